@@ -0,0 +1,42 @@
+#!/usr/bin/env node
+/**
+ * Compare the generated State decoder against the previous generic path
+ * (scValToNative + sanitize + enum normalisation).
+ *
+ * Usage: node scripts/bench-contract-codecs.js [iterations]
+ */
+const {scValToNative} = require('@stellar/stellar-sdk');
+const {decodeState, encodeState} = require('../src/services/contractCodecs');
+const {sanitize} = require('../src/services/sorobanService');
+
+const ITERATIONS = Number(process.argv[2]) || 200000;
+
+function genericDecode(scv) {
+    const raw = sanitize(scValToNative(scv));
+    raw.status = Array.isArray(raw.status) ? String(raw.status[0]).toLowerCase() : raw.status;
+    return raw;
+}
+
+function bench(name, fn, scv) {
+    for (let i = 0; i < 1000; i++) fn(scv); // warm-up
+    const heapBefore = process.memoryUsage().heapUsed;
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < ITERATIONS; i++) fn(scv);
+    const ns = Number(process.hrtime.bigint() - start);
+    const heapDelta = process.memoryUsage().heapUsed - heapBefore;
+    console.log(`${name.padEnd(10)} ${(ns / ITERATIONS).toFixed(0).padStart(6)} ns/op  ` +
+        `${(ITERATIONS / (ns / 1e9)).toFixed(0).padStart(9)} ops/s  heap Δ ${(heapDelta / 1024).toFixed(0)} KiB`);
+}
+
+// Same value the contract returns from get_state
+const state = encodeState({
+    status: 'funding',
+    total_collected: '125000000000',
+    participant_count: 4,
+    version: 3,
+    confirmation_count: 1,
+});
+
+console.log(`get_state decode, ${ITERATIONS} iterations`);
+bench('generic', genericDecode, state);
+bench('generated', decodeState, state);
@@ -0,0 +1,85 @@
+#!/usr/bin/env node
+/**
+ * Compare the compiled catalog serializer against JSON.stringify on a
+ * 5,000-service GET /api/services payload (rows shaped like
+ * serviceModel.findAll, with JSONB schedule/contact/location blobs).
+ *
+ * Usage: node scripts/bench-serializers.js [iterations] [services]
+ */
+const {compileSerializer} = require('../src/services/serializer');
+const {serviceList} = require('../src/schemas/responses');
+
+const ITERATIONS = Number(process.argv[2]) || 200;
+const SERVICES = Number(process.argv[3]) || 5000;
+
+const DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'];
+
+function schedule(i) {
+    const slots = {};
+    for (const day of DAYS) slots[day] = i % 7 === 0 ? [] : [{from: '09:00', to: '13:00'}, {from: '15:00', to: '19:00'}];
+    return {not_applicable: false, timezone: 'America/Bogota', slots};
+}
+
+function row(i) {
+    const locationData = {
+        country: 'Colombia', country_code: 'CO', city: i % 2 ? 'Cartagena' : 'Medellín',
+        address: `Calle ${i % 100} # ${i % 50}-${i % 30}`, lat: 10.39 + i / 1e5, lng: -75.51 - i / 1e5,
+    };
+    const contact = {
+        not_applicable: false, email: `tours${i}@example.com`, phone: '+57 300 000 0000',
+        whatsapp: '+57 300 000 0000', website: `https://example.com/s/${i}`,
+    };
+    const updated = new Date(Date.UTC(2026, 0, 1) + i * 60000);
+    return {
+        id: i + 1,
+        business_id: (i % 250) + 1,
+        name: `Tour "Ciudad amurallada" ${i}`,
+        description: 'Recorrido guiado de 3 horas por el centro histórico, incluye transporte y entradas.',
+        price: `${(50 + (i % 200)).toFixed(7)}`,
+        image_url: i % 3 ? `/images/${i.toString(16).padStart(64, '0')}.webp` : null,
+        location: `${locationData.address}, ${locationData.city}, ${locationData.country}`,
+        location_data: i % 4 ? locationData : null,
+        schedule: i % 5 ? schedule(i) : null,
+        contact_info: i % 6 ? contact : null,
+        active: true,
+        created_at: updated,
+        updated_at: updated,
+        // Internal column a future `SELECT s.*` could add; the schema drops it
+        search_vector: `'amurallada':3 'ciudad':2 'tour':1 '${i}':4`,
+        business_name: `Operador ${(i % 250) + 1}`,
+        business_wallet: 'GBRPYHIL2CI3FNQ4BXLFMNDLFJUNPU2HY3ZMFSHONUCEOASW7QC7OX2H',
+        effective_location: `${locationData.address}, ${locationData.city}, ${locationData.country}`,
+        effective_location_data: locationData,
+        effective_schedule: schedule(i),
+        effective_contact_info: contact,
+    };
+}
+
+function bench(name, fn, payload) {
+    for (let i = 0; i < 10; i++) fn(payload); // warm-up
+    const start = process.hrtime.bigint();
+    let bytes = 0;
+    for (let i = 0; i < ITERATIONS; i++) bytes += fn(payload).length;
+    const ns = Number(process.hrtime.bigint() - start);
+    const ms = ns / ITERATIONS / 1e6;
+    console.log(`${name.padEnd(15)} ${ms.toFixed(2).padStart(7)} ms/op  ` +
+        `${(1000 / ms).toFixed(1).padStart(6)} ops/s  ${(bytes / (ns / 1e9) / 1048576).toFixed(0).padStart(5)} MiB/s`);
+}
+
+const rows = Array.from({length: SERVICES}, (_, i) => row(i));
+const serialize = compileSerializer(serviceList);
+const generic = (payload) => JSON.stringify(payload);
+
+// Same rows without the JSONB blobs: the per-row cost the schema controls
+// (JSONB values are stringified natively either way)
+const JSONB = ['location_data', 'schedule', 'contact_info',
+    'effective_location_data', 'effective_schedule', 'effective_contact_info'];
+const flatRows = rows.map((r) => ({...r, ...Object.fromEntries(JSONB.map((key) => [key, null]))}));
+
+for (const [label, payload] of [['catalog', rows], ['catalog without JSONB', flatRows]]) {
+    console.log(`\nGET /api/services, ${label}: ${SERVICES} services, ${ITERATIONS} iterations`);
+    console.log(`payload: ${(serialize(payload).length / 1024).toFixed(0)} KiB compiled, ` +
+        `${(generic(payload).length / 1024).toFixed(0)} KiB JSON.stringify (includes internal columns)`);
+    bench('JSON.stringify', generic, payload);
+    bench('compiled', serialize, payload);
+}
@@ -0,0 +1,24 @@
+#!/usr/bin/env node
+/**
+ * Remove unreferenced content-addressed images and abandoned direct uploads.
+ *
+ * Usage:
+ *   node scripts/gc-images.js [--dry-run] [--grace-hours=24]
+ */
+require('dotenv').config();
+const pool = require('../src/config/db');
+const {collectGarbage} = require('../src/services/imageGc');
+
+const dryRun = process.argv.includes('--dry-run');
+const graceArg = process.argv.find((a) => a.startsWith('--grace-hours='));
+const graceMs = graceArg ? Number(graceArg.split('=')[1]) * 60 * 60 * 1000 : undefined;
+
+collectGarbage({dryRun, graceMs})
+    .then((result) => {
+        console.log(JSON.stringify(result, null, 2));
+    })
+    .catch((err) => {
+        console.error(err);
+        process.exitCode = 1;
+    })
+    .finally(() => pool.end());
@@ -0,0 +1,197 @@
+#!/usr/bin/env node
+/**
+ * Generate typed ScVal encoders/decoders from the cotravel-escrow contract.
+ *
+ * Reads the #[contracttype] structs and unit enums in
+ * contracts/cotravel-escrow/src/lib.rs and writes
+ * src/services/contractCodecs.js with one decoder/encoder per type that
+ * accesses fields directly instead of going through scValToNative + sanitize.
+ *
+ * Usage:
+ *   node scripts/gen-contract-codecs.js           # write the file
+ *   node scripts/gen-contract-codecs.js --check   # exit 1 if it is stale
+ *
+ * Unsupported field types fail the generation, so a contract change that the
+ * backend cannot decode is caught here rather than at runtime.
+ */
+const fs = require('fs');
+const path = require('path');
+
+const CONTRACT_SRC = path.join(__dirname, '..', '..', 'contracts', 'cotravel-escrow', 'src', 'lib.rs');
+const OUTPUT = path.join(__dirname, '..', 'src', 'services', 'contractCodecs.js');
+
+// ─── Parse the contract source ───────────────────────────────────────────────
+
+function parseContractTypes(source) {
+    const types = [];
+    const re = /#\[contracttype\]\s*(?:#\[derive\([^)]*\)\]\s*)*pub (struct|enum) (\w+) \{([^}]*)\}/g;
+    let match;
+    while ((match = re.exec(source)) !== null) {
+        const [, kind, name, body] = match;
+        const lines = body.split('\n')
+            .map((l) => l.replace(/\/\/.*$/, '').trim())
+            .filter(Boolean);
+
+        if (kind === 'struct') {
+            const fields = lines.map((line) => {
+                const m = line.match(/^pub (\w+): (.+?),?$/);
+                if (!m) throw new Error(`Cannot parse field of ${name}: "${line}"`);
+                return {name: m[1], type: m[2]};
+            });
+            types.push({kind, name, fields});
+        } else {
+            const variants = lines.map((l) => l.replace(/,$/, ''));
+            // Tuple variants (e.g. storage keys) are never returned to the API
+            if (variants.some((v) => v.includes('('))) continue;
+            types.push({kind, name, variants});
+        }
+    }
+    return types;
+}
+
+// ─── Code generation ─────────────────────────────────────────────────────────
+
+const INT_TYPES = new Set(['i64', 'u64', 'i128', 'u128', 'i256', 'u256']);
+
+function decodeExpr(type, v, known) {
+    if (INT_TYPES.has(type)) return `scValToBigInt(expect(${v}, 'scv${intTag(type)}')).toString()`;
+    if (type === 'u32') return `expect(${v}, 'scvU32').u32()`;
+    if (type === 'i32') return `expect(${v}, 'scvI32').i32()`;
+    if (type === 'bool') return `expect(${v}, 'scvBool').b()`;
+    if (type === 'Address') return `Address.fromScVal(expect(${v}, 'scvAddress')).toString()`;
+    if (type === 'Symbol') return `expect(${v}, 'scvSymbol').sym().toString()`;
+    if (type === 'String') return `expect(${v}, 'scvString').str().toString()`;
+
+    const vec = type.match(/^Vec<(.+)>$/);
+    if (vec) return `expect(${v}, 'scvVec').vec().map((x) => ${decodeExpr(vec[1], 'x', known)})`;
+    const opt = type.match(/^Option<(.+)>$/);
+    if (opt) return `(${v}.switch().name === 'scvVoid' ? null : ${decodeExpr(opt[1], v, known)})`;
+
+    if (known.has(type)) return `decode${type}(${v})`;
+    throw new Error(`Unsupported contract type: ${type}`);
+}
+
+function encodeExpr(type, v, known) {
+    if (INT_TYPES.has(type) || ['u32', 'i32', 'bool'].includes(type)) {
+        return `nativeToScVal(${v}, {type: '${type}'})`;
+    }
+    if (type === 'Symbol') return `xdr.ScVal.scvSymbol(${v})`;
+    if (type === 'String') return `xdr.ScVal.scvString(${v})`;
+    if (type === 'Address') return `new Address(${v}).toScVal()`;
+
+    const vec = type.match(/^Vec<(.+)>$/);
+    if (vec) return `xdr.ScVal.scvVec(${v}.map((x) => ${encodeExpr(vec[1], 'x', known)}))`;
+    const opt = type.match(/^Option<(.+)>$/);
+    if (opt) return `(${v} == null ? xdr.ScVal.scvVoid() : ${encodeExpr(opt[1], v, known)})`;
+
+    if (known.has(type)) return `encode${type}(${v})`;
+    throw new Error(`Unsupported contract type: ${type}`);
+}
+
+function intTag(type) {
+    return type[0].toUpperCase() + type.slice(1);
+}
+
+function generateStruct(type, known) {
+    const fields = type.fields;
+    const locals = fields.map((f) => `    let ${f.name};`).join('\n');
+    const cases = fields.map((f) =>
+        `            case '${f.name}':\n                ${f.name} = ${decodeExpr(f.type, 'entry.val()', known)};\n                break;`
+    ).join('\n');
+    const checks = fields.map((f) => `${f.name} === undefined`).join(' || ');
+    const props = fields.map((f) => f.name).join(', ');
+
+    // Soroban serializes struct maps with keys in sorted order
+    const sorted = [...fields].sort((a, b) => (a.name < b.name ? -1 : 1));
+    const entries = sorted.map((f) =>
+        `        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('${f.name}'), val: ${encodeExpr(f.type, `value.${f.name}`, known)}}),`
+    ).join('\n');
+
+    return `// ${type.name} { ${fields.map((f) => `${f.name}: ${f.type}`).join(', ')} }
+function decode${type.name}(scv) {
+${locals}
+    for (const entry of expect(scv, 'scvMap').map()) {
+        switch (entry.key().sym().toString()) {
+${cases}
+            default:
+                break;
+        }
+    }
+    if (${checks}) {
+        throw new TypeError('${type.name}: missing field');
+    }
+    return {${props}};
+}
+
+function encode${type.name}(value) {
+    return xdr.ScVal.scvMap([
+${entries}
+    ]);
+}
+`;
+}
+
+function generateEnum(type) {
+    const cases = type.variants.map((v) => `        case '${v}':\n            return '${v.toLowerCase()}';`).join('\n');
+    const encodeCases = type.variants.map((v) => `'${v.toLowerCase()}': '${v}'`).join(', ');
+    return `// enum ${type.name} { ${type.variants.join(', ')} } — decoded as lowercase strings
+function decode${type.name}(scv) {
+    const tag = expect(scv, 'scvVec').vec()[0].sym().toString();
+    switch (tag) {
+${cases}
+        default:
+            throw new TypeError(\`${type.name}: unknown variant \${tag}\`);
+    }
+}
+
+const ${type.name.toUpperCase()}_VARIANTS = {${encodeCases}};
+
+function encode${type.name}(value) {
+    const tag = ${type.name.toUpperCase()}_VARIANTS[value];
+    if (!tag) throw new TypeError(\`${type.name}: unknown variant \${value}\`);
+    return xdr.ScVal.scvVec([xdr.ScVal.scvSymbol(tag)]);
+}
+`;
+}
+
+function generate(source) {
+    const types = parseContractTypes(source);
+    const known = new Set(types.map((t) => t.name));
+    const body = types.map((t) => (t.kind === 'struct' ? generateStruct(t, known) : generateEnum(t))).join('\n');
+    const exported = types.flatMap((t) => [`decode${t.name}`, `encode${t.name}`]);
+
+    return `// Code generated by scripts/gen-contract-codecs.js from
+// contracts/cotravel-escrow/src/lib.rs. DO NOT EDIT.
+const {Address, nativeToScVal, scValToBigInt, xdr} = require('@stellar/stellar-sdk');
+
+function expect(scv, kind) {
+    if (scv.switch().name !== kind) {
+        throw new TypeError(\`Expected \${kind}, got \${scv.switch().name}\`);
+    }
+    return scv;
+}
+
+${body}
+module.exports = {
+${exported.map((n) => `    ${n},`).join('\n')}
+};
+`;
+}
+
+// ─── CLI ─────────────────────────────────────────────────────────────────────
+
+if (require.main === module) {
+    const output = generate(fs.readFileSync(CONTRACT_SRC, 'utf8'));
+    if (process.argv.includes('--check')) {
+        const current = fs.existsSync(OUTPUT) ? fs.readFileSync(OUTPUT, 'utf8') : '';
+        if (current !== output) {
+            console.error('contractCodecs.js is stale: run npm run codegen:contract');
+            process.exit(1);
+        }
+    } else {
+        fs.writeFileSync(OUTPUT, output);
+        console.log(`Wrote ${path.relative(process.cwd(), OUTPUT)}`);
+    }
+}
+
+module.exports = {generate, parseContractTypes, CONTRACT_SRC, OUTPUT};
@@ -0,0 +1,30 @@
+#!/usr/bin/env node
+/**
+ * Backfill the Postgres images index from the MinIO bucket, for objects
+ * uploaded before the index existed.
+ *
+ * Usage: node scripts/reindex-images.js
+ */
+require('dotenv').config();
+const pool = require('../src/config/db');
+const {minioClient, BUCKETS} = require('../src/config/minio');
+const imageModel = require('../src/models/imageModel');
+const {INCOMING_PREFIX} = require('../src/services/imageKeys');
+
+async function main() {
+    let count = 0;
+    for await (const obj of minioClient.listObjectsV2(BUCKETS.IMAGES, '', true)) {
+        if (!obj.name || obj.name.startsWith(INCOMING_PREFIX)) continue;
+        const stat = await minioClient.statObject(BUCKETS.IMAGES, obj.name);
+        await imageModel.upsert({key: obj.name, size: obj.size, contentType: stat.metaData['content-type']});
+        count++;
+    }
+    console.log(`Indexed ${count} images`);
+}
+
+main()
+    .catch((err) => {
+        console.error(err);
+        process.exitCode = 1;
+    })
+    .finally(() => pool.end());
@@ -0,0 +1,42 @@
+#!/usr/bin/env node
+/**
+ * Rebuild daily_stats for a range of days and optionally resync stat_counters.
+ *
+ * Usage:
+ *   node scripts/rollup-stats.js [--from=YYYY-MM-DD] [--to=YYYY-MM-DD] [--recount]
+ *
+ * Defaults to yesterday and today, like the background job.
+ */
+require('dotenv').config();
+const pool = require('../src/config/db');
+const statsModel = require('../src/models/statsModel');
+const {rollupRecent} = require('../src/services/statsRollup');
+
+const arg = (name) => {
+    const found = process.argv.find((a) => a.startsWith(`--${name}=`));
+    return found ? found.split('=')[1] : undefined;
+};
+
+async function main() {
+    if (process.argv.includes('--recount')) {
+        await statsModel.recount();
+        console.log('stat_counters resynced:', await statsModel.getCounters());
+    }
+
+    const from = arg('from');
+    const to = arg('to');
+    if (from || to) {
+        const days = await statsModel.rollup(from || to, to || from);
+        console.log(`Rolled up ${days} day(s) from ${from || to} to ${to || from}`);
+    } else {
+        const result = await rollupRecent();
+        console.log(`Rolled up ${result.days} day(s) from ${result.from} to ${result.to}`);
+    }
+}
+
+main()
+    .catch((err) => {
+        console.error(err);
+        process.exitCode = 1;
+    })
+    .finally(() => pool.end());
@@ -2,11 +2,15 @@ require('dotenv').config();
 const express = require('express');
 const cors = require('cors');
 const helmet = require('helmet');
-const rateLimit = require('express-rate-limit');
 const pinoHttp = require('pino-http');
 const {randomUUID} = require('crypto');
 const logger = require('./config/logger');
 const errorHandler = require('./middleware/errorHandler');
+const {httpMetrics} = require('./middleware/metrics');
+const {tracingMiddleware} = require('./services/tracing');
+const {rateLimit, requestCost} = require('./middleware/rateLimit');
+const {trackRequests} = require('./services/shutdown');
+const {compression} = require('./middleware/compression');
 
 const app = express();
 
@@ -27,25 +31,39 @@ app.use(cors({
     origin: allowedOrigins,
     credentials: true,
     methods: ['GET', 'POST', 'PUT', 'DELETE'],
-    allowedHeaders: ['Content-Type', 'Authorization'],
+    allowedHeaders: ['Content-Type', 'Authorization', 'traceparent'],
 }));
 
 // ─── Body parsing with size limit ───────────────────────────────────────────
 app.use(express.json({limit: '16kb'}));
 
+// ─── Response compression (brotli/gzip, JSON and text over 1KB) ──────────────
+app.use(compression());
+
 // ─── Request ID ─────────────────────────────────────────────────────────────
 app.use((req, _res, next) => {
     req.id = randomUUID();
     next();
 });
 
+// ─── In-flight tracking (drained on shutdown) ────────────────────────────────
+app.use(trackRequests);
+
+// ─── Tracing (continues an incoming traceparent, tags spans with req.id) ────
+app.use(tracingMiddleware);
+
+// ─── Request metrics (route template, status, latency) ──────────────────────
+app.use(httpMetrics);
+
 // ─── HTTP request logging ───────────────────────────────────────────────────
 app.use(pinoHttp({
     logger,
     genReqId: (req) => req.id,
+    // Correlate log lines with exported traces
+    customProps: (req) => (req.traceId ? {traceId: req.traceId} : {}),
     // Don't log health checks to reduce noise
     autoLogging: {
-        ignore: (req) => req.url === '/health' || req.url === '/',
+        ignore: (req) => req.url.startsWith('/health') || req.url === '/' || req.url === '/metrics',
     },
     customLogLevel: (_req, res, err) => {
         if (res.statusCode >= 500 || err) return 'error';
@@ -66,29 +84,33 @@ app.use(pinoHttp({
 }));
 
 // ─── Rate limiting (disabled during tests) ──────────────────────────────────
+// Budgets per user (or IP when anonymous), shared through Postgres in
+// cluster mode. The global budget is weighted: reads cost 1, writes 2 and
+// routes that submit a transaction 10 (see middleware/rateLimit).
 const skipInTest = () => process.env.NODE_ENV === 'test';
 
 const globalLimiter = rateLimit({
+    name: 'global',
+    limit: 100,
     windowMs: 60 * 1000,
-    max: 100,
-    standardHeaders: true,
-    legacyHeaders: false,
-    skip: (req) => skipInTest() || (req.method === 'GET' && req.path.startsWith('/images')),
-    message: {error: 'Too many requests, please try again later'},
+    cost: requestCost,
+    // Batched sub-requests were paid for by their POST /api/batch
+    skip: (req) => skipInTest() || req.batched || (req.method === 'GET'
+        && (req.path.startsWith('/images') || req.path.startsWith('/health') || req.path === '/metrics')),
 });
 app.use(globalLimiter);
 
 const authLimiter = rateLimit({
+    name: 'auth',
+    limit: 15,
     windowMs: 60 * 1000,
-    max: 15,
-    standardHeaders: true,
-    legacyHeaders: false,
     skip: skipInTest,
-    message: {error: 'Too many auth attempts, please try again later'},
+    message: 'Too many auth attempts, please try again later',
 });
 
 // ─── Routes ─────────────────────────────────────────────────────────────────
 app.use('/health', require('./routes/health'));
+app.use('/metrics', require('./routes/metrics'));
 app.use('/api/auth', authLimiter, require('./routes/auth'));
 app.use('/api/users', require('./routes/users'));
 app.use('/api/businesses', require('./routes/businesses'));
@@ -96,6 +118,7 @@ app.use('/api/services', require('./routes/services'));
 app.use('/api/cart', require('./routes/cart'));
 app.use('/api/invoices', require('./routes/invoices'));
 app.use('/api/admin', require('./routes/admin'));
+app.use('/api/batch', require('./routes/batch'));
 app.use('/images', require('./routes/images'));
 
 // Root
@@ -0,0 +1,219 @@
+const cluster = require('cluster');
+const os = require('os');
+const logger = require('./config/logger');
+
+// ─── Cluster supervisor ──────────────────────────────────────────────────────
+// CLUSTER_WORKERS=N (or `auto` for one per core) forks N copies of the API
+// that share the listening port. The primary process only supervises: it
+// holds no pg pool and serves no requests.
+//
+//   - crashed workers are replaced, with a growing delay if they crash on boot
+//   - SIGHUP restarts the workers one at a time: the replacement must be
+//     listening before the old worker is asked to drain, so capacity never
+//     drops below N-1
+//   - SIGTERM/SIGINT drain every worker (see services/shutdown.js) and exit
+//     once they are gone, or kill them after SHUTDOWN_TIMEOUT_MS
+//
+// Workers get CLUSTER_WORKER_INDEX (0..N-1); only worker 0 runs the
+// scheduled jobs (image GC, stats rollup).
+//
+// The primary also relays /metrics: the scraped worker asks it for every
+// worker's registry snapshot (see services/clusterMetrics.js).
+
+const BOOT_TIMEOUT_MS = 30 * 1000;
+const CRASH_WINDOW_MS = 10 * 1000;     // exits sooner than this after boot count as crash loops
+const MAX_RESPAWN_DELAY_MS = 30 * 1000;
+const SNAPSHOT_TIMEOUT_MS = 2000;      // a busy worker is reported with its previous snapshot
+
+// Add an exited worker's counters and histograms (from its last metrics
+// snapshot) to `retired`, itself a snapshot. Keeping them in the cluster
+// totals means a restart doesn't make the summed counters drop. Gauges only
+// describe live workers and are left out.
+function foldRetired(retired, metrics) {
+    for (const [name, {kind, series}] of Object.entries(metrics)) {
+        if (kind === 'gauge') continue;
+        const totals = new Map(retired[name]?.series);
+        for (const [key, value] of series) {
+            const prev = totals.get(key);
+            if (kind === 'counter') {
+                totals.set(key, (prev || 0) + value);
+            } else {
+                totals.set(key, prev ? {
+                    counts: prev.counts.map((n, i) => n + value.counts[i]),
+                    sum: prev.sum + value.sum,
+                    count: prev.count + value.count,
+                } : value);
+            }
+        }
+        retired[name] = {kind, series: [...totals]};
+    }
+    return retired;
+}
+
+function workerCount(value) {
+    if (value === 'auto') return os.availableParallelism();
+    const n = parseInt(value, 10);
+    return Number.isFinite(n) && n > 0 ? n : 1;
+}
+
+function supervise(count, shutdownTimeoutMs) {
+    // worker.id -> {index, startedAt, retiring, replacing}
+    const workers = new Map();
+    const respawnDelay = new Array(count).fill(0);
+    let stopping = false;
+    let restarting = false;
+
+    function fork(index) {
+        const worker = cluster.fork({CLUSTER_WORKER_INDEX: String(index)});
+        workers.set(worker.id, {index, startedAt: Date.now(), retiring: false, replacing: false});
+        return worker;
+    }
+
+    // Resolve when the worker is accepting connections; reject if it exits first
+    function whenListening(worker) {
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(() => reject(new Error('worker did not start listening in time')), BOOT_TIMEOUT_MS);
+            worker.once('listening', () => {
+                clearTimeout(timer);
+                resolve();
+            });
+            worker.once('exit', () => {
+                clearTimeout(timer);
+                reject(new Error('worker exited during boot'));
+            });
+        });
+    }
+
+    // Ask a worker to drain; SIGKILL it if it outlives the shutdown deadline
+    function retire(worker) {
+        return new Promise((resolve) => {
+            const state = workers.get(worker.id);
+            if (state) state.retiring = true;
+            const timer = setTimeout(() => {
+                logger.warn({pid: worker.process.pid}, 'Worker did not drain in time, killing');
+                worker.process.kill('SIGKILL');
+            }, shutdownTimeoutMs + 5000);
+            worker.once('exit', () => {
+                clearTimeout(timer);
+                resolve();
+            });
+            worker.process.kill('SIGTERM');
+        });
+    }
+
+    // ─── Metrics relay ───
+    // worker.id -> {worker: index, metrics} from the last answered request
+    const snapshots = new Map();
+    // Counters and histograms of exited workers (see foldRetired)
+    const retired = {};
+    // request id -> {requester, waiting: Set<worker.id>, timer}
+    const collecting = new Map();
+
+    function collectMetrics(requester, id) {
+        const request = {requester, waiting: new Set(), timer: null};
+        collecting.set(id, request);
+        for (const worker of Object.values(cluster.workers)) {
+            if (!worker.isConnected()) continue;
+            request.waiting.add(worker.id);
+            worker.send({type: 'metrics:snapshot', id});
+        }
+        request.timer = setTimeout(() => finishMetrics(id), SNAPSHOT_TIMEOUT_MS);
+    }
+
+    function finishMetrics(id) {
+        const request = collecting.get(id);
+        if (!request) return;
+        clearTimeout(request.timer);
+        collecting.delete(id);
+        if (request.requester.isConnected()) {
+            const live = [...snapshots.values()].sort((a, b) => a.worker - b.worker);
+            request.requester.send({
+                type: 'metrics:collected', id,
+                snapshots: [...live, {worker: 'retired', metrics: retired}],
+            });
+        }
+    }
+
+    cluster.on('message', (worker, msg) => {
+        if (msg?.type === 'metrics:collect') {
+            collectMetrics(worker, msg.id);
+        } else if (msg?.type === 'metrics:snapshot') {
+            const state = workers.get(worker.id);
+            if (state) snapshots.set(worker.id, {worker: state.index, metrics: msg.metrics});
+            const request = collecting.get(msg.id);
+            if (!request) return;
+            request.waiting.delete(worker.id);
+            if (request.waiting.size === 0) finishMetrics(msg.id);
+        }
+    });
+
+    cluster.on('exit', (worker, code, signal) => {
+        const state = workers.get(worker.id);
+        workers.delete(worker.id);
+        const last = snapshots.get(worker.id);
+        if (last) foldRetired(retired, last.metrics);
+        snapshots.delete(worker.id);
+        for (const [id, request] of collecting) {
+            if (request.waiting.delete(worker.id) && request.waiting.size === 0) finishMetrics(id);
+        }
+        // Replacements that fail to boot are handled by rollingRestart
+        if (!state || state.retiring || state.replacing || stopping) return;
+
+        const uptime = Date.now() - state.startedAt;
+        const delay = uptime < CRASH_WINDOW_MS
+            ? Math.min(Math.max(respawnDelay[state.index] * 2, 1000), MAX_RESPAWN_DELAY_MS)
+            : 0;
+        respawnDelay[state.index] = delay;
+        logger.error({pid: worker.process.pid, code, signal, index: state.index, respawnInMs: delay}, 'Worker died');
+        setTimeout(() => {
+            if (!stopping) fork(state.index);
+        }, delay);
+    });
+
+    async function rollingRestart() {
+        if (restarting || stopping) return;
+        restarting = true;
+        logger.info({workers: workers.size}, 'Rolling restart started');
+        try {
+            for (const id of [...workers.keys()]) {
+                const old = cluster.workers[id];
+                const state = workers.get(id);
+                if (!old || !state || stopping) continue;
+
+                const replacement = fork(state.index);
+                const next = workers.get(replacement.id);
+                next.replacing = true;
+                try {
+                    await whenListening(replacement);
+                } catch (err) {
+                    // Keep the old worker serving; a broken build stops the roll
+                    logger.error({err: err.message, index: state.index}, 'Rolling restart aborted');
+                    replacement.process.kill('SIGKILL');
+                    return;
+                }
+                next.replacing = false;
+                await retire(old);
+            }
+            logger.info({workers: workers.size}, 'Rolling restart complete');
+        } finally {
+            restarting = false;
+        }
+    }
+
+    async function stop(signal) {
+        if (stopping) return;
+        stopping = true;
+        logger.info({signal, workers: workers.size}, 'Stopping workers');
+        await Promise.all(Object.values(cluster.workers).map(retire));
+        process.exit(0);
+    }
+
+    process.on('SIGHUP', rollingRestart);
+    process.on('SIGTERM', () => stop('SIGTERM'));
+    process.on('SIGINT', () => stop('SIGINT'));
+
+    logger.info({pid: process.pid, workers: count}, 'Cluster supervisor started');
+    for (let i = 0; i < count; i++) fork(i);
+}
+
+module.exports = {workerCount, supervise, foldRetired};
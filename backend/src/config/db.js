@@ -1,10 +1,59 @@
 const {Pool} = require('pg');
 const logger = require('./logger');
+const tracing = require('../services/tracing');
+const queryStats = require('../services/queryStats');
 
 const pool = new Pool({
     connectionString: process.env.DATABASE_URL,
 });
 
+// EXPLAIN ANALYZE executes the statement: run it on its own client, in a
+// read-only transaction that is always rolled back
+async function explain(sql, values) {
+    const client = await pool.connect();
+    try {
+        await client.query('BEGIN READ ONLY');
+        return await client.query(`EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ${sql}`, values);
+    } finally {
+        await client.query('ROLLBACK').catch(() => {});
+        client.release();
+    }
+}
+
+// Every statement is timed into queryStats (slow-query log, EXPLAIN samples,
+// per-fingerprint aggregates) and traced as a client span under the current
+// request/model span. Only the SQL text is recorded, never the parameter
+// values.
+const query = pool.query.bind(pool);
+pool.query = (text, ...rest) => {
+    // Callback and Submittable (cursor/stream) forms are passed through
+    if (typeof rest[rest.length - 1] === 'function' || typeof text?.submit === 'function') {
+        return query(text, ...rest);
+    }
+    const statement = String((typeof text === 'string' ? text : text?.text) || '');
+    const values = rest[0] ?? text?.values;
+    const run = () => {
+        const start = process.hrtime.bigint();
+        const done = (error) => queryStats.record(statement, values, Number(process.hrtime.bigint() - start) / 1e6,
+            {error, explain});
+        return query(text, ...rest).then(
+            (result) => {
+                done(false);
+                return result;
+            },
+            (err) => {
+                done(true);
+                throw err;
+            }
+        );
+    };
+    if (!tracing.enabled()) return run();
+    return tracing.withSpan('pg.query', {
+        'db.system': 'postgresql',
+        'db.statement': statement.replace(/\s+/g, ' ').trim().slice(0, 500),
+    }, run, tracing.SPAN_KIND.CLIENT);
+};
+
 pool.on('error', (err) => {
     logger.error({err}, 'PostgreSQL pool error');
 });
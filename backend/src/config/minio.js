@@ -1,5 +1,11 @@
+const http = require('http');
 const Minio = require('minio');
 const logger = require('./logger');
+const {instrumentStorage} = require('../services/metrics');
+
+// Own keep-alive agent (instead of the global one) so shutdown can close
+// the pooled sockets to MinIO
+const agent = new http.Agent({keepAlive: true});
 
 const minioClient = new Minio.Client({
     endPoint: process.env.MINIO_ENDPOINT || 'minio',
@@ -7,10 +13,38 @@ const minioClient = new Minio.Client({
     useSSL: false,
     accessKey: process.env.MINIO_ACCESS_KEY || 'minioadmin',
     secretKey: process.env.MINIO_SECRET_KEY || 'minioadmin123',
+    transportAgent: agent,
 });
 
+// Time every network call in minio_operation_duration_seconds. Streaming
+// listings (listObjects, listObjectsV2) return streams and are not wrapped.
+instrumentStorage(minioClient, [
+    'bucketExists', 'makeBucket', 'listBuckets', 'getObject', 'getPartialObject', 'putObject',
+    'statObject', 'copyObject', 'removeObject', 'removeObjects',
+]);
+
+// Client used only to presign URLs handed to browsers. It signs for the
+// public endpoint (MINIO_PUBLIC_URL) and has a fixed region so presigning
+// never makes a network call. null when direct-to-storage access is disabled.
+function createPublicClient(url) {
+    if (!url) return null;
+    const u = new URL(url);
+    const useSSL = u.protocol === 'https:';
+    return new Minio.Client({
+        endPoint: u.hostname,
+        port: parseInt(u.port) || (useSSL ? 443 : 80),
+        useSSL,
+        accessKey: process.env.MINIO_ACCESS_KEY || 'minioadmin',
+        secretKey: process.env.MINIO_SECRET_KEY || 'minioadmin123',
+        region: process.env.MINIO_REGION || 'us-east-1',
+    });
+}
+
+const publicClient = createPublicClient(process.env.MINIO_PUBLIC_URL);
+
 const BUCKETS = {
     IMAGES: 'images',
+    DERIVATIVES: 'image-derivatives',
 };
 
 async function initBuckets() {
@@ -23,4 +57,8 @@ async function initBuckets() {
     }
 }
 
-module.exports = {minioClient, BUCKETS, initBuckets};
+function closeStorage() {
+    agent.destroy();
+}
+
+module.exports = {minioClient, publicClient, BUCKETS, initBuckets, closeStorage};
@@ -1,7 +1,16 @@
-const {rpc} = require('@stellar/stellar-sdk');
+const {RpcPool} = require('../services/rpcPool');
 
-const rpcUrl = process.env.SOROBAN_RPC_URL || 'https://soroban-testnet.stellar.org';
-const server = new rpc.Server(rpcUrl);
+// SOROBAN_RPC_URLS takes a comma-separated list of providers; the single
+// SOROBAN_RPC_URL is still accepted.
+const rpcUrls = (process.env.SOROBAN_RPC_URLS || process.env.SOROBAN_RPC_URL || 'https://soroban-testnet.stellar.org')
+    .split(',')
+    .map((url) => url.trim())
+    .filter(Boolean);
+
+const server = new RpcPool(rpcUrls, {
+    timeoutMs: parseInt(process.env.SOROBAN_RPC_TIMEOUT_MS, 10) || 10000,
+    hedgeMs: parseInt(process.env.SOROBAN_RPC_HEDGE_MS, 10) || 500,
+});
 
 const CONTRACT_ID = process.env.CONTRACT_ID;
 const NETWORK_PASSPHRASE = process.env.SOROBAN_NETWORK_PASSPHRASE || 'Test SDF Network ; September 2015';
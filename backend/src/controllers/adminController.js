@@ -1,23 +1,124 @@
 const userModel = require('../models/userModel');
 const businessModel = require('../models/businessModel');
 const invoiceModel = require('../models/invoiceModel');
+const statsModel = require('../models/statsModel');
 const logger = require('../config/logger');
+const {server: sorobanRpc} = require('../config/soroban');
+const imageGc = require('../services/imageGc');
+const queryStats = require('../services/queryStats');
+const {isoDay} = require('../services/statsRollup');
+
+const MAX_ANALYTICS_DAYS = 366;
+const DAY_MS = 24 * 60 * 60 * 1000;
+const MAX_QUERY_STATS = 100;
+
+// Parse ?from=&to= (YYYY-MM-DD, inclusive). Defaults to the last 30 days.
+function parseDayRange(query) {
+    const valid = (d) => typeof d === 'string' && /^\d{4}-\d{2}-\d{2}$/.test(d)
+        && !Number.isNaN(Date.parse(d)) && isoDay(new Date(d)) === d;
+    const to = query.to ?? isoDay(new Date());
+    if (!valid(to)) {
+        return {error: 'from and to must be dates in YYYY-MM-DD format'};
+    }
+    const from = query.from ?? isoDay(new Date(Date.parse(to) - 29 * DAY_MS));
+    if (!valid(from)) {
+        return {error: 'from and to must be dates in YYYY-MM-DD format'};
+    }
+    const days = (Date.parse(to) - Date.parse(from)) / DAY_MS + 1;
+    if (days < 1 || days > MAX_ANALYTICS_DAYS) {
+        return {error: `Range must cover between 1 and ${MAX_ANALYTICS_DAYS} days`};
+    }
+    return {from, to};
+}
 
 module.exports = {
     // GET /api/admin/stats
     async getStats(req, res, next) {
         try {
-            const [users, businesses, invoices] = await Promise.all([
-                userModel.count(),
-                businessModel.count(),
-                invoiceModel.count(),
-            ]);
+            const {users, businesses, invoices} = await statsModel.getCounters();
             res.json({users, businesses, invoices});
         } catch (err) {
             next(err);
         }
     },
 
+    // GET /api/admin/analytics?from=YYYY-MM-DD&to=YYYY-MM-DD — daily rollups
+    async getAnalytics(req, res, next) {
+        try {
+            const range = parseDayRange(req.query);
+            if (range.error) {
+                return res.status(400).json({error: range.error});
+            }
+
+            const days = await statsModel.findDaily(range.from, range.to);
+            const totals = {new_users: 0, new_businesses: 0, new_invoices: 0, total_collected: 0,
+                released_volume: 0, funded_invoices: 0, avg_funding_seconds: null};
+            let fundingSeconds = 0;
+            for (const day of days) {
+                totals.new_users += day.new_users;
+                totals.new_businesses += day.new_businesses;
+                totals.new_invoices += day.new_invoices;
+                totals.total_collected += parseFloat(day.total_collected);
+                totals.released_volume += parseFloat(day.released_volume);
+                totals.funded_invoices += day.funded_invoices;
+                fundingSeconds += (day.avg_funding_seconds || 0) * day.funded_invoices;
+            }
+            if (totals.funded_invoices > 0) {
+                totals.avg_funding_seconds = Math.round(fundingSeconds / totals.funded_invoices);
+            }
+
+            res.json({...range, days, totals});
+        } catch (err) {
+            next(err);
+        }
+    },
+
+    // POST /api/admin/analytics/rollup  { from?, to? } — recompute daily rollups
+    async rollupAnalytics(req, res, next) {
+        try {
+            const range = parseDayRange(req.body);
+            if (range.error) {
+                return res.status(400).json({error: range.error});
+            }
+            const days = await statsModel.rollup(range.from, range.to);
+            logger.info({...range, days, requestedBy: req.user.id}, 'Daily stats rebuilt');
+            res.json({...range, days});
+        } catch (err) {
+            next(err);
+        }
+    },
+
+    // GET /api/admin/rpc — per-endpoint Soroban RPC health and latency
+    getRpcStats(req, res) {
+        res.json({endpoints: sorobanRpc.stats()});
+    },
+
+    // GET /api/admin/queries?limit=&sort=total|mean|max|calls|slow
+    getQueryStats(req, res) {
+        const sort = req.query.sort || 'total';
+        if (!queryStats.SORT_KEYS[sort]) {
+            return res.status(400).json({error: `sort must be one of: ${Object.keys(queryStats.SORT_KEYS).join(', ')}`});
+        }
+        const limit = Math.min(Math.max(parseInt(req.query.limit) || 20, 1), MAX_QUERY_STATS);
+        res.json({sort, queries: queryStats.top({limit, sort})});
+    },
+
+    // DELETE /api/admin/queries — start a fresh measurement window
+    resetQueryStats(req, res) {
+        queryStats.reset();
+        res.status(204).end();
+    },
+
+    // POST /api/admin/images/gc  { dry_run?: boolean }
+    async collectImageGarbage(req, res, next) {
+        try {
+            const result = await imageGc.collectGarbage({dryRun: req.body.dry_run === true});
+            res.json(result);
+        } catch (err) {
+            next(err);
+        }
+    },
+
     // GET /api/admin/users?page=1&limit=50
     async getUsers(req, res, next) {
         try {
@@ -25,7 +126,7 @@ module.exports = {
             const limit = Math.min(100, Math.max(1, parseInt(req.query.limit, 10) || 50));
             const [users, total] = await Promise.all([
                 userModel.findAll({page, limit}),
-                userModel.count(),
+                statsModel.getCounter('users'),
             ]);
             res.json({data: users, total, page, limit});
         } catch (err) {
@@ -70,7 +171,7 @@ module.exports = {
             const limit = Math.min(100, Math.max(1, parseInt(req.query.limit, 10) || 20));
             const [businesses, total] = await Promise.all([
                 businessModel.findAll({page, limit}),
-                businessModel.count(),
+                statsModel.getCounter('businesses'),
             ]);
             res.json({data: businesses, total, page, limit});
         } catch (err) {
@@ -85,7 +186,7 @@ module.exports = {
             const limit = Math.min(100, Math.max(1, parseInt(req.query.limit, 10) || 20));
             const [invoices, total] = await Promise.all([
                 invoiceModel.findAll({page, limit}),
-                invoiceModel.count(),
+                statsModel.getCounter('invoices'),
             ]);
             res.json({data: invoices, total, page, limit});
         } catch (err) {
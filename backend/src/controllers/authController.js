@@ -1,11 +1,10 @@
 const {Keypair} = require('@stellar/stellar-sdk');
 const crypto = require('crypto');
 const userModel = require('../models/userModel');
+const challengeModel = require('../models/challengeModel');
 const {generateToken} = require('../middleware/auth');
 const logger = require('../config/logger');
 
-// In-memory challenge store (simple for bootcamp, use Redis in production)
-const challenges = new Map();
 const CHALLENGE_EXPIRY_MS = 5 * 60 * 1000; // 5 minutes
 
 /**
@@ -28,24 +27,10 @@ module.exports = {
     async getChallenge(req, res, next) {
         try {
             const {wallet} = req.query;
-            if (!wallet) {
-                return res.status(400).json({error: 'wallet query parameter required'});
-            }
-
             const nonce = crypto.randomBytes(32).toString('hex');
             const message = `CoTravel Login: ${nonce}`;
 
-            challenges.set(wallet, {
-                message,
-                createdAt: Date.now(),
-            });
-
-            // Cleanup expired challenges
-            for (const [key, val] of challenges) {
-                if (Date.now() - val.createdAt > CHALLENGE_EXPIRY_MS) {
-                    challenges.delete(key);
-                }
-            }
+            await challengeModel.issue(wallet, message, CHALLENGE_EXPIRY_MS);
 
             logger.debug({wallet: wallet.slice(0, 8) + '...'}, 'Challenge issued');
             res.json({challenge: message});
@@ -65,13 +50,13 @@ module.exports = {
                     return res.status(400).json({error: 'wallet and signature required'});
                 }
 
-                const stored = challenges.get(wallet);
+                const stored = await challengeModel.find(wallet, CHALLENGE_EXPIRY_MS);
                 if (!stored) {
                     return res.status(400).json({error: 'No challenge found. Request one first.'});
                 }
 
-                if (Date.now() - stored.createdAt > CHALLENGE_EXPIRY_MS) {
-                    challenges.delete(wallet);
+                if (stored.expired) {
+                    await challengeModel.remove(wallet);
                     return res.status(400).json({error: 'Challenge expired. Request a new one.'});
                 }
 
@@ -89,7 +74,10 @@ module.exports = {
                     return res.status(401).json({error: 'Signature verification failed: ' + e.message});
                 }
 
-                challenges.delete(wallet);
+                // Single use: a concurrent login with the same signature loses here
+                if (!await challengeModel.remove(wallet, stored.message)) {
+                    return res.status(400).json({error: 'No challenge found. Request one first.'});
+                }
 
                 let user = await userModel.findByWallet(wallet);
                 const isNew = !user;
@@ -0,0 +1,107 @@
+const http = require('http');
+const tracing = require('../services/tracing');
+const {withRequestCache} = require('../services/requestCache');
+
+// Headers every sub-request inherits from the batch request. Authorization
+// is the shared auth; Accept-Encoding is left out so sub-responses are not
+// compressed twice (the batch response itself is).
+const FORWARDED_HEADERS = ['authorization', 'accept-language', 'user-agent', 'x-forwarded-for'];
+
+// Run one GET through the app's middleware and routes, in memory, and
+// resolve with its status, content type and raw body. A sub-request that
+// hasn't ended after timeoutMs resolves as a 504 and is closed, so one slow
+// or never-ending handler can't hold the whole batch.
+function dispatch(req, path, timeoutMs) {
+    return new Promise((resolve) => {
+        const sub = new http.IncomingMessage(req.socket);
+        sub.method = 'GET';
+        sub.url = path;
+        sub.headers = {accept: 'application/json'};
+        for (const name of FORWARDED_HEADERS) {
+            if (req.headers[name] !== undefined) sub.headers[name] = req.headers[name];
+        }
+        // Sub-request spans are children of the batch request's span
+        const traceparent = tracing.currentSpan()?.traceparent() ?? req.headers.traceparent;
+        if (traceparent) sub.headers.traceparent = traceparent;
+        sub.batched = true;
+        sub.push(null);
+
+        const res = new http.ServerResponse(sub);
+        const timer = setTimeout(() => {
+            resolve({status: 504, type: 'application/json', body: Buffer.from('{"error":"Sub-request timed out"}')});
+            // Lets 'close' listeners (in-flight tracking, SSE subscribers) clean up
+            res.emit('close');
+        }, timeoutMs);
+        const chunks = [];
+        const collect = (chunk, encoding) => {
+            if (!chunk || typeof chunk === 'function') return;
+            chunks.push(Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk, typeof encoding === 'string' ? encoding : undefined));
+        };
+        res.write = function (chunk, encoding, callback) {
+            if (!res.headersSent) res.writeHead(res.statusCode);
+            collect(chunk, encoding);
+            if (typeof encoding === 'function') encoding();
+            else if (typeof callback === 'function') callback();
+            return true;
+        };
+        res.end = function (chunk, encoding, callback) {
+            if (res.writableEnded) return res;
+            if (!res.headersSent) res.writeHead(res.statusCode);
+            collect(chunk, encoding);
+            res.finished = true;
+            clearTimeout(timer);
+            resolve({
+                status: res.statusCode,
+                type: String(res.getHeader('Content-Type') || ''),
+                body: Buffer.concat(chunks),
+            });
+            // Request logging, metrics, tracing and in-flight tracking
+            // complete on 'finish' like for any other response
+            res.emit('finish');
+            const done = [chunk, encoding, callback].find((arg) => typeof arg === 'function');
+            if (done) done();
+            return res;
+        };
+
+        // Reached when no route matched (or an error got past errorHandler)
+        req.app.handle(sub, res, (err) => {
+            if (res.headersSent) return res.end();
+            res.status(err ? 500 : 404).json({error: err ? 'Internal server error' : 'Not found'});
+        });
+    });
+}
+
+// JSON text for a sub-response body: JSON bodies are spliced in as they
+// are (no parse and re-stringify), anything else becomes a string
+function bodyJson({type, body}) {
+    if (!body.length) return 'null';
+    if (/^application\/(?:[\w.+-]+\+)?json\b/i.test(type)) return body.toString('utf8');
+    return JSON.stringify(body.toString('utf8'));
+}
+
+module.exports = {
+    // POST /api/batch {requests: [{id?, path}]}
+    // Runs up to MAX_BATCH_REQUESTS GETs in parallel and answers 200 with
+    // {responses: [{id, status, body}]} in request order; each sub-request
+    // has its own status, so one 404 or 403 doesn't fail the batch, and one
+    // that takes longer than BATCH_TIMEOUT_MS answers 504.
+    async run(req, res, next) {
+        try {
+            const {requests} = req.body;
+            const timeoutMs = parseInt(process.env.BATCH_TIMEOUT_MS ?? '10000', 10);
+            // One cache for the whole batch: identical model reads across
+            // sub-requests are queried once (services/requestCache)
+            const results = await withRequestCache(() => Promise.all(
+                requests.map(({path}) => dispatch(req, path, timeoutMs))
+            ));
+
+            const responses = results.map((result, i) => {
+                const id = JSON.stringify(requests[i].id ?? String(i));
+                return `{"id":${id},"status":${result.status},"body":${bodyJson(result)}}`;
+            });
+            res.type('application/json').send(`{"responses":[${responses.join(',')}]}`);
+        } catch (err) {
+            next(err);
+        }
+    },
+};
@@ -1,4 +1,5 @@
 const businessModel = require('../models/businessModel');
+const {catalogNotModified} = require('../middleware/conditional');
 
 module.exports = {
     async create(req, res, next) {
@@ -64,6 +65,7 @@ module.exports = {
         try {
             const page = Math.max(1, parseInt(req.query.page, 10) || 1);
             const limit = Math.min(100, Math.max(1, parseInt(req.query.limit, 10) || 20));
+            if (await catalogNotModified(req, res)) return;
             const businesses = await businessModel.findAll({page, limit});
             res.json(businesses);
         } catch (err) {
@@ -82,6 +84,7 @@ module.exports = {
 
     async getById(req, res, next) {
         try {
+            if (await catalogNotModified(req, res)) return;
             const business = await businessModel.findById(req.params.id);
             if (!business) {
                 return res.status(404).json({error: 'Business not found'});
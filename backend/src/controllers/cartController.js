@@ -1,14 +1,11 @@
 const cartModel = require('../models/cartModel');
 const serviceModel = require('../models/serviceModel');
 const invoiceModel = require('../models/invoiceModel');
-const invoiceItemModel = require('../models/invoiceItemModel');
 
 module.exports = {
     async getCart(req, res, next) {
         try {
-            const items = await cartModel.findByUser(req.user.id);
-            const count = await cartModel.countByUser(req.user.id);
-            res.json({items, count});
+            res.json(await cartModel.findSummaryByUser(req.user.id));
         } catch (err) {
             next(err);
         }
@@ -18,10 +15,6 @@ module.exports = {
         try {
             const {service_id, quantity} = req.body;
 
-            if (!service_id) {
-                return res.status(400).json({error: 'Required: service_id'});
-            }
-
             const service = await serviceModel.findById(service_id);
             if (!service) {
                 return res.status(404).json({error: 'Service not found'});
@@ -37,14 +30,46 @@ module.exports = {
         }
     },
 
-    async updateItem(req, res, next) {
+    // Add or update several services at once: one query validates every
+    // service id, one statement upserts every row, and the response is the
+    // updated cart so the client does not have to fetch it again.
+    async addItems(req, res, next) {
         try {
-            const {quantity} = req.body;
+            const {items, replace} = req.body;
+
+            // Merge repeated service ids: an upsert cannot touch the same row twice
+            const merged = new Map();
+            for (const item of items) {
+                const serviceId = Number(item.service_id);
+                const quantity = item.quantity === undefined || item.quantity === null ? 1 : Number(item.quantity);
+                const previous = merged.get(serviceId) || 0;
+                merged.set(serviceId, replace ? quantity : previous + quantity);
+            }
 
-            if (!quantity || quantity < 1) {
-                return res.status(400).json({error: 'Quantity must be at least 1'});
+            const ids = [...merged.keys()];
+            const services = await serviceModel.findStatusByIds(ids);
+            const found = new Map(services.map((s) => [s.id, s]));
+            const missing = ids.filter((id) => !found.has(id));
+            if (missing.length) {
+                return res.status(404).json({error: `Service not found: ${missing.join(', ')}`});
+            }
+            const inactive = ids.filter((id) => !found.get(id).active);
+            if (inactive.length) {
+                return res.status(400).json({error: `Service is not active: ${inactive.join(', ')}`});
             }
 
+            const pairs = ids.map((id) => ({service_id: id, quantity: merged.get(id)}));
+            await cartModel.upsertMany(req.user.id, pairs, {replace: Boolean(replace)});
+            res.json(await cartModel.findSummaryByUser(req.user.id));
+        } catch (err) {
+            next(err);
+        }
+    },
+
+    async updateItem(req, res, next) {
+        try {
+            const {quantity} = req.body;
+
             const item = await cartModel.findById(req.params.id);
             if (!item) {
                 return res.status(404).json({error: 'Cart item not found'});
@@ -90,37 +115,17 @@ module.exports = {
         try {
             const {name, description, icon, deadline, min_participants, penalty_percent, auto_release} = req.body;
 
-            if (!name || !deadline) {
-                return res.status(400).json({error: 'Required: name, deadline'});
-            }
-
-            const cartItems = await cartModel.findByUser(req.user.id);
-            if (cartItems.length === 0) {
-                return res.status(400).json({error: 'Cart is empty'});
-            }
-
-            // Build invoice items from cart
-            const invoiceItems = cartItems.map((ci, idx) => ({
-                service_id: ci.service_id,
-                description: ci.service_name,
-                amount: parseFloat(ci.price) * ci.quantity,
-                recipient_wallet: ci.business_wallet || null,
-                sort_order: idx,
-            }));
-
-            const totalAmount = invoiceItems.reduce((sum, item) => sum + item.amount, 0);
-
-            const invoice = await invoiceModel.create(
-                req.user.id, name, description || null, totalAmount,
+            // Invoice, items and cart clearing happen atomically in one statement
+            const invoice = await invoiceModel.createFromCart(
+                req.user.id, name, description || null,
                 min_participants || 1, penalty_percent || 10, deadline,
                 {icon: icon || null, auto_release: auto_release || false}
             );
+            if (!invoice) {
+                return res.status(400).json({error: 'Cart is empty'});
+            }
 
-            await invoiceItemModel.createMany(invoice.id, invoiceItems);
-            await cartModel.clearByUser(req.user.id);
-
-            const result = await invoiceModel.findById(invoice.id);
-            res.status(201).json(result);
+            res.status(201).json(invoice);
         } catch (err) {
             next(err);
         }
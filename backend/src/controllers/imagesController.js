@@ -1,4 +1,155 @@
-const {minioClient, BUCKETS} = require('../config/minio');
+const crypto = require('crypto');
+const jwt = require('jsonwebtoken');
+const {CopyConditions} = require('minio');
+const {minioClient, publicClient, BUCKETS} = require('../config/minio');
+const {JWT_SECRET} = require('../middleware/auth');
+const imageDerivatives = require('../services/imageDerivatives');
+const objectStatCache = require('../services/objectStatCache');
+const {contentKey, isImmutableName, INCOMING_PREFIX} = require('../services/imageKeys');
+const imageModel = require('../models/imageModel');
+const {sniffImageType, isFreshCopy, SNIFF_BYTES, MAX_IMAGE_BYTES, ALLOWED_IMAGE_TYPES} = require('../services/minioStorage');
+
+const PRESIGN_EXPIRY_SECONDS = 5 * 60;
+const UPLOAD_TOKEN_AUDIENCE = 'cotravel-upload';
+// Presigned GETs are signed as of the start of the hour and valid for two, so
+// every request within an hour gets the same (browser-cacheable) URL
+const PRESIGNED_GET = process.env.IMAGES_PRESIGNED_GET === 'true' && Boolean(publicClient);
+const PRESIGNED_GET_EXPIRY_SECONDS = 2 * 60 * 60;
+
+const MIME_TYPES = {
+    jpg: 'image/jpeg',
+    jpeg: 'image/jpeg',
+    png: 'image/png',
+    gif: 'image/gif',
+    webp: 'image/webp',
+    avif: 'image/avif',
+    svg: 'image/svg+xml',
+};
+
+const LIST_DEFAULT_LIMIT = 100;
+const LIST_MAX_LIMIT = 1000;
+// IMAGE_LIST_SOURCE=db lists from the Postgres images index instead of MinIO
+const LIST_FROM_DB = process.env.IMAGE_LIST_SOURCE === 'db';
+
+function toListEntry(name, size, lastModified) {
+    return {filename: name, size, lastModified, url: `/images/${name}`};
+}
+
+// Write entries to the response as the MinIO listing produces them, with
+// backpressure, stopping after `limit`. Nothing is written until the first
+// entry (or the end), so listing errors can still become a normal error
+// response.
+function streamListing(req, res, next, {prefix, cursor, limit}) {
+    const stream = minioClient.listObjectsV2(BUCKETS.IMAGES, prefix, true, cursor);
+    let count = 0;
+    let started = false;
+
+    const start = () => {
+        if (started) return;
+        started = true;
+        res.status(200).type('json');
+        res.write('[');
+    };
+    const finish = () => {
+        start();
+        res.end(']');
+    };
+
+    res.on('close', () => stream.destroy());
+    stream.on('data', (obj) => {
+        if (!obj.name || obj.name.startsWith(INCOMING_PREFIX)) return;
+        start();
+        const ok = res.write((count > 0 ? ',' : '') + JSON.stringify(toListEntry(obj.name, obj.size, obj.lastModified)));
+        if (++count >= limit) {
+            stream.destroy();
+            return finish();
+        }
+        if (!ok) {
+            stream.pause();
+            res.once('drain', () => stream.resume());
+        }
+    });
+    stream.on('end', () => {
+        if (count < limit) finish();
+    });
+    stream.on('error', (err) => {
+        if (started) return res.destroy(err);
+        next(err);
+    });
+}
+
+function safeObjectName(name) {
+    return `${Date.now()}-${String(name).replace(/[^\w.-]/g, '_').slice(-100)}`;
+}
+
+// Stream an object once to get its sniffed type and SHA-256
+async function inspectObject(bucket, key) {
+    const hash = crypto.createHash('sha256');
+    let head = Buffer.alloc(0);
+    for await (const chunk of await minioClient.getObject(bucket, key)) {
+        if (head.length < SNIFF_BYTES) head = Buffer.concat([head, chunk.subarray(0, SNIFF_BYTES - head.length)]);
+        hash.update(chunk);
+    }
+    return {mimetype: sniffImageType(head), sha256: hash.digest('hex')};
+}
+
+async function redirectToPresigned(res, bucket, key) {
+    const hourStart = new Date();
+    hourStart.setUTCMinutes(0, 0, 0);
+    const url = await publicClient.presignedGetObject(bucket, key, PRESIGNED_GET_EXPIRY_SECONDS, {}, hourStart);
+    res.set('Cache-Control', 'public, max-age=600');
+    res.redirect(302, url);
+}
+
+// Serve an object with validators, cache headers and single-range support.
+// Conditional requests are answered with 304 before any object read.
+async function sendObject(req, res, bucket, key, stat) {
+    const etag = `"${stat.etag}"`;
+    const ext = key.split('.').pop().toLowerCase();
+
+    res.set({
+        'Content-Type': stat.contentType || MIME_TYPES[ext] || 'application/octet-stream',
+        'ETag': etag,
+        'Last-Modified': new Date(stat.lastModified).toUTCString(),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': isImmutableName(key)
+            ? 'public, max-age=31536000, immutable'
+            : 'public, max-age=300',
+    });
+
+    if (req.fresh) {
+        return res.status(304).end();
+    }
+
+    // A stale If-Range means the client's partial copy is outdated: send it all
+    const ifRange = req.get('If-Range');
+    const rangeValid = !ifRange || ifRange === etag || ifRange === res.get('Last-Modified');
+    const ranges = rangeValid ? req.range(stat.size, {combine: true}) : undefined;
+
+    if (ranges === -1) {
+        res.set('Content-Range', `bytes */${stat.size}`);
+        return res.status(416).end();
+    }
+
+    if (Array.isArray(ranges) && ranges.type === 'bytes' && ranges.length === 1) {
+        const {start, end} = ranges[0];
+        res.status(206).set({
+            'Content-Range': `bytes ${start}-${end}/${stat.size}`,
+            'Content-Length': end - start + 1,
+        });
+        if (req.method === 'HEAD') return res.end();
+        const stream = await minioClient.getPartialObject(bucket, key, start, end - start + 1);
+        stream.on('error', (err) => res.destroy(err));
+        return stream.pipe(res);
+    }
+
+    // No range, malformed or multi-range requests get the full object
+    res.set('Content-Length', stat.size);
+    if (req.method === 'HEAD') return res.end();
+    const stream = await minioClient.getObject(bucket, key);
+    stream.on('error', (err) => res.destroy(err));
+    stream.pipe(res);
+}
 
 module.exports = {
     async upload(req, res, next) {
@@ -7,13 +158,9 @@ module.exports = {
                 return res.status(400).json({error: 'No image provided'});
             }
 
-            const fileName = `${Date.now()}-${req.file.originalname}`;
-
-            await minioClient.putObject(
-                BUCKETS.IMAGES, fileName,
-                req.file.buffer, req.file.size,
-                {'Content-Type': req.file.mimetype}
-            );
+            // Already stored by the streaming storage engine (services/minioStorage)
+            const fileName = req.file.key;
+            await imageModel.upsert({key: fileName, size: req.file.size, contentType: req.file.mimetype});
 
             res.status(201).json({
                 message: 'Image uploaded',
@@ -21,6 +168,100 @@ module.exports = {
                 mimetype: req.file.mimetype,
                 size: req.file.size,
                 url: `/images/${fileName}`,
+                deduplicated: req.file.deduplicated,
+            });
+        } catch (err) {
+            next(err);
+        }
+    },
+
+    // POST /images/presign  { filename, content_type, size }
+    // Returns a presigned POST policy limited to this key, type and size, plus
+    // a token for POST /images/complete.
+    async presign(req, res, next) {
+        try {
+            if (!publicClient) {
+                return res.status(501).json({error: 'Direct uploads are not enabled'});
+            }
+            const {filename, content_type: contentType, size} = req.body;
+            if (!filename || typeof filename !== 'string') {
+                return res.status(400).json({error: 'filename is required'});
+            }
+            if (!ALLOWED_IMAGE_TYPES.includes(contentType)) {
+                return res.status(400).json({error: 'Only JPEG, PNG, WebP, and GIF images are allowed'});
+            }
+            const bytes = Number(size);
+            if (!Number.isInteger(bytes) || bytes <= 0 || bytes > MAX_IMAGE_BYTES) {
+                return res.status(400).json({error: 'size must be between 1 byte and 5MB'});
+            }
+
+            const key = `${INCOMING_PREFIX}${safeObjectName(filename)}`;
+            const policy = publicClient.newPostPolicy();
+            policy.setBucket(BUCKETS.IMAGES);
+            policy.setKey(key);
+            policy.setExpires(new Date(Date.now() + PRESIGN_EXPIRY_SECONDS * 1000));
+            policy.setContentType(contentType);
+            policy.setContentLengthRange(1, MAX_IMAGE_BYTES);
+            const {postURL, formData} = await publicClient.presignedPostPolicy(policy);
+
+            const uploadToken = jwt.sign({key, uid: req.user.id}, JWT_SECRET, {
+                audience: UPLOAD_TOKEN_AUDIENCE,
+                expiresIn: PRESIGN_EXPIRY_SECONDS * 2,
+            });
+            res.json({url: postURL, fields: formData, filename: key, upload_token: uploadToken});
+        } catch (err) {
+            next(err);
+        }
+    },
+
+    // POST /images/complete  { upload_token }
+    // Verifies a direct upload landed and is really an allowed image, then
+    // moves it from incoming/ to its content-addressed name. Objects that fail
+    // the check are deleted.
+    async complete(req, res, next) {
+        try {
+            let claims;
+            try {
+                claims = jwt.verify(req.body.upload_token, JWT_SECRET, {audience: UPLOAD_TOKEN_AUDIENCE});
+            } catch {
+                return res.status(400).json({error: 'Invalid or expired upload token'});
+            }
+            if (claims.uid !== req.user.id) {
+                return res.status(403).json({error: 'Upload token belongs to another user'});
+            }
+
+            let stat;
+            try {
+                stat = await minioClient.statObject(BUCKETS.IMAGES, claims.key);
+            } catch {
+                return res.status(404).json({error: 'Upload not found'});
+            }
+
+            if (stat.size > MAX_IMAGE_BYTES) {
+                await minioClient.removeObject(BUCKETS.IMAGES, claims.key);
+                return res.status(400).json({error: 'Image exceeds 5MB limit'});
+            }
+            const {mimetype, sha256} = await inspectObject(BUCKETS.IMAGES, claims.key);
+            if (!ALLOWED_IMAGE_TYPES.includes(mimetype)) {
+                await minioClient.removeObject(BUCKETS.IMAGES, claims.key);
+                return res.status(400).json({error: 'Only JPEG, PNG, WebP, and GIF images are allowed'});
+            }
+
+            const key = contentKey(sha256, mimetype);
+            const deduplicated = await isFreshCopy(BUCKETS.IMAGES, key);
+            if (!deduplicated) {
+                await minioClient.copyObject(BUCKETS.IMAGES, key, `/${BUCKETS.IMAGES}/${claims.key}`, new CopyConditions());
+            }
+            await minioClient.removeObject(BUCKETS.IMAGES, claims.key);
+            await imageModel.upsert({key, size: stat.size, contentType: mimetype});
+
+            res.status(201).json({
+                message: 'Image uploaded',
+                filename: key,
+                mimetype,
+                size: stat.size,
+                url: `/images/${key}`,
+                deduplicated,
             });
         } catch (err) {
             next(err);
@@ -29,43 +270,47 @@ module.exports = {
 
     async get(req, res, next) {
         try {
-            const stat = await minioClient.statObject(BUCKETS.IMAGES, req.params.filename);
-            if (stat.metaData && stat.metaData['content-type']) {
-                res.setHeader('Content-Type', stat.metaData['content-type']);
-            } else {
-                const ext = req.params.filename.split('.').pop().toLowerCase();
-                const mimeTypes = {
-                    jpg: 'image/jpeg',
-                    jpeg: 'image/jpeg',
-                    png: 'image/png',
-                    gif: 'image/gif',
-                    webp: 'image/webp',
-                    svg: 'image/svg+xml'
-                };
-                res.setHeader('Content-Type', mimeTypes[ext] || 'application/octet-stream');
+            const variantParams = imageDerivatives.parseVariant(req.query);
+            if (variantParams && variantParams.error) {
+                return res.status(400).json({error: variantParams.error});
             }
-            const stream = await minioClient.getObject(BUCKETS.IMAGES, req.params.filename);
-            stream.pipe(res);
+
+            let bucket = BUCKETS.IMAGES;
+            let key = req.params.filename;
+            if (variantParams) {
+                // Falls back to the original when variants are unavailable (no sharp)
+                const variantKey = await imageDerivatives.getVariant(key, variantParams);
+                if (variantKey) {
+                    bucket = BUCKETS.DERIVATIVES;
+                    key = variantKey;
+                }
+            }
+
+            const stat = await objectStatCache.statObject(bucket, key);
+            if (PRESIGNED_GET) return await redirectToPresigned(res, bucket, key);
+            await sendObject(req, res, bucket, key, stat);
         } catch (err) {
+            if (err.status) return next(err);
+            if (res.headersSent) return res.destroy(err);
             res.status(404).json({error: 'Image not found'});
         }
     },
 
+    // GET /images?limit=100&prefix=&cursor=
+    // Streams a JSON array page by page. `cursor` is the filename of the last
+    // entry of the previous page; a page shorter than `limit` is the last one.
     async list(req, res, next) {
         try {
-            const images = [];
-            const stream = minioClient.listObjects(BUCKETS.IMAGES, '', true);
-            await new Promise((resolve, reject) => {
-                stream.on('data', (obj) => images.push({
-                    filename: obj.name,
-                    size: obj.size,
-                    lastModified: obj.lastModified,
-                    url: `/images/${obj.name}`,
-                }));
-                stream.on('end', resolve);
-                stream.on('error', reject);
-            });
-            res.json(images);
+            const limit = Math.min(LIST_MAX_LIMIT, Math.max(1, parseInt(req.query.limit, 10) || LIST_DEFAULT_LIMIT));
+            const prefix = typeof req.query.prefix === 'string' ? req.query.prefix : '';
+            const cursor = typeof req.query.cursor === 'string' ? req.query.cursor : '';
+
+            if (LIST_FROM_DB) {
+                const rows = await imageModel.list({prefix, after: cursor, limit});
+                return res.json(rows.map((r) => toListEntry(r.key, Number(r.size), r.created_at)));
+            }
+
+            streamListing(req, res, next, {prefix, cursor, limit});
         } catch (err) {
             next(err);
         }
@@ -2,6 +2,8 @@ const invoiceParticipantModel = require('../models/invoiceParticipantModel');
 const invoiceModel = require('../models/invoiceModel');
 const transactionModel = require('../models/transactionModel');
 const sorobanService = require('../services/sorobanService');
+const invoiceEvents = require('../services/invoiceEvents');
+const {submitSignedTx} = require('../middleware/signedTx');
 const logger = require('../config/logger');
 
 const STROOPS_PER_XLM = 10_000_000;
@@ -21,6 +23,9 @@ module.exports = {
                 if (existing.status === 'withdrawn') {
                     const reactivated = await invoiceParticipantModel.reactivate(invoice.id, req.user.id);
                     logger.info({invoiceId: invoice.id, userId: req.user.id}, 'Participant rejoined invoice');
+                    invoiceEvents.publish(invoice.id, 'participant_joined', {
+                        ...invoiceEvents.snapshot(invoice), user_id: req.user.id,
+                    });
                     return res.json(reactivated);
                 }
                 return res.status(409).json({error: 'Already joined this invoice', participant: existing});
@@ -28,6 +33,9 @@ module.exports = {
 
             const participant = await invoiceParticipantModel.create(invoice.id, req.user.id);
             logger.info({invoiceId: invoice.id, userId: req.user.id}, 'Participant joined invoice');
+            invoiceEvents.publish(invoice.id, 'participant_joined', {
+                ...invoiceEvents.snapshot(invoice), user_id: req.user.id,
+            });
             res.status(201).json(participant);
         } catch (err) {
             next(err);
@@ -38,9 +46,6 @@ module.exports = {
     async recordContribution(req, res, next) {
         try {
             const {signed_xdr, amount} = req.body;
-            if (!signed_xdr || !amount) {
-                return res.status(400).json({error: 'Required: signed_xdr, amount'});
-            }
 
             const invoice = req.invoice;
 
@@ -50,39 +55,50 @@ module.exports = {
                 logger.info({invoiceId: invoice.id, userId: req.user.id}, 'Participant auto-joined via contribution');
             }
 
-            const result = await sorobanService.submitTx(signed_xdr);
+            const result = await submitSignedTx(req, signed_xdr);
 
-            await transactionModel.create(
+            const recorded = await transactionModel.create(
                 invoice.id, req.user.id, result.hash,
                 'contribute', amount, result.ledger, null
             );
 
-            const newAmount = parseFloat(participant.contributed_amount) + parseFloat(amount);
-            await invoiceParticipantModel.updateAmount(
-                invoice.id, req.user.id, newAmount, invoice.version
-            );
+            // Only the request that recorded the tx applies its side effects
+            let newAmount = parseFloat(participant.contributed_amount);
+            if (recorded) {
+                newAmount += parseFloat(amount);
+                await invoiceParticipantModel.updateAmount(
+                    invoice.id, req.user.id, newAmount, invoice.version
+                );
 
-            try {
-                const state = await sorobanService.getTripState(Number(invoice.contract_invoice_id));
-                if (state) {
-                    const status = state.status?.toLowerCase() || invoice.status;
-                    await invoiceModel.updateFinancials(
-                        invoice.id, stroopsToXlm(state.total_collected || 0),
-                        state.participant_count || 0, status
-                    );
+                try {
+                    const state = await sorobanService.getTripState(Number(invoice.contract_invoice_id));
+                    if (state) {
+                        const status = state.status?.toLowerCase() || invoice.status;
+                        await invoiceModel.updateFinancials(
+                            invoice.id, stroopsToXlm(state.total_collected || 0),
+                            state.participant_count || 0, status
+                        );
+                    }
+                } catch (e) {
+                    logger.warn({invoiceId: invoice.id, err: e.message}, 'On-chain sync failed after contribution');
                 }
-            } catch (e) {
-                logger.warn({invoiceId: invoice.id, err: e.message}, 'On-chain sync failed after contribution');
             }
 
             logger.info({
                 invoiceId: invoice.id,
                 userId: req.user.id,
                 amount,
-                txHash: result.hash
-            }, 'Contribution recorded');
+                txHash: result.hash,
+                replayed: !recorded,
+            }, recorded ? 'Contribution recorded' : 'Contribution already recorded');
 
             const updatedInvoice = await invoiceModel.findById(invoice.id);
+            if (recorded) {
+                invoiceEvents.publish(invoice.id, 'contribution', {
+                    ...invoiceEvents.snapshot(updatedInvoice),
+                    user_id: req.user.id, amount, tx_hash: result.hash,
+                });
+            }
             res.json({tx_hash: result.hash, contributed: newAmount, invoice: updatedInvoice});
         } catch (err) {
             next(err);
@@ -93,9 +109,6 @@ module.exports = {
     async recordWithdrawal(req, res, next) {
         try {
             const {signed_xdr} = req.body;
-            if (!signed_xdr) {
-                return res.status(400).json({error: 'signed_xdr is required'});
-            }
 
             const invoice = req.invoice;
             const participant = await invoiceParticipantModel.findByInvoiceAndUser(invoice.id, req.user.id);
@@ -103,43 +116,56 @@ module.exports = {
                 return res.status(404).json({error: 'Not a participant of this invoice'});
             }
 
-            const result = await sorobanService.submitTx(signed_xdr);
+            const result = await submitSignedTx(req, signed_xdr);
 
-            await transactionModel.create(
+            const recorded = await transactionModel.create(
                 invoice.id, req.user.id, result.hash,
                 'withdraw', participant.contributed_amount, result.ledger, null
             );
 
-            await invoiceParticipantModel.updateStatus(invoice.id, req.user.id, 'withdrawn');
-            await invoiceParticipantModel.updateAmount(invoice.id, req.user.id, 0, participant.contributed_at_version);
+            if (recorded) {
+                await invoiceParticipantModel.updateStatus(invoice.id, req.user.id, 'withdrawn');
+                await invoiceParticipantModel.updateAmount(invoice.id, req.user.id, 0, participant.contributed_at_version);
 
-            try {
-                if (invoice.contract_invoice_id !== null) {
-                    const state = await sorobanService.getTripState(Number(invoice.contract_invoice_id));
-                    if (state) {
-                        const status = state.status?.toLowerCase() || invoice.status;
-                        await invoiceModel.updateFinancials(
-                            invoice.id, stroopsToXlm(state.total_collected || 0),
-                            state.participant_count || 0, status
-                        );
-                    }
-
-                    const penalty = await sorobanService.getPenalty(
-                        Number(invoice.contract_invoice_id), req.user.wallet_address
-                    );
-                    if (penalty !== null) {
-                        await invoiceParticipantModel.updatePenaltyAmount(
-                            invoice.id, req.user.id, stroopsToXlm(penalty)
+                try {
+                    if (invoice.contract_invoice_id !== null) {
+                        const state = await sorobanService.getTripState(Number(invoice.contract_invoice_id));
+                        if (state) {
+                            const status = state.status?.toLowerCase() || invoice.status;
+                            await invoiceModel.updateFinancials(
+                                invoice.id, stroopsToXlm(state.total_collected || 0),
+                                state.participant_count || 0, status
+                            );
+                        }
+
+                        const penalty = await sorobanService.getPenalty(
+                            Number(invoice.contract_invoice_id), req.user.wallet_address
                         );
+                        if (penalty !== null) {
+                            await invoiceParticipantModel.updatePenaltyAmount(
+                                invoice.id, req.user.id, stroopsToXlm(penalty)
+                            );
+                        }
                     }
+                } catch (e) {
+                    logger.warn({invoiceId: invoice.id, err: e.message}, 'On-chain sync failed after withdrawal');
                 }
-            } catch (e) {
-                logger.warn({invoiceId: invoice.id, err: e.message}, 'On-chain sync failed after withdrawal');
             }
 
-            logger.info({invoiceId: invoice.id, userId: req.user.id, txHash: result.hash}, 'Withdrawal recorded');
+            logger.info({
+                invoiceId: invoice.id,
+                userId: req.user.id,
+                txHash: result.hash,
+                replayed: !recorded,
+            }, recorded ? 'Withdrawal recorded' : 'Withdrawal already recorded');
 
             const updatedInvoice = await invoiceModel.findById(invoice.id);
+            if (recorded) {
+                invoiceEvents.publish(invoice.id, 'withdrawal', {
+                    ...invoiceEvents.snapshot(updatedInvoice),
+                    user_id: req.user.id, tx_hash: result.hash,
+                });
+            }
             res.json({tx_hash: result.hash, invoice: updatedInvoice});
         } catch (err) {
             next(err);
@@ -156,16 +182,37 @@ module.exports = {
             }
 
             if (participant.confirmed_release) {
+                // Retry of the confirmation that already went through
+                if (req.submittedTx) {
+                    return res.json({
+                        participant,
+                        confirmation_count: invoice.confirmation_count,
+                        status: invoice.status,
+                    });
+                }
                 return res.status(409).json({error: 'Already confirmed release'});
             }
 
             if (req.body.signed_xdr) {
-                const result = await sorobanService.submitTx(req.body.signed_xdr);
+                const result = await submitSignedTx(req, req.body.signed_xdr);
 
-                await transactionModel.create(
+                const recorded = await transactionModel.create(
                     invoice.id, req.user.id, result.hash,
                     'confirm_release', 0, result.ledger, null
                 );
+
+                // A concurrent retry of this envelope recorded it first and
+                // applies the side effects; answer with the stored state
+                if (!recorded) {
+                    logger.info({invoiceId: invoice.id, userId: req.user.id, txHash: result.hash},
+                        'Release confirmation already recorded');
+                    const current = await invoiceModel.findById(invoice.id);
+                    return res.json({
+                        participant: await invoiceParticipantModel.findByInvoiceAndUser(invoice.id, req.user.id),
+                        confirmation_count: current.confirmation_count,
+                        status: current.status,
+                    });
+                }
             }
 
             const updated = await invoiceParticipantModel.updateConfirmedRelease(
@@ -195,6 +242,13 @@ module.exports = {
                 confirmationCount: finalInvoice.confirmation_count
             }, 'Release confirmed');
 
+            invoiceEvents.publish(invoice.id, 'release_confirmed', {
+                ...invoiceEvents.snapshot(finalInvoice), user_id: req.user.id,
+            });
+            if (finalInvoice.status === 'released') {
+                invoiceEvents.publish(invoice.id, 'released', invoiceEvents.snapshot(finalInvoice));
+            }
+
             res.json({
                 participant: updated,
                 confirmation_count: finalInvoice.confirmation_count,
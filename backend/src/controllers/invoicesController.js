@@ -1,19 +1,14 @@
 const invoiceModel = require('../models/invoiceModel');
 const invoiceItemModel = require('../models/invoiceItemModel');
 const invoiceModificationModel = require('../models/invoiceModificationModel');
+const serviceModel = require('../models/serviceModel');
 const transactionModel = require('../models/transactionModel');
 const sorobanService = require('../services/sorobanService');
+const invoiceEvents = require('../services/invoiceEvents');
+const {submitSignedTx} = require('../middleware/signedTx');
+const {weakEtag, digest, notModified} = require('../middleware/conditional');
 const logger = require('../config/logger');
 
-// Validate amount: finite positive number
-function parseAmount(value) {
-    const num = Number(value);
-    if (!Number.isFinite(num) || num < 0) {
-        return null;
-    }
-    return num;
-}
-
 module.exports = {
     // POST /api/invoices
     async create(req, res, next) {
@@ -23,38 +18,8 @@ module.exports = {
                 penalty_percent, deadline, icon, token_address, auto_release,
             } = req.body;
 
-            if (!name || !items || !items.length || !deadline) {
-                return res.status(400).json({
-                    error: 'Required: name, items (array with at least one item), deadline',
-                });
-            }
-
-            const deadlineDate = new Date(deadline);
-            if (isNaN(deadlineDate.getTime())) {
-                return res.status(400).json({error: 'Invalid deadline format'});
-            }
-            if (deadlineDate <= new Date()) {
-                return res.status(400).json({error: 'Deadline must be in the future'});
-            }
-
-            const STELLAR_ADDRESS_RE = /^G[A-Z2-7]{55}$/;
-            for (const item of items) {
-                if (!item.description || parseAmount(item.amount) === null) {
-                    return res.status(400).json({error: 'Each item must have a description and valid positive amount'});
-                }
-                if (item.recipient_wallet && !STELLAR_ADDRESS_RE.test(item.recipient_wallet)) {
-                    logger.warn({
-                        wallet: item.recipient_wallet,
-                        item: item.description
-                    }, 'Invalid Stellar address in invoice item');
-                    return res.status(400).json({error: `Invalid Stellar wallet address in item: ${item.description}`});
-                }
-            }
-
-            const totalAmount = items.reduce((sum, item) => sum + parseAmount(item.amount), 0);
-            if (totalAmount <= 0) {
-                return res.status(400).json({error: 'Total amount must be positive'});
-            }
+            // Body validated by schemas/requests createInvoice
+            const totalAmount = items.reduce((sum, item) => sum + Number(item.amount), 0);
 
             const invoice = await invoiceModel.create(
                 req.user.id, name, description || null,
@@ -145,6 +110,20 @@ module.exports = {
     async getById(req, res, next) {
         try {
             const invoice = req.invoice;
+            // Every write to an invoice or its items bumps updated_at (item
+            // edits also bump version), so drafts revalidate from the row
+            // loadInvoice already read, plus what the body joins from other
+            // tables: the organizer (read with the row) and the item
+            // service/business names (versioned by the catalog generation).
+            // Linked invoices embed live on-chain state and fall back to
+            // Express's body hash ETag.
+            if (invoice.contract_invoice_id === null) {
+                const etag = weakEtag('inv', invoice.id, invoice.version, invoice.updated_at,
+                    digest(invoice.organizer_wallet, invoice.organizer_name), await serviceModel.catalogVersion());
+                if (notModified(req, res, etag, {private: true})) return;
+            } else {
+                res.set('Cache-Control', 'private, no-cache');
+            }
             invoice.items = await invoiceItemModel.findByInvoice(invoice.id);
 
             if (invoice.contract_invoice_id !== null) {
@@ -165,22 +144,35 @@ module.exports = {
         }
     },
 
+    // GET /api/invoices/:id/events (Server-Sent Events)
+    streamEvents(req, res) {
+        // A stream never ends, so it can't be a POST /api/batch sub-request
+        if (req.batched) {
+            return res.status(400).json({error: 'Event streams cannot be batched'});
+        }
+        invoiceEvents.subscribe(req.invoice.id, req, res);
+    },
+
     // POST /api/invoices/:id/link-contract
     async linkContract(req, res, next) {
         try {
             const {signed_xdr} = req.body;
-            if (!signed_xdr) {
-                return res.status(400).json({error: 'signed_xdr is required'});
-            }
 
             const invoice = req.invoice;
+            if (req.submittedTx) {
+                return res.json({
+                    ...invoice,
+                    tx_hash: req.submittedTx.tx_hash,
+                    contract_invoice_id: invoice.contract_invoice_id,
+                });
+            }
             if (invoice.contract_invoice_id !== null) {
                 return res.status(409).json({error: 'Invoice already linked to contract'});
             }
 
             let result;
             try {
-                result = await sorobanService.submitTx(signed_xdr);
+                result = await submitSignedTx(req, signed_xdr);
             } catch (txErr) {
                 logger.warn({invoiceId: invoice.id, err: txErr.message}, 'Failed to submit link-contract transaction');
                 return res.status(400).json({error: `Blockchain transaction failed: ${txErr.message}`});
@@ -189,12 +181,16 @@ module.exports = {
             const contractInvoiceId = result.returnValue;
             const updated = await invoiceModel.linkContract(invoice.id, contractInvoiceId);
 
-            await transactionModel.create(
+            const recorded = await transactionModel.create(
                 invoice.id, req.user.id, result.hash,
                 'create', 0, result.ledger, {contract_invoice_id: contractInvoiceId}
             );
 
             logger.info({invoiceId: invoice.id, contractInvoiceId, txHash: result.hash}, 'Invoice linked to contract');
+            // Concurrent retries of the envelope publish once
+            if (recorded) {
+                invoiceEvents.publish(invoice.id, 'linked', {...invoiceEvents.snapshot(updated), tx_hash: result.hash});
+            }
             res.json({...updated, tx_hash: result.hash, contract_invoice_id: contractInvoiceId});
         } catch (err) {
             next(err);
@@ -206,17 +202,11 @@ module.exports = {
         try {
             const {items, change_summary, signed_xdr} = req.body;
 
-            if (!items || !items.length) {
-                return res.status(400).json({error: 'Required: items (array with at least one item)'});
-            }
-
-            for (const item of items) {
-                if (!item.description || parseAmount(item.amount) === null) {
-                    return res.status(400).json({error: 'Each item must have a description and valid positive amount'});
-                }
-            }
-
             const invoice = req.invoice;
+            if (req.submittedTx) {
+                const currentItems = await invoiceItemModel.findByInvoice(invoice.id);
+                return res.json({...invoice, items: currentItems, tx_hash: req.submittedTx.tx_hash});
+            }
 
             if (invoice.contract_invoice_id !== null && !signed_xdr) {
                 return res.status(400).json({
@@ -226,14 +216,23 @@ module.exports = {
 
             let txHash = null;
             if (signed_xdr) {
-                const result = await sorobanService.submitTx(signed_xdr);
+                const result = await submitSignedTx(req, signed_xdr);
                 txHash = result.hash;
 
-                await transactionModel.create(
+                const recorded = await transactionModel.create(
                     invoice.id, req.user.id, result.hash,
                     'update_recipients', 0, result.ledger,
                     {change_summary: change_summary || 'Items updated'}
                 );
+
+                // A concurrent retry of this envelope recorded it first and
+                // applies the update; answer with the stored state
+                if (!recorded) {
+                    logger.info({invoiceId: invoice.id, txHash}, 'Items update already recorded');
+                    const current = await invoiceModel.findById(invoice.id);
+                    const currentItems = await invoiceItemModel.findByInvoice(invoice.id);
+                    return res.json({...current, items: currentItems, tx_hash: txHash});
+                }
             }
 
             const currentItems = await invoiceItemModel.findByInvoice(invoice.id);
@@ -244,7 +243,7 @@ module.exports = {
             }));
             const newItems = await invoiceItemModel.replaceAll(invoice.id, itemsWithOrder);
 
-            const newTotal = items.reduce((sum, item) => sum + parseAmount(item.amount), 0);
+            const newTotal = items.reduce((sum, item) => sum + Number(item.amount), 0);
             await invoiceModel.updateTotalAmount(invoice.id, newTotal);
 
             const updated = await invoiceModel.incrementVersion(invoice.id);
@@ -261,6 +260,7 @@ module.exports = {
                 itemCount: items.length,
                 newTotal
             }, 'Invoice items updated');
+            invoiceEvents.publish(invoice.id, 'items_updated', {...invoiceEvents.snapshot(updated), tx_hash: txHash});
 
             const response = {...updated, items: newItems};
             if (txHash) response.tx_hash = txHash;
@@ -274,19 +274,19 @@ module.exports = {
     async release(req, res, next) {
         try {
             const {signed_xdr} = req.body;
-            if (!signed_xdr) {
-                return res.status(400).json({error: 'signed_xdr is required'});
-            }
 
             const invoice = req.invoice;
+            if (req.submittedTx) {
+                return res.json({...invoice, tx_hash: req.submittedTx.tx_hash});
+            }
             if (!['funding', 'completed'].includes(invoice.status)) {
                 return res.status(400).json({error: 'Can only release invoices in funding or completed status'});
             }
 
-            const result = await sorobanService.submitTx(signed_xdr);
+            const result = await submitSignedTx(req, signed_xdr);
             const updated = await invoiceModel.updateStatus(invoice.id, 'released');
 
-            await transactionModel.create(
+            const recorded = await transactionModel.create(
                 invoice.id, req.user.id, result.hash,
                 'release', invoice.total_collected || 0, result.ledger, null
             );
@@ -296,6 +296,9 @@ module.exports = {
                 txHash: result.hash,
                 amount: invoice.total_collected
             }, 'Invoice released');
+            if (recorded) {
+                invoiceEvents.publish(invoice.id, 'released', {...invoiceEvents.snapshot(updated), tx_hash: result.hash});
+            }
             res.json({...updated, tx_hash: result.hash});
         } catch (err) {
             next(err);
@@ -307,6 +310,9 @@ module.exports = {
         try {
             const {signed_xdr} = req.body;
             const invoice = req.invoice;
+            if (req.submittedTx) {
+                return res.json({...invoice, tx_hash: req.submittedTx.tx_hash});
+            }
 
             if (!['draft', 'funding', 'completed'].includes(invoice.status)) {
                 return res.status(400).json({error: 'Can only cancel invoices in draft, funding, or completed status'});
@@ -316,6 +322,7 @@ module.exports = {
             if (invoice.status === 'draft') {
                 const updated = await invoiceModel.updateStatus(invoice.id, 'cancelled');
                 logger.info({invoiceId: invoice.id, previousStatus: 'draft'}, 'Draft invoice cancelled');
+                invoiceEvents.publish(invoice.id, 'cancelled', invoiceEvents.snapshot(updated));
                 return res.json(updated);
             }
 
@@ -323,10 +330,10 @@ module.exports = {
                 return res.status(400).json({error: 'signed_xdr is required'});
             }
 
-            const result = await sorobanService.submitTx(signed_xdr);
+            const result = await submitSignedTx(req, signed_xdr);
             const updated = await invoiceModel.updateStatus(invoice.id, 'cancelled');
 
-            await transactionModel.create(
+            const recorded = await transactionModel.create(
                 invoice.id, req.user.id, result.hash,
                 'cancel', 0, result.ledger, null
             );
@@ -336,6 +343,9 @@ module.exports = {
                 txHash: result.hash,
                 previousStatus: invoice.status
             }, 'Invoice cancelled');
+            if (recorded) {
+                invoiceEvents.publish(invoice.id, 'cancelled', {...invoiceEvents.snapshot(updated), tx_hash: result.hash});
+            }
             res.json({...updated, tx_hash: result.hash});
         } catch (err) {
             next(err);
@@ -346,19 +356,19 @@ module.exports = {
     async claimDeadline(req, res, next) {
         try {
             const {signed_xdr} = req.body;
-            if (!signed_xdr) {
-                return res.status(400).json({error: 'signed_xdr is required'});
-            }
 
             const invoice = req.invoice;
+            if (req.submittedTx) {
+                return res.json({...invoice, tx_hash: req.submittedTx.tx_hash});
+            }
             if (invoice.contract_invoice_id === null) {
                 return res.status(400).json({error: 'Invoice not linked to contract'});
             }
 
-            const result = await sorobanService.submitTx(signed_xdr);
+            const result = await submitSignedTx(req, signed_xdr);
             const updated = await invoiceModel.updateStatus(invoice.id, 'cancelled');
 
-            await transactionModel.create(
+            const recorded = await transactionModel.create(
                 invoice.id, req.user.id, result.hash,
                 'claim_deadline', 0, result.ledger, null
             );
@@ -368,6 +378,9 @@ module.exports = {
                 txHash: result.hash,
                 claimedBy: req.user.id
             }, 'Invoice deadline claimed');
+            if (recorded) {
+                invoiceEvents.publish(invoice.id, 'cancelled', {...invoiceEvents.snapshot(updated), tx_hash: result.hash});
+            }
             res.json({...updated, tx_hash: result.hash});
         } catch (err) {
             next(err);
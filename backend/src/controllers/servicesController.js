@@ -1,5 +1,6 @@
 const serviceModel = require('../models/serviceModel');
 const businessModel = require('../models/businessModel');
+const {catalogNotModified} = require('../middleware/conditional');
 
 module.exports = {
     async create(req, res, next) {
@@ -16,10 +17,6 @@ module.exports = {
                 location_data
             } = req.body;
 
-            if (!business_id || !name || price === undefined) {
-                return res.status(400).json({error: 'Required: business_id, name, price'});
-            }
-
             // Verify business exists and user owns it
             const business = await businessModel.findById(business_id);
             if (!business) {
@@ -47,6 +44,7 @@ module.exports = {
 
     async getAll(req, res, next) {
         try {
+            if (await catalogNotModified(req, res)) return;
             const {q, category, min_price, max_price, business_id, location} = req.query;
             const hasFilters = q || category || min_price || max_price || business_id || location;
             const services = hasFilters
@@ -60,6 +58,7 @@ module.exports = {
 
     async getById(req, res, next) {
         try {
+            if (await catalogNotModified(req, res)) return;
             const service = await serviceModel.findById(req.params.id);
             if (!service) {
                 return res.status(404).json({error: 'Service not found'});
@@ -72,6 +71,7 @@ module.exports = {
 
     async getByBusiness(req, res, next) {
         try {
+            if (await catalogNotModified(req, res)) return;
             const services = await serviceModel.findByBusiness(req.params.id);
             res.json(services);
         } catch (err) {
@@ -1,9 +1,11 @@
-const app = require('./app');
-const pool = require('./config/db');
-const {initBuckets} = require('./config/minio');
+require('dotenv').config();
+const cluster = require('cluster');
 const logger = require('./config/logger');
+const {workerCount, supervise} = require('./cluster');
 
 const PORT = process.env.PORT || 3000;
+const WORKERS = workerCount(process.env.CLUSTER_WORKERS);
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS ?? '30000', 10);
 
 async function waitFor(fn, label, retries = 10, delay = 3000) {
     for (let i = 1; i <= retries; i++) {
@@ -19,18 +21,78 @@ async function waitFor(fn, label, retries = 10, delay = 3000) {
     }
 }
 
-async function init() {
-    try {
-        await waitFor(() => pool.query('SELECT 1'), 'PostgreSQL');
-        await waitFor(() => initBuckets(), 'MinIO');
-    } catch (error) {
-        console.error('Initialization failed after retries:', error.message);
-        process.exit(1);
+function startWorker() {
+    const app = require('./app');
+    const pool = require('./config/db');
+    const {initBuckets, closeStorage} = require('./config/minio');
+    const imageGc = require('./services/imageGc');
+    const statsRollup = require('./services/statsRollup');
+    const invoiceEvents = require('./services/invoiceEvents');
+    const sorobanService = require('./services/sorobanService');
+    const shutdown = require('./services/shutdown');
+    const healthProber = require('./services/healthProber');
+    const {useSharedStore} = require('./services/rateLimitStore');
+
+    // Scheduled jobs run in one process only (worker 0 in cluster mode)
+    const runsJobs = cluster.isPrimary || process.env.CLUSTER_WORKER_INDEX === '0';
+
+    async function init() {
+        try {
+            await waitFor(() => pool.query('SELECT 1'), 'PostgreSQL');
+            await waitFor(() => initBuckets(), 'MinIO');
+        } catch (error) {
+            console.error('Initialization failed after retries:', error.message);
+            process.exit(1);
+        }
     }
-}
 
-init().then(() => {
-    app.listen(PORT, '0.0.0.0', () => {
-        logger.info({port: PORT}, `CoTravel API running on http://localhost:${PORT}`);
+    init().then(async () => {
+        if (runsJobs) {
+            const gcMinutes = parseInt(process.env.IMAGE_GC_INTERVAL_MINUTES, 10);
+            if (gcMinutes > 0) {
+                imageGc.schedule(gcMinutes * 60 * 1000);
+            }
+
+            const rollupMinutes = parseInt(process.env.STATS_ROLLUP_INTERVAL_MINUTES ?? '60', 10);
+            if (rollupMinutes > 0) {
+                statsRollup.rollupRecent().catch((err) => logger.error({err}, 'Daily stats rollup failed'));
+                statsRollup.schedule(rollupMinutes * 60 * 1000);
+            }
+        }
+
+        // SSE subscribers may be connected to any worker or replica. A
+        // shared rate-limit store (RATE_LIMIT_STORE=postgres, the default in
+        // cluster mode) marks a deployment with more than one process.
+        if (cluster.isWorker || useSharedStore()) {
+            await invoiceEvents.connectBus();
+        }
+
+        healthProber.start(parseInt(process.env.HEALTH_PROBE_INTERVAL_MS ?? '10000', 10));
+
+        const server = app.listen(PORT, '0.0.0.0', () => {
+            logger.info({port: PORT, pid: process.pid}, `CoTravel API running on http://localhost:${PORT}`);
+        });
+
+        shutdown.onShutdown('wait', 'prober', () => healthProber.stop());
+        shutdown.onShutdown('wait', 'sse', () => invoiceEvents.closeAll());
+        shutdown.onShutdown('wait', 'submitTx', async (msLeft) => {
+            const pending = await sorobanService.drainSubmissions(msLeft);
+            if (pending > 0) {
+                logger.warn({pending}, 'Exiting with transactions still awaiting confirmation');
+            }
+        });
+        shutdown.onShutdown('close', 'eventBus', () => invoiceEvents.closeBus());
+        shutdown.onShutdown('close', 'postgres', () => pool.end());
+        shutdown.onShutdown('close', 'minio', () => closeStorage());
+        shutdown.installSignalHandlers(server, {
+            timeoutMs: SHUTDOWN_TIMEOUT_MS,
+            readinessDelayMs: parseInt(process.env.SHUTDOWN_READINESS_DELAY_MS ?? '0', 10),
+        });
     });
-});
+}
+
+if (cluster.isPrimary && WORKERS > 1) {
+    supervise(WORKERS, SHUTDOWN_TIMEOUT_MS);
+} else {
+    startWorker();
+}
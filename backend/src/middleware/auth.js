@@ -1,4 +1,5 @@
 const jwt = require('jsonwebtoken');
+const {LruCache} = require('../services/lruCache');
 
 const JWT_SECRET = process.env.JWT_SECRET;
 if (!JWT_SECRET && process.env.NODE_ENV === 'production') {
@@ -19,52 +20,70 @@ function validateId(req, res, next) {
     next();
 }
 
-// ─── Verify JWT token and attach user to request ────────────────────────────
-function requireAuth(req, res, next) {
-    const header = req.headers.authorization;
-    if (!header || !header.startsWith('Bearer ')) {
-        return res.status(401).json({error: 'Authorization token required'});
-    }
-
-    const token = header.split(' ')[1];
+// ─── Memoized JWT verification ──────────────────────────────────────────────
+// The rate limiter keys authenticated requests by user, so a token is
+// verified before routing and again by requireAuth. Verified payloads are
+// cached by token until they expire (at most VERIFY_CACHE_TTL_MS), which
+// turns the second and every later check into a map lookup. Only valid
+// tokens are cached.
+const VERIFY_CACHE_TTL_MS = 5 * 60 * 1000;
+const verified = new LruCache({max: 10000, ttlMs: VERIFY_CACHE_TTL_MS});
+
+// Payload of a valid token, or null
+function verifyToken(token) {
+    const cached = verified.get(token);
+    if (cached) return cached;
     try {
         const payload = jwt.verify(token, SECRET, {
             issuer: JWT_ISSUER,
             audience: JWT_AUDIENCE,
         });
-        req.user = {
-            id: payload.id,
-            wallet_address: payload.wallet_address,
-            role: payload.role || 'user',
-            provider: payload.provider,
-        };
-        next();
-    } catch (err) {
-        return res.status(401).json({error: 'Invalid or expired token'});
+        const ttl = payload.exp ? payload.exp * 1000 - Date.now() : VERIFY_CACHE_TTL_MS;
+        verified.set(token, payload, Math.min(ttl, VERIFY_CACHE_TTL_MS));
+        return payload;
+    } catch (_) {
+        return null;
     }
 }
 
-// ─── Optional auth: attach user if token present, otherwise continue ────────
-function optionalAuth(req, res, next) {
+// Bearer token from the Authorization header, or null
+function bearerToken(req) {
     const header = req.headers.authorization;
-    if (!header || !header.startsWith('Bearer ')) {
-        return next();
+    if (!header || !header.startsWith('Bearer ')) return null;
+    return header.split(' ')[1];
+}
+
+function toUser(payload) {
+    return {
+        id: payload.id,
+        wallet_address: payload.wallet_address,
+        role: payload.role || 'user',
+        provider: payload.provider,
+    };
+}
+
+// ─── Verify JWT token and attach user to request ────────────────────────────
+function requireAuth(req, res, next) {
+    const token = bearerToken(req);
+    if (!token) {
+        return res.status(401).json({error: 'Authorization token required'});
     }
 
-    const token = header.split(' ')[1];
-    try {
-        const payload = jwt.verify(token, SECRET, {
-            issuer: JWT_ISSUER,
-            audience: JWT_AUDIENCE,
-        });
-        req.user = {
-            id: payload.id,
-            wallet_address: payload.wallet_address,
-            role: payload.role || 'user',
-            provider: payload.provider,
-        };
-    } catch (_) {
-        // Invalid token, continue without user
+    const payload = verifyToken(token);
+    if (!payload) {
+        return res.status(401).json({error: 'Invalid or expired token'});
+    }
+    req.user = toUser(payload);
+    next();
+}
+
+// ─── Optional auth: attach user if token present, otherwise continue ────────
+function optionalAuth(req, res, next) {
+    const token = bearerToken(req);
+    // Invalid token: continue without user
+    const payload = token && verifyToken(token);
+    if (payload) {
+        req.user = toUser(payload);
     }
     next();
 }
@@ -79,6 +98,7 @@ function requireAdmin(req, res, next) {
 
 // ─── Load invoice by :id param ──────────────────────────────────────────────
 const invoiceModel = require('../models/invoiceModel');
+const tracing = require('../services/tracing');
 
 async function loadInvoice(req, res, next) {
     try {
@@ -87,6 +107,7 @@ async function loadInvoice(req, res, next) {
             return res.status(404).json({error: 'Invoice not found'});
         }
         req.invoice = invoice;
+        tracing.setAttributes({'invoice.id': invoice.id, 'invoice.contract_id': invoice.contract_invoice_id});
         next();
     } catch (err) {
         next(err);
@@ -180,5 +201,7 @@ module.exports = {
     loadInvoice, requireInvoiceOrganizer, requireInvoiceAccess,
     loadBusiness, requireBusinessOwner,
     generateToken,
+    verifyToken,
+    bearerToken,
     JWT_SECRET: SECRET,
 };
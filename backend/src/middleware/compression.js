@@ -0,0 +1,101 @@
+const zlib = require('zlib');
+const logger = require('../config/logger');
+
+// ─── Response compression ────────────────────────────────────────────────────
+// Bodies sent in one piece (res.json / res.send) are compressed with brotli
+// or gzip, whichever the client prefers in Accept-Encoding, when they are at
+// least COMPRESSION_MIN_BYTES long. Streams (images, SSE) write before they
+// end and are left alone, as are bodies that already have an encoding.
+//
+// Compression runs on the libuv threadpool (zlib async API), so a large
+// catalog response doesn't block the event loop. Brotli quality 4 compresses
+// JSON better than gzip -6 at a similar CPU cost; 11 is for static assets.
+
+const COMPRESSION_MIN_BYTES = parseInt(process.env.COMPRESSION_MIN_BYTES, 10) || 1024;
+const BROTLI_QUALITY = 4;
+const GZIP_LEVEL = 6;
+
+const COMPRESSIBLE = /^(application\/(json|javascript|xml|[\w.+-]+\+json)|text\/(?!event-stream)[\w.+-]+|image\/svg\+xml)\b/i;
+const PREFERENCE = ['br', 'gzip'];
+
+// Best supported coding for an Accept-Encoding header, or null
+function negotiate(header) {
+    if (!header) return null;
+    const weights = new Map();
+    for (const part of header.split(',')) {
+        const [name, ...params] = part.trim().toLowerCase().split(';');
+        if (!name) continue;
+        const q = params.map((p) => p.trim()).find((p) => p.startsWith('q='));
+        weights.set(name, q ? parseFloat(q.slice(2)) || 0 : 1);
+    }
+    let best = null;
+    let bestWeight = 0;
+    for (const coding of PREFERENCE) {
+        const weight = weights.has(coding) ? weights.get(coding) : (weights.get('*') ?? 0);
+        if (weight > bestWeight) {
+            best = coding;
+            bestWeight = weight;
+        }
+    }
+    return best;
+}
+
+function compressBody(coding, buffer, callback) {
+    if (coding === 'br') {
+        zlib.brotliCompress(buffer, {
+            params: {
+                [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+                [zlib.constants.BROTLI_PARAM_SIZE_HINT]: buffer.length,
+            },
+        }, callback);
+    } else {
+        zlib.gzip(buffer, {level: GZIP_LEVEL}, callback);
+    }
+}
+
+function compressible(req, res) {
+    if (req.method === 'HEAD' || res.statusCode < 200 || res.statusCode === 204 || res.statusCode === 304) {
+        return false;
+    }
+    if (res.getHeader('Content-Encoding')) return false;
+    if (/\bno-transform\b/.test(res.getHeader('Cache-Control') || '')) return false;
+    return COMPRESSIBLE.test(res.getHeader('Content-Type') || '');
+}
+
+function compression({threshold = COMPRESSION_MIN_BYTES} = {}) {
+    return function compress(req, res, next) {
+        const end = res.end;
+
+        res.end = function (chunk, encoding, callback) {
+            if (typeof encoding === 'function') {
+                callback = encoding;
+                encoding = undefined;
+            }
+            if (!chunk || res.headersSent || !compressible(req, res)) {
+                return end.call(res, chunk, encoding, callback);
+            }
+
+            // Caches must key on Accept-Encoding even when this body stays plain
+            res.vary('Accept-Encoding');
+            const buffer = Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk, encoding);
+            const coding = buffer.length >= threshold && negotiate(req.headers['accept-encoding']);
+            if (!coding) return end.call(res, buffer, undefined, callback);
+
+            compressBody(coding, buffer, (err, compressed) => {
+                if (err) {
+                    logger.warn({err: err.message, coding}, 'Response compression failed, sending plain body');
+                    return end.call(res, buffer, undefined, callback);
+                }
+                if (res.headersSent) return end.call(res, buffer, undefined, callback);
+                res.setHeader('Content-Encoding', coding);
+                res.setHeader('Content-Length', compressed.length);
+                end.call(res, compressed, undefined, callback);
+            });
+            return res;
+        };
+
+        next();
+    };
+}
+
+module.exports = {compression, negotiate};
@@ -0,0 +1,51 @@
+const crypto = require('crypto');
+const serviceModel = require('../models/serviceModel');
+
+// ─── Conditional GET ─────────────────────────────────────────────────────────
+// Express already tags every res.json body with a hash ETag, but it can only
+// answer 304 after the handler has run its queries and serialized the body.
+// Handlers that know a cheap version of what they are about to send (row
+// updated_at, the catalog generation counter) set a weak ETag from it
+// first and stop with 304 when the client already has that version.
+
+function toVersion(part) {
+    if (part instanceof Date) return part.getTime().toString(36);
+    return String(part ?? '');
+}
+
+// Short digest of values that can't go in an ETag as they are (user names,
+// wallets): weakEtag('inv', id, digest(row.organizer_name))
+function digest(...values) {
+    return crypto.createHash('sha1').update(JSON.stringify(values)).digest('base64url').slice(0, 12);
+}
+
+// Weak ETag from version parts: weakEtag('svc', 12, row.updated_at)
+function weakEtag(...parts) {
+    return `W/"${parts.map(toVersion).join('-')}"`;
+}
+
+/**
+ * Set the ETag and Cache-Control for a response and answer 304 if the
+ * request's If-None-Match already names it. Returns true when the response
+ * has been sent; the handler must return without doing more work.
+ *
+ * Responses only revalidate (no-cache): the ETag makes that a 304 with an
+ * empty body. Per-user resources pass {private: true} so shared caches
+ * never store them.
+ */
+function notModified(req, res, etag, {private: isPrivate = false} = {}) {
+    res.set('ETag', etag);
+    res.set('Cache-Control', isPrivate ? 'private, no-cache' : 'no-cache');
+    if (!req.fresh) return false;
+    res.status(304).end();
+    return true;
+}
+
+// Catalog endpoints (services, businesses) share one version: any change to
+// either table (see serviceModel.catalogVersion). The catalog changes rarely and is read on every page load.
+async function catalogNotModified(req, res) {
+    const version = await serviceModel.catalogVersion();
+    return notModified(req, res, weakEtag('catalog', version));
+}
+
+module.exports = {weakEtag, digest, notModified, catalogNotModified};
@@ -0,0 +1,16 @@
+const {httpRequestDuration, httpRequestsTotal} = require('../services/metrics');
+const {routeLabel} = require('../services/tracing');
+
+// Record http_requests_total and http_request_duration_seconds, labelled with
+// the route template rather than the raw URL
+function httpMetrics(req, res, next) {
+    const start = process.hrtime.bigint();
+    res.on('finish', () => {
+        const labels = {method: req.method, route: routeLabel(req), status_code: res.statusCode};
+        httpRequestsTotal.inc(labels);
+        httpRequestDuration.observe(labels, Number(process.hrtime.bigint() - start) / 1e9);
+    });
+    next();
+}
+
+module.exports = {httpMetrics, routeLabel};
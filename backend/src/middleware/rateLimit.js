@@ -0,0 +1,83 @@
+const logger = require('../config/logger');
+const {verifyToken, bearerToken} = require('./auth');
+const {getStore} = require('../services/rateLimitStore');
+
+// ─── Rate limiting ───────────────────────────────────────────────────────────
+// Each limiter is a budget of `limit` units per `windowMs` per key. Requests
+// spend `cost` units, so one limiter can let a client browse the catalog
+// freely and still cap how often it makes the API submit transactions.
+//
+// Keys are per user for requests with a valid token (the JWT is verified
+// through the memoized verifyToken, so requireAuth doesn't pay for it again)
+// and per IP otherwise; users behind one NAT don't share a budget.
+//
+// If the store fails (Postgres down) the request is let through: rate
+// limiting protects the service, it must not take it down.
+
+function clientKey(req) {
+    const token = bearerToken(req);
+    const payload = token && verifyToken(token);
+    return payload ? `user:${payload.id}` : `ip:${req.ip}`;
+}
+
+// Cost table: first matching rule wins. Anything that makes the API submit
+// a transaction and poll for its confirmation (up to 30 RPC calls) costs 10.
+const SUBMIT_TX_ROUTE = /^\/api\/invoices\/\d+\/(contribute|withdraw|confirm|link-contract|release|cancel|claim-deadline|items)$/;
+
+function requestCost(req) {
+    // A batch costs what its GETs would cost sent one by one
+    if (req.method === 'POST' && req.path === '/api/batch') {
+        return Array.isArray(req.body?.requests) ? Math.max(req.body.requests.length, 1) : 1;
+    }
+    if ((req.method === 'POST' || req.method === 'PUT') && SUBMIT_TX_ROUTE.test(req.path)) return 10;
+    if (req.method === 'GET' || req.method === 'HEAD') return 1;
+    return 2;
+}
+
+/**
+ * Build a limiter middleware.
+ *
+ * name      prefix of the stored keys; limiters never share budgets
+ * limit     units per window
+ * windowMs  window length (or bucket refill period)
+ * cost      units per request: a number or (req) => number
+ * key       (req) => string, clientKey by default
+ * skip      (req) => boolean
+ * store     a MemoryStore or PostgresStore, the RATE_LIMIT_STORE one by default
+ */
+function rateLimit({
+    name, limit, windowMs, cost = 1, key = clientKey, skip = () => false,
+    message = 'Too many requests, please try again later', store = null,
+}) {
+    const rule = {limit, windowMs};
+    const policy = `${limit};w=${Math.round(windowMs / 1000)}`;
+
+    return async function rateLimiter(req, res, next) {
+        if (skip(req)) return next();
+
+        const units = typeof cost === 'function' ? cost(req) : cost;
+        let result;
+        try {
+            result = await (store || getStore()).consume(`${name}:${key(req)}`, units, rule);
+        } catch (err) {
+            logger.warn({limiter: name, err: err.message}, 'Rate limit store failed, allowing request');
+            return next();
+        }
+
+        res.set({
+            'RateLimit-Policy': policy,
+            'RateLimit-Limit': String(limit),
+            'RateLimit-Remaining': String(result.remaining),
+            'RateLimit-Reset': String(Math.ceil(result.resetMs / 1000)),
+        });
+        if (!result.allowed) {
+            // Enough budget for this request comes back before the full reset
+            const retryAfter = Math.max(Math.ceil(Math.min(units * windowMs / limit, result.resetMs) / 1000), 1);
+            res.set('Retry-After', String(retryAfter));
+            return res.status(429).json({error: message});
+        }
+        next();
+    };
+}
+
+module.exports = {rateLimit, clientKey, requestCost};
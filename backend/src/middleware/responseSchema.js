@@ -0,0 +1,25 @@
+const {compileSerializer} = require('../services/serializer');
+
+// ─── Response schemas ────────────────────────────────────────────────────────
+// router.get('/', responseSchema(schemas.serviceList), ctrl.getAll)
+//
+// The schema is compiled when the route is declared. For this request,
+// res.json writes 2xx bodies with the compiled serializer (declared
+// properties only); errors ({error: ...}) and redirects keep the generic
+// res.json. Controllers don't change.
+
+function responseSchema(schema) {
+    const serialize = compileSerializer(schema);
+
+    return function useResponseSchema(req, res, next) {
+        const json = res.json;
+        res.json = function (body) {
+            if (res.statusCode < 200 || res.statusCode >= 300) return json.call(res, body);
+            if (!res.get('Content-Type')) res.set('Content-Type', 'application/json; charset=utf-8');
+            return res.send(serialize(body));
+        };
+        next();
+    };
+}
+
+module.exports = {responseSchema};
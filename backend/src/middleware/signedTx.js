@@ -0,0 +1,91 @@
+const sorobanService = require('../services/sorobanService');
+const transactionModel = require('../models/transactionModel');
+
+// ─── Signed-XDR submission guards ────────────────────────────────────────────
+// verifySignedTx rejects envelopes that are not the call the route expects
+// before any DB or RPC work.
+//
+// A client that retries after a timeout sends the same signed envelope again.
+// The envelope hash is known before submission, so a retry of an already
+// recorded transaction is answered from the `transactions` table without
+// touching the RPC or re-applying off-chain side effects.
+
+const STROOPS_PER_XLM = 10_000_000;
+
+// Reject a signed_xdr that is not the expected call for this route before any
+// RPC or DB work. Requests without signed_xdr pass through (controllers decide
+// whether it is required). Must run after loadInvoice.
+function verifySignedTx(fn) {
+    return async (req, res, next) => {
+        try {
+            const signedXdr = req.body && req.body.signed_xdr;
+            if (!signedXdr) return next();
+
+            const expected = {
+                fn,
+                tripId: req.invoice.contract_invoice_id,
+                wallet: req.user.wallet_address,
+            };
+            const amount = Number(req.body.amount);
+            if (req.body.amount !== undefined && Number.isFinite(amount)) {
+                expected.amountStroops = Math.round(amount * STROOPS_PER_XLM);
+            }
+
+            await sorobanService.verifySignedTx(signedXdr, expected);
+            next();
+        } catch (err) {
+            next(err);
+        }
+    };
+}
+
+// transactions.type recorded for each contract function, where they differ
+const RECORDED_TYPES = {create_invoice: 'create'};
+
+// Load the recorded transaction for req.body.signed_xdr, if any. `fn` is the
+// contract function the route submits: a transaction recorded for another
+// function (a contribute envelope posted to /withdraw) is not a retry of
+// this request. Must run after loadInvoice.
+function loadSubmittedTx(fn) {
+    const expectedType = RECORDED_TYPES[fn] || fn;
+
+    return async (req, res, next) => {
+        try {
+            const signedXdr = req.body && req.body.signed_xdr;
+            if (!signedXdr) return next();
+
+            const hash = sorobanService.hashSignedXdr(signedXdr);
+            if (!hash) return next();
+
+            const recorded = await transactionModel.findByHash(hash);
+            if (recorded) {
+                if (recorded.invoice_id !== req.invoice.id || recorded.user_id !== req.user.id
+                    || recorded.type !== expectedType) {
+                    return res.status(409).json({error: 'Transaction already recorded for another request'});
+                }
+                req.submittedTx = recorded;
+                res.set('Idempotent-Replayed', 'true');
+            }
+            next();
+        } catch (err) {
+            next(err);
+        }
+    };
+}
+
+// Submit the signed XDR, or return the stored result of a replayed one.
+// `replayed` tells the caller to skip off-chain side effects.
+async function submitSignedTx(req, signedXdr) {
+    const recorded = req.submittedTx;
+    if (recorded) {
+        return {
+            hash: recorded.tx_hash,
+            ledger: recorded.ledger_sequence,
+            returnValue: recorded.event_data?.contract_invoice_id ?? null,
+            replayed: true,
+        };
+    }
+    return sorobanService.submitTx(signedXdr);
+}
+
+module.exports = {verifySignedTx, loadSubmittedTx, submitSignedTx};
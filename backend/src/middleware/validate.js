@@ -0,0 +1,23 @@
+const {compileValidator} = require('../services/validator');
+
+// ─── Request validation ──────────────────────────────────────────────────────
+// router.post('/', requireAuth, validate(schemas.createInvoice), ctrl.create)
+//
+// Schemas ({params, query, body}) are compiled when the route is declared
+// (services/validator). The middleware goes right after requireAuth, which
+// does no I/O, and before loadInvoice and the signed-XDR guards, so a
+// malformed request is answered 400 {error} without a DB query or an RPC.
+
+function validate(schemas) {
+    const validators = Object.entries(schemas).map(([source, schema]) => [source, compileValidator(schema)]);
+
+    return function validateRequest(req, res, next) {
+        for (const [source, check] of validators) {
+            const error = check(req[source] ?? {});
+            if (error !== null) return res.status(400).json({error});
+        }
+        next();
+    };
+}
+
+module.exports = {validate};
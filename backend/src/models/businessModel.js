@@ -1,6 +1,8 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
-module.exports = {
+module.exports = memoizeReads(instrumentModel('businessModel', {
     async create(ownerId, name, category, description, logoUrl, walletAddress, contactEmail, location, schedule, contactInfo, locationData) {
         const {rows} = await pool.query(
             `INSERT INTO businesses (owner_id, name, category, description, logo_url, wallet_address, contact_email,
@@ -29,11 +31,6 @@ module.exports = {
         return rows;
     },
 
-    async count() {
-        const {rows} = await pool.query('SELECT COUNT(*)::int as total FROM businesses WHERE active = true');
-        return rows[0].total;
-    },
-
     async findById(id) {
         const {rows} = await pool.query(
             `SELECT b.*, u.wallet_address as owner_wallet, u.username as owner_name
@@ -90,4 +87,4 @@ module.exports = {
         );
         return rows[0] || null;
     },
-};
+}), ['findById', 'findDistinctCategories', 'findDistinctLocations']);
@@ -1,11 +1,19 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
-module.exports = {
-    async findByUser(userId) {
+module.exports = memoizeReads(instrumentModel('cartModel', {
+    // Items, total quantity and per-business subtotals in one query. The
+    // window columns repeat on every row and are folded out here.
+    async findSummaryByUser(userId) {
         const {rows} = await pool.query(
             `SELECT ci.*, s.name as service_name, s.description as service_description,
                     s.price, s.image_url, s.active as service_active,
-                    b.id as business_id, b.name as business_name, b.wallet_address as business_wallet
+                    b.id as business_id, b.name as business_name, b.wallet_address as business_wallet,
+                    SUM(ci.quantity) OVER ()::int as cart_count,
+                    SUM(s.price * ci.quantity) OVER () as cart_total,
+                    SUM(ci.quantity) OVER (PARTITION BY b.id)::int as business_count,
+                    SUM(s.price * ci.quantity) OVER (PARTITION BY b.id) as business_subtotal
              FROM cart_items ci
              JOIN services s ON ci.service_id = s.id
              JOIN businesses b ON s.business_id = b.id
@@ -13,17 +21,27 @@ module.exports = {
              ORDER BY ci.added_at DESC`,
             [userId]
         );
-        return rows;
-    },
 
-    async countByUser(userId) {
-        const {rows} = await pool.query(
-            `SELECT COALESCE(SUM(quantity), 0)::int as total
-             FROM cart_items
-             WHERE user_id = $1`,
-            [userId]
-        );
-        return rows[0].total;
+        const businesses = new Map();
+        const items = rows.map(({cart_count, cart_total, business_count, business_subtotal, ...item}) => {
+            if (!businesses.has(item.business_id)) {
+                businesses.set(item.business_id, {
+                    business_id: item.business_id,
+                    business_name: item.business_name,
+                    business_wallet: item.business_wallet,
+                    count: business_count,
+                    subtotal: business_subtotal,
+                });
+            }
+            return item;
+        });
+
+        return {
+            items,
+            count: rows.length ? rows[0].cart_count : 0,
+            total: rows.length ? rows[0].cart_total : '0',
+            businesses: [...businesses.values()],
+        };
     },
 
     async addItem(userId, serviceId, quantity = 1) {
@@ -38,6 +56,24 @@ module.exports = {
         return rows[0];
     },
 
+    // Upsert many (service_id, quantity) pairs in one statement. Pairs must have
+    // distinct service ids. With `replace` the given quantity overwrites the
+    // current one; otherwise it is added to it, like addItem.
+    async upsertMany(userId, pairs, {replace = false} = {}) {
+        const {rows} = await pool.query(
+            `INSERT INTO cart_items (user_id, service_id, quantity)
+             SELECT $1, u.service_id, u.quantity
+             FROM unnest($2::int[], $3::int[]) AS u(service_id, quantity)
+             ON CONFLICT (user_id, service_id)
+             DO UPDATE SET quantity = CASE WHEN $4 THEN EXCLUDED.quantity
+                                           ELSE cart_items.quantity + EXCLUDED.quantity END,
+                           added_at = NOW()
+             RETURNING *`,
+            [userId, pairs.map((p) => p.service_id), pairs.map((p) => p.quantity), replace]
+        );
+        return rows;
+    },
+
     async findById(id) {
         const {rows} = await pool.query(
             `SELECT ci.*, s.name as service_name, s.price
@@ -72,4 +108,4 @@ module.exports = {
         );
         return rowCount;
     },
-};
+}), ['findSummaryByUser']);
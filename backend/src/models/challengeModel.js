@@ -0,0 +1,42 @@
+const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+
+// Login challenges live in Postgres so that /challenge and /login can be
+// served by different workers or replicas.
+module.exports = instrumentModel('challengeModel', {
+    // Store a new challenge for a wallet (replacing any previous one) and
+    // drop expired ones
+    async issue(wallet, message, expiryMs) {
+        await pool.query(
+            `WITH expired AS (
+                DELETE FROM auth_challenges
+                WHERE created_at < NOW() - $3 * INTERVAL '1 millisecond' AND wallet <> $1
+             )
+             INSERT INTO auth_challenges (wallet, message, created_at)
+             VALUES ($1, $2, NOW())
+             ON CONFLICT (wallet) DO UPDATE SET message = EXCLUDED.message, created_at = EXCLUDED.created_at`,
+            [wallet, message, expiryMs]
+        );
+    },
+
+    // Pending challenge with its expiry evaluated on the database clock
+    async find(wallet, expiryMs) {
+        const {rows} = await pool.query(
+            `SELECT message, created_at < NOW() - $2 * INTERVAL '1 millisecond' AS expired
+             FROM auth_challenges
+             WHERE wallet = $1`,
+            [wallet, expiryMs]
+        );
+        return rows[0] || null;
+    },
+
+    // Remove a challenge; with `message`, only if it is still that one. Returns
+    // whether a row was deleted, so concurrent logins can't both use it.
+    async remove(wallet, message = null) {
+        const {rowCount} = await pool.query(
+            'DELETE FROM auth_challenges WHERE wallet = $1 AND ($2::text IS NULL OR message = $2)',
+            [wallet, message]
+        );
+        return rowCount > 0;
+    },
+});
@@ -0,0 +1,32 @@
+const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+
+module.exports = instrumentModel('imageModel', {
+    // Record an object in the images index (idempotent: dedupe hits re-upsert)
+    async upsert({key, size, contentType}) {
+        await pool.query(
+            `INSERT INTO images (key, size, content_type)
+             VALUES ($1, $2, $3)
+             ON CONFLICT (key) DO UPDATE SET size = EXCLUDED.size, content_type = EXCLUDED.content_type`,
+            [key, size, contentType]
+        );
+    },
+
+    async removeMany(keys) {
+        if (keys.length === 0) return;
+        await pool.query('DELETE FROM images WHERE key = ANY($1)', [keys]);
+    },
+
+    // Keyset page ordered by key: `after` is the last key of the previous page
+    async list({prefix = '', after = '', limit}) {
+        const {rows} = await pool.query(
+            `SELECT key, size, created_at
+             FROM images
+             WHERE key > $1 AND key LIKE $2
+             ORDER BY key
+             LIMIT $3`,
+            [after, `${prefix.replace(/[\\%_]/g, '\\$&')}%`, limit]
+        );
+        return rows;
+    },
+});
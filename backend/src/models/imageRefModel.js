@@ -0,0 +1,20 @@
+const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+
+module.exports = instrumentModel('imageRefModel', {
+    // Reference count of every /images/ URL stored in the database, as a Map
+    // of url → count. One pass over the referencing columns.
+    async countReferences() {
+        const {rows} = await pool.query(
+            `SELECT url, COUNT(*)::int AS refs
+             FROM (SELECT logo_url AS url FROM businesses
+                   UNION ALL
+                   SELECT image_url FROM services
+                   UNION ALL
+                   SELECT avatar_url FROM users) r
+             WHERE url LIKE '/images/%'
+             GROUP BY url`
+        );
+        return new Map(rows.map((r) => [r.url, r.refs]));
+    },
+});
@@ -1,6 +1,8 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
-module.exports = {
+module.exports = memoizeReads(instrumentModel('invoiceItemModel', {
     async createMany(invoiceId, items) {
         if (!items.length) return [];
 
@@ -73,4 +75,4 @@ module.exports = {
         );
         return rows;
     },
-};
+}), ['findByInvoice']);
@@ -1,11 +1,13 @@
 const crypto = require('crypto');
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
 function generateInviteCode() {
     return crypto.randomBytes(6).toString('base64url').slice(0, 8);
 }
 
-module.exports = {
+module.exports = memoizeReads(instrumentModel('invoiceModel', {
     async create(organizerId, name, description, totalAmount, minParticipants, penaltyPercent, deadline, opts = {}) {
         const inviteCode = generateInviteCode();
         const {rows} = await pool.query(
@@ -21,6 +23,56 @@ module.exports = {
         return rows[0];
     },
 
+    // Create a draft invoice from the user's cart in one statement: lock the
+    // cart rows, insert the invoice with the summed total, insert one item per
+    // cart row (price * quantity, paid to the business wallet) and clear the
+    // cart. Locking first means a concurrent checkout of the same cart waits
+    // and then sees it empty. Returns null when the cart is empty.
+    async createFromCart(organizerId, name, description, minParticipants, penaltyPercent, deadline, opts = {}) {
+        const {rows} = await pool.query(
+            `WITH locked AS (SELECT id, service_id, quantity, added_at
+                             FROM cart_items
+                             WHERE user_id = $1
+                                 FOR UPDATE),
+                  cart AS (SELECT l.id,
+                                  l.service_id,
+                                  s.name                                                      AS description,
+                                  s.price * l.quantity                                        AS amount,
+                                  b.wallet_address                                            AS recipient_wallet,
+                                  (ROW_NUMBER() OVER (ORDER BY l.added_at DESC, l.id) - 1)::int AS sort_order
+                           FROM locked l
+                                    JOIN services s ON l.service_id = s.id
+                                    JOIN businesses b ON s.business_id = b.id),
+                  invoice AS (
+                      INSERT INTO invoices (organizer_id, name, description, total_amount, min_participants,
+                                            penalty_percent, deadline, icon, token_address, auto_release,
+                                            invite_code, status)
+                          SELECT $1, $2, $3, SUM(cart.amount), $4, $5, $6, $7, $8, $9, $10, 'draft'
+                          FROM cart
+                          HAVING COUNT(*) > 0
+                          RETURNING *),
+                  items AS (
+                      INSERT INTO invoice_items (invoice_id, service_id, description, amount, recipient_wallet,
+                                                 sort_order)
+                          SELECT invoice.id, cart.service_id, cart.description, cart.amount,
+                                 cart.recipient_wallet, cart.sort_order
+                          FROM invoice,
+                               cart),
+                  cleared AS (
+                      DELETE FROM cart_items
+                          WHERE id IN (SELECT id FROM locked)
+                              AND EXISTS (SELECT 1 FROM invoice))
+             SELECT invoice.*, u.wallet_address as organizer_wallet, u.username as organizer_name
+             FROM invoice
+                      JOIN users u ON invoice.organizer_id = u.id`,
+            [
+                organizerId, name, description, minParticipants, penaltyPercent, deadline,
+                opts.icon || null, opts.token_address || null, opts.auto_release || false, generateInviteCode(),
+            ]
+        );
+        return rows[0] || null;
+    },
+
     async findAll({page = 1, limit = 20} = {}) {
         const offset = (page - 1) * Math.min(limit, 100);
         const {rows} = await pool.query(
@@ -87,11 +139,6 @@ module.exports = {
         return rows[0].total;
     },
 
-    async count() {
-        const {rows} = await pool.query('SELECT COUNT(*)::int as total FROM invoices');
-        return rows[0].total;
-    },
-
     async linkContract(id, contractInvoiceId) {
         const {rows} = await pool.query(
             `UPDATE invoices SET contract_invoice_id = $2, status = 'funding', updated_at = NOW()
@@ -151,4 +198,4 @@ module.exports = {
         );
         return rows[0] || null;
     },
-};
+}), ['findById']);
@@ -1,6 +1,7 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
 
-module.exports = {
+module.exports = instrumentModel('invoiceModificationModel', {
     async create(invoiceId, version, changeSummary, itemsSnapshot) {
         const {rows} = await pool.query(
             `INSERT INTO invoice_modifications (invoice_id, version, change_summary, items_snapshot)
@@ -20,4 +21,4 @@ module.exports = {
         );
         return rows;
     },
-};
+});
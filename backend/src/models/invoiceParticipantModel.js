@@ -1,6 +1,8 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
-module.exports = {
+module.exports = memoizeReads(instrumentModel('invoiceParticipantModel', {
     async create(invoiceId, userId) {
         const {rows} = await pool.query(
             `INSERT INTO invoice_participants (invoice_id, user_id)
@@ -85,4 +87,4 @@ module.exports = {
         );
         return rows[0] || null;
     },
-};
+}), ['findByInvoice', 'findByInvoiceAndUser']);
@@ -1,6 +1,8 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
-module.exports = {
+module.exports = memoizeReads(instrumentModel('serviceModel', {
     async create(businessId, name, description, price, imageUrl, location, schedule, contactInfo, locationData) {
         const {rows} = await pool.query(
             `INSERT INTO services (business_id, name, description, price, image_url, location, schedule, contact_info,
@@ -49,6 +51,24 @@ module.exports = {
         return rows[0] || null;
     },
 
+    // Catalog generation (stat_counters 'catalog'): triggers bump it on every
+    // write to services or businesses and when a business owner changes
+    // wallet or username, so it versions everything the catalog endpoints
+    // return. One primary-key read.
+    async catalogVersion() {
+        const {rows} = await pool.query(`SELECT value FROM stat_counters WHERE name = 'catalog'`);
+        return rows.length ? rows[0].value : '0';
+    },
+
+    // id and active flag of every existing service in `ids`
+    async findStatusByIds(ids) {
+        const {rows} = await pool.query(
+            `SELECT id, active FROM services WHERE id = ANY($1::int[])`,
+            [ids]
+        );
+        return rows;
+    },
+
     async findAll() {
         const {rows} = await pool.query(
             `SELECT s.*, b.name as business_name, b.wallet_address as business_wallet,
@@ -151,4 +171,4 @@ module.exports = {
         );
         return rows[0] || null;
     },
-};
+}), ['findById', 'catalogVersion']);
@@ -0,0 +1,128 @@
+const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+
+module.exports = instrumentModel('statsModel', {
+    // Row counts kept up to date by triggers (see stat_counters in init.sql).
+    // `businesses` counts active businesses only.
+    async getCounters() {
+        const {rows} = await pool.query('SELECT name, value::int AS value FROM stat_counters');
+        const counters = {users: 0, businesses: 0, invoices: 0};
+        for (const row of rows) counters[row.name] = row.value;
+        return counters;
+    },
+
+    async getCounter(name) {
+        const {rows} = await pool.query('SELECT value::int AS value FROM stat_counters WHERE name = $1', [name]);
+        return rows.length ? rows[0].value : 0;
+    },
+
+    // Reset the counters to exact COUNT(*) values, e.g. after a bulk load
+    // with triggers disabled
+    async recount() {
+        await pool.query(
+            `UPDATE stat_counters c
+             SET value = n.total
+             FROM (SELECT 'users' AS name, COUNT(*) AS total FROM users
+                   UNION ALL
+                   SELECT 'businesses', COUNT(*) FILTER (WHERE active) FROM businesses
+                   UNION ALL
+                   SELECT 'invoices', COUNT(*) FROM invoices) n
+             WHERE c.name = n.name`
+        );
+    },
+
+    // Recompute daily_stats for every day in [from, to] (YYYY-MM-DD, both
+    // inclusive). Only rows created inside the range are scanned. An invoice
+    // counts as funded on the first day its running contribute - withdraw
+    // total reaches total_amount.
+    async rollup(from, to) {
+        const {rowCount} = await pool.query(
+            `WITH days AS (SELECT d::date AS day
+                           FROM generate_series($1::date, $2::date, INTERVAL '1 day') d),
+                  new_users AS (SELECT created_at::date AS day, COUNT(*)::int AS n
+                                FROM users
+                                WHERE created_at >= $1::date AND created_at < $2::date + 1
+                                GROUP BY 1),
+                  new_businesses AS (SELECT created_at::date AS day, COUNT(*)::int AS n
+                                     FROM businesses
+                                     WHERE created_at >= $1::date AND created_at < $2::date + 1
+                                     GROUP BY 1),
+                  new_invoices AS (SELECT day, SUM(n)::int AS n, jsonb_object_agg(status, n) AS by_status
+                                   FROM (SELECT created_at::date AS day, COALESCE(status, 'draft') AS status, COUNT(*) AS n
+                                         FROM invoices
+                                         WHERE created_at >= $1::date AND created_at < $2::date + 1
+                                         GROUP BY 1, 2) s
+                                   GROUP BY day),
+                  volume AS (SELECT created_at::date AS day,
+                                    SUM(amount) FILTER (WHERE type = 'contribute') AS collected,
+                                    SUM(amount) FILTER (WHERE type = 'release')    AS released
+                             FROM transactions
+                             WHERE created_at >= $1::date AND created_at < $2::date + 1
+                             GROUP BY 1),
+                  running AS (SELECT t.invoice_id, t.created_at, i.total_amount,
+                                     SUM(CASE WHEN t.type = 'withdraw' THEN -t.amount ELSE t.amount END)
+                                     OVER (PARTITION BY t.invoice_id ORDER BY t.created_at, t.id) AS collected
+                              FROM transactions t
+                                       JOIN invoices i ON i.id = t.invoice_id
+                              WHERE t.type IN ('contribute', 'withdraw')
+                                AND t.invoice_id IN (SELECT invoice_id
+                                                     FROM transactions
+                                                     WHERE type = 'contribute'
+                                                       AND created_at >= $1::date
+                                                       AND created_at < $2::date + 1)),
+                  funded AS (SELECT r.invoice_id, MIN(r.created_at) AS funded_at
+                             FROM running r
+                             WHERE r.total_amount > 0 AND r.collected >= r.total_amount
+                             GROUP BY r.invoice_id),
+                  funding AS (SELECT f.funded_at::date AS day, COUNT(*)::int AS n,
+                                     AVG(EXTRACT(EPOCH FROM f.funded_at - i.created_at))::int AS avg_seconds
+                              FROM funded f
+                                       JOIN invoices i ON i.id = f.invoice_id
+                              WHERE f.funded_at >= $1::date AND f.funded_at < $2::date + 1
+                              GROUP BY 1)
+             INSERT INTO daily_stats (day, new_users, new_businesses, new_invoices, invoices_by_status,
+                                      total_collected, released_volume, funded_invoices, avg_funding_seconds,
+                                      computed_at)
+             SELECT days.day,
+                    COALESCE(nu.n, 0),
+                    COALESCE(nb.n, 0),
+                    COALESCE(ni.n, 0),
+                    COALESCE(ni.by_status, '{}'),
+                    COALESCE(v.collected, 0),
+                    COALESCE(v.released, 0),
+                    COALESCE(fu.n, 0),
+                    fu.avg_seconds,
+                    NOW()
+             FROM days
+                      LEFT JOIN new_users nu ON nu.day = days.day
+                      LEFT JOIN new_businesses nb ON nb.day = days.day
+                      LEFT JOIN new_invoices ni ON ni.day = days.day
+                      LEFT JOIN volume v ON v.day = days.day
+                      LEFT JOIN funding fu ON fu.day = days.day
+             ON CONFLICT (day) DO UPDATE SET new_users           = EXCLUDED.new_users,
+                                             new_businesses      = EXCLUDED.new_businesses,
+                                             new_invoices        = EXCLUDED.new_invoices,
+                                             invoices_by_status  = EXCLUDED.invoices_by_status,
+                                             total_collected     = EXCLUDED.total_collected,
+                                             released_volume     = EXCLUDED.released_volume,
+                                             funded_invoices     = EXCLUDED.funded_invoices,
+                                             avg_funding_seconds = EXCLUDED.avg_funding_seconds,
+                                             computed_at         = EXCLUDED.computed_at`,
+            [from, to]
+        );
+        return rowCount;
+    },
+
+    async findDaily(from, to) {
+        const {rows} = await pool.query(
+            `SELECT to_char(day, 'YYYY-MM-DD') AS day, new_users, new_businesses, new_invoices,
+                    invoices_by_status, total_collected, released_volume, funded_invoices,
+                    avg_funding_seconds, computed_at
+             FROM daily_stats
+             WHERE day BETWEEN $1::date AND $2::date
+             ORDER BY day`,
+            [from, to]
+        );
+        return rows;
+    },
+});
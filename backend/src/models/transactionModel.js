@@ -1,14 +1,17 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
 
-module.exports = {
+module.exports = instrumentModel('transactionModel', {
+    // Returns null when tx_hash was already recorded (duplicate submission)
     async create(invoiceId, userId, txHash, type, amount, ledgerSequence, eventData) {
         const {rows} = await pool.query(
             `INSERT INTO transactions (invoice_id, user_id, tx_hash, type, amount, ledger_sequence, event_data)
              VALUES ($1, $2, $3, $4, $5, $6, $7)
+             ON CONFLICT (tx_hash) DO NOTHING
              RETURNING *`,
             [invoiceId, userId, txHash, type, amount, ledgerSequence, eventData]
         );
-        return rows[0];
+        return rows[0] || null;
     },
 
     async findByInvoice(invoiceId) {
@@ -30,4 +33,4 @@ module.exports = {
         );
         return rows[0] || null;
     },
-};
+});
@@ -1,6 +1,8 @@
 const pool = require('../config/db');
+const {instrumentModel} = require('../services/metrics');
+const {memoizeReads} = require('../services/requestCache');
 
-module.exports = {
+module.exports = memoizeReads(instrumentModel('userModel', {
     async findByWallet(walletAddress) {
         const {rows} = await pool.query(
             'SELECT * FROM users WHERE wallet_address = $1',
@@ -26,11 +28,6 @@ module.exports = {
         return rows;
     },
 
-    async count() {
-        const {rows} = await pool.query('SELECT COUNT(*)::int as total FROM users');
-        return rows[0].total;
-    },
-
     async create(walletAddress, username) {
         const {rows} = await pool.query(
             'INSERT INTO users (wallet_address, username) VALUES ($1, $2) RETURNING *',
@@ -70,4 +67,4 @@ module.exports = {
         );
         return rows[0] || null;
     },
-};
+}), ['findById', 'findByWallet']);
@@ -7,6 +7,13 @@ router.use(requireAuth, requireAdmin);
 
 // Dashboard stats
 router.get('/stats', adminCtrl.getStats);
+router.get('/rpc', adminCtrl.getRpcStats);
+router.get('/analytics', adminCtrl.getAnalytics);
+router.post('/analytics/rollup', adminCtrl.rollupAnalytics);
+
+// Query performance
+router.get('/queries', adminCtrl.getQueryStats);
+router.delete('/queries', adminCtrl.resetQueryStats);
 
 // Users management
 router.get('/users', adminCtrl.getUsers);
@@ -15,6 +22,9 @@ router.put('/users/:id/role', adminCtrl.updateUserRole);
 // Businesses oversight
 router.get('/businesses', adminCtrl.getBusinesses);
 
+// Storage maintenance
+router.post('/images/gc', adminCtrl.collectImageGarbage);
+
 // Invoices oversight
 router.get('/invoices', adminCtrl.getInvoices);
 
@@ -1,9 +1,11 @@
 const router = require('express').Router();
 const authCtrl = require('../controllers/authController');
 const {requireAuth} = require('../middleware/auth');
+const {validate} = require('../middleware/validate');
+const schemas = require('../schemas/requests');
 
 // Public (no auth needed)
-router.get('/challenge', authCtrl.getChallenge);
+router.get('/challenge', validate(schemas.challenge), authCtrl.getChallenge);
 router.post('/login', authCtrl.login);
 
 // Protected (requires JWT)
@@ -0,0 +1,8 @@
+const router = require('express').Router();
+const batchCtrl = require('../controllers/batchController');
+const {validate} = require('../middleware/validate');
+const schemas = require('../schemas/requests');
+
+router.post('/', validate(schemas.batch), batchCtrl.run);
+
+module.exports = router;
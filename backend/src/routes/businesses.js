@@ -2,13 +2,15 @@ const router = require('express').Router();
 const businessesCtrl = require('../controllers/businessesController');
 const servicesCtrl = require('../controllers/servicesController');
 const {requireAuth, loadBusiness, requireBusinessOwner, validateId} = require('../middleware/auth');
+const {responseSchema} = require('../middleware/responseSchema');
+const schemas = require('../schemas/responses');
 
 // Public (catalog)
 router.get('/categories', businessesCtrl.getCategories);
 router.get('/locations', businessesCtrl.getLocations);
 router.get('/', businessesCtrl.getAll);
 router.get('/:id', validateId, businessesCtrl.getById);
-router.get('/:id/services', validateId, servicesCtrl.getByBusiness);
+router.get('/:id/services', validateId, responseSchema(schemas.serviceList), servicesCtrl.getByBusiness);
 
 // My businesses (dashboard)
 router.get('/my/list', requireAuth, businessesCtrl.getMyBusinesses);
@@ -1,12 +1,15 @@
 const router = require('express').Router();
 const cartCtrl = require('../controllers/cartController');
 const {requireAuth, validateId} = require('../middleware/auth');
+const {validate} = require('../middleware/validate');
+const schemas = require('../schemas/requests');
 
 router.get('/', requireAuth, cartCtrl.getCart);
-router.post('/items', requireAuth, cartCtrl.addItem);
-router.put('/items/:id', validateId, requireAuth, cartCtrl.updateItem);
+router.post('/items', requireAuth, validate(schemas.addCartItem), cartCtrl.addItem);
+router.post('/items/bulk', requireAuth, validate(schemas.addCartItems), cartCtrl.addItems);
+router.put('/items/:id', validateId, requireAuth, validate(schemas.updateCartItem), cartCtrl.updateItem);
 router.delete('/items/:id', validateId, requireAuth, cartCtrl.removeItem);
 router.delete('/', requireAuth, cartCtrl.clearCart);
-router.post('/checkout', requireAuth, cartCtrl.checkout);
+router.post('/checkout', requireAuth, validate(schemas.checkout), cartCtrl.checkout);
 
 module.exports = router;
@@ -1,28 +1,52 @@
 const router = require('express').Router();
-const pool = require('../config/db');
-const {minioClient} = require('../config/minio');
+const prober = require('../services/healthProber');
+const {isDraining} = require('../services/shutdown');
 
-router.get('/', async (req, res) => {
-    const health = {status: 'ok', database: 'disconnected', storage: 'disconnected'};
+// All health endpoints answer from the background prober's last results;
+// only the first hit before the prober has run does any I/O.
 
+// GET /health/live — the process is up and its event loop responds
+router.get('/live', (req, res) => {
+    res.json({status: 'ok', uptime: Math.round(process.uptime())});
+});
+
+// GET /health/ready — can take traffic: not draining and every critical
+// dependency up on a fresh probe
+router.get('/ready', async (req, res, next) => {
     try {
-        await pool.query('SELECT 1');
-        health.database = 'connected';
-    } catch (error) {
-        health.status = 'error';
-        health.database_error = error.message;
+        if (isDraining()) {
+            return res.status(503).json({status: 'draining'});
+        }
+        await prober.ensureChecked();
+        const {ready, dependencies} = prober.snapshot();
+        res.status(ready ? 200 : 503).json({status: ready ? 'ok' : 'unavailable', dependencies});
+    } catch (err) {
+        next(err);
     }
+});
 
+// GET /health — legacy summary of database and storage
+router.get('/', async (req, res, next) => {
     try {
-        await minioClient.listBuckets();
-        health.storage = 'connected';
-    } catch (error) {
-        health.status = 'error';
-        health.storage_error = error.message;
-    }
+        // Shutting down: tell the load balancer to stop sending traffic here
+        if (isDraining()) {
+            return res.status(503).json({status: 'draining'});
+        }
+
+        await prober.ensureChecked(['postgres', 'minio']);
+        const {ready, dependencies: {postgres, minio}} = prober.snapshot(['postgres', 'minio']);
+        const health = {
+            status: ready ? 'ok' : 'error',
+            database: postgres.status === 'up' ? 'connected' : 'disconnected',
+            storage: minio.status === 'up' ? 'connected' : 'disconnected',
+        };
+        if (postgres.error) health.database_error = postgres.error;
+        if (minio.error) health.storage_error = minio.error;
 
-    const statusCode = health.status === 'ok' ? 200 : 500;
-    res.status(statusCode).json(health);
+        res.status(ready ? 200 : 500).json(health);
+    } catch (err) {
+        next(err);
+    }
 });
 
 module.exports = router;
@@ -1,27 +1,38 @@
 const router = require('express').Router();
 const multer = require('multer');
-const rateLimit = require('express-rate-limit');
 const ctrl = require('../controllers/imagesController');
 const {requireAuth} = require('../middleware/auth');
+const {MinioStorage, MAX_IMAGE_BYTES, ALLOWED_IMAGE_TYPES} = require('../services/minioStorage');
+const {BUCKETS} = require('../config/minio');
+const {contentKey} = require('../services/imageKeys');
+const {rateLimit} = require('../middleware/rateLimit');
 
 const uploadLimiter = rateLimit({
+    name: 'upload',
+    limit: 10,
     windowMs: 60 * 1000,
-    max: 10,
-    standardHeaders: true,
-    legacyHeaders: false,
     skip: () => process.env.NODE_ENV === 'test',
-    message: {error: 'Too many uploads, please try again later'},
+    message: 'Too many uploads, please try again later',
 });
 
+// Files are streamed to MinIO; the storage engine enforces the 5MB limit
+// mid-stream and replaces the declared mimetype with the sniffed one.
 const upload = multer({
-    storage: multer.memoryStorage(),
-    limits: {fileSize: 5 * 1024 * 1024}, // 5MB max
+    storage: new MinioStorage({
+        bucket: BUCKETS.IMAGES,
+        maxBytes: MAX_IMAGE_BYTES,
+        allowedTypes: ALLOWED_IMAGE_TYPES,
+        objectName: (_req, _file, info) => contentKey(info.sha256, info.mimetype),
+    }),
+    limits: {files: 1},
     fileFilter: (_req, file, cb) => {
-        const allowed = ['image/jpeg', 'image/png', 'image/webp', 'image/gif'];
-        if (allowed.includes(file.mimetype)) {
+        // Cheap early reject on the declared type; content is checked while streaming
+        if (ALLOWED_IMAGE_TYPES.includes(file.mimetype)) {
             cb(null, true);
         } else {
-            cb(new Error('Only JPEG, PNG, WebP, and GIF images are allowed'));
+            const err = new Error('Only JPEG, PNG, WebP, and GIF images are allowed');
+            err.status = 400;
+            cb(err);
         }
     },
 });
@@ -29,6 +40,10 @@ const upload = multer({
 // Upload requires auth
 router.post('/upload', uploadLimiter, requireAuth, upload.single('image'), ctrl.upload);
 
+// Direct-to-storage upload: presigned POST policy, then completion check
+router.post('/presign', uploadLimiter, requireAuth, ctrl.presign);
+router.post('/complete', requireAuth, ctrl.complete);
+
 // Retrieval is public (images are referenced by URL)
 router.get('/:filename', ctrl.get);
 router.get('/', ctrl.list);
@@ -8,33 +8,40 @@ const {
     loadInvoice,
     validateId
 } = require('../middleware/auth');
+const {verifySignedTx, loadSubmittedTx} = require('../middleware/signedTx');
+const {responseSchema} = require('../middleware/responseSchema');
+const schemas = require('../schemas/responses');
+const {validate} = require('../middleware/validate');
+const requests = require('../schemas/requests');
 
 // My invoices (dashboard)
-router.get('/my', requireAuth, invoicesCtrl.getMyInvoices);
+router.get('/my', requireAuth, responseSchema(schemas.myInvoices), invoicesCtrl.getMyInvoices);
 
 // Join by invite code (auth required, no access check — this IS the entry point)
 router.get('/join/:code', requireAuth, invoicesCtrl.getByInviteCode);
 
 // Detail (auth required, scoped to organizer/participant/admin)
-router.get('/:id', validateId, requireAuth, loadInvoice, requireInvoiceAccess, invoicesCtrl.getById);
+router.get('/:id', validateId, requireAuth, loadInvoice, requireInvoiceAccess, responseSchema(schemas.invoiceDetail),
+    invoicesCtrl.getById);
 router.get('/:id/participants', validateId, requireAuth, loadInvoice, requireInvoiceAccess, invoiceParticipantsCtrl.list);
+router.get('/:id/events', validateId, requireAuth, loadInvoice, requireInvoiceAccess, invoicesCtrl.streamEvents);
 
 // Create
-router.post('/', requireAuth, invoicesCtrl.create);
+router.post('/', requireAuth, validate(requests.createInvoice), invoicesCtrl.create);
 
 // Participant actions
 router.post('/:id/join', validateId, requireAuth, loadInvoice, invoiceParticipantsCtrl.join);
-router.post('/:id/contribute', validateId, requireAuth, loadInvoice, invoiceParticipantsCtrl.recordContribution);
-router.post('/:id/withdraw', validateId, requireAuth, loadInvoice, invoiceParticipantsCtrl.recordWithdrawal);
-router.post('/:id/confirm', validateId, requireAuth, loadInvoice, invoiceParticipantsCtrl.confirmRelease);
+router.post('/:id/contribute', validateId, requireAuth, validate(requests.contribute), loadInvoice, verifySignedTx('contribute'), loadSubmittedTx('contribute'), invoiceParticipantsCtrl.recordContribution);
+router.post('/:id/withdraw', validateId, requireAuth, validate(requests.signedTx), loadInvoice, verifySignedTx('withdraw'), loadSubmittedTx('withdraw'), invoiceParticipantsCtrl.recordWithdrawal);
+router.post('/:id/confirm', validateId, requireAuth, validate(requests.optionalSignedTx), loadInvoice, verifySignedTx('confirm_release'), loadSubmittedTx('confirm_release'), invoiceParticipantsCtrl.confirmRelease);
 
 // Organizer only
-router.post('/:id/link-contract', validateId, requireAuth, loadInvoice, requireInvoiceOrganizer, invoicesCtrl.linkContract);
-router.put('/:id/items', validateId, requireAuth, loadInvoice, requireInvoiceOrganizer, invoicesCtrl.updateItems);
-router.post('/:id/release', validateId, requireAuth, loadInvoice, requireInvoiceOrganizer, invoicesCtrl.release);
-router.post('/:id/cancel', validateId, requireAuth, loadInvoice, requireInvoiceOrganizer, invoicesCtrl.cancel);
+router.post('/:id/link-contract', validateId, requireAuth, validate(requests.signedTx), loadInvoice, requireInvoiceOrganizer, verifySignedTx('create_invoice'), loadSubmittedTx('create_invoice'), invoicesCtrl.linkContract);
+router.put('/:id/items', validateId, requireAuth, validate(requests.updateItems), loadInvoice, requireInvoiceOrganizer, verifySignedTx('update_recipients'), loadSubmittedTx('update_recipients'), invoicesCtrl.updateItems);
+router.post('/:id/release', validateId, requireAuth, validate(requests.signedTx), loadInvoice, requireInvoiceOrganizer, verifySignedTx('release'), loadSubmittedTx('release'), invoicesCtrl.release);
+router.post('/:id/cancel', validateId, requireAuth, validate(requests.optionalSignedTx), loadInvoice, requireInvoiceOrganizer, verifySignedTx('cancel'), loadSubmittedTx('cancel'), invoicesCtrl.cancel);
 
 // Deadline claim (any authenticated user)
-router.post('/:id/claim-deadline', validateId, requireAuth, loadInvoice, invoicesCtrl.claimDeadline);
+router.post('/:id/claim-deadline', validateId, requireAuth, validate(requests.signedTx), loadInvoice, verifySignedTx('claim_deadline'), loadSubmittedTx('claim_deadline'), invoicesCtrl.claimDeadline);
 
 module.exports = router;
@@ -0,0 +1,32 @@
+const crypto = require('crypto');
+const router = require('express').Router();
+const {CONTENT_TYPE} = require('../services/metrics');
+const clusterMetrics = require('../services/clusterMetrics');
+
+// Prometheus scrape endpoint. When METRICS_TOKEN is set the scraper must send
+// it as a bearer token; otherwise the endpoint is open (keep it off the public
+// ingress in that case).
+function requireMetricsToken(req, res, next) {
+    const expected = process.env.METRICS_TOKEN;
+    if (!expected) return next();
+
+    const header = req.headers.authorization || '';
+    const given = Buffer.from(header.startsWith('Bearer ') ? header.slice(7) : '');
+    const wanted = Buffer.from(expected);
+    if (given.length !== wanted.length || !crypto.timingSafeEqual(given, wanted)) {
+        return res.status(401).json({error: 'Metrics token required'});
+    }
+    next();
+}
+
+router.get('/', requireMetricsToken, async (req, res) => {
+    try {
+        const text = await clusterMetrics.render();
+        res.set('Content-Type', CONTENT_TYPE);
+        res.send(text);
+    } catch (err) {
+        res.status(503).json({error: err.message});
+    }
+});
+
+module.exports = router;
@@ -1,13 +1,17 @@
 const router = require('express').Router();
 const servicesCtrl = require('../controllers/servicesController');
 const {requireAuth, validateId} = require('../middleware/auth');
+const {responseSchema} = require('../middleware/responseSchema');
+const schemas = require('../schemas/responses');
+const {validate} = require('../middleware/validate');
+const requests = require('../schemas/requests');
 
 // Public (catalog)
-router.get('/', servicesCtrl.getAll);
+router.get('/', responseSchema(schemas.serviceList), servicesCtrl.getAll);
 router.get('/:id', validateId, servicesCtrl.getById);
 
 // Protected
-router.post('/', requireAuth, servicesCtrl.create);
+router.post('/', requireAuth, validate(requests.createService), servicesCtrl.create);
 router.put('/:id', validateId, requireAuth, servicesCtrl.update);
 
 module.exports = router;
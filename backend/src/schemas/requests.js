@@ -0,0 +1,263 @@
+// ─── Request schemas ─────────────────────────────────────────────────────────
+// Used with validate() on the routes (middleware/validate) and compiled once
+// at startup (services/validator). The error messages are the ones the
+// controllers returned before the checks moved here; checks are listed in
+// the order the controllers ran them.
+
+const STELLAR_ADDRESS_RE = /^G[A-Z2-7]{55}$/;
+
+const signedXdr = {type: 'string'};
+
+// Routes whose only input is a signed transaction
+const signedTx = {
+    body: {
+        type: 'object',
+        required: ['signed_xdr'],
+        errors: {required: 'signed_xdr is required'},
+        properties: {signed_xdr: signedXdr},
+    },
+};
+
+// ─── Auth ────────────────────────────────────────────────────────────────────
+
+const challenge = {
+    query: {
+        type: 'object',
+        required: ['wallet'],
+        errors: {required: 'wallet query parameter required'},
+        // Stellar public keys are 56 characters (auth_challenges.wallet)
+        properties: {
+            wallet: {type: 'string', maxLength: 56, errors: {default: 'Invalid wallet address'}},
+        },
+    },
+};
+
+// ─── Invoices ────────────────────────────────────────────────────────────────
+
+const ITEM_ERROR = 'Each item must have a description and valid positive amount';
+
+const invoiceItem = {
+    type: 'object',
+    required: ['description', 'amount'],
+    errors: {type: ITEM_ERROR, required: ITEM_ERROR},
+    properties: {
+        description: {type: 'string', errors: {default: ITEM_ERROR}},
+        amount: {type: 'numeric', minimum: 0, errors: {default: ITEM_ERROR}},
+    },
+};
+
+const itemsTotal = (items) => items.reduce((sum, item) => sum + Number(item.amount), 0) > 0;
+
+const createInvoice = {
+    body: {
+        type: 'object',
+        required: ['name', 'items', 'deadline'],
+        errors: {required: 'Required: name, items (array with at least one item), deadline'},
+        properties: {
+            name: {type: 'string'},
+            deadline: {
+                type: 'string',
+                format: 'date-time',
+                future: true,
+                errors: {type: 'Invalid deadline format', format: 'Invalid deadline format', future: 'Deadline must be in the future'},
+            },
+            items: {
+                type: 'array',
+                items: {
+                    ...invoiceItem,
+                    properties: {
+                        ...invoiceItem.properties,
+                        recipient_wallet: {
+                            type: 'string',
+                            pattern: STELLAR_ADDRESS_RE,
+                            errors: {default: (wallet, item) => `Invalid Stellar wallet address in item: ${item.description}`},
+                        },
+                    },
+                },
+                check: itemsTotal,
+                errors: {check: 'Total amount must be positive'},
+            },
+            min_participants: {type: 'integer', minimum: 1},
+            penalty_percent: {type: 'integer', minimum: 0, maximum: 100},
+            auto_release: {type: 'boolean'},
+        },
+    },
+};
+
+const updateItems = {
+    body: {
+        type: 'object',
+        required: ['items'],
+        errors: {required: 'Required: items (array with at least one item)'},
+        properties: {
+            items: {type: 'array', items: invoiceItem},
+            change_summary: {type: 'string'},
+            signed_xdr: signedXdr,
+        },
+    },
+};
+
+const contribute = {
+    body: {
+        type: 'object',
+        required: ['signed_xdr', 'amount'],
+        errors: {required: 'Required: signed_xdr, amount'},
+        properties: {
+            signed_xdr: signedXdr,
+            amount: {type: 'numeric', exclusiveMinimum: 0},
+        },
+    },
+};
+
+// Cancelling a draft or confirming off-chain needs no transaction
+const optionalSignedTx = {
+    body: {
+        type: 'object',
+        properties: {signed_xdr: signedXdr},
+    },
+};
+
+// ─── Cart ────────────────────────────────────────────────────────────────────
+
+const MAX_BULK_ITEMS = 100;
+const QUANTITY_ERROR = 'Quantity must be at least 1';
+
+const quantity = {type: 'integer', minimum: 1, errors: {default: QUANTITY_ERROR}};
+
+const addCartItem = {
+    body: {
+        type: 'object',
+        required: ['service_id'],
+        errors: {required: 'Required: service_id'},
+        properties: {
+            service_id: {type: 'integer', minimum: 1},
+            quantity,
+        },
+    },
+};
+
+const addCartItems = {
+    body: {
+        type: 'object',
+        required: ['items'],
+        errors: {required: 'Required: items (array with at least one item)'},
+        properties: {
+            items: {
+                type: 'array',
+                maxItems: MAX_BULK_ITEMS,
+                errors: {
+                    type: 'Required: items (array with at least one item)',
+                    maxItems: `At most ${MAX_BULK_ITEMS} items per request`,
+                },
+                items: {
+                    type: 'object',
+                    required: ['service_id'],
+                    errors: {type: 'Each item requires a valid service_id', required: 'Each item requires a valid service_id'},
+                    properties: {
+                        service_id: {type: 'integer', minimum: 1, errors: {default: 'Each item requires a valid service_id'}},
+                        quantity,
+                    },
+                },
+            },
+            replace: {type: 'boolean'},
+        },
+    },
+};
+
+const updateCartItem = {
+    body: {
+        type: 'object',
+        required: ['quantity'],
+        errors: {required: QUANTITY_ERROR},
+        properties: {quantity},
+    },
+};
+
+const checkout = {
+    body: {
+        type: 'object',
+        required: ['name', 'deadline'],
+        errors: {required: 'Required: name, deadline'},
+        properties: {
+            name: {type: 'string'},
+            deadline: {type: 'string', format: 'date-time', errors: {default: 'Invalid deadline format'}},
+            min_participants: {type: 'integer', minimum: 1},
+            penalty_percent: {type: 'integer', minimum: 0, maximum: 100},
+            auto_release: {type: 'boolean'},
+        },
+    },
+};
+
+// ─── Catalog ─────────────────────────────────────────────────────────────────
+
+const createService = {
+    body: {
+        type: 'object',
+        required: ['business_id', 'name', 'price'],
+        errors: {required: 'Required: business_id, name, price'},
+        properties: {
+            business_id: {type: 'integer', minimum: 1},
+            name: {type: 'string'},
+            price: {type: 'numeric', minimum: 0},
+        },
+    },
+};
+
+// ─── Batch ───────────────────────────────────────────────────────────────────
+
+const MAX_BATCH_REQUESTS = 20;
+// Any GET under /api except the batch endpoint itself and the SSE streams,
+// which never end. Express routes ignore case and a trailing slash, so these
+// do too (streamEvents also refuses batched requests).
+const BATCH_PATH_RE = /^\/api\/(?!batch(?:[/?]|$))\S*$/i;
+const SSE_PATH_RE = /\/events\/?(?:\?|$)/i;
+
+const batch = {
+    body: {
+        type: 'object',
+        required: ['requests'],
+        errors: {required: 'Required: requests (array with at least one request)'},
+        properties: {
+            requests: {
+                type: 'array',
+                maxItems: MAX_BATCH_REQUESTS,
+                errors: {
+                    type: 'Required: requests (array with at least one request)',
+                    maxItems: `At most ${MAX_BATCH_REQUESTS} requests per batch`,
+                },
+                items: {
+                    type: 'object',
+                    required: ['path'],
+                    errors: {type: 'Each request requires a path', required: 'Each request requires a path'},
+                    properties: {
+                        id: {type: 'string', maxLength: 64},
+                        path: {
+                            type: 'string',
+                            maxLength: 2048,
+                            pattern: BATCH_PATH_RE,
+                            check: (path) => !SSE_PATH_RE.test(path),
+                            errors: {default: (path) => `Unsupported batch path: ${path}`},
+                        },
+                    },
+                },
+            },
+        },
+    },
+};
+
+module.exports = {
+    MAX_BULK_ITEMS,
+    MAX_BATCH_REQUESTS,
+    signedTx,
+    challenge,
+    createInvoice,
+    updateItems,
+    contribute,
+    optionalSignedTx,
+    addCartItem,
+    addCartItems,
+    updateCartItem,
+    checkout,
+    createService,
+    batch,
+};
@@ -0,0 +1,130 @@
+// ─── Response schemas ────────────────────────────────────────────────────────
+// Declared per route with responseSchema() and compiled once at startup
+// (services/serializer). Only the properties listed here reach the client:
+// a column added to a table stays private until it is added below.
+//
+// Types follow what pg returns: DECIMAL and BIGINT columns arrive as strings,
+// TIMESTAMP as Date, JSONB as parsed values ({} = any JSON).
+
+const id = {type: 'integer'};
+const text = {type: 'string'};
+const amount = {type: 'string'};
+const timestamp = {type: 'string', format: 'date-time'};
+const jsonb = {};
+
+// ─── Catalog ─────────────────────────────────────────────────────────────────
+
+// serviceModel.findAll / findFiltered: services + business name and the
+// effective (service or business) location, schedule and contact.
+// findFiltered also returns the business category.
+const service = {
+    type: 'object',
+    properties: {
+        id,
+        business_id: id,
+        name: text,
+        description: text,
+        price: amount,
+        image_url: text,
+        location: text,
+        location_data: jsonb,
+        schedule: jsonb,
+        contact_info: jsonb,
+        active: {type: 'boolean'},
+        created_at: timestamp,
+        updated_at: timestamp,
+        business_name: text,
+        business_wallet: text,
+        business_category: text,
+        effective_location: text,
+        effective_location_data: jsonb,
+        effective_schedule: jsonb,
+        effective_contact_info: jsonb,
+    },
+};
+
+const serviceList = {type: 'array', items: service};
+
+// ─── Invoices ────────────────────────────────────────────────────────────────
+
+const invoiceItem = {
+    type: 'object',
+    properties: {
+        id,
+        invoice_id: id,
+        service_id: id,
+        description: text,
+        amount,
+        recipient_wallet: text,
+        sort_order: {type: 'integer'},
+        created_at: timestamp,
+        service_name: text,
+        business_name: text,
+    },
+};
+
+// GET /api/invoices/:id: the invoice row, organizer, items and, for linked
+// invoices, the on-chain state or the reason it couldn't be read
+const invoiceDetail = {
+    type: 'object',
+    properties: {
+        id,
+        organizer_id: id,
+        contract_invoice_id: text,
+        name: text,
+        description: text,
+        icon: text,
+        total_amount: amount,
+        token_address: text,
+        min_participants: {type: 'integer'},
+        penalty_percent: {type: 'integer'},
+        deadline: timestamp,
+        auto_release: {type: 'boolean'},
+        invite_code: text,
+        status: text,
+        total_collected: amount,
+        participant_count: {type: 'integer'},
+        version: {type: 'integer'},
+        confirmation_count: {type: 'integer'},
+        created_at: timestamp,
+        updated_at: timestamp,
+        organizer_wallet: text,
+        organizer_name: text,
+        items: {type: 'array', items: invoiceItem},
+        onchain: jsonb,
+        onchain_error: text,
+    },
+};
+
+// GET /api/invoices/my: one page of invoiceModel.findByUser
+const myInvoices = {
+    type: 'object',
+    properties: {
+        data: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: {
+                    id,
+                    name: text,
+                    description: text,
+                    icon: text,
+                    status: text,
+                    total_amount: amount,
+                    total_collected: amount,
+                    participant_count: {type: 'integer'},
+                    deadline: timestamp,
+                    created_at: timestamp,
+                    organizer_wallet: text,
+                    organizer_name: text,
+                    user_role: text,
+                },
+            },
+        },
+        total: {type: 'integer'},
+        page: {type: 'integer'},
+        limit: {type: 'integer'},
+    },
+};
+
+module.exports = {serviceList, invoiceDetail, myInvoices};
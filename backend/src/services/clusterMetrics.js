@@ -0,0 +1,47 @@
+const cluster = require('cluster');
+const crypto = require('crypto');
+const {registry} = require('./metrics');
+
+// ─── /metrics in cluster mode ────────────────────────────────────────────────
+// Each worker keeps its own registry, and the shared port hands a scrape to
+// whichever worker accepts it. So the scraped worker asks the primary
+// (cluster.js) for a snapshot of every worker's registry and renders them as
+// one exposition, whichever worker answers. The primary also keeps the last
+// counters of workers that exited, so a restart doesn't make the sums drop;
+// only counts a worker gathered after its last snapshot are lost.
+
+const COLLECT_TIMEOUT_MS = 5000;
+
+// request id -> resolve(snapshots)
+const pending = new Map();
+
+if (cluster.isWorker) {
+    process.on('message', (msg) => {
+        if (msg?.type === 'metrics:snapshot') {
+            process.send({type: 'metrics:snapshot', id: msg.id, metrics: registry.snapshot()});
+        } else if (msg?.type === 'metrics:collected') {
+            pending.get(msg.id)?.(msg.snapshots);
+        }
+    });
+}
+
+// Prometheus text for the whole cluster (or this process when not clustered)
+function render() {
+    if (!cluster.isWorker) return Promise.resolve(registry.render());
+
+    return new Promise((resolve, reject) => {
+        const id = crypto.randomUUID();
+        const timer = setTimeout(() => {
+            pending.delete(id);
+            reject(new Error('Cluster metrics collection timed out'));
+        }, COLLECT_TIMEOUT_MS);
+        pending.set(id, (snapshots) => {
+            clearTimeout(timer);
+            pending.delete(id);
+            resolve(registry.renderCluster(snapshots));
+        });
+        process.send({type: 'metrics:collect', id});
+    });
+}
+
+module.exports = {render};
@@ -0,0 +1,224 @@
+// Code generated by scripts/gen-contract-codecs.js from
+// contracts/cotravel-escrow/src/lib.rs. DO NOT EDIT.
+const {Address, nativeToScVal, scValToBigInt, xdr} = require('@stellar/stellar-sdk');
+
+function expect(scv, kind) {
+    if (scv.switch().name !== kind) {
+        throw new TypeError(`Expected ${kind}, got ${scv.switch().name}`);
+    }
+    return scv;
+}
+
+// enum Status { Funding, Completed, Cancelled, Released } — decoded as lowercase strings
+function decodeStatus(scv) {
+    const tag = expect(scv, 'scvVec').vec()[0].sym().toString();
+    switch (tag) {
+        case 'Funding':
+            return 'funding';
+        case 'Completed':
+            return 'completed';
+        case 'Cancelled':
+            return 'cancelled';
+        case 'Released':
+            return 'released';
+        default:
+            throw new TypeError(`Status: unknown variant ${tag}`);
+    }
+}
+
+const STATUS_VARIANTS = {'funding': 'Funding', 'completed': 'Completed', 'cancelled': 'Cancelled', 'released': 'Released'};
+
+function encodeStatus(value) {
+    const tag = STATUS_VARIANTS[value];
+    if (!tag) throw new TypeError(`Status: unknown variant ${value}`);
+    return xdr.ScVal.scvVec([xdr.ScVal.scvSymbol(tag)]);
+}
+
+// Recipient { address: Address, amount: i128 }
+function decodeRecipient(scv) {
+    let address;
+    let amount;
+    for (const entry of expect(scv, 'scvMap').map()) {
+        switch (entry.key().sym().toString()) {
+            case 'address':
+                address = Address.fromScVal(expect(entry.val(), 'scvAddress')).toString();
+                break;
+            case 'amount':
+                amount = scValToBigInt(expect(entry.val(), 'scvI128')).toString();
+                break;
+            default:
+                break;
+        }
+    }
+    if (address === undefined || amount === undefined) {
+        throw new TypeError('Recipient: missing field');
+    }
+    return {address, amount};
+}
+
+function encodeRecipient(value) {
+    return xdr.ScVal.scvMap([
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('address'), val: new Address(value.address).toScVal()}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('amount'), val: nativeToScVal(value.amount, {type: 'i128'})}),
+    ]);
+}
+
+// Config { organizer: Address, token: Address, target_amount: i128, min_participants: u32, deadline: u64, penalty_percent: u32, auto_release: bool }
+function decodeConfig(scv) {
+    let organizer;
+    let token;
+    let target_amount;
+    let min_participants;
+    let deadline;
+    let penalty_percent;
+    let auto_release;
+    for (const entry of expect(scv, 'scvMap').map()) {
+        switch (entry.key().sym().toString()) {
+            case 'organizer':
+                organizer = Address.fromScVal(expect(entry.val(), 'scvAddress')).toString();
+                break;
+            case 'token':
+                token = Address.fromScVal(expect(entry.val(), 'scvAddress')).toString();
+                break;
+            case 'target_amount':
+                target_amount = scValToBigInt(expect(entry.val(), 'scvI128')).toString();
+                break;
+            case 'min_participants':
+                min_participants = expect(entry.val(), 'scvU32').u32();
+                break;
+            case 'deadline':
+                deadline = scValToBigInt(expect(entry.val(), 'scvU64')).toString();
+                break;
+            case 'penalty_percent':
+                penalty_percent = expect(entry.val(), 'scvU32').u32();
+                break;
+            case 'auto_release':
+                auto_release = expect(entry.val(), 'scvBool').b();
+                break;
+            default:
+                break;
+        }
+    }
+    if (organizer === undefined || token === undefined || target_amount === undefined || min_participants === undefined || deadline === undefined || penalty_percent === undefined || auto_release === undefined) {
+        throw new TypeError('Config: missing field');
+    }
+    return {organizer, token, target_amount, min_participants, deadline, penalty_percent, auto_release};
+}
+
+function encodeConfig(value) {
+    return xdr.ScVal.scvMap([
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('auto_release'), val: nativeToScVal(value.auto_release, {type: 'bool'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('deadline'), val: nativeToScVal(value.deadline, {type: 'u64'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('min_participants'), val: nativeToScVal(value.min_participants, {type: 'u32'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('organizer'), val: new Address(value.organizer).toScVal()}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('penalty_percent'), val: nativeToScVal(value.penalty_percent, {type: 'u32'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('target_amount'), val: nativeToScVal(value.target_amount, {type: 'i128'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('token'), val: new Address(value.token).toScVal()}),
+    ]);
+}
+
+// State { status: Status, total_collected: i128, participant_count: u32, version: u32, confirmation_count: u32 }
+function decodeState(scv) {
+    let status;
+    let total_collected;
+    let participant_count;
+    let version;
+    let confirmation_count;
+    for (const entry of expect(scv, 'scvMap').map()) {
+        switch (entry.key().sym().toString()) {
+            case 'status':
+                status = decodeStatus(entry.val());
+                break;
+            case 'total_collected':
+                total_collected = scValToBigInt(expect(entry.val(), 'scvI128')).toString();
+                break;
+            case 'participant_count':
+                participant_count = expect(entry.val(), 'scvU32').u32();
+                break;
+            case 'version':
+                version = expect(entry.val(), 'scvU32').u32();
+                break;
+            case 'confirmation_count':
+                confirmation_count = expect(entry.val(), 'scvU32').u32();
+                break;
+            default:
+                break;
+        }
+    }
+    if (status === undefined || total_collected === undefined || participant_count === undefined || version === undefined || confirmation_count === undefined) {
+        throw new TypeError('State: missing field');
+    }
+    return {status, total_collected, participant_count, version, confirmation_count};
+}
+
+function encodeState(value) {
+    return xdr.ScVal.scvMap([
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('confirmation_count'), val: nativeToScVal(value.confirmation_count, {type: 'u32'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('participant_count'), val: nativeToScVal(value.participant_count, {type: 'u32'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('status'), val: encodeStatus(value.status)}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('total_collected'), val: nativeToScVal(value.total_collected, {type: 'i128'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('version'), val: nativeToScVal(value.version, {type: 'u32'})}),
+    ]);
+}
+
+// TripInfo { trip_id: u64, organizer: Address, target_amount: i128, status: Status, total_collected: i128, participant_count: u32 }
+function decodeTripInfo(scv) {
+    let trip_id;
+    let organizer;
+    let target_amount;
+    let status;
+    let total_collected;
+    let participant_count;
+    for (const entry of expect(scv, 'scvMap').map()) {
+        switch (entry.key().sym().toString()) {
+            case 'trip_id':
+                trip_id = scValToBigInt(expect(entry.val(), 'scvU64')).toString();
+                break;
+            case 'organizer':
+                organizer = Address.fromScVal(expect(entry.val(), 'scvAddress')).toString();
+                break;
+            case 'target_amount':
+                target_amount = scValToBigInt(expect(entry.val(), 'scvI128')).toString();
+                break;
+            case 'status':
+                status = decodeStatus(entry.val());
+                break;
+            case 'total_collected':
+                total_collected = scValToBigInt(expect(entry.val(), 'scvI128')).toString();
+                break;
+            case 'participant_count':
+                participant_count = expect(entry.val(), 'scvU32').u32();
+                break;
+            default:
+                break;
+        }
+    }
+    if (trip_id === undefined || organizer === undefined || target_amount === undefined || status === undefined || total_collected === undefined || participant_count === undefined) {
+        throw new TypeError('TripInfo: missing field');
+    }
+    return {trip_id, organizer, target_amount, status, total_collected, participant_count};
+}
+
+function encodeTripInfo(value) {
+    return xdr.ScVal.scvMap([
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('organizer'), val: new Address(value.organizer).toScVal()}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('participant_count'), val: nativeToScVal(value.participant_count, {type: 'u32'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('status'), val: encodeStatus(value.status)}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('target_amount'), val: nativeToScVal(value.target_amount, {type: 'i128'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('total_collected'), val: nativeToScVal(value.total_collected, {type: 'i128'})}),
+        new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('trip_id'), val: nativeToScVal(value.trip_id, {type: 'u64'})}),
+    ]);
+}
+
+module.exports = {
+    decodeStatus,
+    encodeStatus,
+    decodeRecipient,
+    encodeRecipient,
+    decodeConfig,
+    encodeConfig,
+    decodeState,
+    encodeState,
+    decodeTripInfo,
+    encodeTripInfo,
+};
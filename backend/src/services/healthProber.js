@@ -0,0 +1,124 @@
+const pool = require('../config/db');
+const {minioClient, BUCKETS} = require('../config/minio');
+const {server: sorobanRpc} = require('../config/soroban');
+const logger = require('../config/logger');
+const {registry} = require('./metrics');
+
+// ─── Dependency prober ───────────────────────────────────────────────────────
+// Health endpoints used to run SELECT 1 and listBuckets on every hit, so an
+// aggressive load-balancer probe added constant load and one slow MinIO call
+// made the instance look dead. The prober checks each dependency on its own
+// interval (HEALTH_PROBE_INTERVAL_MS) and /health, /health/ready answer from
+// the last results with no I/O.
+//
+// A dependency is `up` when its last probe succeeded within PROBE_TIMEOUT_MS.
+// Results older than STALE_AFTER intervals are reported as stale: the prober
+// itself is stuck, which readiness treats as down. Soroban RPC is reported
+// but not critical: the catalog, cart and invoice reads work without it.
+
+const PROBE_TIMEOUT_MS = 2000;
+const STALE_AFTER = 3;
+
+const PROBES = {
+    postgres: {critical: true, run: () => pool.query('SELECT 1').then(() => ({}))},
+    minio: {critical: true, run: () => minioClient.bucketExists(BUCKETS.IMAGES).then(() => ({}))},
+    soroban: {
+        critical: false,
+        run: () => sorobanRpc.getLatestLedger().then((ledger) => ({ledger: ledger.sequence})),
+    },
+};
+
+// name -> {status, latency_ms, checked_at, error?, ...details}
+const results = new Map();
+let intervalMs = 10 * 1000;
+let timer = null;
+
+function withTimeout(promise, ms) {
+    let t;
+    const timeout = new Promise((_, reject) => {
+        t = setTimeout(() => reject(new Error(`probe timed out after ${ms}ms`)), ms);
+    });
+    return Promise.race([promise, timeout]).finally(() => clearTimeout(t));
+}
+
+async function probe(name) {
+    const start = process.hrtime.bigint();
+    const elapsed = () => Math.round(Number(process.hrtime.bigint() - start) / 1e5) / 10;
+    try {
+        const details = await withTimeout(PROBES[name].run(), PROBE_TIMEOUT_MS);
+        results.set(name, {status: 'up', latency_ms: elapsed(), checked_at: Date.now(), ...details});
+    } catch (err) {
+        const previous = results.get(name);
+        if (previous?.status !== 'down') {
+            logger.warn({dependency: name, err: err.message}, 'Dependency probe failed');
+        }
+        results.set(name, {status: 'down', latency_ms: elapsed(), checked_at: Date.now(), error: err.message});
+    }
+}
+
+// Probe the given dependencies (all by default) in parallel
+async function refresh(names = Object.keys(PROBES)) {
+    await Promise.all(names.map(probe));
+}
+
+// Probe the ones that have never been checked (first hit before start())
+async function ensureChecked(names = Object.keys(PROBES)) {
+    const missing = names.filter((name) => !results.has(name));
+    if (missing.length) await refresh(missing);
+}
+
+function start(ms = intervalMs) {
+    stop();
+    intervalMs = ms;
+    refresh().catch(() => {
+    });
+    timer = setInterval(() => refresh().catch(() => {
+    }), intervalMs);
+    timer.unref();
+}
+
+function stop() {
+    if (timer) clearInterval(timer);
+    timer = null;
+}
+
+// Last results with their age. `ready` is false if a critical dependency is
+// down, stale or unchecked.
+function snapshot(names = Object.keys(PROBES)) {
+    const now = Date.now();
+    const dependencies = {};
+    let ready = true;
+    for (const name of names) {
+        const result = results.get(name);
+        if (!result) {
+            dependencies[name] = {status: 'unknown'};
+            if (PROBES[name].critical) ready = false;
+            continue;
+        }
+        const {checked_at: checkedAt, ...rest} = result;
+        const ageMs = now - checkedAt;
+        const stale = ageMs > intervalMs * STALE_AFTER;
+        dependencies[name] = {...rest, critical: PROBES[name].critical, age_ms: ageMs, stale};
+        if (PROBES[name].critical && (result.status !== 'up' || stale)) ready = false;
+    }
+    return {ready, dependencies};
+}
+
+registry.gauge('dependency_up', 'Last probe result per dependency (1 up, 0 down)', ['dependency'], (g) => {
+    for (const [name, result] of results) g.set({dependency: name}, result.status === 'up' ? 1 : 0);
+});
+registry.gauge('dependency_probe_latency_seconds', 'Latency of the last probe per dependency', ['dependency'], (g) => {
+    for (const [name, result] of results) g.set({dependency: name}, result.latency_ms / 1000);
+});
+
+module.exports = {
+    start,
+    stop,
+    refresh,
+    ensureChecked,
+    snapshot,
+    _reset() {
+        stop();
+        results.clear();
+    },
+};
@@ -0,0 +1,122 @@
+const os = require('os');
+const {minioClient, BUCKETS} = require('../config/minio');
+const logger = require('../config/logger');
+const objectStatCache = require('./objectStatCache');
+
+// ─── Resized image variants ──────────────────────────────────────────────────
+// GET /images/:filename?w=320&fmt=webp serves a resized copy of the original.
+// Variants are generated once, stored in the derivatives bucket under
+// `<filename>/w<width>.<fmt>`, and served from there like any other object.
+//
+// Resizing is CPU-heavy, so it runs through a bounded pool: at most
+// DERIVATIVE_CONCURRENCY jobs at a time, a bounded queue behind them, and
+// concurrent requests for the same variant share one job.
+//
+// sharp is a dependency, but its prebuilt libvips binary can fail to load
+// (unsupported platform, broken install). Variant requests then fall back to
+// the original image instead of failing, and a warning is logged at startup.
+
+let sharp = null;
+try {
+    sharp = require('sharp');
+    // One libvips thread per job; the pool below controls parallelism
+    sharp.concurrency(1);
+} catch {
+    logger.warn('sharp failed to load: image variants disabled, originals will be served');
+}
+
+const WIDTHS = [160, 320, 480, 640, 960, 1280];
+const FORMATS = {
+    webp: {contentType: 'image/webp', options: {quality: 80}},
+    avif: {contentType: 'image/avif', options: {quality: 50}},
+};
+
+const CONCURRENCY = parseInt(process.env.DERIVATIVE_CONCURRENCY, 10) || Math.max(1, Math.floor(os.cpus().length / 2));
+const MAX_QUEUE = 100;
+
+let running = 0;
+const queue = [];
+const inflight = new Map();
+
+function enqueue(job) {
+    return new Promise((resolve, reject) => {
+        if (queue.length >= MAX_QUEUE) {
+            const err = new Error('Image resizing is busy, try again later');
+            err.status = 503;
+            return reject(err);
+        }
+        queue.push({job, resolve, reject});
+        drain();
+    });
+}
+
+function drain() {
+    while (running < CONCURRENCY && queue.length > 0) {
+        const {job, resolve, reject} = queue.shift();
+        running++;
+        job().then(resolve, reject).finally(() => {
+            running--;
+            drain();
+        });
+    }
+}
+
+// Validate ?w=&fmt= query params. Returns null when no variant is requested,
+// {error} for invalid params, or {width, fmt}.
+function parseVariant(query) {
+    if (query.w === undefined && query.fmt === undefined) return null;
+
+    const width = query.w === undefined ? null : Number(query.w);
+    if (width !== null && !WIDTHS.includes(width)) {
+        return {error: `w must be one of ${WIDTHS.join(', ')}`};
+    }
+    const fmt = query.fmt === undefined ? 'webp' : String(query.fmt);
+    if (!FORMATS[fmt]) {
+        return {error: `fmt must be one of ${Object.keys(FORMATS).join(', ')}`};
+    }
+    return {width, fmt};
+}
+
+function variantKey(filename, {width, fmt}) {
+    return `${filename}/w${width ?? 'orig'}.${fmt}`;
+}
+
+async function generate(filename, variant, key) {
+    const original = await minioClient.getObject(BUCKETS.IMAGES, filename);
+    const {contentType, options} = FORMATS[variant.fmt];
+
+    let transformer = sharp();
+    if (variant.width) {
+        transformer = transformer.resize({width: variant.width, withoutEnlargement: true});
+    }
+    transformer = transformer.toFormat(variant.fmt, options);
+    original.on('error', (err) => transformer.destroy(err));
+    original.pipe(transformer);
+    const body = await transformer.toBuffer();
+
+    await minioClient.putObject(BUCKETS.DERIVATIVES, key, body, body.length, {'Content-Type': contentType});
+}
+
+// Make sure the variant exists in the derivatives bucket and return its key,
+// or null when variants are unavailable.
+async function getVariant(filename, variant) {
+    if (!sharp) return null;
+
+    const key = variantKey(filename, variant);
+    try {
+        await objectStatCache.statObject(BUCKETS.DERIVATIVES, key);
+        return key;
+    } catch (err) {
+        if (err.code !== 'NotFound' && err.code !== 'NoSuchKey') throw err;
+    }
+
+    if (!inflight.has(key)) {
+        const pending = enqueue(() => generate(filename, variant, key))
+            .finally(() => inflight.delete(key));
+        inflight.set(key, pending);
+    }
+    await inflight.get(key);
+    return key;
+}
+
+module.exports = {parseVariant, getVariant, WIDTHS};
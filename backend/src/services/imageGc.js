@@ -0,0 +1,80 @@
+const {minioClient, BUCKETS} = require('../config/minio');
+const logger = require('../config/logger');
+const imageRefModel = require('../models/imageRefModel');
+const imageModel = require('../models/imageModel');
+const objectStatCache = require('./objectStatCache');
+const {isContentKey, INCOMING_PREFIX} = require('./imageKeys');
+
+// ─── Garbage collection of unreferenced images ───────────────────────────────
+// Content-addressed images are shared, so they are never deleted when a
+// business or service changes its image. This job removes the ones that no
+// row references any more, together with their resized variants, plus direct
+// uploads that were never completed. Only objects older than the grace period
+// are considered, so an image uploaded but not yet saved on a form survives.
+// Legacy timestamped names are left alone.
+
+const DEFAULT_GRACE_MS = 24 * 60 * 60 * 1000;
+
+async function listKeys(bucket, prefix) {
+    const objects = [];
+    for await (const obj of minioClient.listObjects(bucket, prefix, true)) {
+        objects.push(obj);
+    }
+    return objects;
+}
+
+async function removeWithVariants(key) {
+    await minioClient.removeObject(BUCKETS.IMAGES, key);
+    objectStatCache.invalidate(BUCKETS.IMAGES, key);
+
+    const variants = await listKeys(BUCKETS.DERIVATIVES, `${key}/`);
+    if (variants.length > 0) {
+        await minioClient.removeObjects(BUCKETS.DERIVATIVES, variants.map((v) => v.name));
+        variants.forEach((v) => objectStatCache.invalidate(BUCKETS.DERIVATIVES, v.name));
+    }
+}
+
+// Returns what was (or, with dryRun, would be) removed
+async function collectGarbage({graceMs = DEFAULT_GRACE_MS, dryRun = false} = {}) {
+    const cutoff = Date.now() - graceMs;
+    const refs = await imageRefModel.countReferences();
+
+    const unreferenced = [];
+    const abandoned = [];
+    let bytes = 0;
+    for await (const obj of minioClient.listObjects(BUCKETS.IMAGES, '', true)) {
+        if (new Date(obj.lastModified).getTime() > cutoff) continue;
+        if (obj.name.startsWith(INCOMING_PREFIX)) {
+            abandoned.push(obj.name);
+            bytes += obj.size;
+        } else if (isContentKey(obj.name) && !refs.has(`/images/${obj.name}`)) {
+            unreferenced.push(obj.name);
+            bytes += obj.size;
+        }
+    }
+
+    if (!dryRun) {
+        for (const key of unreferenced) {
+            await removeWithVariants(key);
+        }
+        await imageModel.removeMany(unreferenced);
+        if (abandoned.length > 0) {
+            await minioClient.removeObjects(BUCKETS.IMAGES, abandoned);
+        }
+    }
+
+    const result = {unreferenced, abandoned, bytes, dryRun};
+    logger.info({removed: unreferenced.length, abandoned: abandoned.length, bytes, dryRun}, 'Image GC finished');
+    return result;
+}
+
+// Run collectGarbage every `intervalMs` in the background
+function schedule(intervalMs) {
+    const timer = setInterval(() => {
+        collectGarbage().catch((err) => logger.error({err}, 'Image GC failed'));
+    }, intervalMs);
+    timer.unref();
+    return timer;
+}
+
+module.exports = {collectGarbage, schedule};
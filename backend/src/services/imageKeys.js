@@ -0,0 +1,31 @@
+// ─── Image object names ──────────────────────────────────────────────────────
+// Uploaded images are stored content-addressed: `<sha256 hex>.<ext>`. The same
+// bytes always map to the same name, so identical uploads share one object
+// and every image URL can be cached forever. Older uploads keep their
+// `<ms timestamp>-<original name>` names, which are also never overwritten.
+// Direct (presigned) uploads land under `incoming/` until they are verified.
+
+const EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/gif': 'gif',
+};
+
+const CONTENT_KEY = /^[0-9a-f]{64}\.(jpg|png|webp|gif)$/;
+const INCOMING_PREFIX = 'incoming/';
+
+function contentKey(sha256Hex, mimetype) {
+    return `${sha256Hex}.${EXTENSIONS[mimetype]}`;
+}
+
+function isContentKey(key) {
+    return CONTENT_KEY.test(key);
+}
+
+// Objects (and their derivatives, `<name>/w320.webp`) whose bytes never change
+function isImmutableName(key) {
+    return /^(\d{13}-|[0-9a-f]{64}\.)/.test(key);
+}
+
+module.exports = {contentKey, isContentKey, isImmutableName, INCOMING_PREFIX};
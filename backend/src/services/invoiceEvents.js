@@ -0,0 +1,322 @@
+const crypto = require('crypto');
+const pool = require('../config/db');
+const logger = require('../config/logger');
+
+// ─── Invoice event hub ───────────────────────────────────────────────────────
+// Fans out invoice state changes (contributions, withdrawals, confirmations,
+// release/cancel) to Server-Sent Events subscribers. Events are produced by
+// the backend's own write paths, so clients no longer need to poll
+// GET /api/invoices/:id (and its Soroban simulation) to see progress.
+//
+// With several workers or replicas, the process that handles a write is
+// rarely the one holding the subscriber's stream. connectBus() LISTENs on a
+// Postgres channel: publish() delivers locally and NOTIFYs the other
+// processes, which deliver the event to their own subscribers. index.js
+// connects it in cluster workers and in any process using the shared
+// rate-limit store (RATE_LIMIT_STORE=postgres), which is how a deployment of
+// single-process replicas is configured.
+
+const HISTORY_SIZE = 50;              // events kept per invoice for Last-Event-ID resume
+const MAX_TOPICS = 1000;              // invoices with retained history
+const MAX_SUBSCRIBERS_PER_INVOICE = 200;
+const MAX_PENDING_BYTES = 64 * 1024;  // unflushed bytes before a slow client is dropped
+const HEARTBEAT_MS = 25 * 1000;
+const RETRY_MS = 5000;
+const CHANNEL = 'invoice_events';
+const MAX_NOTIFY_BYTES = 7900;        // Postgres rejects NOTIFY payloads of 8000 bytes or more
+const BUS_RECONNECT_MS = 2000;
+const ORIGIN = crypto.randomUUID();   // skips our own notifications
+
+// invoiceId -> {subscribers: Set<res>, history: Array<event>}
+const topics = new Map();
+let heartbeat = null;
+let lastTick = 0;
+// {conn, closed}; conn is the dedicated LISTEN connection (see listen)
+let bus = null;
+
+// Ids are "<microseconds>-<origin>". The timestamp is strictly increasing and
+// never behind one received from another process; the origin keeps ids from
+// processes that publish in the same microsecond distinct. Ids order by
+// timestamp, then origin (compareIds).
+function nextId() {
+    lastTick = Math.max(Date.now() * 1000, lastTick + 1);
+    return `${lastTick}-${ORIGIN}`;
+}
+
+// {tick, origin} or null. Bare numbers (ids from older builds) have no origin.
+function parseId(id) {
+    if (id === undefined || id === null) return null;
+    const text = String(id);
+    const dash = text.indexOf('-');
+    const tick = Number(dash === -1 ? text : text.slice(0, dash));
+    if (!Number.isSafeInteger(tick) || tick <= 0) return null;
+    return {tick, origin: dash === -1 ? '' : text.slice(dash + 1)};
+}
+
+function compareIds(a, b) {
+    if (a.tick !== b.tick) return a.tick - b.tick;
+    if (a.origin === b.origin) return 0;
+    return a.origin < b.origin ? -1 : 1;
+}
+
+function getTopic(invoiceId, create) {
+    let topic = topics.get(invoiceId);
+    if (!topic && create) {
+        topic = {subscribers: new Set(), history: []};
+        topics.set(invoiceId, topic);
+        evictTopics();
+    }
+    return topic;
+}
+
+// Drop history of the oldest invoices nobody is listening to
+function evictTopics() {
+    if (topics.size <= MAX_TOPICS) return;
+    for (const [id, topic] of topics) {
+        if (topics.size <= MAX_TOPICS) break;
+        if (topic.subscribers.size === 0) topics.delete(id);
+    }
+}
+
+function format(event) {
+    return `id: ${event.id}\nevent: ${event.type}\ndata: ${JSON.stringify(event.data)}\n\n`;
+}
+
+// Write to a subscriber, dropping it if the socket can't keep up
+function write(res, chunk) {
+    if (res.writableEnded || res.destroyed) return false;
+    res.write(chunk);
+    if (res.writableLength > MAX_PENDING_BYTES) {
+        logger.warn({pending: res.writableLength}, 'SSE subscriber too slow, disconnecting');
+        res.destroy();
+        return false;
+    }
+    return true;
+}
+
+function startHeartbeat() {
+    if (heartbeat) return;
+    heartbeat = setInterval(() => {
+        for (const topic of topics.values()) {
+            for (const res of topic.subscribers) write(res, ': ping\n\n');
+        }
+    }, HEARTBEAT_MS);
+    heartbeat.unref();
+}
+
+function stopHeartbeatIfIdle() {
+    if (!heartbeat) return;
+    for (const topic of topics.values()) {
+        if (topic.subscribers.size > 0) return;
+    }
+    clearInterval(heartbeat);
+    heartbeat = null;
+}
+
+// Record an event and deliver it to local subscribers
+function deliver(invoiceId, event) {
+    const topic = getTopic(invoiceId, true);
+    topic.history.push(event);
+    if (topic.history.length > HISTORY_SIZE) topic.history.shift();
+
+    const chunk = format(event);
+    for (const res of topic.subscribers) write(res, chunk);
+}
+
+// ─── Cross-process bus ───────────────────────────────────────────────────────
+
+function receive(payload) {
+    let message;
+    try {
+        message = JSON.parse(payload);
+    } catch (_) {
+        return;
+    }
+    if (message.origin === ORIGIN) return;
+    const id = parseId(message.event?.id);
+    if (id) lastTick = Math.max(lastTick, id.tick);
+    deliver(message.invoiceId, message.event);
+}
+
+function notify(invoiceId, event) {
+    const payload = JSON.stringify({origin: ORIGIN, invoiceId, event});
+    if (Buffer.byteLength(payload) > MAX_NOTIFY_BYTES) {
+        logger.warn({invoiceId, type: event.type}, 'Invoice event too large for NOTIFY, delivered locally only');
+        return;
+    }
+    pool.query('SELECT pg_notify($1, $2)', [CHANNEL, payload])
+        .catch((err) => logger.warn({err: err.message, invoiceId}, 'Invoice event NOTIFY failed'));
+}
+
+// Give the LISTEN connection back to the pool exactly once, without our
+// handlers: a later pool user must not feed receive() or trigger a reconnect.
+// `err` (or true) makes the pool discard the connection instead of reusing it.
+function releaseConnection(conn, err) {
+    if (conn.released) return;
+    conn.released = true;
+    conn.client.removeListener('notification', conn.onNotification);
+    conn.client.removeListener('error', conn.onError);
+    conn.client.release(err);
+}
+
+async function listen() {
+    const client = await pool.connect();
+    const conn = {client, released: false};
+    conn.onNotification = (msg) => receive(msg.payload);
+    conn.onError = (err) => {
+        const current = bus !== null && bus.conn === conn;
+        releaseConnection(conn, err);
+        // Errors while connecting are retried by the caller
+        if (!current) return;
+        logger.warn({err: err.message}, 'Invoice event bus connection lost, reconnecting');
+        bus.conn = null;
+        reconnect();
+    };
+    client.on('notification', conn.onNotification);
+    client.on('error', conn.onError);
+
+    try {
+        await client.query(`LISTEN ${CHANNEL}`);
+    } catch (err) {
+        releaseConnection(conn, err);
+        throw err;
+    }
+    if (!bus || bus.closed) {
+        // closeBus() ran while we were connecting: drop the LISTENing connection
+        releaseConnection(conn, true);
+        return;
+    }
+    bus.conn = conn;
+    logger.info({channel: CHANNEL}, 'Invoice event bus listening');
+}
+
+function reconnect() {
+    if (!bus || bus.closed) return;
+    setTimeout(() => {
+        if (!bus || bus.closed) return;
+        listen().catch((err) => {
+            logger.warn({err: err.message}, 'Invoice event bus reconnect failed');
+            reconnect();
+        });
+    }, BUS_RECONNECT_MS).unref();
+}
+
+// Counters the invoice detail page renders
+function snapshot(invoice) {
+    if (!invoice) return {};
+    return {
+        status: invoice.status,
+        total_amount: invoice.total_amount,
+        total_collected: invoice.total_collected,
+        participant_count: invoice.participant_count,
+        confirmation_count: invoice.confirmation_count,
+        version: invoice.version,
+    };
+}
+
+module.exports = {
+    snapshot,
+
+    /**
+     * Publish an invoice event. `data` should be small: a snapshot of the
+     * counters the UI renders plus whatever identifies the change.
+     */
+    publish(invoiceId, type, data = {}) {
+        const event = {
+            id: nextId(),
+            type,
+            data: {invoice_id: invoiceId, type, ...data, at: new Date().toISOString()},
+        };
+        deliver(invoiceId, event);
+        if (bus) notify(invoiceId, event);
+        return event;
+    },
+
+    // Start fanning events out across processes (called once per worker)
+    async connectBus() {
+        if (bus) return;
+        bus = {conn: null, closed: false};
+        try {
+            await listen();
+        } catch (err) {
+            logger.warn({err: err.message}, 'Invoice event bus unavailable, retrying');
+            reconnect();
+        }
+    },
+
+    // Release the LISTEN connection (before pool.end() on shutdown)
+    async closeBus() {
+        if (!bus) return;
+        const {conn} = bus;
+        bus.closed = true;
+        bus = null;
+        if (conn && !conn.released) {
+            try {
+                await conn.client.query(`UNLISTEN ${CHANNEL}`);
+                releaseConnection(conn);
+            } catch (err) {
+                releaseConnection(conn, err);
+            }
+        }
+    },
+
+    /**
+     * Attach an SSE response to an invoice. Replays retained events newer
+     * than the client's Last-Event-ID, then streams live ones.
+     */
+    subscribe(invoiceId, req, res) {
+        const topic = getTopic(invoiceId, true);
+        if (topic.subscribers.size >= MAX_SUBSCRIBERS_PER_INVOICE) {
+            return res.status(503).json({error: 'Too many listeners for this invoice'});
+        }
+
+        res.status(200);
+        res.set({
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache, no-transform',
+            'Connection': 'keep-alive',
+            'X-Accel-Buffering': 'no',
+        });
+        res.flushHeaders();
+        write(res, `retry: ${RETRY_MS}\n\n`);
+
+        const lastEventId = parseId(req.get('Last-Event-ID') || req.query.last_event_id);
+        if (lastEventId) {
+            for (const event of topic.history) {
+                const id = parseId(event.id);
+                if (id && compareIds(id, lastEventId) > 0) write(res, format(event));
+            }
+        }
+
+        topic.subscribers.add(res);
+        startHeartbeat();
+
+        res.on('close', () => {
+            topic.subscribers.delete(res);
+            stopHeartbeatIfIdle();
+        });
+    },
+
+    // Close every open stream (used on shutdown and in tests)
+    closeAll() {
+        for (const topic of topics.values()) {
+            for (const res of topic.subscribers) res.end();
+            topic.subscribers.clear();
+        }
+        stopHeartbeatIfIdle();
+    },
+
+    subscriberCount(invoiceId) {
+        const topic = topics.get(invoiceId);
+        return topic ? topic.subscribers.size : 0;
+    },
+
+    // Entry point for NOTIFY payloads (exposed for tests)
+    _receive: receive,
+
+    _reset() {
+        this.closeAll();
+        topics.clear();
+        lastTick = 0;
+    },
+};
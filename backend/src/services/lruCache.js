@@ -0,0 +1,45 @@
+// ─── Small in-process LRU cache with per-entry TTL ──────────────────────────
+// Map iteration order is insertion order, so re-inserting on every hit keeps
+// the least recently used entry first and eviction is O(1).
+
+class LruCache {
+    constructor({max = 1000, ttlMs = 60000} = {}) {
+        this.max = max;
+        this.ttlMs = ttlMs;
+        this.entries = new Map();
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return undefined;
+        if (entry.expires <= Date.now()) {
+            this.entries.delete(key);
+            return undefined;
+        }
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    set(key, value, ttlMs = this.ttlMs) {
+        this.entries.delete(key);
+        this.entries.set(key, {value, expires: Date.now() + ttlMs});
+        if (this.entries.size > this.max) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+    }
+
+    delete(key) {
+        this.entries.delete(key);
+    }
+
+    clear() {
+        this.entries.clear();
+    }
+
+    get size() {
+        return this.entries.size;
+    }
+}
+
+module.exports = {LruCache};
@@ -0,0 +1,370 @@
+const {monitorEventLoopDelay, PerformanceObserver, constants} = require('perf_hooks');
+const tracing = require('./tracing');
+
+// ─── Prometheus metrics registry ─────────────────────────────────────────────
+// Minimal counters, gauges and histograms rendered in the Prometheus text
+// exposition format (0.0.4) by GET /metrics. Label values are kept in a Map
+// keyed by their JSON encoding, so callers must use bounded label sets:
+// route templates, model method names, RPC methods, MinIO operations.
+//
+// Also registers the process-level metrics every service should expose:
+// CPU, memory, event-loop delay and GC pauses.
+
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+function escapeLabel(value) {
+    return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+}
+
+function formatLabels(labels) {
+    const entries = Object.entries(labels);
+    if (entries.length === 0) return '';
+    return `{${entries.map(([k, v]) => `${k}="${escapeLabel(v)}"`).join(',')}}`;
+}
+
+function formatValue(value) {
+    if (value === Infinity) return '+Inf';
+    if (value === -Infinity) return '-Inf';
+    return String(value);
+}
+
+class Metric {
+    constructor(type, name, help, labelNames = []) {
+        this.type = type;
+        this.name = name;
+        this.help = help;
+        this.labelNames = labelNames;
+        this.series = new Map();
+    }
+
+    key(labels) {
+        return JSON.stringify(this.labelNames.map((l) => String(labels[l] ?? '')));
+    }
+
+    labelsOf(key) {
+        const values = JSON.parse(key);
+        return Object.fromEntries(this.labelNames.map((l, i) => [l, values[i]]));
+    }
+
+    header() {
+        return `# HELP ${this.name} ${this.help}\n# TYPE ${this.name} ${this.type}\n`;
+    }
+
+    reset() {
+        this.series.clear();
+    }
+
+    // Plain copy of the series, sent to the primary in cluster mode
+    snapshot() {
+        return [...this.series];
+    }
+}
+
+class Counter extends Metric {
+    constructor(name, help, labelNames) {
+        super('counter', name, help, labelNames);
+    }
+
+    inc(labels = {}, value = 1) {
+        const key = this.key(labels);
+        this.series.set(key, (this.series.get(key) || 0) + value);
+    }
+
+    // Sum of every worker's count for each label set
+    aggregate(parts) {
+        const total = new Counter(this.name, this.help, this.labelNames);
+        for (const {series} of parts) {
+            for (const [key, value] of series) total.series.set(key, (total.series.get(key) || 0) + value);
+        }
+        return total;
+    }
+
+    render() {
+        let out = this.header();
+        for (const [key, value] of this.series) {
+            out += `${this.name}${formatLabels(this.labelsOf(key))} ${formatValue(value)}\n`;
+        }
+        return out;
+    }
+}
+
+class Gauge extends Metric {
+    // `collect` is called on every scrape to refresh the values. `type` lets a
+    // collected value that only grows (e.g. CPU time) be exposed as a counter.
+    constructor(name, help, labelNames, collect, type = 'gauge') {
+        super(type, name, help, labelNames);
+        this.collect = collect;
+    }
+
+    set(labels, value) {
+        this.series.set(this.key(labels), value);
+    }
+
+    snapshot() {
+        if (this.collect) this.collect(this);
+        return super.snapshot();
+    }
+
+    // Gauges don't add up across processes (start time, loop delay), so each
+    // worker keeps its own series under a `worker` label
+    aggregate(parts) {
+        const labelled = new Gauge(this.name, this.help, ['worker', ...this.labelNames], null, this.type);
+        for (const {worker, series} of parts) {
+            for (const [key, value] of series) {
+                labelled.series.set(JSON.stringify([String(worker), ...JSON.parse(key)]), value);
+            }
+        }
+        return labelled;
+    }
+
+    render() {
+        if (this.collect) this.collect(this);
+        let out = this.header();
+        for (const [key, value] of this.series) {
+            out += `${this.name}${formatLabels(this.labelsOf(key))} ${formatValue(value)}\n`;
+        }
+        return out;
+    }
+}
+
+class Histogram extends Metric {
+    constructor(name, help, labelNames, buckets = DEFAULT_BUCKETS) {
+        super('histogram', name, help, labelNames);
+        this.buckets = [...buckets].sort((a, b) => a - b);
+    }
+
+    observe(labels, value) {
+        const key = this.key(labels);
+        let series = this.series.get(key);
+        if (!series) {
+            series = {counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0};
+            this.series.set(key, series);
+        }
+        const i = this.buckets.findIndex((b) => value <= b);
+        if (i !== -1) series.counts[i]++;
+        series.sum += value;
+        series.count++;
+    }
+
+    aggregate(parts) {
+        const total = new Histogram(this.name, this.help, this.labelNames, this.buckets);
+        for (const {series} of parts) {
+            for (const [key, {counts, sum, count}] of series) {
+                let merged = total.series.get(key);
+                if (!merged) {
+                    merged = {counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0};
+                    total.series.set(key, merged);
+                }
+                for (let i = 0; i < counts.length; i++) merged.counts[i] += counts[i];
+                merged.sum += sum;
+                merged.count += count;
+            }
+        }
+        return total;
+    }
+
+    // Returns a function that observes the seconds elapsed since startTimer
+    startTimer(labels = {}) {
+        const start = process.hrtime.bigint();
+        return (extra = {}) => {
+            this.observe({...labels, ...extra}, Number(process.hrtime.bigint() - start) / 1e9);
+        };
+    }
+
+    render() {
+        let out = this.header();
+        for (const [key, series] of this.series) {
+            const labels = this.labelsOf(key);
+            let cumulative = 0;
+            this.buckets.forEach((bucket, i) => {
+                cumulative += series.counts[i];
+                out += `${this.name}_bucket${formatLabels({...labels, le: formatValue(bucket)})} ${cumulative}\n`;
+            });
+            out += `${this.name}_bucket${formatLabels({...labels, le: '+Inf'})} ${series.count}\n`;
+            out += `${this.name}_sum${formatLabels(labels)} ${series.sum}\n`;
+            out += `${this.name}_count${formatLabels(labels)} ${series.count}\n`;
+        }
+        return out;
+    }
+}
+
+class Registry {
+    constructor() {
+        this.metrics = new Map();
+    }
+
+    register(metric) {
+        if (this.metrics.has(metric.name)) {
+            throw new Error(`Metric ${metric.name} is already registered`);
+        }
+        this.metrics.set(metric.name, metric);
+        return metric;
+    }
+
+    counter(name, help, labelNames) {
+        return this.register(new Counter(name, help, labelNames));
+    }
+
+    gauge(name, help, labelNames, collect) {
+        return this.register(new Gauge(name, help, labelNames, collect));
+    }
+
+    histogram(name, help, labelNames, buckets) {
+        return this.register(new Histogram(name, help, labelNames, buckets));
+    }
+
+    render() {
+        return [...this.metrics.values()].map((m) => m.render()).join('');
+    }
+
+    // {metricName: {kind, series}} for this process (see services/clusterMetrics.js).
+    // kind is counter, histogram or gauge: only the first two add up across processes.
+    snapshot() {
+        return Object.fromEntries([...this.metrics.values()].map((m) => [m.name, {
+            kind: m instanceof Gauge ? 'gauge' : m.type,
+            series: m.snapshot(),
+        }]));
+    }
+
+    // One exposition for the whole cluster from every worker's snapshot
+    // ([{worker, metrics}]): counters and histograms are summed, gauges are
+    // labelled by worker index
+    renderCluster(snapshots) {
+        return [...this.metrics.values()]
+            .map((m) => m.aggregate(snapshots.map(({worker, metrics}) => ({worker, series: metrics[m.name]?.series || []}))))
+            .map((m) => m.render())
+            .join('');
+    }
+}
+
+const registry = new Registry();
+const CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8';
+
+// ─── Application metrics ─────────────────────────────────────────────────────
+
+const httpRequestDuration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template',
+    ['method', 'route', 'status_code']
+);
+const httpRequestsTotal = registry.counter(
+    'http_requests_total', 'HTTP requests by route template',
+    ['method', 'route', 'status_code']
+);
+const dbQueryDuration = registry.histogram(
+    'db_query_duration_seconds', 'Model method latency (one or more SQL statements)',
+    ['query', 'outcome']
+);
+const rpcRequestDuration = registry.histogram(
+    'soroban_rpc_duration_seconds', 'Soroban RPC call latency per attempt',
+    ['method', 'endpoint', 'outcome'], [...DEFAULT_BUCKETS, 30]
+);
+const storageOperationDuration = registry.histogram(
+    'minio_operation_duration_seconds', 'MinIO operation latency',
+    ['operation', 'outcome']
+);
+
+// ─── Process metrics ─────────────────────────────────────────────────────────
+
+const startTime = Math.floor(Date.now() / 1000 - process.uptime());
+
+registry.gauge('process_start_time_seconds', 'Start time of the process since unix epoch', [],
+    (g) => g.set({}, startTime));
+
+registry.register(new Gauge('process_cpu_seconds_total', 'User and system CPU time spent', ['mode'], (g) => {
+    const usage = process.cpuUsage();
+    g.set({mode: 'user'}, usage.user / 1e6);
+    g.set({mode: 'system'}, usage.system / 1e6);
+}, 'counter'));
+
+registry.gauge('process_memory_bytes', 'Process memory usage', ['type'], (g) => {
+    for (const [type, bytes] of Object.entries(process.memoryUsage())) {
+        g.set({type}, bytes);
+    }
+});
+
+// Event-loop delay sampled every 10ms; percentiles cover the time since the
+// previous scrape
+const loopDelay = monitorEventLoopDelay({resolution: 10});
+loopDelay.enable();
+
+registry.gauge('nodejs_eventloop_delay_seconds', 'Event-loop delay since the last scrape', ['quantile'], (g) => {
+    g.set({quantile: '0.5'}, loopDelay.percentile(50) / 1e9);
+    g.set({quantile: '0.99'}, loopDelay.percentile(99) / 1e9);
+    g.set({quantile: '1'}, loopDelay.max / 1e9);
+    loopDelay.reset();
+});
+
+const GC_KINDS = {
+    [constants.NODE_PERFORMANCE_GC_MAJOR]: 'major',
+    [constants.NODE_PERFORMANCE_GC_MINOR]: 'minor',
+    [constants.NODE_PERFORMANCE_GC_INCREMENTAL]: 'incremental',
+    [constants.NODE_PERFORMANCE_GC_WEAKCB]: 'weakcb',
+};
+const gcDuration = registry.histogram(
+    'nodejs_gc_duration_seconds', 'Garbage collection pauses by kind',
+    ['kind'], [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1]
+);
+const gcObserver = new PerformanceObserver((list) => {
+    for (const entry of list.getEntries()) {
+        gcDuration.observe({kind: GC_KINDS[entry.detail?.kind] || 'unknown'}, entry.duration / 1000);
+    }
+});
+gcObserver.observe({entryTypes: ['gc']});
+
+// ─── Instrumentation helpers ─────────────────────────────────────────────────
+
+// Wrap every function property of a model object so each call is timed as
+// db_query_duration_seconds{query="<name>.<method>"} and traced as a span
+function instrumentModel(name, model) {
+    for (const [method, fn] of Object.entries(model)) {
+        if (typeof fn !== 'function') continue;
+        const query = `${name}.${method}`;
+        model[method] = function (...args) {
+            return observed(dbQueryDuration, {query}, `db ${query}`, {'db.query_name': query},
+                () => fn.apply(this, args));
+        };
+    }
+    return model;
+}
+
+// Wrap the promise-returning methods of a MinIO client
+function instrumentStorage(client, operations) {
+    for (const operation of operations) {
+        const fn = client[operation];
+        if (typeof fn !== 'function') continue;
+        client[operation] = function (...args) {
+            const attributes = {'storage.operation': operation, 'storage.bucket': args[0]};
+            if (typeof args[1] === 'string') attributes['storage.key'] = args[1];
+            return observed(storageOperationDuration, {operation}, `minio ${operation}`, attributes,
+                () => fn.apply(this, args), tracing.SPAN_KIND.CLIENT);
+        };
+    }
+    return client;
+}
+
+// Time fn in `histogram` (adding an ok/error outcome label) inside a span
+function observed(histogram, labels, spanName, attributes, fn, kind) {
+    return tracing.withSpan(spanName, attributes, async () => {
+        const end = histogram.startTimer(labels);
+        try {
+            const result = await fn();
+            end({outcome: 'ok'});
+            return result;
+        } catch (err) {
+            end({outcome: 'error'});
+            throw err;
+        }
+    }, kind);
+}
+
+module.exports = {
+    registry,
+    CONTENT_TYPE,
+    Registry,
+    httpRequestDuration,
+    httpRequestsTotal,
+    rpcRequestDuration,
+    storageOperationDuration,
+    instrumentModel,
+    instrumentStorage,
+};
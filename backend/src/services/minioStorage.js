@@ -0,0 +1,178 @@
+const fs = require('fs');
+const http = require('http');
+const https = require('https');
+const os = require('os');
+const path = require('path');
+const crypto = require('crypto');
+const {Transform, pipeline} = require('stream');
+const {minioClient} = require('../config/minio');
+const {storageOperationDuration} = require('./metrics');
+
+// ─── Streaming multer storage engine for MinIO ───────────────────────────────
+// multer.memoryStorage() holds every upload as one Buffer in the V8 heap, and
+// minio-js copies it again into its own part buffer. This engine streams the
+// multipart file through a content sniffer and a byte counter into a temp file
+// (so memory per upload is one stream chunk), then PUTs that file to MinIO
+// through a presigned URL with a known Content-Length, which S3 requires and
+// which lets the body be streamed from disk instead of buffered.
+//
+// The declared mimetype is ignored: the stored Content-Type comes from the
+// file's magic bytes. Oversized uploads are cut off as soon as they cross the
+// limit, and a client abort removes the temp file.
+//
+// The SHA-256 of the bytes is computed on the way through, so the object name
+// can be content-addressed (see imageKeys). When an object with that name
+// already exists the PUT is skipped, unless the existing copy is old enough to
+// be near garbage collection, in which case it is rewritten to refresh its
+// Last-Modified (imageGc only removes objects older than its grace period).
+
+const SNIFF_BYTES = 12;
+const REFRESH_AFTER_MS = 60 * 60 * 1000;
+const MAX_IMAGE_BYTES = 5 * 1024 * 1024;
+const ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png', 'image/webp', 'image/gif'];
+
+// Magic-byte signatures of the accepted image formats
+function sniffImageType(head) {
+    if (head.length >= 3 && head[0] === 0xff && head[1] === 0xd8 && head[2] === 0xff) return 'image/jpeg';
+    if (head.length >= 8 && head.subarray(0, 8).equals(Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]))) {
+        return 'image/png';
+    }
+    if (head.length >= 6 && ['GIF87a', 'GIF89a'].includes(head.subarray(0, 6).toString('latin1'))) return 'image/gif';
+    if (head.length >= 12 && head.subarray(0, 4).toString('latin1') === 'RIFF'
+        && head.subarray(8, 12).toString('latin1') === 'WEBP') {
+        return 'image/webp';
+    }
+    return null;
+}
+
+function httpError(status, message) {
+    const err = new Error(message);
+    err.status = status;
+    return err;
+}
+
+// Passes bytes through while enforcing maxBytes and sniffing the first bytes.
+// `info.mimetype` is set once enough bytes have been seen.
+function inspector(maxBytes, allowedTypes, info) {
+    let head = Buffer.alloc(0);
+    let size = 0;
+    const hash = crypto.createHash('sha256');
+
+    const check = () => {
+        info.mimetype = sniffImageType(head);
+        if (!info.mimetype || !allowedTypes.includes(info.mimetype)) {
+            return httpError(400, 'Only JPEG, PNG, WebP, and GIF images are allowed');
+        }
+        return null;
+    };
+
+    return new Transform({
+        transform(chunk, _enc, cb) {
+            size += chunk.length;
+            if (size > maxBytes) {
+                return cb(httpError(413, `Image exceeds ${Math.floor(maxBytes / (1024 * 1024))}MB limit`));
+            }
+            if (info.mimetype === undefined) {
+                head = Buffer.concat([head, chunk.subarray(0, SNIFF_BYTES - head.length)]);
+                if (head.length >= SNIFF_BYTES) {
+                    const err = check();
+                    if (err) return cb(err);
+                }
+            }
+            info.size = size;
+            hash.update(chunk);
+            cb(null, chunk);
+        },
+        flush(cb) {
+            info.sha256 = hash.digest('hex');
+            if (info.mimetype === undefined) return cb(check());
+            cb();
+        },
+    });
+}
+
+// PUT a local file to MinIO, streaming it from disk
+async function putFile(bucket, key, filePath, size, contentType) {
+    const url = new URL(await minioClient.presignedPutObject(bucket, key, 60));
+    const transport = url.protocol === 'https:' ? https : http;
+    const observe = storageOperationDuration.startTimer({operation: 'putFile'});
+
+    await new Promise((resolve, reject) => {
+        const req = transport.request(url, {
+            method: 'PUT',
+            headers: {'Content-Length': size, 'Content-Type': contentType},
+        }, (res) => {
+            res.resume();
+            if (res.statusCode >= 200 && res.statusCode < 300) return resolve();
+            reject(new Error(`MinIO PUT ${key} failed with ${res.statusCode}`));
+        });
+        req.on('error', reject);
+        fs.createReadStream(filePath).on('error', reject).pipe(req);
+    }).then(() => observe({outcome: 'ok'}), (err) => {
+        observe({outcome: 'error'});
+        throw err;
+    });
+}
+
+// True when `key` exists and was written recently enough to be reused as is
+async function isFreshCopy(bucket, key) {
+    try {
+        const stat = await minioClient.statObject(bucket, key);
+        return Date.now() - new Date(stat.lastModified).getTime() < REFRESH_AFTER_MS;
+    } catch (err) {
+        if (err.code === 'NotFound' || err.code === 'NoSuchKey') return false;
+        throw err;
+    }
+}
+
+class MinioStorage {
+    constructor({bucket, maxBytes, allowedTypes, objectName}) {
+        this.bucket = bucket;
+        this.maxBytes = maxBytes;
+        this.allowedTypes = allowedTypes;
+        this.objectName = objectName;
+    }
+
+    _handleFile(req, file, cb) {
+        const tmpPath = path.join(os.tmpdir(), `upload-${crypto.randomUUID()}`);
+        const info = {mimetype: undefined, size: 0};
+        const cleanup = () => fs.unlink(tmpPath, () => {
+        });
+
+        pipeline(
+            file.stream,
+            inspector(this.maxBytes, this.allowedTypes, info),
+            fs.createWriteStream(tmpPath),
+            async (err) => {
+                if (err) {
+                    cleanup();
+                    return cb(err);
+                }
+                try {
+                    const key = this.objectName(req, file, info);
+                    const deduplicated = await isFreshCopy(this.bucket, key);
+                    if (!deduplicated) {
+                        await putFile(this.bucket, key, tmpPath, info.size, info.mimetype);
+                    }
+                    cb(null, {
+                        bucket: this.bucket, key, size: info.size, mimetype: info.mimetype,
+                        sha256: info.sha256, deduplicated,
+                    });
+                } catch (uploadErr) {
+                    cb(uploadErr);
+                } finally {
+                    cleanup();
+                }
+            }
+        );
+    }
+
+    // Called by multer when the request fails after this file was stored.
+    // A content-addressed object may already be shared with another upload,
+    // so it is left for imageGc to reclaim once unreferenced.
+    _removeFile(_req, _file, cb) {
+        cb(null);
+    }
+}
+
+module.exports = {MinioStorage, sniffImageType, isFreshCopy, SNIFF_BYTES, MAX_IMAGE_BYTES, ALLOWED_IMAGE_TYPES};
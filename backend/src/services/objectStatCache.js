@@ -0,0 +1,35 @@
+const {minioClient} = require('../config/minio');
+const {LruCache} = require('./lruCache');
+const {isImmutableName} = require('./imageKeys');
+
+// ─── Cached statObject for public image reads ────────────────────────────────
+// GET /images is the hottest public endpoint and is not rate limited, so the
+// metadata round trip to MinIO is cached in-process. Objects written under
+// immutable names never change; anything else is re-checked after a minute.
+
+const IMMUTABLE_TTL_MS = 60 * 60 * 1000;
+const MUTABLE_TTL_MS = 60 * 1000;
+
+const cache = new LruCache({max: 5000, ttlMs: MUTABLE_TTL_MS});
+
+async function statObject(bucket, key) {
+    const cacheKey = `${bucket}/${key}`;
+    const cached = cache.get(cacheKey);
+    if (cached) return cached;
+
+    const stat = await minioClient.statObject(bucket, key);
+    const entry = {
+        size: stat.size,
+        etag: stat.etag,
+        lastModified: stat.lastModified,
+        contentType: stat.metaData && stat.metaData['content-type'],
+    };
+    cache.set(cacheKey, entry, isImmutableName(key) ? IMMUTABLE_TTL_MS : MUTABLE_TTL_MS);
+    return entry;
+}
+
+function invalidate(bucket, key) {
+    cache.delete(`${bucket}/${key}`);
+}
+
+module.exports = {statObject, invalidate, _cache: cache};
@@ -0,0 +1,175 @@
+const crypto = require('crypto');
+const logger = require('../config/logger');
+
+// ─── Query statistics and slow-query capture ─────────────────────────────────
+// Every statement that goes through pool.query is aggregated by fingerprint:
+// the SQL with literals replaced by `?` and IN lists collapsed, so the
+// dynamic WHERE clauses of e.g. serviceModel.findFiltered show up as one
+// entry per shape of the query, not per set of values.
+//
+// Statements slower than SLOW_QUERY_MS are logged with the shape of their
+// parameters (types and array lengths, never the values). A sample of slow
+// SELECTs (SLOW_QUERY_EXPLAIN_RATE, at most one per fingerprint every
+// EXPLAIN_COOLDOWN_MS) is re-run under EXPLAIN (ANALYZE, BUFFERS) in the
+// background and the plan kept with the fingerprint.
+//
+// ANALYZE executes the statement, and a SELECT can have side effects through
+// the functions it calls (rate_limit_take debits a bucket, pg_notify sends an
+// event). Only SELECTs whose calls are all side-effect-free built-ins are
+// explained, and the runner (config/db) wraps them in a read-only
+// transaction that is always rolled back.
+//
+// GET /api/admin/queries returns the top fingerprints.
+
+const MAX_FINGERPRINTS = 1000;
+const MAX_SHAPES = 5;
+const EXPLAIN_COOLDOWN_MS = 5 * 60 * 1000;
+
+// Built-ins a statement may call and still be explained
+const SAFE_FUNCTIONS = new Set([
+    'count', 'sum', 'min', 'max', 'avg', 'bool_or', 'bool_and', 'array_agg', 'string_agg',
+    'json_agg', 'jsonb_agg', 'json_build_object', 'jsonb_build_object', 'row_number', 'rank',
+    'dense_rank', 'coalesce', 'nullif', 'greatest', 'least', 'lower', 'upper', 'trim', 'length',
+    'concat', 'concat_ws', 'substring', 'position', 'split_part', 'now', 'date_trunc', 'extract',
+    'to_char', 'date', 'round', 'floor', 'ceil', 'abs', 'unnest', 'array_length', 'cardinality',
+    'generate_series', 'cast',
+]);
+// SQL keywords that can be followed by a parenthesis without being a call
+const PAREN_KEYWORDS = new Set([
+    'select', 'from', 'join', 'lateral', 'where', 'on', 'using', 'and', 'or', 'not', 'in', 'exists',
+    'any', 'all', 'some', 'as', 'with', 'values', 'over', 'filter', 'within', 'partition', 'by',
+    'case', 'when', 'then', 'else', 'union', 'intersect', 'except', 'distinct', 'between', 'is',
+    'like', 'ilike', 'limit', 'offset', 'interval', 'array', 'row', 'numeric', 'decimal', 'varchar',
+    'char', 'timestamp', 'timestamptz',
+]);
+
+// A SELECT that calls only known side-effect-free functions
+function explainable(sql) {
+    const text = sql.replace(/--[^\n]*/g, ' ').replace(/'(?:[^']|'')*'/g, "''");
+    if (!/^\s*(WITH\b[\s\S]*?\)\s*)?SELECT\b/i.test(text)) return false;
+    if (/\b(INSERT|UPDATE|DELETE|MERGE)\b/i.test(text)) return false;
+    for (const [, name] of text.matchAll(/([a-z_][\w$]*(?:\.[a-z_][\w$]*)?)\s*\(/gi)) {
+        const fn = name.toLowerCase();
+        if (!PAREN_KEYWORDS.has(fn) && !SAFE_FUNCTIONS.has(fn)) return false;
+    }
+    return true;
+}
+
+const stats = new Map();
+let slowMs = 200;
+let explainRate = 0.1;
+
+function configure(env = process.env) {
+    slowMs = env.SLOW_QUERY_MS === undefined ? 200 : Number(env.SLOW_QUERY_MS);
+    explainRate = env.SLOW_QUERY_EXPLAIN_RATE === undefined ? 0.1 : Number(env.SLOW_QUERY_EXPLAIN_RATE);
+}
+
+// Normalize SQL so that statements differing only in literal values match
+function normalize(sql) {
+    return sql
+        .replace(/--[^\n]*/g, ' ')
+        .replace(/'(?:[^']|'')*'/g, '?')
+        .replace(/(?<![$\w.])-?\d+(?:\.\d+)?\b/g, '?')
+        .replace(/\s+/g, ' ')
+        .replace(/\bIN \((?:\s*(?:\?|\$\d+)\s*,?)+\)/gi, 'IN (...)')
+        .trim();
+}
+
+function fingerprint(sql) {
+    return crypto.createHash('sha1').update(normalize(sql)).digest('hex').slice(0, 12);
+}
+
+function shapeOf(value) {
+    if (value === null || value === undefined) return 'null';
+    if (Array.isArray(value)) return `array(${value.length})`;
+    if (Buffer.isBuffer(value)) return 'bytea';
+    if (value instanceof Date) return 'timestamp';
+    if (typeof value === 'number') return Number.isInteger(value) ? 'int' : 'numeric';
+    if (typeof value === 'object') return 'json';
+    return typeof value === 'string' ? 'text' : typeof value;
+}
+
+function paramShapes(values) {
+    return (values || []).map(shapeOf).join(', ');
+}
+
+function evictOne() {
+    let victim = null;
+    for (const [id, entry] of stats) {
+        if (!victim || entry.totalMs < stats.get(victim).totalMs) victim = id;
+    }
+    stats.delete(victim);
+}
+
+// Record one execution. `explain(sql, values)` runs EXPLAIN (ANALYZE, ...)
+// of the statement, bypassing this instrumentation, and resolves with its
+// result.
+function record(sql, values, ms, {error = false, explain = null} = {}) {
+    const id = fingerprint(sql);
+    let entry = stats.get(id);
+    if (!entry) {
+        if (stats.size >= MAX_FINGERPRINTS) evictOne();
+        entry = {
+            fingerprint: id, query: normalize(sql).slice(0, 1000),
+            calls: 0, errors: 0, totalMs: 0, maxMs: 0, slow: 0,
+            shapes: [], plan: null, planAt: 0,
+        };
+        stats.set(id, entry);
+    }
+    entry.calls++;
+    entry.totalMs += ms;
+    if (ms > entry.maxMs) entry.maxMs = ms;
+    if (error) entry.errors++;
+
+    if (ms < slowMs) return;
+
+    entry.slow++;
+    const shape = paramShapes(values);
+    if (!entry.shapes.includes(shape) && entry.shapes.length < MAX_SHAPES) entry.shapes.push(shape);
+    logger.warn({fingerprint: id, durationMs: Math.round(ms), params: shape, query: entry.query}, 'Slow query');
+
+    if (explain && !error && Date.now() - entry.planAt > EXPLAIN_COOLDOWN_MS
+        && Math.random() < explainRate && explainable(sql)) {
+        entry.planAt = Date.now();
+        explain(sql, values)
+            .then(({rows}) => {
+                entry.plan = rows[0]['QUERY PLAN'];
+            })
+            .catch((err) => logger.debug({fingerprint: id, err: err.message}, 'EXPLAIN failed'));
+    }
+}
+
+const SORT_KEYS = {
+    total: (e) => e.totalMs,
+    mean: (e) => e.totalMs / e.calls,
+    max: (e) => e.maxMs,
+    calls: (e) => e.calls,
+    slow: (e) => e.slow,
+};
+
+function top({limit = 20, sort = 'total'} = {}) {
+    const key = SORT_KEYS[sort] || SORT_KEYS.total;
+    return [...stats.values()]
+        .sort((a, b) => key(b) - key(a))
+        .slice(0, limit)
+        .map((e) => ({
+            fingerprint: e.fingerprint,
+            query: e.query,
+            calls: e.calls,
+            errors: e.errors,
+            slow: e.slow,
+            total_ms: Math.round(e.totalMs),
+            mean_ms: Number((e.totalMs / e.calls).toFixed(2)),
+            max_ms: Math.round(e.maxMs),
+            param_shapes: e.shapes,
+            plan: e.plan,
+        }));
+}
+
+function reset() {
+    stats.clear();
+}
+
+configure();
+
+module.exports = {record, top, reset, configure, normalize, fingerprint, paramShapes, explainable, SORT_KEYS};
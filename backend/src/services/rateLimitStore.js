@@ -0,0 +1,109 @@
+const pool = require('../config/db');
+const logger = require('../config/logger');
+
+// ─── Rate-limit stores ───────────────────────────────────────────────────────
+// Both stores answer one question: may `key` spend `cost` units of a rule
+// ({limit, windowMs})? They return {allowed, remaining, resetMs} where
+// resetMs is how long until the full budget is available again.
+//
+//   MemoryStore    sliding window per process: the previous window's count,
+//                  weighted by how much of it still overlaps, plus the
+//                  current one. No burst at window boundaries.
+//   PostgresStore  token bucket on the UNLOGGED rate_limit_buckets table,
+//                  refilled continuously at limit/windowMs. One function
+//                  call per request, shared by every worker and replica.
+//
+// RATE_LIMIT_STORE=postgres|memory selects the store; the default is
+// postgres in cluster mode (CLUSTER_WORKERS > 1) and memory otherwise.
+
+const PRUNE_INTERVAL_MS = 60 * 1000;
+
+class MemoryStore {
+    constructor() {
+        // key -> {start, current, previous}
+        this.windows = new Map();
+        this.timer = setInterval(() => this.prune(), PRUNE_INTERVAL_MS);
+        this.timer.unref();
+        this.maxWindowMs = 0;
+    }
+
+    consume(key, cost, {limit, windowMs}) {
+        const now = Date.now();
+        this.maxWindowMs = Math.max(this.maxWindowMs, windowMs);
+        const start = now - (now % windowMs);
+        let w = this.windows.get(key);
+        if (!w || w.start < start - windowMs) {
+            w = {start, current: 0, previous: 0};
+        } else if (w.start < start) {
+            w = {start, current: 0, previous: w.current};
+        }
+        this.windows.set(key, w);
+
+        const overlap = 1 - (now - start) / windowMs;
+        const used = w.previous * overlap + w.current;
+        const allowed = used + cost <= limit;
+        if (allowed) w.current += cost;
+        return {
+            allowed,
+            remaining: Math.max(Math.floor(limit - used - (allowed ? cost : 0)), 0),
+            resetMs: start + windowMs - now,
+        };
+    }
+
+    prune() {
+        const cutoff = Date.now() - 2 * this.maxWindowMs;
+        for (const [key, w] of this.windows) {
+            if (w.start < cutoff) this.windows.delete(key);
+        }
+    }
+}
+
+class PostgresStore {
+    // rate_limit_take (init.sql) refills, checks and debits the bucket under
+    // a row lock, in one round trip
+    async consume(key, cost, {limit, windowMs}) {
+        const {rows: [row]} = await pool.query(
+            'SELECT granted, tokens_left FROM rate_limit_take($1, $2, $3, $4)',
+            [key, limit, cost, windowMs]
+        );
+        return {
+            allowed: row.granted,
+            remaining: Math.floor(row.tokens_left),
+            resetMs: Math.ceil((limit - row.tokens_left) * windowMs / limit),
+        };
+    }
+}
+
+let pruneTimer = null;
+
+// Buckets idle long enough to be full again carry no state
+function schedulePrune() {
+    if (pruneTimer) return;
+    pruneTimer = setInterval(() => {
+        pool.query(`DELETE FROM rate_limit_buckets WHERE updated_at < NOW() - INTERVAL '1 hour'`)
+            .catch((err) => logger.warn({err: err.message}, 'Rate limit prune failed'));
+    }, PRUNE_INTERVAL_MS);
+    pruneTimer.unref();
+}
+
+function useSharedStore(env = process.env) {
+    if (env.RATE_LIMIT_STORE) return env.RATE_LIMIT_STORE === 'postgres';
+    return parseInt(env.CLUSTER_WORKERS, 10) > 1 || env.CLUSTER_WORKERS === 'auto';
+}
+
+let defaultStore = null;
+
+// The process-wide store chosen by RATE_LIMIT_STORE
+function getStore() {
+    if (!defaultStore) {
+        if (useSharedStore()) {
+            defaultStore = new PostgresStore();
+            schedulePrune();
+        } else {
+            defaultStore = new MemoryStore();
+        }
+    }
+    return defaultStore;
+}
+
+module.exports = {MemoryStore, PostgresStore, getStore, useSharedStore};
@@ -0,0 +1,53 @@
+const {AsyncLocalStorage} = require('async_hooks');
+
+// ─── Request-scoped read memoization ─────────────────────────────────────────
+// Inside withRequestCache(fn), identical calls to a memoized model read share
+// one query: the second caller of invoiceModel.findById(7) awaits the
+// promise of the first. Outside a scope the methods run as before.
+//
+// The batch endpoint opens one scope around all its GET sub-requests, which
+// run in parallel and mostly resolve the same rows (the invoice, the user,
+// the participants, the catalog version). Only reads are memoized and only
+// GETs run inside a scope, so a cached row can't be stale within it.
+//
+// Handlers decorate what they load (invoice.items = ...), so every caller
+// gets its own structured clone of the shared result.
+
+const storage = new AsyncLocalStorage();
+
+// Run fn with a fresh cache for everything it calls, sync or async
+function withRequestCache(fn) {
+    return storage.run(new Map(), fn);
+}
+
+// Memoize `methods` of a model object per request scope; returns the model
+function memoizeReads(model, methods) {
+    for (const method of methods) {
+        const fn = model[method];
+        if (typeof fn !== 'function') {
+            throw new TypeError(`Cannot memoize ${method}: not a function`);
+        }
+        model[method] = function (...args) {
+            const cache = storage.getStore();
+            if (!cache) return fn.apply(this, args);
+
+            let calls = cache.get(fn);
+            if (!calls) {
+                calls = new Map();
+                cache.set(fn, calls);
+            }
+            const key = JSON.stringify(args);
+            let pending = calls.get(key);
+            if (!pending) {
+                pending = Promise.resolve(fn.apply(this, args));
+                calls.set(key, pending);
+                // A failed lookup is retried by the next caller
+                pending.catch(() => calls.delete(key));
+            }
+            return pending.then(structuredClone);
+        };
+    }
+    return model;
+}
+
+module.exports = {withRequestCache, memoizeReads};
@@ -0,0 +1,283 @@
+const {rpc} = require('@stellar/stellar-sdk');
+const logger = require('../config/logger');
+const {rpcRequestDuration} = require('./metrics');
+const tracing = require('./tracing');
+
+// ─── Soroban RPC endpoint pool ───────────────────────────────────────────────
+// Wraps one rpc.Server per endpoint behind the subset of the rpc.Server
+// interface the backend uses. Each endpoint keeps an exponentially weighted
+// latency and failure rate; calls go to the best-scored endpoint and fail over
+// to the next one on transport errors or timeouts (sendTransaction only after
+// checking the first endpoint didn't accept it). Read-only simulations are
+// hedged: if the first endpoint has not answered after `hedgeMs`, the same
+// request goes to the next endpoint and the first successful answer wins.
+//
+// JSON-RPC errors (the provider answered, the request itself is wrong) are not
+// endpoint failures and are rethrown without failover.
+//
+// The rpc.Server instances live for the whole process, so their HTTP
+// connections are reused through Node's keep-alive global agents.
+
+const EWMA_ALPHA = 0.2;
+const FAILURES_TO_EJECT = 3;
+const BASE_COOLDOWN_MS = 5000;
+const MAX_COOLDOWN_MS = 60000;
+const LATENCY_SAMPLES = 256;
+
+function isRpcError(err) {
+    // rpc.Server rethrows the JSON-RPC `error` member as a plain object
+    return Boolean(err) && !(err instanceof Error) && typeof err.code === 'number';
+}
+
+function withTimeout(promise, ms, url) {
+    let timer;
+    const timeout = new Promise((_, reject) => {
+        timer = setTimeout(() => reject(new Error(`RPC timeout after ${ms}ms (${redactUrl(url)})`)), ms);
+    });
+    return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+// Provider URLs often carry API keys in the query string or userinfo
+function redactUrl(url) {
+    try {
+        const u = new URL(url);
+        return `${u.protocol}//${u.host}${u.pathname}`;
+    } catch {
+        return '[invalid url]';
+    }
+}
+
+function percentile(sorted, p) {
+    if (sorted.length === 0) return null;
+    return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))];
+}
+
+class Endpoint {
+    constructor(url) {
+        this.url = url;
+        this.server = new rpc.Server(url, {allowHttp: url.startsWith('http://')});
+        this.latencyEwma = null;
+        this.failureRate = 0;
+        this.consecutiveFailures = 0;
+        this.ejectedUntil = 0;
+        this.requests = 0;
+        this.errors = 0;
+        this.hedges = 0;
+        this.samples = [];
+    }
+
+    // Lower is better; unmeasured endpoints are tried as if average
+    score() {
+        const latency = this.latencyEwma ?? 100;
+        return latency * (1 + 10 * this.failureRate);
+    }
+
+    available(now) {
+        return this.ejectedUntil <= now;
+    }
+
+    recordSuccess(ms) {
+        this.latencyEwma = this.latencyEwma === null ? ms : this.latencyEwma + EWMA_ALPHA * (ms - this.latencyEwma);
+        this.failureRate *= 1 - EWMA_ALPHA;
+        this.consecutiveFailures = 0;
+        this.ejectedUntil = 0;
+        this.samples.push(ms);
+        if (this.samples.length > LATENCY_SAMPLES) this.samples.shift();
+    }
+
+    recordFailure() {
+        this.errors++;
+        this.failureRate += EWMA_ALPHA * (1 - this.failureRate);
+        this.consecutiveFailures++;
+        if (this.consecutiveFailures >= FAILURES_TO_EJECT) {
+            const exponent = this.consecutiveFailures - FAILURES_TO_EJECT;
+            const cooldown = Math.min(MAX_COOLDOWN_MS, BASE_COOLDOWN_MS * 2 ** exponent);
+            this.ejectedUntil = Date.now() + cooldown;
+        }
+    }
+
+    stats(now) {
+        const sorted = [...this.samples].sort((a, b) => a - b);
+        return {
+            url: redactUrl(this.url),
+            healthy: this.available(now),
+            requests: this.requests,
+            errors: this.errors,
+            hedges: this.hedges,
+            failure_rate: Number(this.failureRate.toFixed(3)),
+            latency_ewma_ms: this.latencyEwma === null ? null : Math.round(this.latencyEwma),
+            latency_p50_ms: percentile(sorted, 0.5),
+            latency_p99_ms: percentile(sorted, 0.99),
+        };
+    }
+}
+
+class RpcPool {
+    constructor(urls, {timeoutMs = 10000, hedgeMs = 500, hedgedMethods = ['simulateTransaction']} = {}) {
+        if (!urls.length) throw new Error('RpcPool needs at least one URL');
+        this.endpoints = urls.map((url) => new Endpoint(url));
+        this.timeoutMs = timeoutMs;
+        this.hedgeMs = hedgeMs;
+        this.hedgedMethods = new Set(hedgedMethods);
+    }
+
+    // Available endpoints by score, then ejected ones (used only as a last
+    // resort, which also acts as the half-open probe once the cooldown ends)
+    ranked() {
+        const now = Date.now();
+        const byScore = (a, b) => a.score() - b.score();
+        const available = this.endpoints.filter((e) => e.available(now)).sort(byScore);
+        const ejected = this.endpoints.filter((e) => !e.available(now))
+            .sort((a, b) => a.ejectedUntil - b.ejectedUntil);
+        return [...available, ...ejected];
+    }
+
+    attempt(endpoint, method, args) {
+        const attributes = {'rpc.system': 'soroban', 'rpc.method': method, 'rpc.endpoint': redactUrl(endpoint.url)};
+        return tracing.withSpan(`rpc ${method}`, attributes, async (span) => {
+            endpoint.requests++;
+            const start = process.hrtime.bigint();
+            const observe = rpcRequestDuration.startTimer({method, endpoint: redactUrl(endpoint.url)});
+            try {
+                const result = await withTimeout(endpoint.server[method](...args), this.timeoutMs, endpoint.url);
+                endpoint.recordSuccess(Number(process.hrtime.bigint() - start) / 1e6);
+                observe({outcome: 'ok'});
+                span?.setAttribute('rpc.status', result?.status);
+                return result;
+            } catch (err) {
+                observe({outcome: isRpcError(err) ? 'rpc_error' : 'error'});
+                if (isRpcError(err)) {
+                    endpoint.recordSuccess(Number(process.hrtime.bigint() - start) / 1e6);
+                } else {
+                    endpoint.recordFailure();
+                    logger.warn({rpc: redactUrl(endpoint.url), method, err: err.message}, 'Soroban RPC call failed');
+                }
+                throw err;
+            }
+        }, tracing.SPAN_KIND.CLIENT);
+    }
+
+    async call(method, ...args) {
+        const order = this.ranked();
+        if (this.hedgedMethods.has(method) && order.length > 1) {
+            return this.hedged(order, method, args);
+        }
+
+        let lastError;
+        for (const endpoint of order) {
+            try {
+                return await this.attempt(endpoint, method, args);
+            } catch (err) {
+                if (isRpcError(err)) throw err;
+                lastError = err;
+            }
+        }
+        throw lastError;
+    }
+
+    // Start on the best endpoint; launch the next one when the hedge delay
+    // elapses or the current attempts fail. First success wins; the slower
+    // request is left to finish in the background.
+    hedged(order, method, args) {
+        return new Promise((resolve, reject) => {
+            let next = 0;
+            let running = 0;
+            let settled = false;
+            let lastError;
+            let timer;
+
+            const launch = () => {
+                if (settled || next >= order.length) return;
+                const endpoint = order[next++];
+                if (next > 1) endpoint.hedges++;
+                running++;
+                clearTimeout(timer);
+                timer = setTimeout(launch, this.hedgeMs);
+
+                this.attempt(endpoint, method, args).then((result) => {
+                    if (settled) return;
+                    settled = true;
+                    clearTimeout(timer);
+                    resolve(result);
+                }, (err) => {
+                    running--;
+                    if (settled) return;
+                    if (isRpcError(err)) {
+                        settled = true;
+                        clearTimeout(timer);
+                        return reject(err);
+                    }
+                    lastError = err;
+                    if (next < order.length) return launch();
+                    if (running === 0) {
+                        settled = true;
+                        clearTimeout(timer);
+                        reject(lastError);
+                    }
+                });
+            };
+
+            launch();
+        });
+    }
+
+    stats() {
+        const now = Date.now();
+        return this.endpoints.map((e) => e.stats(now));
+    }
+
+    // ─── rpc.Server surface used by the backend ─────────────────────────────
+
+    simulateTransaction(tx) {
+        return this.call('simulateTransaction', tx);
+    }
+
+    // Not idempotent: an endpoint that timed out (or dropped the connection)
+    // may still have accepted the envelope, and resending it elsewhere gets a
+    // DUPLICATE or a sequence ERROR. After a transport failure the hash is
+    // looked up first; only a NOT_FOUND is sent to the next endpoint. A known
+    // transaction is reported as DUPLICATE, so the caller just polls for it.
+    async sendTransaction(tx) {
+        const hash = tx.hash().toString('hex');
+        let lastError;
+        for (const endpoint of this.ranked()) {
+            if (lastError) {
+                let previous;
+                try {
+                    previous = await this.getTransaction(hash);
+                } catch {
+                    throw lastError;
+                }
+                if (previous.status !== 'NOT_FOUND') {
+                    return {
+                        status: 'DUPLICATE',
+                        hash,
+                        latestLedger: previous.latestLedger,
+                        latestLedgerCloseTime: previous.latestLedgerCloseTime,
+                    };
+                }
+            }
+            try {
+                return await this.attempt(endpoint, 'sendTransaction', [tx]);
+            } catch (err) {
+                if (isRpcError(err)) throw err;
+                lastError = err;
+            }
+        }
+        throw lastError;
+    }
+
+    getTransaction(hash) {
+        return this.call('getTransaction', hash);
+    }
+
+    getLatestLedger() {
+        return this.call('getLatestLedger');
+    }
+
+    getHealth() {
+        return this.call('getHealth');
+    }
+}
+
+module.exports = {RpcPool};
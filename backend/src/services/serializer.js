@@ -0,0 +1,109 @@
+// ─── Schema-compiled JSON serializers ────────────────────────────────────────
+// compileSerializer(schema) turns a response schema (a JSON Schema subset)
+// into a function that copies exactly the declared properties, in declared
+// order, into fresh objects and stringifies those. Two effects over res.json:
+//
+//   - Columns that are not declared are never written, so a column added to
+//     `SELECT s.*` / `SELECT i.*` later doesn't leak until a schema lists it.
+//   - The copies are built by generated code with a fixed shape, which keeps
+//     V8's JSON.stringify on its fast path, and TIMESTAMP columns are
+//     formatted directly instead of through Date#toJSON, the most expensive
+//     step per row (npm run bench:serializers).
+//
+// Writing the JSON text itself from generated code (fast-json-stringify)
+// was measured slower than native JSON.stringify on Node 20 for these
+// payloads; most of the catalog's bytes are JSONB blobs either way.
+//
+// Supported schema keywords:
+//   {type: 'object', properties: {...}}   fixed-shape object
+//   {type: 'array', items: schema}        array
+//   {type: 'string', format: 'date-time'} Date objects from pg (ISO string)
+//   {type: 'string'|'integer'|'number'|'boolean'}
+//   {} or {type: 'object'}                any JSON (JSONB blobs, on-chain state)
+//
+// The output is exactly JSON.stringify of the declared properties: undefined
+// ones are omitted, null stays null and a value of another runtime type than
+// declared (a BIGINT that pg returns as a string) is written as it is.
+
+const TYPES = new Set([undefined, 'object', 'array', 'string', 'integer', 'number', 'boolean']);
+
+function pad2(n) {
+    return n < 10 ? `0${n}` : `${n}`;
+}
+
+function pad3(n) {
+    return n < 10 ? `00${n}` : n < 100 ? `0${n}` : `${n}`;
+}
+
+// Same text as Date#toJSON, about 3x faster. Invalid dates and years outside
+// 1000-9999 (sign and padding rules) are left to toJSON.
+function isoDate(value) {
+    const year = value.getUTCFullYear();
+    if (!(year >= 1000 && year <= 9999)) return value;
+    return `${year}-${pad2(value.getUTCMonth() + 1)}-${pad2(value.getUTCDate())}`
+        + `T${pad2(value.getUTCHours())}:${pad2(value.getUTCMinutes())}:${pad2(value.getUTCSeconds())}`
+        + `.${pad3(value.getUTCMilliseconds())}Z`;
+}
+
+// Expression that projects `value` (an expression) for a property schema
+function projection(schema, value, nested) {
+    if (!TYPES.has(schema.type)) {
+        throw new TypeError(`Unsupported response schema type: ${schema.type}`);
+    }
+    if (schema.type === 'string' && schema.format === 'date-time') {
+        return `(${value} instanceof Date ? $date(${value}) : ${value})`;
+    }
+    if ((schema.type === 'object' && schema.properties) || schema.type === 'array') {
+        nested.push(compileProjection(schema));
+        return `$p[${nested.length - 1}](${value})`;
+    }
+    return value;
+}
+
+function compileObject(schema) {
+    const nested = [];
+    const properties = Object.entries(schema.properties).map(([key, propertySchema]) => {
+        const name = JSON.stringify(key);
+        return `${name}: ${projection(propertySchema, `o[${name}]`, nested)}`;
+    });
+    const body = `return function projectObject(o) {
+        if (o === null || typeof o !== 'object' || Array.isArray(o)) return o;
+        return {
+            ${properties.join(',\n')}
+        };
+    };`;
+    return new Function('$date', '$p', body)(isoDate, nested);
+}
+
+function compileArray(schema) {
+    const nested = [];
+    const item = projection(schema.items || {}, 'a[i]', nested);
+    const body = `return function projectArray(a) {
+        if (!Array.isArray(a)) return a;
+        const out = new Array(a.length);
+        for (let i = 0; i < a.length; i++) out[i] = ${item};
+        return out;
+    };`;
+    return new Function('$date', '$p', body)(isoDate, nested);
+}
+
+function compileProjection(schema) {
+    if (schema.type === 'object' && schema.properties) return compileObject(schema);
+    if (schema.type === 'array') return compileArray(schema);
+    return new Function('$date', `return (v) => ${projection(schema, 'v', [])};`)(isoDate);
+}
+
+/**
+ * Compile a response schema into (value) => JSON string.
+ * Throws on schemas it doesn't understand when the route is declared, not
+ * on the first request.
+ */
+function compileSerializer(schema) {
+    if (!schema || typeof schema !== 'object') {
+        throw new TypeError('Response schema must be an object');
+    }
+    const project = compileProjection(schema);
+    return (value) => JSON.stringify(project(value));
+}
+
+module.exports = {compileSerializer};
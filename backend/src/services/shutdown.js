@@ -0,0 +1,148 @@
+const logger = require('../config/logger');
+
+// ─── Shutdown coordinator ────────────────────────────────────────────────────
+// On SIGTERM (a deploy, a rolling restart of the cluster) the process goes
+// through fixed phases instead of dying mid-request:
+//
+//   1. drain     readiness flips to 503 so load balancers stop routing here;
+//                after SHUTDOWN_READINESS_DELAY_MS the listener is closed,
+//                idle keep-alive sockets are dropped and busy ones get
+//                `Connection: close` on their last response
+//   2. wait      in-flight requests and the registered `wait` hooks (pending
+//                submitTx confirmations, SSE streams) finish
+//   3. close     `close` hooks release resources: the LISTEN connection, the
+//                pg pool, the MinIO agent
+//
+// Everything is bounded by SHUTDOWN_TIMEOUT_MS; past it the process exits
+// with code 1 and whatever was still running is lost. Clients that were
+// mid-request therefore get their response instead of a reset, and don't
+// retry into the instances that are still up.
+
+const POLL_MS = 100;
+
+const hooks = {wait: [], close: []};
+let draining = false;
+let inflight = 0;
+
+// Register work to finish (`wait`) or a resource to release (`close`).
+// fn receives the ms left before the deadline.
+function onShutdown(phase, name, fn) {
+    hooks[phase].push({name, fn});
+}
+
+function isDraining() {
+    return draining;
+}
+
+function inflightRequests() {
+    return inflight;
+}
+
+// Express middleware: counts in-flight requests and asks clients to close
+// their keep-alive connection once draining has started
+function trackRequests(req, res, next) {
+    inflight++;
+    let done = false;
+    const finish = () => {
+        if (done) return;
+        done = true;
+        inflight--;
+    };
+    res.once('finish', finish);
+    res.once('close', finish);
+    // Checked when headers go out, so requests already running when the
+    // drain starts also release their connection
+    const writeHead = res.writeHead;
+    res.writeHead = function (...args) {
+        if (draining) res.setHeader('Connection', 'close');
+        return writeHead.apply(this, args);
+    };
+    next();
+}
+
+function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+async function waitForRequests(deadline) {
+    while (inflight > 0 && Date.now() < deadline) {
+        await sleep(POLL_MS);
+    }
+    return inflight;
+}
+
+// Run hooks in parallel, logging (not throwing) failures
+async function runHooks(phase, deadline) {
+    await Promise.all(hooks[phase].map(async ({name, fn}) => {
+        try {
+            await fn(Math.max(deadline - Date.now(), 0));
+        } catch (err) {
+            logger.warn({hook: name, err: err.message}, 'Shutdown hook failed');
+        }
+    }));
+}
+
+/**
+ * Drain and stop the process. `server` is the http.Server returned by
+ * app.listen. Resolves with the exit code (0 clean, 1 deadline hit).
+ */
+async function shutdown(server, {signal, timeoutMs, readinessDelayMs = 0}) {
+    if (draining) return null;
+    draining = true;
+    const deadline = Date.now() + timeoutMs;
+    logger.info({signal, pid: process.pid, inflight, timeoutMs}, 'Shutting down');
+
+    // Let the load balancer see the failing readiness probe before the
+    // listener goes away, so new connections aren't refused
+    if (readinessDelayMs > 0) await sleep(Math.min(readinessDelayMs, timeoutMs));
+
+    const closed = new Promise((resolve) => server.close(resolve));
+    server.closeIdleConnections();
+
+    await runHooks('wait', deadline);
+    const left = await waitForRequests(deadline);
+    if (left > 0) {
+        logger.warn({inflight: left}, 'Shutdown deadline reached with requests in flight');
+        server.closeAllConnections();
+    }
+    await Promise.race([closed, sleep(Math.max(deadline - Date.now(), 0))]);
+
+    await runHooks('close', deadline + 1000);
+    const code = left > 0 || Date.now() > deadline ? 1 : 0;
+    logger.info({code}, 'Shutdown complete');
+    return code;
+}
+
+// Hook SIGTERM/SIGINT to shutdown() and exit with its result. Repeated
+// signals (Ctrl-C reaches every cluster worker, then the supervisor sends
+// SIGTERM) don't restart or cut short the drain.
+function installSignalHandlers(server, options) {
+    const handle = (signal) => {
+        if (draining) return;
+        // Last resort if a close hook hangs
+        setTimeout(() => process.exit(1), options.timeoutMs + 2000).unref();
+        shutdown(server, {...options, signal})
+            .then((code) => process.exit(code))
+            .catch((err) => {
+                logger.error({err}, 'Shutdown failed');
+                process.exit(1);
+            });
+    };
+    process.on('SIGTERM', () => handle('SIGTERM'));
+    process.on('SIGINT', () => handle('SIGINT'));
+}
+
+module.exports = {
+    onShutdown,
+    isDraining,
+    inflightRequests,
+    trackRequests,
+    shutdown,
+    installSignalHandlers,
+    _reset() {
+        draining = false;
+        inflight = 0;
+        hooks.wait = [];
+        hooks.close = [];
+    },
+};
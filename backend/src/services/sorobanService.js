@@ -5,9 +5,16 @@ const {
     Address,
     nativeToScVal,
     scValToNative,
+    scValToBigInt,
     Account,
+    FeeBumpTransaction,
+    xdr,
 } = require('@stellar/stellar-sdk');
 const {server, CONTRACT_ID, NETWORK_PASSPHRASE, SIMULATION_SOURCE} = require('../config/soroban');
+const codecs = require('./contractCodecs');
+const tracing = require('./tracing');
+
+const PRESIMULATE = process.env.SOROBAN_PRESIMULATE === 'true';
 
 // Convert BigInt values to strings for JSON serialization
 function sanitize(obj) {
@@ -21,8 +28,14 @@ function sanitize(obj) {
     return obj;
 }
 
-// Execute a read-only contract call via simulation
-async function callReadOnly(functionName, args = []) {
+// Execute a read-only contract call via simulation and decode the return
+// value with a typed decoder from contractCodecs.
+function callReadOnly(functionName, args, decode, attributes = {}) {
+    return tracing.withSpan(`soroban ${functionName}`, {'contract.function': functionName, ...attributes},
+        () => simulateReadOnly(functionName, args, decode));
+}
+
+async function simulateReadOnly(functionName, args, decode) {
     const contract = new Contract(CONTRACT_ID);
     const account = new Account(SIMULATION_SOURCE, '0');
 
@@ -41,26 +54,70 @@ async function callReadOnly(functionName, args = []) {
     }
 
     const retval = simResult.result?.retval;
-    return retval ? sanitize(scValToNative(retval)) : null;
+    return retval ? decode(retval) : null;
 }
 
-// Submit a signed XDR transaction and wait for confirmation
-async function submitTx(signedXdr) {
-    const tx = TransactionBuilder.fromXDR(signedXdr, NETWORK_PASSPHRASE);
+// i128 return values as decimal strings
+function decodeI128(scv) {
+    return scValToBigInt(scv).toString();
+}
+
+// Hash of a signed envelope (the same hash sendTransaction reports).
+// Returns null for undecodable XDR.
+function hashSignedXdr(signedXdr) {
+    try {
+        return TransactionBuilder.fromXDR(signedXdr, NETWORK_PASSPHRASE).hash().toString('hex');
+    } catch (_) {
+        return null;
+    }
+}
+
+function toSubmitResult(hash, getResult) {
+    // Extract return value if any
+    let returnValue = null;
+    if (getResult.returnValue) {
+        returnValue = sanitize(scValToNative(getResult.returnValue));
+    }
+
+    return {
+        hash,
+        ledger: getResult.ledger,
+        returnValue,
+    };
+}
+
+async function sendAndConfirm(tx, hash) {
+    // Optional local simulation gate: a call that would fail on-chain is
+    // rejected in one fast RPC instead of after up to 30s of polling
+    if (PRESIMULATE) {
+        const sim = await server.simulateTransaction(tx);
+        if (SorobanRpc.Api.isSimulationError(sim)) {
+            throw rejectTx(`simulation failed: ${sim.error}`);
+        }
+    }
+
     const sendResult = await server.sendTransaction(tx);
 
     if (sendResult.status === 'ERROR') {
+        // A retry of an envelope that already landed fails with a sequence
+        // error; one lookup tells us whether it actually succeeded.
+        const previous = await server.getTransaction(hash);
+        if (previous.status === 'SUCCESS') {
+            return toSubmitResult(hash, previous);
+        }
         throw new Error(`sendTransaction failed: ${JSON.stringify(sendResult.errorResult)}`);
     }
 
-    // Poll for confirmation
-    const hash = sendResult.hash;
+    // Poll for confirmation (DUPLICATE means it is already pending: same wait)
     let getResult;
+    const span = tracing.currentSpan();
+    span?.setAttribute('tx.send_status', sendResult.status);
     for (let i = 0; i < 30; i++) {
         await new Promise((r) => setTimeout(r, 1000));
         getResult = await server.getTransaction(hash);
         if (getResult.status !== 'NOT_FOUND') break;
     }
+    span?.setAttributes({'tx.status': getResult?.status, 'tx.ledger': getResult?.ledger});
 
     if (!getResult || getResult.status === 'NOT_FOUND') {
         throw new Error(`Transaction ${hash} not confirmed after 30s`);
@@ -70,56 +127,149 @@ async function submitTx(signedXdr) {
         throw new Error(`Transaction ${hash} failed`);
     }
 
-    // Extract return value if any
-    let returnValue = null;
-    if (getResult.returnValue) {
-        returnValue = sanitize(scValToNative(getResult.returnValue));
+    return toSubmitResult(hash, getResult);
+}
+
+// ─── Pre-submission validation ────────────────────────────────────────────────
+// Argument positions of each contract entry point that the API submits.
+// `caller` is the address that must authorize (and sign) the call.
+const CALL_SPECS = {
+    create_invoice: {caller: 0},
+    contribute: {trip: 0, caller: 1, amount: 2},
+    withdraw: {trip: 0, caller: 1},
+    confirm_release: {trip: 0, caller: 1},
+    release: {trip: 0},
+    cancel: {trip: 0},
+    claim_deadline: {trip: 0},
+    update_recipients: {trip: 0},
+};
+
+function rejectTx(message) {
+    const err = new Error(`Invalid transaction: ${message}`);
+    err.status = 400;
+    return err;
+}
+
+/**
+ * Check that a signed envelope is the contract call the route expects before
+ * spending an RPC round trip on it: a single invokeContract of CONTRACT_ID,
+ * the right function, trip_id, caller and amount, sourced from the caller's
+ * wallet. Pure decoding, no network.
+ *
+ * expected: {fn, tripId?, wallet, amountStroops?}
+ */
+async function verifySignedTx(signedXdr, expected) {
+    const spec = CALL_SPECS[expected.fn];
+    if (spec.trip !== undefined && expected.tripId == null) {
+        throw rejectTx('invoice is not linked to the contract');
     }
 
-    return {
-        hash,
-        ledger: getResult.ledger,
-        returnValue,
-    };
+    let tx;
+    try {
+        tx = TransactionBuilder.fromXDR(signedXdr, NETWORK_PASSPHRASE);
+    } catch (_) {
+        throw rejectTx('malformed XDR envelope');
+    }
+    if (tx instanceof FeeBumpTransaction) {
+        tx = tx.innerTransaction;
+    }
+
+    if (!tx.signatures.length) {
+        throw rejectTx('envelope is not signed');
+    }
+    if (tx.source !== expected.wallet) {
+        throw rejectTx('source account does not match your wallet');
+    }
+    if (tx.operations.length !== 1 || tx.operations[0].type !== 'invokeHostFunction') {
+        throw rejectTx('expected a single contract invocation');
+    }
+
+    const func = tx.operations[0].func;
+    if (func.switch() !== xdr.HostFunctionType.hostFunctionTypeInvokeContract()) {
+        throw rejectTx('expected a contract invocation');
+    }
+    const invoke = func.invokeContract();
+    if (Address.fromScAddress(invoke.contractAddress()).toString() !== CONTRACT_ID) {
+        throw rejectTx('wrong contract');
+    }
+    if (invoke.functionName().toString() !== expected.fn) {
+        throw rejectTx(`expected a call to ${expected.fn}`);
+    }
+
+    const args = invoke.args();
+    try {
+        if (spec.trip !== undefined
+            && BigInt(scValToNative(args[spec.trip])) !== BigInt(expected.tripId)) {
+            throw rejectTx('trip_id does not match this invoice');
+        }
+        if (spec.caller !== undefined
+            && Address.fromScVal(args[spec.caller]).toString() !== expected.wallet) {
+            throw rejectTx('caller address does not match your wallet');
+        }
+        if (spec.amount !== undefined && expected.amountStroops !== undefined
+            && BigInt(scValToNative(args[spec.amount])) !== BigInt(expected.amountStroops)) {
+            throw rejectTx('amount does not match the signed transaction');
+        }
+    } catch (err) {
+        if (err.status) throw err;
+        throw rejectTx(`unexpected arguments for ${expected.fn}`);
+    }
 }
 
-// ─── Soroban enum helper ──────────────────────────────────────────────────────
-// Soroban unit-variant enums are encoded as ScVec: e.g. Status::Completed →
-//   { vec: [{ symbol: "Completed" }] } → scValToNative returns ["Completed"].
-// This helper normalises any representation to a lowercase string.
+// hash -> Promise of the submission currently waiting for confirmation
+const inflight = new Map();
+
+// Submit a signed XDR transaction and wait for confirmation.
+// Concurrent submissions of the same envelope share one confirmation wait.
+async function submitTx(signedXdr) {
+    const tx = TransactionBuilder.fromXDR(signedXdr, NETWORK_PASSPHRASE);
+    const hash = tx.hash().toString('hex');
 
-function normalizeEnum(val) {
-    if (typeof val === 'string') return val.toLowerCase();
-    if (Array.isArray(val) && val.length > 0) return String(val[0]).toLowerCase();
-    if (typeof val === 'number') return String(val); // integer enum fallback
-    if (val && typeof val === 'object') {
-        const key = Object.keys(val)[0];
-        return key ? key.toLowerCase() : null;
+    if (inflight.has(hash)) {
+        return inflight.get(hash);
     }
-    return null;
+
+    const pending = tracing.withSpan('soroban submitTx', {'tx.hash': hash}, () => sendAndConfirm(tx, hash))
+        .finally(() => inflight.delete(hash));
+    inflight.set(hash, pending);
+    return pending;
+}
+
+// Wait (up to timeoutMs) for the submissions still polling for confirmation,
+// so a worker being shut down doesn't abandon a contribution mid-wait.
+// Resolves with the number still pending when it gave up.
+async function drainSubmissions(timeoutMs) {
+    if (inflight.size === 0) return 0;
+    let timer;
+    const timeout = new Promise((resolve) => {
+        timer = setTimeout(resolve, timeoutMs);
+    });
+    await Promise.race([Promise.allSettled([...inflight.values()]), timeout]);
+    clearTimeout(timer);
+    return inflight.size;
 }
 
 module.exports = {
     // ─── Read-only contract queries ─────────────────────────────────────────
 
     async getTripState(poolId) {
-        const raw = await callReadOnly('get_state', [
+        return callReadOnly('get_state', [
             nativeToScVal(poolId, {type: 'u64'}),
-        ]);
-        if (raw && raw.status !== undefined) {
-            raw.status = normalizeEnum(raw.status);
-        }
-        return raw;
+        ], codecs.decodeState, {'contract.trip_id': String(poolId)});
     },
 
     async getPenalty(poolId, walletAddress) {
         return callReadOnly('get_penalty', [
             nativeToScVal(poolId, {type: 'u64'}),
             new Address(walletAddress).toScVal(),
-        ]);
+        ], decodeI128, {'contract.trip_id': String(poolId)});
     },
 
     // ─── Submit signed XDR ──────────────────────────────────────────────────
     submitTx,
+    drainSubmissions,
+    pendingSubmissions: () => inflight.size,
+    hashSignedXdr,
+    verifySignedTx,
     sanitize,
 };
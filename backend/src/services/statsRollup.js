@@ -0,0 +1,33 @@
+const logger = require('../config/logger');
+const statsModel = require('../models/statsModel');
+
+// ─── Daily statistics rollup ─────────────────────────────────────────────────
+// Keeps daily_stats current for /api/admin/analytics. Each run recomputes
+// yesterday and today: today is still filling up, and yesterday picks up rows
+// committed after the last run before midnight. Older days are only rebuilt
+// on demand (POST /api/admin/analytics/rollup or scripts/rollup-stats.js).
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function isoDay(date) {
+    return date.toISOString().slice(0, 10);
+}
+
+async function rollupRecent(now = new Date()) {
+    const from = isoDay(new Date(now.getTime() - DAY_MS));
+    const to = isoDay(now);
+    const days = await statsModel.rollup(from, to);
+    logger.debug({from, to, days}, 'Daily stats rolled up');
+    return {from, to, days};
+}
+
+// Run rollupRecent every `intervalMs` in the background
+function schedule(intervalMs) {
+    const timer = setInterval(() => {
+        rollupRecent().catch((err) => logger.error({err}, 'Daily stats rollup failed'));
+    }, intervalMs);
+    timer.unref();
+    return timer;
+}
+
+module.exports = {rollupRecent, schedule, isoDay};
@@ -0,0 +1,277 @@
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const {AsyncLocalStorage} = require('async_hooks');
+const {performance} = require('perf_hooks');
+
+// ─── Request tracing ─────────────────────────────────────────────────────────
+// OpenTelemetry-style spans without the SDK: the current span lives in an
+// AsyncLocalStorage, so any code running on behalf of a request (models, the
+// pg pool, the RPC pool, MinIO calls) can open child spans without passing a
+// context around. Incoming W3C `traceparent` headers are continued.
+//
+// Finished spans are exported in OTLP/JSON:
+//   TRACE_EXPORTER=console    one JSON span per line on stdout
+//   TRACE_EXPORTER=otlp-file  ExportTraceServiceRequest batches, one per line,
+//                             appended to TRACE_FILE (logs/traces.jsonl); the
+//                             format the OTel collector's file receiver reads
+// With no exporter configured tracing is off and withSpan just calls fn.
+
+const SPAN_KIND = {INTERNAL: 1, SERVER: 2, CLIENT: 3};
+const STATUS = {UNSET: 0, OK: 1, ERROR: 2};
+const FLUSH_INTERVAL_MS = 1000;
+const MAX_BATCH = 512;
+
+const storage = new AsyncLocalStorage();
+let exporter = null;
+let sampleRatio = 1;
+
+// Epoch time in nanoseconds, at microsecond precision (a float of epoch
+// nanoseconds would exceed Number.MAX_SAFE_INTEGER)
+function nowNanos() {
+    return BigInt(Math.round((performance.timeOrigin + performance.now()) * 1e3)) * 1000n;
+}
+
+function randomHex(bytes) {
+    return crypto.randomBytes(bytes).toString('hex');
+}
+
+// Parse a W3C traceparent header: 00-<32 hex trace id>-<16 hex span id>-<flags>
+function parseTraceparent(header) {
+    const m = /^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/.exec(String(header || '').trim());
+    if (!m || /^0+$/.test(m[1]) || /^0+$/.test(m[2])) return null;
+    return {traceId: m[1], spanId: m[2], sampled: (parseInt(m[3], 16) & 1) === 1};
+}
+
+function toAttributeValue(value) {
+    if (typeof value === 'boolean') return {boolValue: value};
+    if (Number.isInteger(value)) return {intValue: String(value)};
+    if (typeof value === 'number') return {doubleValue: value};
+    return {stringValue: String(value)};
+}
+
+class Span {
+    constructor(name, {kind = SPAN_KIND.INTERNAL, attributes = {}, parent = null, remote = null} = {}) {
+        this.name = name;
+        this.kind = kind;
+        this.traceId = parent?.traceId || remote?.traceId || randomHex(16);
+        this.spanId = randomHex(8);
+        this.parentSpanId = parent?.spanId || remote?.spanId || '';
+        this.sampled = parent ? parent.sampled : (remote ? remote.sampled : Math.random() < sampleRatio);
+        this.attributes = {};
+        this.setAttributes(attributes);
+        this.events = [];
+        this.status = {code: STATUS.UNSET};
+        this.start = nowNanos();
+        this.end = null;
+    }
+
+    setAttribute(key, value) {
+        if (value !== undefined && value !== null) this.attributes[key] = value;
+        return this;
+    }
+
+    setAttributes(attributes) {
+        for (const [key, value] of Object.entries(attributes)) this.setAttribute(key, value);
+        return this;
+    }
+
+    addEvent(name, attributes = {}) {
+        this.events.push({name, time: nowNanos(), attributes});
+        return this;
+    }
+
+    recordError(err) {
+        this.status = {code: STATUS.ERROR, message: err?.message || String(err)};
+        this.addEvent('exception', {'exception.message': err?.message || String(err)});
+        return this;
+    }
+
+    finish() {
+        if (this.end !== null) return;
+        this.end = nowNanos();
+        if (this.sampled && exporter) exporter.export(this);
+    }
+
+    traceparent() {
+        return `00-${this.traceId}-${this.spanId}-${this.sampled ? '01' : '00'}`;
+    }
+
+    toOtlp() {
+        return {
+            traceId: this.traceId,
+            spanId: this.spanId,
+            parentSpanId: this.parentSpanId,
+            name: this.name,
+            kind: this.kind,
+            startTimeUnixNano: String(this.start),
+            endTimeUnixNano: String(this.end),
+            attributes: Object.entries(this.attributes).map(([key, value]) => ({key, value: toAttributeValue(value)})),
+            events: this.events.map((e) => ({
+                name: e.name,
+                timeUnixNano: String(e.time),
+                attributes: Object.entries(e.attributes).map(([key, value]) => ({key, value: toAttributeValue(value)})),
+            })),
+            status: this.status,
+        };
+    }
+}
+
+// ─── Exporters ───────────────────────────────────────────────────────────────
+
+const RESOURCE = {
+    attributes: [
+        {key: 'service.name', value: {stringValue: 'cotravel-api'}},
+        {key: 'process.pid', value: {intValue: String(process.pid)}},
+    ],
+};
+
+function consoleExporter() {
+    return {
+        export(span) {
+            process.stdout.write(`${JSON.stringify(span.toOtlp())}\n`);
+        },
+        flush() {
+        },
+    };
+}
+
+// Buffers spans and appends one OTLP/JSON request per flush
+function otlpFileExporter(file) {
+    fs.mkdirSync(path.dirname(file), {recursive: true});
+    let batch = [];
+
+    const flush = () => {
+        if (batch.length === 0) return;
+        const request = {
+            resourceSpans: [{
+                resource: RESOURCE,
+                scopeSpans: [{scope: {name: 'cotravel-api'}, spans: batch.map((s) => s.toOtlp())}],
+            }],
+        };
+        batch = [];
+        fs.appendFile(file, `${JSON.stringify(request)}\n`, () => {
+        });
+    };
+
+    const timer = setInterval(flush, FLUSH_INTERVAL_MS);
+    timer.unref();
+    process.once('beforeExit', flush);
+
+    return {
+        export(span) {
+            batch.push(span);
+            if (batch.length >= MAX_BATCH) flush();
+        },
+        flush,
+    };
+}
+
+// Install an exporter ({export(span), flush()}) or null to turn tracing off
+function setExporter(next) {
+    if (exporter) exporter.flush();
+    exporter = next;
+}
+
+function configure(env = process.env) {
+    sampleRatio = env.TRACE_SAMPLE_RATIO === undefined ? 1 : Number(env.TRACE_SAMPLE_RATIO);
+    if (env.TRACE_EXPORTER === 'console') {
+        setExporter(consoleExporter());
+    } else if (env.TRACE_EXPORTER === 'otlp-file') {
+        const file = env.TRACE_FILE || path.join(__dirname, '..', '..', 'logs', 'traces.jsonl');
+        setExporter(otlpFileExporter(file));
+    } else {
+        setExporter(null);
+    }
+}
+
+// ─── API ─────────────────────────────────────────────────────────────────────
+
+function enabled() {
+    return exporter !== null;
+}
+
+function currentSpan() {
+    return storage.getStore() || null;
+}
+
+// Set attributes on the current span (no-op outside a trace)
+function setAttributes(attributes) {
+    currentSpan()?.setAttributes(attributes);
+}
+
+// Run fn inside a child span of the current one. The span ends when the
+// returned promise settles and records the error if it rejects.
+async function withSpan(name, attributes, fn, kind = SPAN_KIND.INTERNAL) {
+    if (!enabled()) return fn();
+    const span = new Span(name, {kind, attributes, parent: currentSpan()});
+    try {
+        return await storage.run(span, () => fn(span));
+    } catch (err) {
+        span.recordError(err);
+        throw err;
+    } finally {
+        span.finish();
+    }
+}
+
+// Route template (/api/invoices/:id) for span names and metric labels, never
+// the raw URL. Read when the response finishes: req.route survives, but once
+// an error has left a mounted router Express resets req.baseUrl, so the mount
+// path is then taken from the URL segments the route itself did not match.
+function routeLabel(req) {
+    // Requests that matched no route (404s, scanners) share one label
+    if (!req.route) return 'unmatched';
+    const route = req.route.path;
+    if (req.baseUrl) return req.baseUrl + route;
+    const segments = req.originalUrl.split('?')[0].split('/').filter(Boolean);
+    const routeSegments = route.split('/').filter(Boolean).length;
+    const mount = segments.slice(0, segments.length - routeSegments).join('/');
+    return (mount ? `/${mount}` : '') + route;
+}
+
+// Express middleware: one SERVER span per request, continuing the caller's
+// traceparent. The rest of the request runs with that span as context.
+function tracingMiddleware(req, res, next) {
+    if (!enabled()) return next();
+
+    const span = new Span(`${req.method} request`, {
+        kind: SPAN_KIND.SERVER,
+        remote: parseTraceparent(req.headers.traceparent),
+        attributes: {
+            'http.method': req.method,
+            'http.target': req.originalUrl.split('?')[0],
+            'request.id': req.id,
+        },
+    });
+    req.traceId = span.traceId;
+    res.setHeader('traceparent', span.traceparent());
+
+    const done = () => {
+        const route = routeLabel(req);
+        span.name = `${req.method} ${route}`;
+        span.setAttributes({'http.route': route, 'http.status_code': res.statusCode});
+        if (req.user) span.setAttribute('user.id', req.user.id);
+        if (res.statusCode >= 500) span.status = {code: STATUS.ERROR};
+        span.finish();
+    };
+    res.once('finish', done);
+    res.once('close', done);
+
+    storage.run(span, next);
+}
+
+configure();
+
+module.exports = {
+    withSpan,
+    currentSpan,
+    setAttributes,
+    tracingMiddleware,
+    routeLabel,
+    parseTraceparent,
+    setExporter,
+    configure,
+    enabled,
+    SPAN_KIND,
+};
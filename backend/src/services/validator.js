@@ -0,0 +1,172 @@
+// ─── Compiled request validators ─────────────────────────────────────────────
+// compileValidator(schema) walks a request schema once and returns a
+// function (value) => error message | null. Routes run it through the
+// validate() middleware before loading anything, so malformed requests are
+// rejected without a DB query or an RPC call.
+//
+// Schema keywords (a JSON Schema subset, plus the ones the API needs):
+//   type        'string' | 'integer' | 'numeric' | 'boolean' | 'array' | 'object'
+//               integer and numeric also accept numeric strings ("5", "10.5"),
+//               as amounts and ids arrive from forms and query strings
+//   required    object: keys that must be present and not null, '' or []
+//   properties  object: schemas for its keys, checked in declared order
+//   items       array: schema for every element
+//   minItems, maxItems, minLength, maxLength, pattern, enum
+//   minimum, exclusiveMinimum, maximum
+//   format      'date-time': parseable by Date
+//   future      with format date-time: later than now
+//   check       (value, parent) => boolean, runs after everything else
+//   errors      {keyword: message} overrides, `default` for every keyword;
+//               a message can be (value, parent) => string
+//
+// Keywords are checked in the order above and the first failure wins, so a
+// schema reproduces the order of the checks it replaces.
+
+function isMissing(value) {
+    return value === undefined || value === null || value === ''
+        || (Array.isArray(value) && value.length === 0);
+}
+
+function isNumeric(value) {
+    if (typeof value === 'number') return Number.isFinite(value);
+    return typeof value === 'string' && value.trim() !== '' && Number.isFinite(Number(value));
+}
+
+const TYPE_CHECKS = {
+    string: (v) => typeof v === 'string',
+    numeric: isNumeric,
+    integer: (v) => isNumeric(v) && Number.isInteger(Number(v)),
+    boolean: (v) => typeof v === 'boolean',
+    array: Array.isArray,
+    object: (v) => v !== null && typeof v === 'object' && !Array.isArray(v),
+};
+
+const TYPE_NAMES = {
+    string: 'a string',
+    numeric: 'a number',
+    integer: 'an integer',
+    boolean: 'a boolean',
+    array: 'an array',
+    object: 'an object',
+};
+
+function defaultMessage(keyword, schema, path) {
+    switch (keyword) {
+        case 'required':
+            return `${path} is required`;
+        case 'type':
+            return `${path} must be ${TYPE_NAMES[schema.type]}`;
+        case 'minItems':
+            return `${path} must have at least ${schema.minItems} items`;
+        case 'maxItems':
+            return `${path} must have at most ${schema.maxItems} items`;
+        case 'minLength':
+            return `${path} must be at least ${schema.minLength} characters`;
+        case 'maxLength':
+            return `${path} must be at most ${schema.maxLength} characters`;
+        case 'enum':
+            return `${path} must be one of: ${schema.enum.join(', ')}`;
+        case 'minimum':
+            return `${path} must be at least ${schema.minimum}`;
+        case 'exclusiveMinimum':
+            return `${path} must be greater than ${schema.exclusiveMinimum}`;
+        case 'maximum':
+            return `${path} must be at most ${schema.maximum}`;
+        case 'format':
+            return `${path} must be a valid date`;
+        case 'future':
+            return `${path} must be in the future`;
+        default:
+            return `${path} is invalid`;
+    }
+}
+
+// (value, parent) => message, resolved once per schema node and keyword
+function messageFor(keyword, schema, path, fallback = undefined) {
+    const message = schema.errors?.[keyword] ?? fallback ?? schema.errors?.default
+        ?? defaultMessage(keyword, schema, path);
+    return typeof message === 'function' ? message : () => message;
+}
+
+function compileNode(schema, path) {
+    if (schema.type && !TYPE_CHECKS[schema.type]) {
+        throw new TypeError(`Unsupported request schema type at ${path}: ${schema.type}`);
+    }
+    if (schema.format && schema.format !== 'date-time') {
+        throw new TypeError(`Unsupported request schema format at ${path}: ${schema.format}`);
+    }
+    if ((schema.properties || schema.required) && schema.type !== 'object') {
+        throw new TypeError(`Request schema with properties must have type object at ${path || 'root'}`);
+    }
+
+    // Each rule: (value, parent) => message | null
+    const rules = [];
+    const rule = (keyword, test) => {
+        const message = messageFor(keyword, schema, path);
+        rules.push((v, parent) => (test(v, parent) ? null : message(v, parent)));
+    };
+
+    if (schema.type) rule('type', TYPE_CHECKS[schema.type]);
+    if (schema.minLength !== undefined) rule('minLength', (v) => v.length >= schema.minLength);
+    if (schema.maxLength !== undefined) rule('maxLength', (v) => v.length <= schema.maxLength);
+    if (schema.pattern) rule('pattern', (v) => schema.pattern.test(v));
+    if (schema.enum) {
+        const allowed = new Set(schema.enum);
+        rule('enum', (v) => allowed.has(v));
+    }
+    if (schema.minimum !== undefined) rule('minimum', (v) => Number(v) >= schema.minimum);
+    if (schema.exclusiveMinimum !== undefined) rule('exclusiveMinimum', (v) => Number(v) > schema.exclusiveMinimum);
+    if (schema.maximum !== undefined) rule('maximum', (v) => Number(v) <= schema.maximum);
+    if (schema.format === 'date-time') rule('format', (v) => !Number.isNaN(new Date(v).getTime()));
+    if (schema.future) rule('future', (v) => new Date(v) > new Date());
+    if (schema.minItems !== undefined) rule('minItems', (v) => v.length >= schema.minItems);
+    if (schema.maxItems !== undefined) rule('maxItems', (v) => v.length <= schema.maxItems);
+
+    if (schema.items) {
+        const itemPath = `${path}[]`;
+        const item = compileNode(schema.items, itemPath);
+        const missing = messageFor('type', schema.items, itemPath);
+        rules.push((v) => {
+            for (const element of v) {
+                const message = element === null || element === undefined ? missing(element, v) : item(element, v);
+                if (message !== null) return message;
+            }
+            return null;
+        });
+    }
+
+    for (const key of schema.required || []) {
+        const keyPath = path ? `${path}.${key}` : key;
+        const message = messageFor('required', schema.properties?.[key] ?? {}, keyPath, schema.errors?.required);
+        rules.push((v) => (isMissing(v[key]) ? message(v[key], v) : null));
+    }
+
+    for (const [key, propertySchema] of Object.entries(schema.properties || {})) {
+        const property = compileNode(propertySchema, path ? `${path}.${key}` : key);
+        rules.push((v) => (isMissing(v[key]) ? null : property(v[key], v)));
+    }
+
+    if (schema.check) rule('check', schema.check);
+
+    return function validateNode(value, parent) {
+        for (const check of rules) {
+            const message = check(value, parent);
+            if (message !== null) return message;
+        }
+        return null;
+    };
+}
+
+/**
+ * Compile a request schema into (value) => error message | null.
+ * Unsupported keywords throw when the route is declared.
+ */
+function compileValidator(schema) {
+    if (!schema || typeof schema !== 'object') {
+        throw new TypeError('Request schema must be an object');
+    }
+    const validateRoot = compileNode(schema, '');
+    return (value) => validateRoot(value, undefined);
+}
+
+module.exports = {compileValidator};
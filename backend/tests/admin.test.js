@@ -0,0 +1,203 @@
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction, pool} = require('./dbHelper');
+const {loginWithNewWallet, createTestBusiness, createTestInvoice} = require('./helpers');
+const {generateToken} = require('../src/middleware/auth');
+const statsModel = require('../src/models/statsModel');
+const {isoDay} = require('../src/services/statsRollup');
+const queryStats = require('../src/services/queryStats');
+const {PostgresStore} = require('../src/services/rateLimitStore');
+
+beforeEach(async () => {
+    await beginTransaction();
+    jest.clearAllMocks();
+});
+afterEach(() => rollbackTransaction());
+
+async function loginAsAdmin() {
+    const {user} = await loginWithNewWallet(app);
+    return generateToken({...user, role: 'admin'});
+}
+
+// ─── Access ──────────────────────────────────────────────────────────────────
+
+describe('Admin - Access', () => {
+    test('GET /api/admin/stats as a regular user returns 403', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const res = await request(app)
+            .get('/api/admin/stats')
+            .set('Authorization', `Bearer ${token}`);
+        expect(res.status).toBe(403);
+    });
+});
+
+// ─── Counters ────────────────────────────────────────────────────────────────
+
+describe('Admin - Stats counters', () => {
+    test('GET /api/admin/stats matches exact row counts', async () => {
+        const token = await loginAsAdmin();
+        const {rows: [exact]} = await pool.query(
+            `SELECT (SELECT COUNT(*)::int FROM users) AS users,
+                    (SELECT COUNT(*)::int FROM businesses WHERE active) AS businesses,
+                    (SELECT COUNT(*)::int FROM invoices) AS invoices`
+        );
+
+        const res = await request(app)
+            .get('/api/admin/stats')
+            .set('Authorization', `Bearer ${token}`);
+        expect(res.status).toBe(200);
+        expect(res.body).toEqual(exact);
+    });
+
+    test('counters follow inserts and business deactivation', async () => {
+        const before = await statsModel.getCounters();
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        await createTestInvoice(app, token);
+
+        let after = await statsModel.getCounters();
+        expect(after.users).toBe(before.users + 1);
+        expect(after.businesses).toBe(before.businesses + 1);
+        expect(after.invoices).toBe(before.invoices + 1);
+
+        await request(app)
+            .put(`/api/businesses/${business.id}`)
+            .set('Authorization', `Bearer ${token}`)
+            .send({active: false});
+        after = await statsModel.getCounters();
+        expect(after.businesses).toBe(before.businesses);
+    });
+});
+
+// ─── Analytics ───────────────────────────────────────────────────────────────
+
+describe('Admin - Analytics', () => {
+    test('rollup records today\'s signups, invoices and funding', async () => {
+        const adminToken = await loginAsAdmin();
+        const {token, user} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+        await pool.query(
+            `INSERT INTO transactions (invoice_id, user_id, tx_hash, type, amount)
+             VALUES ($1, $2, $3, 'contribute', $4)`,
+            [invoice.id, user.id, `test-${Date.now()}`, invoice.total_amount]
+        );
+
+        const today = isoDay(new Date());
+        const rollup = await request(app)
+            .post('/api/admin/analytics/rollup')
+            .set('Authorization', `Bearer ${adminToken}`)
+            .send({from: today, to: today});
+        expect(rollup.status).toBe(200);
+        expect(rollup.body.days).toBe(1);
+
+        const res = await request(app)
+            .get(`/api/admin/analytics?from=${today}&to=${today}`)
+            .set('Authorization', `Bearer ${adminToken}`);
+        expect(res.status).toBe(200);
+        expect(res.body.days).toHaveLength(1);
+
+        const day = res.body.days[0];
+        expect(day.day).toBe(today);
+        expect(day.new_users).toBeGreaterThanOrEqual(2);
+        expect(day.new_invoices).toBeGreaterThanOrEqual(1);
+        expect(day.invoices_by_status.draft).toBeGreaterThanOrEqual(1);
+        expect(parseFloat(day.total_collected)).toBeGreaterThanOrEqual(1000);
+        expect(day.funded_invoices).toBeGreaterThanOrEqual(1);
+        expect(day.avg_funding_seconds).not.toBeNull();
+        expect(res.body.totals.new_users).toBe(day.new_users);
+    });
+
+    test('GET /api/admin/analytics defaults to the last 30 days', async () => {
+        const token = await loginAsAdmin();
+        const res = await request(app)
+            .get('/api/admin/analytics')
+            .set('Authorization', `Bearer ${token}`);
+        expect(res.status).toBe(200);
+        expect(res.body.to).toBe(isoDay(new Date()));
+        expect((Date.parse(res.body.to) - Date.parse(res.body.from)) / 86400000).toBe(29);
+    });
+
+    test('GET /api/admin/analytics rejects invalid ranges', async () => {
+        const token = await loginAsAdmin();
+        for (const qs of ['from=2026-02-30', 'from=yesterday', 'from=2026-05-02&to=2026-05-01',
+            'from=2020-01-01&to=2026-01-01']) {
+            const res = await request(app)
+                .get(`/api/admin/analytics?${qs}`)
+                .set('Authorization', `Bearer ${token}`);
+            expect(res.status).toBe(400);
+        }
+    });
+});
+
+// ─── Query stats ─────────────────────────────────────────────────────────────
+
+describe('Admin - Query stats', () => {
+    afterEach(() => queryStats.reset());
+
+    test('fingerprints ignore literal values and IN list lengths', () => {
+        const a = queryStats.fingerprint('SELECT * FROM services WHERE price > 10 AND id IN (1, 2)\n LIMIT 20');
+        const b = queryStats.fingerprint("SELECT *  FROM services WHERE price > 99.5 AND id IN (3, 4, 5) LIMIT 5");
+        expect(a).toBe(b);
+        expect(queryStats.fingerprint('SELECT * FROM services WHERE price > $1')).not.toBe(a);
+        expect(queryStats.paramShapes([1, 'x', null, [1, 2], {a: 1}])).toBe('int, text, null, array(2), json');
+    });
+
+    test('slow SELECTs keep parameter shapes and an EXPLAIN plan', async () => {
+        queryStats.configure({SLOW_QUERY_MS: '0', SLOW_QUERY_EXPLAIN_RATE: '1'});
+        try {
+            const sql = 'SELECT id FROM users WHERE wallet_address = $1';
+            const explain = (text, values) => pool.query(`EXPLAIN (ANALYZE, FORMAT JSON) ${text}`, values);
+            queryStats.record(sql, ['GSECRETVALUE'], 12.5, {explain});
+            await new Promise((resolve) => setTimeout(resolve, 50));
+
+            const [entry] = queryStats.top();
+            expect(entry).toMatchObject({query: sql, calls: 1, slow: 1, param_shapes: ['text']});
+            expect(JSON.stringify(entry)).not.toContain('GSECRETVALUE');
+            expect(entry.plan[0].Plan).toBeDefined();
+        } finally {
+            queryStats.configure();
+        }
+    });
+
+    test('slow statements with side effects are never re-run under EXPLAIN', async () => {
+        queryStats.configure({SLOW_QUERY_MS: '0', SLOW_QUERY_EXPLAIN_RATE: '1'});
+        try {
+            const store = new PostgresStore();
+            const rule = {limit: 5, windowMs: 60 * 1000};
+            await store.consume('test:explain', 2, rule);
+
+            const explain = jest.fn((text, values) => pool.query(`EXPLAIN (ANALYZE, FORMAT JSON) ${text}`, values));
+            queryStats.record('SELECT granted, tokens_left FROM rate_limit_take($1, $2, $3, $4)',
+                ['test:explain', rule.limit, 2, rule.windowMs], 500, {explain});
+            queryStats.record('SELECT pg_notify($1, $2)', ['invoice_events', '{}'], 500, {explain});
+            expect(explain).not.toHaveBeenCalled();
+
+            // The bucket was debited once, by the store's own call
+            expect(await store.consume('test:explain', 3, rule)).toMatchObject({allowed: true, remaining: 0});
+
+            queryStats.record('SELECT COUNT(*) FROM users WHERE lower(username) = $1', ['x'], 500, {explain});
+            expect(explain).toHaveBeenCalledTimes(1);
+        } finally {
+            queryStats.configure();
+        }
+    });
+
+    test('GET /api/admin/queries returns the top fingerprints', async () => {
+        const token = await loginAsAdmin();
+        queryStats.record('SELECT 1 FROM users WHERE id = $1', [1], 1);
+        queryStats.record('SELECT 1 FROM users WHERE id = $1', [2], 3);
+        queryStats.record('SELECT 1 FROM businesses', [], 2);
+
+        const res = await request(app)
+            .get('/api/admin/queries?sort=calls&limit=1')
+            .set('Authorization', `Bearer ${token}`);
+        expect(res.status).toBe(200);
+        expect(res.body.queries).toHaveLength(1);
+        expect(res.body.queries[0]).toMatchObject({calls: 2, total_ms: 4, max_ms: 3});
+
+        const bad = await request(app)
+            .get('/api/admin/queries?sort=nope')
+            .set('Authorization', `Bearer ${token}`);
+        expect(bad.status).toBe(400);
+    });
+});
@@ -108,6 +108,20 @@ describe('Auth - Login', () => {
         expect(res.status).toBe(401);
     });
 
+    test('POST /api/auth/login challenge can only be used once', async () => {
+        const keypair = Keypair.random();
+        const wallet = keypair.publicKey();
+        const cr = await request(app).get('/api/auth/challenge').query({wallet});
+        const signature = signChallenge(cr.body.challenge, keypair);
+
+        const first = await request(app).post('/api/auth/login').send({wallet, signature});
+        expect(first.status).toBe(200);
+
+        const replay = await request(app).post('/api/auth/login').send({wallet, signature});
+        expect(replay.status).toBe(400);
+        expect(replay.body.error).toContain('No challenge found');
+    });
+
     test('POST /api/auth/login with tampered signature returns 401', async () => {
         const keypair = Keypair.random();
         const wallet = keypair.publicKey();
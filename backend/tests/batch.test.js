@@ -0,0 +1,116 @@
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction, pool} = require('./dbHelper');
+const {loginWithNewWallet, createTestInvoice} = require('./helpers');
+const {requestCost} = require('../src/middleware/rateLimit');
+const sorobanService = require('../src/services/sorobanService');
+const invoiceEvents = require('../src/services/invoiceEvents');
+const invoicesController = require('../src/controllers/invoicesController');
+const userModel = require('../src/models/userModel');
+
+jest.mock('../src/services/sorobanService');
+
+beforeEach(async () => {
+    await beginTransaction();
+    jest.clearAllMocks();
+    sorobanService.getTripState.mockResolvedValue(null);
+    sorobanService.hashSignedXdr.mockReturnValue(null);
+});
+afterEach(async () => {
+    jest.restoreAllMocks();
+    delete process.env.BATCH_TIMEOUT_MS;
+    await rollbackTransaction();
+});
+
+// ─── Batch ───────────────────────────────────────────────────────────────────
+
+describe('Batch', () => {
+    test('POST /api/batch runs GETs with shared auth and per-item status', async () => {
+        const {token, user} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+
+        const res = await request(app)
+            .post('/api/batch')
+            .set('Authorization', `Bearer ${token}`)
+            .send({
+                requests: [
+                    {id: 'invoice', path: `/api/invoices/${invoice.id}`},
+                    {id: 'me', path: '/api/auth/me'},
+                    {id: 'missing', path: '/api/invoices/999999'},
+                    {path: '/api/services'},
+                ],
+            });
+
+        expect(res.status).toBe(200);
+        const [inv, me, missing, services] = res.body.responses;
+        expect(inv).toMatchObject({id: 'invoice', status: 200, body: {id: invoice.id}});
+        expect(me).toMatchObject({id: 'me', status: 200, body: {id: user.id}});
+        expect(missing).toMatchObject({id: 'missing', status: 404, body: {error: 'Invoice not found'}});
+        expect(services.id).toBe('3');
+        expect(Array.isArray(services.body)).toBe(true);
+    });
+
+    test('identical model lookups run once per batch', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+        const query = jest.spyOn(pool, 'query');
+
+        const res = await request(app)
+            .post('/api/batch')
+            .set('Authorization', `Bearer ${token}`)
+            .send({
+                requests: [
+                    {path: `/api/invoices/${invoice.id}`},
+                    {path: `/api/invoices/${invoice.id}/participants`},
+                ],
+            });
+
+        expect(res.body.responses.map((r) => r.status)).toEqual([200, 200]);
+        const invoiceLookups = query.mock.calls.filter(([sql]) => /FROM invoices i\s+JOIN users u ON i\.organizer_id = u\.id\s+WHERE i\.id = \$1/.test(sql));
+        expect(invoiceLookups).toHaveLength(1);
+    });
+
+    test('rejects nested batches and event streams, costs one unit per GET', async () => {
+        const paths = ['/api/batch', '/api/Batch', '/api/invoices/1/events', '/api/invoices/1/events/',
+            '/api/invoices/1/Events', '/api/invoices/1/EVENTS/?last_event_id=1', '/images/x.png'];
+        for (const path of paths) {
+            const res = await request(app).post('/api/batch').send({requests: [{path}]});
+            expect(res.status).toBe(400);
+            expect(res.body.error).toBe(`Unsupported batch path: ${path}`);
+        }
+        expect(requestCost({method: 'POST', path: '/api/batch', body: {requests: [{}, {}, {}]}})).toBe(3);
+    });
+
+    test('event streams refuse batched requests without subscribing', () => {
+        const res = {
+            status(code) {
+                this.statusCode = code;
+                return this;
+            },
+            json(body) {
+                this.body = body;
+                return this;
+            },
+        };
+        invoicesController.streamEvents({batched: true, invoice: {id: 1}}, res);
+        expect(res.statusCode).toBe(400);
+        expect(invoiceEvents.subscriberCount(1)).toBe(0);
+    });
+
+    test('a sub-request that outlives BATCH_TIMEOUT_MS answers 504', async () => {
+        const {token} = await loginWithNewWallet(app);
+        process.env.BATCH_TIMEOUT_MS = '200';
+        jest.spyOn(userModel, 'findById').mockReturnValue(new Promise(() => {
+        }));
+
+        const res = await request(app)
+            .post('/api/batch')
+            .set('Authorization', `Bearer ${token}`)
+            .send({requests: [{id: 'me', path: '/api/auth/me'}, {id: 'services', path: '/api/services'}]});
+
+        expect(res.status).toBe(200);
+        const [me, services] = res.body.responses;
+        expect(me).toEqual({id: 'me', status: 504, body: {error: 'Sub-request timed out'}});
+        expect(services.status).toBe(200);
+    });
+});
@@ -1,7 +1,9 @@
 const request = require('supertest');
 const app = require('../src/app');
 const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {Keypair} = require('@stellar/stellar-sdk');
 const {loginWithNewWallet, createTestBusiness} = require('./helpers');
+const userModel = require('../src/models/userModel');
 
 beforeEach(async () => {
     await beginTransaction();
@@ -39,6 +41,20 @@ describe('Businesses - Public', () => {
         const res = await request(app).get('/api/businesses/99999');
         expect(res.status).toBe(404);
     });
+
+    test('GET /api/businesses/:id is stale after the owner changes wallet', async () => {
+        const {token, user} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+
+        const first = await request(app).get(`/api/businesses/${business.id}`);
+        await userModel.updateWallet(user.id, Keypair.random().publicKey());
+
+        const res = await request(app)
+            .get(`/api/businesses/${business.id}`)
+            .set('If-None-Match', first.headers.etag);
+        expect(res.status).toBe(200);
+        expect(res.body.owner_wallet).not.toBe(first.body.owner_wallet);
+    });
 });
 
 describe('Businesses - Protected', () => {
@@ -180,6 +180,102 @@ describe('Cart - CRUD', () => {
     });
 });
 
+// ─── Bulk Operations ─────────────────────────────────────────────────────────
+
+describe('Cart - Bulk', () => {
+    test('POST /api/cart/items/bulk adds several services and returns the cart', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        const first = await createTestService(app, token, business.id);
+        const second = await createTestService(app, token, business.id);
+
+        const res = await request(app)
+            .post('/api/cart/items/bulk')
+            .set('Authorization', `Bearer ${token}`)
+            .send({items: [{service_id: first.id, quantity: 2}, {service_id: second.id}, {service_id: first.id}]});
+
+        expect(res.status).toBe(200);
+        expect(res.body.items).toHaveLength(2);
+        expect(res.body.count).toBe(4);
+        expect(parseFloat(res.body.total)).toBe(2000);
+        expect(res.body.businesses).toHaveLength(1);
+        expect(res.body.businesses[0].business_id).toBe(business.id);
+        expect(parseFloat(res.body.businesses[0].subtotal)).toBe(2000);
+    });
+
+    test('POST /api/cart/items/bulk with replace overwrites quantities', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        const service = await createTestService(app, token, business.id);
+
+        await request(app)
+            .post('/api/cart/items')
+            .set('Authorization', `Bearer ${token}`)
+            .send({service_id: service.id, quantity: 5});
+
+        const res = await request(app)
+            .post('/api/cart/items/bulk')
+            .set('Authorization', `Bearer ${token}`)
+            .send({items: [{service_id: service.id, quantity: 2}], replace: true});
+
+        expect(res.status).toBe(200);
+        expect(res.body.count).toBe(2);
+    });
+
+    test('POST /api/cart/items/bulk with an unknown service adds nothing', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        const service = await createTestService(app, token, business.id);
+
+        const res = await request(app)
+            .post('/api/cart/items/bulk')
+            .set('Authorization', `Bearer ${token}`)
+            .send({items: [{service_id: service.id}, {service_id: 999999}]});
+        expect(res.status).toBe(404);
+        expect(res.body.error).toMatch(/999999/);
+
+        const cartRes = await request(app)
+            .get('/api/cart')
+            .set('Authorization', `Bearer ${token}`);
+        expect(cartRes.body.count).toBe(0);
+    });
+
+    test('POST /api/cart/items/bulk validates the payload', async () => {
+        const {token} = await loginWithNewWallet(app);
+        for (const body of [{}, {items: []}, {items: [{service_id: 'x'}]}, {items: [{service_id: 1, quantity: 0}]}]) {
+            const res = await request(app)
+                .post('/api/cart/items/bulk')
+                .set('Authorization', `Bearer ${token}`)
+                .send(body);
+            expect(res.status).toBe(400);
+        }
+    });
+
+    test('GET /api/cart returns subtotals per business', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const hotel = await createTestBusiness(app, token);
+        const tours = await createTestBusiness(app, token);
+        const room = await createTestService(app, token, hotel.id);
+        const tour = await createTestService(app, token, tours.id);
+
+        await request(app)
+            .post('/api/cart/items/bulk')
+            .set('Authorization', `Bearer ${token}`)
+            .send({items: [{service_id: room.id, quantity: 3}, {service_id: tour.id}]});
+
+        const res = await request(app)
+            .get('/api/cart')
+            .set('Authorization', `Bearer ${token}`);
+
+        expect(res.status).toBe(200);
+        expect(res.body.count).toBe(4);
+        expect(parseFloat(res.body.total)).toBe(2000);
+        const subtotals = Object.fromEntries(res.body.businesses.map((b) => [b.business_id, parseFloat(b.subtotal)]));
+        expect(subtotals).toEqual({[hotel.id]: 1500, [tours.id]: 500});
+        expect(res.body.items[0]).not.toHaveProperty('cart_count');
+    });
+});
+
 // ─── Ownership Checks ────────────────────────────────────────────────────────
 
 describe('Cart - Ownership', () => {
@@ -254,6 +350,40 @@ describe('Cart - Checkout', () => {
         expect(cartRes.body.count).toBe(0);
     });
 
+    test('POST /api/cart/checkout turns every cart line into an invoice item', async () => {
+        const {token, user} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        const first = await createTestService(app, token, business.id);
+        const second = await createTestService(app, token, business.id);
+
+        for (const [service, quantity] of [[first, 1], [second, 3]]) {
+            await request(app)
+                .post('/api/cart/items')
+                .set('Authorization', `Bearer ${token}`)
+                .send({service_id: service.id, quantity});
+        }
+
+        const res = await request(app)
+            .post('/api/cart/checkout')
+            .set('Authorization', `Bearer ${token}`)
+            .send({
+                name: 'Two Line Checkout',
+                deadline: new Date(Date.now() + 86400000).toISOString(),
+            });
+        expect(res.status).toBe(201);
+        expect(parseFloat(res.body.total_amount)).toBe(2000); // 500 + 500 * 3
+        expect(res.body.organizer_wallet).toBe(user.wallet_address);
+
+        const invoiceRes = await request(app)
+            .get(`/api/invoices/${res.body.id}`)
+            .set('Authorization', `Bearer ${token}`);
+        const items = invoiceRes.body.items;
+        expect(items).toHaveLength(2);
+        expect(items.map((i) => i.sort_order).sort()).toEqual([0, 1]);
+        expect(items.map((i) => parseFloat(i.amount)).sort((a, b) => a - b)).toEqual([500, 1500]);
+        expect(items.every((i) => i.recipient_wallet === business.wallet_address)).toBe(true);
+    });
+
     test('POST /api/cart/checkout with empty cart returns 400', async () => {
         const {token} = await loginWithNewWallet(app);
         const res = await request(app)
@@ -0,0 +1,72 @@
+const http = require('http');
+const zlib = require('zlib');
+const express = require('express');
+const {compression, negotiate} = require('../src/middleware/compression');
+
+// App with a large and a small JSON body and an SSE stream
+const large = {items: Array.from({length: 200}, (_, i) => ({id: i, name: `Service ${i}`}))};
+const app = express();
+app.use(compression());
+app.get('/large', (req, res) => res.json(large));
+app.get('/small', (req, res) => res.json({ok: true}));
+app.get('/stream', (req, res) => {
+    res.set('Content-Type', 'text/event-stream');
+    res.write(`data: ${JSON.stringify(large)}\n\n`);
+    res.end();
+});
+
+let server;
+beforeAll((done) => {
+    server = app.listen(0, done);
+});
+afterAll((done) => server.close(done));
+
+// Raw GET: node's http client never decodes the body
+function get(path, acceptEncoding) {
+    return new Promise((resolve, reject) => {
+        const headers = acceptEncoding ? {'Accept-Encoding': acceptEncoding} : {};
+        http.get({port: server.address().port, path, headers}, (res) => {
+            const chunks = [];
+            res.on('data', (chunk) => chunks.push(chunk));
+            res.on('end', () => resolve({status: res.statusCode, headers: res.headers, body: Buffer.concat(chunks)}));
+        }).on('error', reject);
+    });
+}
+
+describe('Compression - Negotiation', () => {
+    test('prefers brotli, honours q-values and rejects unknown codings', () => {
+        expect(negotiate('gzip, deflate, br')).toBe('br');
+        expect(negotiate('br;q=0, gzip;q=0.5')).toBe('gzip');
+        expect(negotiate('gzip;q=1, br;q=0.8')).toBe('gzip');
+        expect(negotiate('identity')).toBeNull();
+        expect(negotiate(undefined)).toBeNull();
+    });
+});
+
+describe('Compression - Middleware', () => {
+    test('compresses JSON over the threshold with the negotiated coding', async () => {
+        const br = await get('/large', 'gzip, br');
+        expect(br.headers['content-encoding']).toBe('br');
+        expect(br.headers.vary).toMatch(/Accept-Encoding/);
+        expect(Number(br.headers['content-length'])).toBe(br.body.length);
+        expect(JSON.parse(zlib.brotliDecompressSync(br.body))).toEqual(large);
+
+        const gzip = await get('/large', 'gzip');
+        expect(gzip.headers['content-encoding']).toBe('gzip');
+        expect(JSON.parse(zlib.gunzipSync(gzip.body))).toEqual(large);
+    });
+
+    test('leaves small bodies, streams and plain clients uncompressed', async () => {
+        const small = await get('/small', 'br');
+        expect(small.headers['content-encoding']).toBeUndefined();
+        expect(JSON.parse(small.body)).toEqual({ok: true});
+
+        const plain = await get('/large');
+        expect(plain.headers['content-encoding']).toBeUndefined();
+        expect(plain.headers.vary).toMatch(/Accept-Encoding/);
+        expect(JSON.parse(plain.body)).toEqual(large);
+
+        const stream = await get('/stream', 'br');
+        expect(stream.headers['content-encoding']).toBeUndefined();
+    });
+});
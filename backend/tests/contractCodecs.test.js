@@ -0,0 +1,48 @@
+const fs = require('fs');
+const {Keypair, xdr} = require('@stellar/stellar-sdk');
+const {generate, CONTRACT_SRC, OUTPUT} = require('../scripts/gen-contract-codecs');
+const codecs = require('../src/services/contractCodecs');
+
+describe('Contract codecs', () => {
+    test('generated file is up to date with the contract', () => {
+        const expected = generate(fs.readFileSync(CONTRACT_SRC, 'utf8'));
+        expect(fs.readFileSync(OUTPUT, 'utf8')).toBe(expected);
+    });
+
+    test('State round-trips with a lowercase status', () => {
+        const state = {
+            status: 'completed',
+            total_collected: '170141183460469231731687303715884105727',
+            participant_count: 3,
+            version: 7,
+            confirmation_count: 2,
+        };
+        expect(codecs.decodeState(codecs.encodeState(state))).toEqual(state);
+    });
+
+    test('Config round-trips addresses and u64 deadline', () => {
+        const config = {
+            organizer: Keypair.random().publicKey(),
+            token: process.env.NATIVE_TOKEN_ID,
+            target_amount: '5000000000',
+            min_participants: 2,
+            deadline: '1893456000',
+            penalty_percent: 10,
+            auto_release: true,
+        };
+        expect(codecs.decodeConfig(codecs.encodeConfig(config))).toEqual(config);
+    });
+
+    test('unknown Status variant throws instead of passing through', () => {
+        const scv = xdr.ScVal.scvVec([xdr.ScVal.scvSymbol('Paused')]);
+        expect(() => codecs.decodeStatus(scv)).toThrow('unknown variant Paused');
+    });
+
+    test('wrong field type throws', () => {
+        const scv = xdr.ScVal.scvMap([
+            new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('address'), val: xdr.ScVal.scvU32(1)}),
+            new xdr.ScMapEntry({key: xdr.ScVal.scvSymbol('amount'), val: xdr.ScVal.scvU32(1)}),
+        ]);
+        expect(() => codecs.decodeRecipient(scv)).toThrow('Expected scvAddress');
+    });
+});
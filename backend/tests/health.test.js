@@ -1,9 +1,19 @@
 const request = require('supertest');
 const app = require('../src/app');
 const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const prober = require('../src/services/healthProber');
+const {minioClient} = require('../src/config/minio');
+const {server: sorobanRpc} = require('../src/config/soroban');
 
-beforeEach(() => beginTransaction());
-afterEach(() => rollbackTransaction());
+beforeEach(async () => {
+    await beginTransaction();
+    jest.spyOn(sorobanRpc, 'getLatestLedger').mockResolvedValue({sequence: 4242});
+});
+afterEach(async () => {
+    jest.restoreAllMocks();
+    prober._reset();
+    await rollbackTransaction();
+});
 
 describe('Health Checks', () => {
     test('GET / returns API running message', async () => {
@@ -19,4 +29,42 @@ describe('Health Checks', () => {
         expect(res.body.status).toBe('ok');
         expect(res.body.database).toBe('connected');
     });
+
+    test('GET /health/live answers without probing dependencies', async () => {
+        const res = await request(app).get('/health/live');
+        expect(res.status).toBe(200);
+        expect(res.body.status).toBe('ok');
+        expect(prober.snapshot().dependencies.postgres.status).toBe('unknown');
+    });
+
+    test('GET /health/ready reports latency and age per dependency', async () => {
+        const res = await request(app).get('/health/ready');
+        expect(res.status).toBe(200);
+        expect(res.body.status).toBe('ok');
+        const {postgres, soroban} = res.body.dependencies;
+        expect(postgres).toMatchObject({status: 'up', critical: true, stale: false});
+        expect(typeof postgres.latency_ms).toBe('number');
+        expect(soroban).toMatchObject({status: 'up', critical: false, ledger: 4242});
+    });
+
+    test('GET /health/ready serves cached results and fails on a critical dependency', async () => {
+        await prober.refresh();
+        const bucketExists = jest.spyOn(minioClient, 'bucketExists').mockRejectedValue(new Error('minio down'));
+
+        // Cached: the failure isn't seen until the next probe
+        expect((await request(app).get('/health/ready')).status).toBe(200);
+        expect(bucketExists).not.toHaveBeenCalled();
+
+        await prober.refresh(['minio']);
+        const res = await request(app).get('/health/ready');
+        expect(res.status).toBe(503);
+        expect(res.body.dependencies.minio).toMatchObject({status: 'down', error: 'minio down'});
+    });
+
+    test('a failing non-critical dependency keeps the instance ready', async () => {
+        sorobanRpc.getLatestLedger.mockRejectedValue(new Error('rpc down'));
+        const res = await request(app).get('/health/ready');
+        expect(res.status).toBe(200);
+        expect(res.body.dependencies.soroban.status).toBe('down');
+    });
 });
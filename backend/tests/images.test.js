@@ -1,11 +1,22 @@
 const request = require('supertest');
+const sharp = require('sharp');
 const app = require('../src/app');
 const {beginTransaction, rollbackTransaction} = require('./dbHelper');
-const {loginWithNewWallet} = require('./helpers');
+const {loginWithNewWallet, createTestBusiness} = require('./helpers');
 const {minioClient, BUCKETS, initBuckets} = require('../src/config/minio');
+const imageGc = require('../src/services/imageGc');
+const imageModel = require('../src/models/imageModel');
 
 let uploadedFiles = [];
 
+// Uploads are sniffed by magic bytes, so fixtures need a real PNG signature
+const PNG_SIGNATURE = Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]);
+const fakePng = () => Buffer.concat([PNG_SIGNATURE, Buffer.from('fake-png-data')]);
+// Decodable 640x480 PNG for the resize path
+const realPng = () => sharp({
+    create: {width: 640, height: 480, channels: 3, background: '#336699'},
+}).png().toBuffer();
+
 beforeAll(async () => {
     await initBuckets();
 });
@@ -19,6 +30,7 @@ afterEach(async () => {
     for (const filename of uploadedFiles) {
         try {
             await minioClient.removeObject(BUCKETS.IMAGES, filename);
+            await minioClient.removeObject(BUCKETS.DERIVATIVES, `${filename}/w320.webp`);
         } catch (_) { /* ignore cleanup errors */
         }
     }
@@ -32,18 +44,40 @@ describe('Images', () => {
         const res = await request(app)
             .post('/images/upload')
             .set('Authorization', `Bearer ${token}`)
-            .attach('image', Buffer.from('fake-png-data'), 'test-img.png');
+            .attach('image', fakePng(), 'test-img.png');
 
         expect(res.status).toBe(201);
         expect(res.body.filename).toBeDefined();
         expect(res.body.url).toContain('/images/');
         uploadedFiles.push(res.body.filename);
+
+        const stat = await minioClient.statObject(BUCKETS.IMAGES, res.body.filename);
+        expect(stat.size).toBe(fakePng().length);
+    });
+
+    test('POST /images/upload rejects content that is not an image', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const res = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', Buffer.from('<html>not an image</html>'), 'test-img.png');
+        expect(res.status).toBe(400);
+    });
+
+    test('POST /images/upload over 5MB returns 413', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const big = Buffer.concat([PNG_SIGNATURE, Buffer.alloc(5 * 1024 * 1024)]);
+        const res = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', big, 'too-big.png');
+        expect(res.status).toBe(413);
     });
 
     test('POST /images/upload without auth returns 401', async () => {
         const res = await request(app)
             .post('/images/upload')
-            .attach('image', Buffer.from('fake-png-data'), 'test-img.png');
+            .attach('image', fakePng(), 'test-img.png');
         expect(res.status).toBe(401);
     });
 
@@ -60,7 +94,7 @@ describe('Images', () => {
         const upload = await request(app)
             .post('/images/upload')
             .set('Authorization', `Bearer ${token}`)
-            .attach('image', Buffer.from('fake-png-data'), 'stream-test.png');
+            .attach('image', fakePng(), 'stream-test.png');
         const filename = upload.body.filename;
         uploadedFiles.push(filename);
 
@@ -68,6 +102,189 @@ describe('Images', () => {
         expect(res.status).toBe(200);
     });
 
+    test('GET /images/:filename?w=&fmt= returns a resized variant', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const upload = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', await realPng(), 'variant-test.png');
+        uploadedFiles.push(upload.body.filename);
+
+        const res = await request(app).get(`/images/${upload.body.filename}?w=320&fmt=webp`);
+        expect(res.status).toBe(200);
+        expect(res.headers['content-type']).toBe('image/webp');
+        const {format, width, height} = await sharp(res.body).metadata();
+        expect({format, width, height}).toEqual({format: 'webp', width: 320, height: 240});
+    });
+
+    test('variants fall back to the original when sharp fails to load', async () => {
+        await jest.isolateModulesAsync(async () => {
+            jest.doMock('sharp', () => {
+                throw new Error('Cannot find module \'sharp\'');
+            });
+            const imageDerivatives = require('../src/services/imageDerivatives');
+            expect(await imageDerivatives.getVariant('anything.png', {width: 320, fmt: 'webp'})).toBeNull();
+        });
+        jest.dontMock('sharp');
+    });
+
+    test('GET /images/:filename with a width outside the whitelist returns 400', async () => {
+        const res = await request(app).get('/images/anything.png?w=333');
+        expect(res.status).toBe(400);
+        expect(res.body.error).toContain('w must be one of');
+    });
+
+    test('GET /images/:filename sends validators and answers conditional requests with 304', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const upload = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', fakePng(), 'cache-test.png');
+        const filename = upload.body.filename;
+        uploadedFiles.push(filename);
+
+        const res = await request(app).get(`/images/${filename}`);
+        expect(res.status).toBe(200);
+        expect(res.headers.etag).toBeDefined();
+        expect(res.headers['last-modified']).toBeDefined();
+        expect(res.headers['accept-ranges']).toBe('bytes');
+        expect(res.headers['cache-control']).toContain('immutable');
+
+        const cached = await request(app)
+            .get(`/images/${filename}`)
+            .set('If-None-Match', res.headers.etag);
+        expect(cached.status).toBe(304);
+    });
+
+    test('GET /images/:filename with Range returns 206 with the requested bytes', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const upload = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', fakePng(), 'range-test.png');
+        const filename = upload.body.filename;
+        uploadedFiles.push(filename);
+
+        const res = await request(app)
+            .get(`/images/${filename}`)
+            .set('Range', 'bytes=0-7')
+            .buffer(true)
+            .parse((r, cb) => {
+                const chunks = [];
+                r.on('data', (c) => chunks.push(c));
+                r.on('end', () => cb(null, Buffer.concat(chunks)));
+            });
+        expect(res.status).toBe(206);
+        expect(res.headers['content-range']).toBe(`bytes 0-7/${fakePng().length}`);
+        expect(Buffer.compare(res.body, PNG_SIGNATURE)).toBe(0);
+
+        const unsatisfiable = await request(app)
+            .get(`/images/${filename}`)
+            .set('Range', 'bytes=100000-');
+        expect(unsatisfiable.status).toBe(416);
+    });
+
+    test('presigned POST upload is verified by /images/complete', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const body = fakePng();
+
+        const presign = await request(app)
+            .post('/images/presign')
+            .set('Authorization', `Bearer ${token}`)
+            .send({filename: 'direct.png', content_type: 'image/png', size: body.length});
+        expect(presign.status).toBe(200);
+        expect(presign.body.fields.policy).toBeDefined();
+        uploadedFiles.push(presign.body.filename);
+
+        const form = new FormData();
+        for (const [name, value] of Object.entries(presign.body.fields)) form.append(name, value);
+        form.append('file', new Blob([body], {type: 'image/png'}));
+        const put = await fetch(presign.body.url, {method: 'POST', body: form});
+        expect(put.status).toBeLessThan(300);
+
+        const res = await request(app)
+            .post('/images/complete')
+            .set('Authorization', `Bearer ${token}`)
+            .send({upload_token: presign.body.upload_token});
+        expect(res.status).toBe(201);
+        expect(res.body.mimetype).toBe('image/png');
+        expect(res.body.filename).toMatch(/^[0-9a-f]{64}\.png$/);
+        uploadedFiles.push(res.body.filename);
+    });
+
+    test('identical uploads share one content-addressed object', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const body = Buffer.concat([PNG_SIGNATURE, Buffer.from(`dedupe-${Date.now()}`)]);
+
+        const first = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', body, 'a.png');
+        const second = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', body, 'b.png');
+        uploadedFiles.push(first.body.filename);
+
+        expect(first.body.filename).toMatch(/^[0-9a-f]{64}\.png$/);
+        expect(second.body.filename).toBe(first.body.filename);
+        expect(second.body.deduplicated).toBe(true);
+    });
+
+    test('image GC only selects unreferenced content-addressed objects', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const upload = async (tag) => {
+            const res = await request(app)
+                .post('/images/upload')
+                .set('Authorization', `Bearer ${token}`)
+                .attach('image', Buffer.concat([PNG_SIGNATURE, Buffer.from(`${tag}-${Date.now()}`)]), 'gc.png');
+            uploadedFiles.push(res.body.filename);
+            return res.body;
+        };
+        const orphan = await upload('orphan');
+        const logo = await upload('logo');
+
+        const business = await createTestBusiness(app, token);
+        await request(app)
+            .put(`/api/businesses/${business.id}`)
+            .set('Authorization', `Bearer ${token}`)
+            .send({logo_url: logo.url});
+
+        const result = await imageGc.collectGarbage({graceMs: 0, dryRun: true});
+        expect(result.unreferenced).toContain(orphan.filename);
+        expect(result.unreferenced).not.toContain(logo.filename);
+    });
+
+    test('POST /images/presign rejects disallowed types and sizes', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const badType = await request(app)
+            .post('/images/presign')
+            .set('Authorization', `Bearer ${token}`)
+            .send({filename: 'x.svg', content_type: 'image/svg+xml', size: 100});
+        expect(badType.status).toBe(400);
+
+        const tooBig = await request(app)
+            .post('/images/presign')
+            .set('Authorization', `Bearer ${token}`)
+            .send({filename: 'x.png', content_type: 'image/png', size: 6 * 1024 * 1024});
+        expect(tooBig.status).toBe(400);
+    });
+
+    test('POST /images/complete with another user\'s token returns 403', async () => {
+        const owner = await loginWithNewWallet(app);
+        const other = await loginWithNewWallet(app);
+        const presign = await request(app)
+            .post('/images/presign')
+            .set('Authorization', `Bearer ${owner.token}`)
+            .send({filename: 'x.png', content_type: 'image/png', size: 100});
+
+        const res = await request(app)
+            .post('/images/complete')
+            .set('Authorization', `Bearer ${other.token}`)
+            .send({upload_token: presign.body.upload_token});
+        expect(res.status).toBe(403);
+    });
+
     test('GET /images/:filename non-existent returns 404', async () => {
         const res = await request(app).get('/images/does-not-exist-12345.png');
         expect(res.status).toBe(404);
@@ -78,4 +295,36 @@ describe('Images', () => {
         expect(res.status).toBe(200);
         expect(Array.isArray(res.body)).toBe(true);
     });
+
+    test('GET /images pages with limit and cursor', async () => {
+        const {token} = await loginWithNewWallet(app);
+        for (const tag of ['page-a', 'page-b']) {
+            const res = await request(app)
+                .post('/images/upload')
+                .set('Authorization', `Bearer ${token}`)
+                .attach('image', Buffer.concat([PNG_SIGNATURE, Buffer.from(`${tag}-${Date.now()}`)]), 'p.png');
+            uploadedFiles.push(res.body.filename);
+        }
+
+        const first = await request(app).get('/images?limit=1');
+        expect(first.status).toBe(200);
+        expect(first.body.length).toBe(1);
+
+        const next = await request(app).get(`/images?limit=1&cursor=${encodeURIComponent(first.body[0].filename)}`);
+        expect(next.status).toBe(200);
+        expect(next.body.length).toBe(1);
+        expect(next.body[0].filename > first.body[0].filename).toBe(true);
+    });
+
+    test('uploads are recorded in the images index', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const res = await request(app)
+            .post('/images/upload')
+            .set('Authorization', `Bearer ${token}`)
+            .attach('image', Buffer.concat([PNG_SIGNATURE, Buffer.from(`index-${Date.now()}`)]), 'i.png');
+        uploadedFiles.push(res.body.filename);
+
+        const rows = await imageModel.list({prefix: res.body.filename, limit: 10});
+        expect(rows.map((r) => r.key)).toEqual([res.body.filename]);
+    });
 });
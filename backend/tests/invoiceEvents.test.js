@@ -0,0 +1,206 @@
+const {EventEmitter} = require('events');
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction, pool} = require('./dbHelper');
+const {loginWithNewWallet, createTestInvoice} = require('./helpers');
+const invoiceEvents = require('../src/services/invoiceEvents');
+
+jest.mock('../src/services/sorobanService');
+
+// Minimal stand-in for an Express response held open by SSE
+function fakeResponse() {
+    const res = new EventEmitter();
+    res.chunks = [];
+    res.headers = {};
+    res.writableLength = 0;
+    res.writableEnded = false;
+    res.destroyed = false;
+    res.status = (code) => {
+        res.statusCode = code;
+        return res;
+    };
+    res.set = (headers) => Object.assign(res.headers, headers);
+    res.json = (body) => {
+        res.body = body;
+        return res;
+    };
+    res.flushHeaders = () => {
+    };
+    res.write = (chunk) => res.chunks.push(chunk);
+    res.end = () => {
+        res.writableEnded = true;
+        res.emit('close');
+    };
+    res.destroy = () => {
+        res.destroyed = true;
+        res.emit('close');
+    };
+    return res;
+}
+
+function fakeRequest(lastEventId) {
+    return {
+        query: {},
+        get: (name) => (name === 'Last-Event-ID' ? lastEventId : undefined),
+    };
+}
+
+afterEach(() => invoiceEvents._reset());
+
+describe('Invoice Events - Hub', () => {
+    test('subscribe sends SSE headers and delivers published events', () => {
+        const res = fakeResponse();
+        invoiceEvents.subscribe(1, fakeRequest(), res);
+
+        expect(res.statusCode).toBe(200);
+        expect(res.headers['Content-Type']).toBe('text/event-stream');
+
+        invoiceEvents.publish(1, 'contribution', {total_collected: '10'});
+        const chunk = res.chunks.find((c) => c.startsWith('id: '));
+        expect(chunk).toContain('event: contribution');
+        expect(chunk).toContain('"total_collected":"10"');
+    });
+
+    test('events for other invoices are not delivered', () => {
+        const res = fakeResponse();
+        invoiceEvents.subscribe(1, fakeRequest(), res);
+        invoiceEvents.publish(2, 'contribution');
+        expect(res.chunks.some((c) => c.startsWith('id: '))).toBe(false);
+    });
+
+    test('Last-Event-ID replays only newer events', () => {
+        const first = invoiceEvents.publish(3, 'participant_joined');
+        invoiceEvents.publish(3, 'contribution');
+
+        const res = fakeResponse();
+        invoiceEvents.subscribe(3, fakeRequest(String(first.id)), res);
+
+        const replayed = res.chunks.filter((c) => c.startsWith('id: '));
+        expect(replayed.length).toBe(1);
+        expect(replayed[0]).toContain('event: contribution');
+    });
+
+    test('slow subscribers are disconnected', () => {
+        const res = fakeResponse();
+        invoiceEvents.subscribe(4, fakeRequest(), res);
+        res.writableLength = 1024 * 1024;
+
+        invoiceEvents.publish(4, 'contribution');
+        expect(res.destroyed).toBe(true);
+        expect(invoiceEvents.subscriberCount(4)).toBe(0);
+    });
+
+    test('events NOTIFYed by another process reach local subscribers', () => {
+        const res = fakeResponse();
+        invoiceEvents.subscribe(5, fakeRequest(), res);
+
+        const event = {id: Date.now() * 1000, type: 'contribution', data: {invoice_id: 5, total_collected: '7'}};
+        invoiceEvents._receive(JSON.stringify({origin: 'other-worker', invoiceId: 5, event}));
+        invoiceEvents._receive('not json');
+
+        const delivered = res.chunks.filter((c) => c.startsWith('id: '));
+        expect(delivered).toHaveLength(1);
+        expect(delivered[0]).toContain('"total_collected":"7"');
+    });
+
+    test('events from two processes in the same microsecond get distinct, ordered ids', () => {
+        const local = invoiceEvents.publish(6, 'participant_joined');
+        const tick = Number(String(local.id).split('-')[0]);
+        const remote = {id: `${tick}-zzzz`, type: 'contribution', data: {invoice_id: 6}};
+        invoiceEvents._receive(JSON.stringify({origin: 'other-worker', invoiceId: 6, event: remote}));
+        expect(remote.id).not.toBe(local.id);
+
+        const res = fakeResponse();
+        invoiceEvents.subscribe(6, fakeRequest(String(local.id)), res);
+        const replayed = res.chunks.filter((c) => c.startsWith('id: '));
+        expect(replayed).toHaveLength(1);
+        expect(replayed[0]).toContain(`id: ${tick}-zzzz`);
+    });
+
+    test('receiving an event advances the id clock past it', () => {
+        const future = (Date.now() + 60 * 1000) * 1000;
+        const event = {id: `${future}-other`, type: 'contribution', data: {invoice_id: 7}};
+        invoiceEvents._receive(JSON.stringify({origin: 'other-worker', invoiceId: 7, event}));
+
+        const next = invoiceEvents.publish(7, 'withdrawal');
+        expect(Number(String(next.id).split('-')[0])).toBeGreaterThan(future);
+    });
+});
+
+describe('Invoice Events - Bus connection', () => {
+    function fakeClient() {
+        const client = new EventEmitter();
+        client.query = jest.fn().mockResolvedValue({});
+        client.release = jest.fn();
+        return client;
+    }
+
+    afterEach(() => jest.restoreAllMocks());
+
+    test('closeBus unhooks the LISTEN connection before returning it to the pool', async () => {
+        const client = fakeClient();
+        jest.spyOn(pool, 'connect').mockResolvedValue(client);
+
+        await invoiceEvents.connectBus();
+        expect(client.listenerCount('notification')).toBe(1);
+        await invoiceEvents.closeBus();
+
+        expect(client.query).toHaveBeenLastCalledWith('UNLISTEN invoice_events');
+        expect(client.listenerCount('notification')).toBe(0);
+        expect(client.listenerCount('error')).toBe(0);
+        expect(client.release).toHaveBeenCalledTimes(1);
+    });
+
+    test('a lost connection is released once and no longer delivers', async () => {
+        const client = fakeClient();
+        jest.spyOn(pool, 'connect').mockResolvedValueOnce(client).mockReturnValue(new Promise(() => {
+        }));
+        await invoiceEvents.connectBus();
+        const lost = new Error('connection reset');
+        client.emit('error', lost);
+        await invoiceEvents.closeBus();
+
+        expect(client.release).toHaveBeenCalledTimes(1);
+        expect(client.release).toHaveBeenCalledWith(lost);
+        expect(client.listenerCount('notification')).toBe(0);
+        expect(client.listenerCount('error')).toBe(0);
+    });
+});
+
+describe('Invoice Events - Stream access', () => {
+    beforeEach(() => beginTransaction());
+    afterEach(() => rollbackTransaction());
+
+    test('GET /api/invoices/:id/events without auth returns 401', async () => {
+        const res = await request(app).get('/api/invoices/1/events');
+        expect(res.status).toBe(401);
+    });
+
+    test('GET /api/invoices/:id/events as outsider returns 403', async () => {
+        const organizer = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, organizer.token);
+        const outsider = await loginWithNewWallet(app);
+
+        const res = await request(app)
+            .get(`/api/invoices/${invoice.id}/events`)
+            .set('Authorization', `Bearer ${outsider.token}`);
+        expect(res.status).toBe(403);
+    });
+
+    test('POST /api/invoices/:id/join publishes participant_joined', async () => {
+        const organizer = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, organizer.token);
+        const participant = await loginWithNewWallet(app);
+
+        const res = fakeResponse();
+        invoiceEvents.subscribe(invoice.id, fakeRequest(), res);
+
+        await request(app)
+            .post(`/api/invoices/${invoice.id}/join`)
+            .set('Authorization', `Bearer ${participant.token}`);
+
+        const chunk = res.chunks.find((c) => c.startsWith('id: '));
+        expect(chunk).toContain('event: participant_joined');
+        expect(chunk).toContain(`"user_id":${participant.user.id}`);
+    });
+});
@@ -3,6 +3,7 @@ const app = require('../src/app');
 const {beginTransaction, rollbackTransaction} = require('./dbHelper');
 const {loginWithNewWallet, createTestInvoice} = require('./helpers');
 const sorobanService = require('../src/services/sorobanService');
+const invoiceEvents = require('../src/services/invoiceEvents');
 
 jest.mock('../src/services/sorobanService');
 
@@ -11,6 +12,7 @@ beforeEach(async () => {
     jest.clearAllMocks();
     sorobanService.getTripState.mockResolvedValue(null);
     sorobanService.getPenalty.mockResolvedValue(null);
+    sorobanService.hashSignedXdr.mockReturnValue(null);
 });
 afterEach(() => rollbackTransaction());
 
@@ -109,6 +111,80 @@ describe('Invoice Participants - Contribute', () => {
         expect(listRes.body.some((p) => p.user_id === participant.user.id)).toBe(true);
     });
 
+    test('POST /api/invoices/:id/contribute retry with same XDR is not double-counted', async () => {
+        const organizer = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, organizer.token);
+        const participant = await loginWithNewWallet(app);
+
+        sorobanService.hashSignedXdr.mockReturnValue('contrib-hash-retry');
+        sorobanService.submitTx.mockResolvedValue({
+            hash: 'contrib-hash-retry', ledger: 104, returnValue: null,
+        });
+
+        const first = await request(app)
+            .post(`/api/invoices/${invoice.id}/contribute`)
+            .set('Authorization', `Bearer ${participant.token}`)
+            .send({signed_xdr: 'retried-xdr', amount: 100});
+        const retry = await request(app)
+            .post(`/api/invoices/${invoice.id}/contribute`)
+            .set('Authorization', `Bearer ${participant.token}`)
+            .send({signed_xdr: 'retried-xdr', amount: 100});
+
+        expect(first.status).toBe(200);
+        expect(retry.status).toBe(200);
+        expect(retry.headers['idempotent-replayed']).toBe('true');
+        expect(retry.body.tx_hash).toBe('contrib-hash-retry');
+        expect(retry.body.contributed).toBe(100);
+        expect(sorobanService.submitTx).toHaveBeenCalledTimes(1);
+    });
+
+    test('POST /api/invoices/:id/contribute reusing another user\'s tx returns 409', async () => {
+        const organizer = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, organizer.token);
+        const p1 = await loginWithNewWallet(app);
+        const p2 = await loginWithNewWallet(app);
+
+        sorobanService.hashSignedXdr.mockReturnValue('contrib-hash-shared');
+        sorobanService.submitTx.mockResolvedValue({
+            hash: 'contrib-hash-shared', ledger: 105, returnValue: null,
+        });
+
+        await request(app)
+            .post(`/api/invoices/${invoice.id}/contribute`)
+            .set('Authorization', `Bearer ${p1.token}`)
+            .send({signed_xdr: 'shared-xdr', amount: 100});
+        const res = await request(app)
+            .post(`/api/invoices/${invoice.id}/contribute`)
+            .set('Authorization', `Bearer ${p2.token}`)
+            .send({signed_xdr: 'shared-xdr', amount: 100});
+
+        expect(res.status).toBe(409);
+    });
+
+    test('POST /api/invoices/:id/withdraw with a recorded contribute tx returns 409', async () => {
+        const organizer = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, organizer.token);
+        const participant = await loginWithNewWallet(app);
+
+        sorobanService.hashSignedXdr.mockReturnValue('contrib-hash-other-route');
+        sorobanService.submitTx.mockResolvedValue({
+            hash: 'contrib-hash-other-route', ledger: 106, returnValue: null,
+        });
+
+        await request(app)
+            .post(`/api/invoices/${invoice.id}/contribute`)
+            .set('Authorization', `Bearer ${participant.token}`)
+            .send({signed_xdr: 'contrib-xdr', amount: 100});
+        const res = await request(app)
+            .post(`/api/invoices/${invoice.id}/withdraw`)
+            .set('Authorization', `Bearer ${participant.token}`)
+            .send({signed_xdr: 'contrib-xdr'});
+
+        expect(res.status).toBe(409);
+        expect(res.headers['idempotent-replayed']).toBeUndefined();
+        expect(sorobanService.submitTx).toHaveBeenCalledTimes(1);
+    });
+
     test('POST /api/invoices/:id/contribute missing fields returns 400', async () => {
         const organizer = await loginWithNewWallet(app);
         const invoice = await createTestInvoice(app, organizer.token);
@@ -223,6 +299,38 @@ describe('Invoice Participants - Confirm Release', () => {
         expect(res.status).toBe(409);
     });
 
+    test('POST /api/invoices/:id/confirm concurrent retries confirm once', async () => {
+        const organizer = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, organizer.token);
+        const participant = await loginWithNewWallet(app);
+
+        await request(app)
+            .post(`/api/invoices/${invoice.id}/join`)
+            .set('Authorization', `Bearer ${participant.token}`);
+
+        // Both retries pass the checks before either records the tx
+        sorobanService.hashSignedXdr.mockReturnValue('confirm-hash-race');
+        sorobanService.submitTx.mockImplementation(() => new Promise((resolve) => {
+            setTimeout(() => resolve({hash: 'confirm-hash-race', ledger: 201, returnValue: null}), 50);
+        }));
+        const publish = jest.spyOn(invoiceEvents, 'publish');
+
+        const confirm = () => request(app)
+            .post(`/api/invoices/${invoice.id}/confirm`)
+            .set('Authorization', `Bearer ${participant.token}`)
+            .send({signed_xdr: 'raced-confirm-xdr'});
+        const [first, second] = await Promise.all([confirm(), confirm()]);
+
+        expect(first.status).toBe(200);
+        expect(second.status).toBe(200);
+        const listed = await request(app)
+            .get(`/api/invoices/${invoice.id}`)
+            .set('Authorization', `Bearer ${organizer.token}`);
+        expect(listed.body.confirmation_count).toBe(1);
+        expect(publish.mock.calls.filter(([, type]) => type === 'release_confirmed')).toHaveLength(1);
+        publish.mockRestore();
+    });
+
     test('POST /api/invoices/:id/confirm non-participant returns 404', async () => {
         const organizer = await loginWithNewWallet(app);
         const invoice = await createTestInvoice(app, organizer.token);
@@ -1,8 +1,9 @@
 const request = require('supertest');
 const app = require('../src/app');
-const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {beginTransaction, rollbackTransaction, pool} = require('./dbHelper');
 const {loginWithNewWallet, createTestInvoice} = require('./helpers');
 const sorobanService = require('../src/services/sorobanService');
+const invoiceEvents = require('../src/services/invoiceEvents');
 
 jest.mock('../src/services/sorobanService');
 
@@ -11,6 +12,7 @@ beforeEach(async () => {
     jest.clearAllMocks();
     sorobanService.getTripState.mockResolvedValue(null);
     sorobanService.getPenalty.mockResolvedValue(null);
+    sorobanService.hashSignedXdr.mockReturnValue(null);
 });
 afterEach(() => rollbackTransaction());
 
@@ -74,6 +76,45 @@ describe('Invoices - Detail', () => {
         expect(res.body.items.length).toBe(2);
     });
 
+    test('GET /api/invoices/:id answers 304 until the draft changes', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+        const auth = {Authorization: `Bearer ${token}`};
+
+        const first = await request(app).get(`/api/invoices/${invoice.id}`).set(auth);
+        expect(first.headers['cache-control']).toBe('private, no-cache');
+        const cached = await request(app)
+            .get(`/api/invoices/${invoice.id}`)
+            .set({...auth, 'If-None-Match': first.headers.etag});
+        expect(cached.status).toBe(304);
+
+        await request(app)
+            .put(`/api/invoices/${invoice.id}/items`)
+            .set(auth)
+            .send({items: [{description: 'Only item', amount: 1000, recipient_wallet: 'GAAA'}]});
+
+        const changed = await request(app)
+            .get(`/api/invoices/${invoice.id}`)
+            .set({...auth, 'If-None-Match': first.headers.etag});
+        expect(changed.status).toBe(200);
+        expect(changed.body.items.length).toBe(1);
+    });
+
+    test('GET /api/invoices/:id is stale after the organizer renames', async () => {
+        const {token, user} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+        const auth = {Authorization: `Bearer ${token}`};
+
+        const first = await request(app).get(`/api/invoices/${invoice.id}`).set(auth);
+        await pool.query('UPDATE users SET username = $2 WHERE id = $1', [user.id, 'Renamed organizer']);
+
+        const res = await request(app)
+            .get(`/api/invoices/${invoice.id}`)
+            .set({...auth, 'If-None-Match': first.headers.etag});
+        expect(res.status).toBe(200);
+        expect(res.body.organizer_name).toBe('Renamed organizer');
+    });
+
     test('GET /api/invoices/:id as participant returns invoice', async () => {
         const organizer = await loginWithNewWallet(app);
         const invoice = await createTestInvoice(app, organizer.token);
@@ -310,6 +351,40 @@ describe('Invoices - Update Items', () => {
         expect(res.body.tx_hash).toBe('update-hash');
     });
 
+    test('PUT items concurrent retries of one XDR apply once', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+
+        sorobanService.submitTx.mockResolvedValue({
+            hash: 'link-hash', ledger: 100, returnValue: 5,
+        });
+        await request(app)
+            .post(`/api/invoices/${invoice.id}/link-contract`)
+            .set('Authorization', `Bearer ${token}`)
+            .send({signed_xdr: 'fake-xdr'});
+
+        sorobanService.hashSignedXdr.mockReturnValue('update-hash-race');
+        sorobanService.submitTx.mockImplementation(() => new Promise((resolve) => {
+            setTimeout(() => resolve({hash: 'update-hash-race', ledger: 102, returnValue: null}), 50);
+        }));
+        const publish = jest.spyOn(invoiceEvents, 'publish');
+
+        const update = () => request(app)
+            .put(`/api/invoices/${invoice.id}/items`)
+            .set('Authorization', `Bearer ${token}`)
+            .send({items: [{description: 'Updated', amount: 800}], signed_xdr: 'raced-update-xdr'});
+        const [first, second] = await Promise.all([update(), update()]);
+
+        expect(first.status).toBe(200);
+        expect(second.status).toBe(200);
+        const current = await request(app)
+            .get(`/api/invoices/${invoice.id}`)
+            .set('Authorization', `Bearer ${token}`);
+        expect(current.body.version).toBe(1);
+        expect(publish.mock.calls.filter(([, type]) => type === 'items_updated')).toHaveLength(1);
+        publish.mockRestore();
+    });
+
     test('PUT items as non-organizer returns 403', async () => {
         const organizer = await loginWithNewWallet(app);
         const invoice = await createTestInvoice(app, organizer.token);
@@ -0,0 +1,30 @@
+const {LruCache} = require('../src/services/lruCache');
+
+describe('LruCache', () => {
+    test('evicts the least recently used entry', () => {
+        const cache = new LruCache({max: 2});
+        cache.set('a', 1);
+        cache.set('b', 2);
+        cache.get('a');
+        cache.set('c', 3);
+
+        expect(cache.get('a')).toBe(1);
+        expect(cache.get('b')).toBeUndefined();
+        expect(cache.get('c')).toBe(3);
+    });
+
+    test('expires entries after their TTL', () => {
+        jest.useFakeTimers();
+        try {
+            const cache = new LruCache({ttlMs: 1000});
+            cache.set('a', 1);
+            cache.set('b', 2, 5000);
+
+            jest.advanceTimersByTime(1001);
+            expect(cache.get('a')).toBeUndefined();
+            expect(cache.get('b')).toBe(2);
+        } finally {
+            jest.useRealTimers();
+        }
+    });
+});
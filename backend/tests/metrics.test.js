@@ -0,0 +1,149 @@
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {Registry, instrumentModel, registry} = require('../src/services/metrics');
+const {foldRetired} = require('../src/cluster');
+const {routeLabel} = require('../src/middleware/metrics');
+
+beforeEach(async () => {
+    await beginTransaction();
+    jest.clearAllMocks();
+});
+afterEach(() => rollbackTransaction());
+
+// ─── Exposition format ───────────────────────────────────────────────────────
+
+describe('Metrics - Registry', () => {
+    test('renders counters and cumulative histogram buckets', () => {
+        const reg = new Registry();
+        const counter = reg.counter('jobs_total', 'Jobs run', ['kind']);
+        const histogram = reg.histogram('job_seconds', 'Job duration', ['kind'], [0.1, 1]);
+        counter.inc({kind: 'a'});
+        counter.inc({kind: 'a'}, 2);
+        histogram.observe({kind: 'a'}, 0.05);
+        histogram.observe({kind: 'a'}, 0.5);
+        histogram.observe({kind: 'a'}, 5);
+
+        const text = reg.render();
+        expect(text).toContain('# TYPE jobs_total counter');
+        expect(text).toContain('jobs_total{kind="a"} 3');
+        expect(text).toContain('job_seconds_bucket{kind="a",le="0.1"} 1');
+        expect(text).toContain('job_seconds_bucket{kind="a",le="1"} 2');
+        expect(text).toContain('job_seconds_bucket{kind="a",le="+Inf"} 3');
+        expect(text).toContain('job_seconds_count{kind="a"} 3');
+    });
+
+    test('escapes label values', () => {
+        const reg = new Registry();
+        reg.counter('odd_total', 'Odd labels', ['v']).inc({v: 'a"b\\c\nd'});
+        expect(reg.render()).toContain('odd_total{v="a\\"b\\\\c\\nd"} 1');
+    });
+
+    test('renders worker snapshots as one cluster exposition', () => {
+        const worker = () => {
+            const reg = new Registry();
+            reg.counter('jobs_total', 'Jobs run', ['kind']);
+            reg.histogram('job_seconds', 'Job duration', ['kind'], [0.1, 1]);
+            reg.gauge('queue_depth', 'Queued jobs', ['queue']);
+            return reg;
+        };
+        const a = worker();
+        const b = worker();
+        a.metrics.get('jobs_total').inc({kind: 'a'}, 2);
+        b.metrics.get('jobs_total').inc({kind: 'a'}, 3);
+        a.metrics.get('job_seconds').observe({kind: 'a'}, 0.05);
+        b.metrics.get('job_seconds').observe({kind: 'a'}, 0.5);
+        a.metrics.get('queue_depth').set({queue: 'q'}, 4);
+        b.metrics.get('queue_depth').set({queue: 'q'}, 7);
+
+        // Snapshots travel over IPC as JSON
+        const snapshots = JSON.parse(JSON.stringify([
+            {worker: 0, metrics: a.snapshot()},
+            {worker: 1, metrics: b.snapshot()},
+        ]));
+        const text = worker().renderCluster(snapshots);
+        expect(text).toContain('jobs_total{kind="a"} 5');
+        expect(text).toContain('job_seconds_bucket{kind="a",le="0.1"} 1');
+        expect(text).toContain('job_seconds_bucket{kind="a",le="1"} 2');
+        expect(text).toContain('job_seconds_count{kind="a"} 2');
+        expect(text).toContain('queue_depth{worker="0",queue="q"} 4');
+        expect(text).toContain('queue_depth{worker="1",queue="q"} 7');
+    });
+
+    test('counters of exited workers stay in the cluster totals', () => {
+        const worker = () => {
+            const reg = new Registry();
+            reg.counter('jobs_total', 'Jobs run', ['kind']);
+            reg.gauge('queue_depth', 'Queued jobs', ['queue']);
+            return reg;
+        };
+        const exited = worker();
+        exited.metrics.get('jobs_total').inc({kind: 'a'}, 4);
+        exited.metrics.get('queue_depth').set({queue: 'q'}, 9);
+        const replacement = worker();
+        replacement.metrics.get('jobs_total').inc({kind: 'a'}, 1);
+
+        const retired = foldRetired({}, JSON.parse(JSON.stringify(exited.snapshot())));
+        const text = worker().renderCluster([
+            {worker: 0, metrics: replacement.snapshot()},
+            {worker: 'retired', metrics: retired},
+        ]);
+        expect(text).toContain('jobs_total{kind="a"} 5');
+        expect(text).not.toContain('queue_depth{worker="retired"');
+    });
+
+    test('instrumentModel times calls and keeps results and errors', async () => {
+        const model = instrumentModel('fakeModel', {
+            async ok(x) {
+                return x * 2;
+            },
+            async fail() {
+                throw new Error('boom');
+            },
+        });
+        await expect(model.ok(21)).resolves.toBe(42);
+        await expect(model.fail()).rejects.toThrow('boom');
+
+        const text = registry.render();
+        expect(text).toContain('db_query_duration_seconds_count{query="fakeModel.ok",outcome="ok"} 1');
+        expect(text).toContain('db_query_duration_seconds_count{query="fakeModel.fail",outcome="error"} 1');
+    });
+});
+
+// ─── /metrics endpoint ───────────────────────────────────────────────────────
+
+describe('Metrics - Endpoint', () => {
+    test('GET /metrics labels requests by route template', async () => {
+        await request(app).get('/api/businesses/99999');
+        await request(app).get('/api/does-not-exist');
+
+        const res = await request(app).get('/metrics');
+        expect(res.status).toBe(200);
+        expect(res.headers['content-type']).toMatch(/^text\/plain; version=0\.0\.4/);
+        expect(res.text).toMatch(/http_requests_total\{method="GET",route="\/api\/businesses\/:id",status_code="404"\} \d+/);
+        expect(res.text).toMatch(/http_requests_total\{method="GET",route="unmatched",status_code="404"\} \d+/);
+        expect(res.text).not.toContain('99999');
+        expect(res.text).toMatch(/db_query_duration_seconds_count\{query="businessModel.findById",outcome="ok"\} \d+/);
+        expect(res.text).toContain('nodejs_eventloop_delay_seconds{quantile="0.99"}');
+        expect(res.text).toContain('process_cpu_seconds_total{mode="user"}');
+    });
+
+    test('route label survives the router resetting baseUrl after an error', () => {
+        const req = (baseUrl, path, originalUrl) => ({baseUrl, route: path && {path}, originalUrl});
+        expect(routeLabel(req('/api/invoices', '/:id/items', '/api/invoices/7/items'))).toBe('/api/invoices/:id/items');
+        expect(routeLabel(req('', '/:id/items', '/api/invoices/7/items?x=1'))).toBe('/api/invoices/:id/items');
+        expect(routeLabel(req('', '/', '/api/invoices'))).toBe('/api/invoices/');
+        expect(routeLabel(req('', undefined, '/api/nope'))).toBe('unmatched');
+    });
+
+    test('GET /metrics requires METRICS_TOKEN when set', async () => {
+        process.env.METRICS_TOKEN = 'scrape-secret';
+        try {
+            expect((await request(app).get('/metrics')).status).toBe(401);
+            const res = await request(app).get('/metrics').set('Authorization', 'Bearer scrape-secret');
+            expect(res.status).toBe(200);
+        } finally {
+            delete process.env.METRICS_TOKEN;
+        }
+    });
+});
@@ -0,0 +1,87 @@
+const express = require('express');
+const request = require('supertest');
+const jwt = require('jsonwebtoken');
+const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {rateLimit, requestCost} = require('../src/middleware/rateLimit');
+const {MemoryStore, PostgresStore} = require('../src/services/rateLimitStore');
+const {generateToken, verifyToken} = require('../src/middleware/auth');
+
+beforeEach(() => beginTransaction());
+afterEach(async () => {
+    jest.restoreAllMocks();
+    await rollbackTransaction();
+});
+
+// App with one weighted limiter and a catch-all handler
+function limitedApp(options) {
+    const app = express();
+    app.use(rateLimit({name: 'test', windowMs: 60 * 1000, store: new MemoryStore(), ...options}));
+    app.all('*', (req, res) => res.json({ok: true}));
+    return app;
+}
+
+// ─── Stores ──────────────────────────────────────────────────────────────────
+
+describe('Rate Limit - Stores', () => {
+    test('memory sliding window charges the request cost', () => {
+        const store = new MemoryStore();
+        const rule = {limit: 5, windowMs: 60 * 1000};
+        expect(store.consume('k', 3, rule)).toMatchObject({allowed: true, remaining: 2});
+        expect(store.consume('k', 3, rule).allowed).toBe(false);
+        expect(store.consume('k', 2, rule)).toMatchObject({allowed: true, remaining: 0});
+        expect(store.consume('other', 5, rule).allowed).toBe(true);
+    });
+
+    test('postgres token bucket debits atomically and refuses when empty', async () => {
+        const store = new PostgresStore();
+        const rule = {limit: 3, windowMs: 60 * 1000};
+        expect(await store.consume('test:pg', 2, rule)).toMatchObject({allowed: true, remaining: 1});
+        expect((await store.consume('test:pg', 2, rule)).allowed).toBe(false);
+        const last = await store.consume('test:pg', 1, rule);
+        expect(last).toMatchObject({allowed: true, remaining: 0});
+        expect(last.resetMs).toBeGreaterThan(0);
+    });
+});
+
+// ─── Middleware ──────────────────────────────────────────────────────────────
+
+describe('Rate Limit - Middleware', () => {
+    test('submitting a transaction costs more than a read', async () => {
+        const app = limitedApp({limit: 12, cost: requestCost});
+        const token = generateToken({id: 901, wallet_address: 'GTEST', role: 'user'});
+        const auth = {Authorization: `Bearer ${token}`};
+
+        expect((await request(app).get('/api/services').set(auth)).status).toBe(200);
+        const contribute = await request(app).post('/api/invoices/5/contribute').set(auth);
+        expect(contribute.status).toBe(200);
+        expect(contribute.headers['ratelimit-remaining']).toBe('1');
+
+        expect((await request(app).get('/api/services').set(auth)).status).toBe(200);
+        const limited = await request(app).get('/api/services').set(auth);
+        expect(limited.status).toBe(429);
+        expect(Number(limited.headers['retry-after'])).toBeGreaterThanOrEqual(1);
+        expect(limited.body.error).toMatch(/Too many requests/);
+    });
+
+    test('authenticated requests are limited per user, not per IP', async () => {
+        const app = limitedApp({limit: 1});
+        const alice = generateToken({id: 902, wallet_address: 'GA', role: 'user'});
+        const bob = generateToken({id: 903, wallet_address: 'GB', role: 'user'});
+
+        expect((await request(app).get('/').set('Authorization', `Bearer ${alice}`)).status).toBe(200);
+        expect((await request(app).get('/').set('Authorization', `Bearer ${alice}`)).status).toBe(429);
+        expect((await request(app).get('/').set('Authorization', `Bearer ${bob}`)).status).toBe(200);
+        // Anonymous requests share the IP budget; a bad token counts as anonymous
+        expect((await request(app).get('/')).status).toBe(200);
+        expect((await request(app).get('/').set('Authorization', 'Bearer nope')).status).toBe(429);
+    });
+
+    test('verified tokens are memoized', () => {
+        const token = generateToken({id: 904, wallet_address: 'GC', role: 'user'});
+        const verify = jest.spyOn(jwt, 'verify');
+        expect(verifyToken(token).id).toBe(904);
+        expect(verifyToken(token).id).toBe(904);
+        expect(verify).toHaveBeenCalledTimes(1);
+        expect(verifyToken('garbage')).toBeNull();
+    });
+});
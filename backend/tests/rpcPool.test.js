@@ -0,0 +1,137 @@
+const http = require('http');
+const {Account, Keypair, Networks, Operation, TransactionBuilder} = require('@stellar/stellar-sdk');
+const {RpcPool} = require('../src/services/rpcPool');
+
+// Stand-in Soroban RPC: answers getLatestLedger with a fixed sequence and
+// sendTransaction with PENDING after `delayMs`, or fails every request with
+// HTTP 503 when `down` is set. `methods` records the calls received.
+function startRpc(sequence, {delayMs = 0, down = false} = {}) {
+    const stub = {hits: 0, methods: [], down, delayMs};
+    stub.server = http.createServer((req, res) => {
+        let body = '';
+        req.on('data', (chunk) => (body += chunk));
+        req.on('end', () => {
+            stub.hits++;
+            const {id, method} = JSON.parse(body);
+            stub.methods.push(method);
+            setTimeout(() => {
+                if (stub.down) {
+                    res.writeHead(503).end();
+                    return;
+                }
+                const result = method === 'sendTransaction'
+                    ? {status: 'PENDING', hash: 'tx-hash', latestLedger: sequence, latestLedgerCloseTime: '0'}
+                    : {id: 'ledger-hash', protocolVersion: 22, sequence};
+                res.writeHead(200, {'Content-Type': 'application/json'});
+                res.end(JSON.stringify({jsonrpc: '2.0', id, result}));
+            }, stub.delayMs);
+        });
+    });
+    return new Promise((resolve) => {
+        stub.server.listen(0, '127.0.0.1', () => {
+            stub.url = `http://127.0.0.1:${stub.server.address().port}`;
+            resolve(stub);
+        });
+    });
+}
+
+function signedTx() {
+    const source = new Account(Keypair.random().publicKey(), '1');
+    return new TransactionBuilder(source, {fee: '100', networkPassphrase: Networks.TESTNET})
+        .addOperation(Operation.bumpSequence({bumpTo: '2'}))
+        .setTimeout(30)
+        .build();
+}
+
+describe('RpcPool', () => {
+    let a;
+    let b;
+
+    beforeEach(async () => {
+        a = await startRpc(1);
+        b = await startRpc(2);
+    });
+
+    afterEach(async () => {
+        await Promise.all([a, b].map((stub) => new Promise((r) => {
+            stub.server.closeAllConnections();
+            stub.server.close(r);
+        })));
+    });
+
+    test('fails over to the next endpoint when one is down', async () => {
+        a.down = true;
+        const pool = new RpcPool([a.url, b.url]);
+
+        const ledger = await pool.getLatestLedger();
+        expect(ledger.sequence).toBe(2);
+
+        const [statsA, statsB] = pool.stats();
+        expect(statsA.errors).toBe(1);
+        expect(statsB.requests).toBe(1);
+        expect(statsB.latency_ewma_ms).not.toBeNull();
+    });
+
+    test('ejects an endpoint after repeated failures', async () => {
+        a.down = true;
+        const pool = new RpcPool([a.url, b.url]);
+
+        for (let i = 0; i < 3; i++) await pool.getLatestLedger();
+        expect(pool.stats()[0].healthy).toBe(false);
+
+        const hitsBefore = a.hits;
+        await pool.getLatestLedger();
+        expect(a.hits).toBe(hitsBefore);
+    });
+
+    test('throws the last error when every endpoint fails', async () => {
+        a.down = true;
+        b.down = true;
+        const pool = new RpcPool([a.url, b.url]);
+        await expect(pool.getLatestLedger()).rejects.toThrow();
+    });
+
+    test('hedged calls answer from the fast endpoint', async () => {
+        a.delayMs = 1000;
+        const pool = new RpcPool([a.url, b.url], {hedgeMs: 50, hedgedMethods: ['getLatestLedger']});
+
+        const start = Date.now();
+        const ledger = await pool.getLatestLedger();
+        expect(ledger.sequence).toBe(2);
+        expect(Date.now() - start).toBeLessThan(1000);
+        expect(pool.stats()[1].hedges).toBe(1);
+    });
+
+    test('times out a hung endpoint and fails over', async () => {
+        a.delayMs = 1000;
+        const pool = new RpcPool([a.url, b.url], {timeoutMs: 100});
+
+        const ledger = await pool.getLatestLedger();
+        expect(ledger.sequence).toBe(2);
+        expect(pool.stats()[0].errors).toBe(1);
+    });
+
+    test('a timed-out send is not resent once the network knows the hash', async () => {
+        a.delayMs = 1000;
+        const pool = new RpcPool([a.url, b.url], {timeoutMs: 100});
+        const tx = signedTx();
+        const getTransaction = jest.spyOn(pool, 'getTransaction')
+            .mockResolvedValue({status: 'SUCCESS', latestLedger: 7, latestLedgerCloseTime: '0'});
+
+        const result = await pool.sendTransaction(tx);
+        expect(result).toMatchObject({status: 'DUPLICATE', hash: tx.hash().toString('hex')});
+        expect(getTransaction).toHaveBeenCalledWith(tx.hash().toString('hex'));
+        expect(b.methods).not.toContain('sendTransaction');
+    });
+
+    test('a timed-out send unknown to the network goes to the next endpoint', async () => {
+        a.delayMs = 1000;
+        const pool = new RpcPool([a.url, b.url], {timeoutMs: 100});
+        jest.spyOn(pool, 'getTransaction')
+            .mockResolvedValue({status: 'NOT_FOUND', latestLedger: 7, latestLedgerCloseTime: '0'});
+
+        const result = await pool.sendTransaction(signedTx());
+        expect(result.status).toBe('PENDING');
+        expect(b.methods).toContain('sendTransaction');
+    });
+});
@@ -0,0 +1,59 @@
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {loginWithNewWallet, createTestBusiness, createTestService} = require('./helpers');
+const {compileSerializer} = require('../src/services/serializer');
+const schemas = require('../src/schemas/responses');
+
+beforeEach(() => beginTransaction());
+afterEach(() => rollbackTransaction());
+
+describe('Serializer - Compiled schemas', () => {
+    const serialize = compileSerializer({
+        type: 'array',
+        items: {
+            type: 'object',
+            properties: {
+                id: {type: 'integer'},
+                name: {type: 'string'},
+                created_at: {type: 'string', format: 'date-time'},
+                contract_invoice_id: {type: 'string'},
+                schedule: {},
+                items: {type: 'array', items: {type: 'object', properties: {amount: {type: 'string'}}}},
+                onchain: {},
+            },
+        },
+    });
+
+    test('writes what JSON.stringify would for the declared properties', () => {
+        const rows = [
+            {
+                id: 1, name: 'Tour "norte"\n', created_at: new Date('2026-03-04T05:06:07.089Z'),
+                contract_invoice_id: '42', schedule: {slots: {monday: [{from: '09:00'}]}},
+                items: [{amount: '10.5000000'}], onchain: undefined,
+            },
+            {id: 2, name: null, created_at: new Date(NaN), contract_invoice_id: null, schedule: null, items: []},
+            {id: 3, created_at: new Date('0999-12-31T23:59:59.999Z'), items: null},
+        ];
+        expect(serialize(rows)).toBe(JSON.stringify(rows));
+    });
+
+    test('drops undeclared columns at every level', () => {
+        const row = {id: 1, name: 'x', password_hash: 'secret', items: [{amount: '1', internal_note: 'secret'}]};
+        const out = JSON.parse(serialize([row]));
+        expect(out).toEqual([{id: 1, name: 'x', items: [{amount: '1'}]}]);
+        expect(() => compileSerializer({type: 'date'})).toThrow(/Unsupported/);
+    });
+
+    test('GET /api/services returns exactly the catalog schema properties', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        const service = await createTestService(app, token, business.id);
+
+        const res = await request(app).get(`/api/services?business_id=${business.id}`);
+        expect(res.status).toBe(200);
+        const row = res.body.find((s) => s.id === service.id);
+        expect(Object.keys(row)).toEqual(Object.keys(schemas.serviceList.items.properties));
+        expect(row.created_at).toBe(new Date(row.created_at).toISOString());
+    });
+});
@@ -51,6 +51,55 @@ describe('Services - Public', () => {
         const res = await request(app).get('/api/services/99999');
         expect(res.status).toBe(404);
     });
+
+    test('GET /api/services keeps the fields of the filtered and unfiltered lists', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        const service = await createTestService(app, token, business.id);
+        const listed = [
+            'id', 'business_id', 'name', 'description', 'price', 'image_url', 'location', 'location_data',
+            'schedule', 'contact_info', 'active', 'created_at', 'updated_at', 'business_name', 'business_wallet',
+            'effective_location', 'effective_location_data', 'effective_schedule', 'effective_contact_info',
+        ];
+
+        const all = await request(app).get('/api/services');
+        expect(Object.keys(all.body.find((s) => s.id === service.id)).sort()).toEqual([...listed].sort());
+
+        const filtered = await request(app).get(`/api/services?business_id=${business.id}`);
+        expect(Object.keys(filtered.body[0]).sort()).toEqual([...listed, 'business_category'].sort());
+        expect(filtered.body[0].business_category).toBe('hotel');
+    });
+});
+
+describe('Services - Conditional GET', () => {
+    test('GET /api/services answers 304 until the catalog changes', async () => {
+        const first = await request(app).get('/api/services');
+        expect(first.status).toBe(200);
+        expect(first.headers.etag).toMatch(/^W\/"catalog-/);
+        expect(first.headers['cache-control']).toBe('no-cache');
+
+        const cached = await request(app).get('/api/services').set('If-None-Match', first.headers.etag);
+        expect(cached.status).toBe(304);
+
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+        await createTestService(app, token, business.id);
+
+        const changed = await request(app).get('/api/services').set('If-None-Match', first.headers.etag);
+        expect(changed.status).toBe(200);
+        expect(changed.headers.etag).not.toBe(first.headers.etag);
+    });
+
+    test('GET /api/businesses/:id shares the catalog version', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const business = await createTestBusiness(app, token);
+
+        const catalog = await request(app).get('/api/services');
+        const res = await request(app)
+            .get(`/api/businesses/${business.id}`)
+            .set('If-None-Match', catalog.headers.etag);
+        expect(res.status).toBe(304);
+    });
 });
 
 describe('Services - Protected', () => {
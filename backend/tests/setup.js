@@ -8,6 +8,7 @@ process.env.MINIO_ENDPOINT = process.env.TEST_MINIO_ENDPOINT || process.env.MINI
 process.env.MINIO_PORT = process.env.TEST_MINIO_PORT || process.env.MINIO_PORT || '9000';
 process.env.MINIO_ACCESS_KEY = process.env.TEST_MINIO_ACCESS_KEY || process.env.MINIO_ACCESS_KEY || 'minioadmin';
 process.env.MINIO_SECRET_KEY = process.env.TEST_MINIO_SECRET_KEY || process.env.MINIO_SECRET_KEY || 'minioadmin123';
+process.env.MINIO_PUBLIC_URL = process.env.MINIO_PUBLIC_URL || `http://${process.env.MINIO_ENDPOINT}:${process.env.MINIO_PORT}`;
 process.env.JWT_SECRET = process.env.JWT_SECRET || 'test-jwt-secret';
 process.env.SOROBAN_RPC_URL = process.env.SOROBAN_RPC_URL || 'https://soroban-testnet.stellar.org';
 process.env.SOROBAN_NETWORK_PASSPHRASE = process.env.SOROBAN_NETWORK_PASSPHRASE || 'Test SDF Network ; September 2015';
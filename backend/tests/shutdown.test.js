@@ -0,0 +1,70 @@
+const http = require('http');
+const express = require('express');
+const request = require('supertest');
+const app = require('../src/app');
+const shutdown = require('../src/services/shutdown');
+
+afterEach(() => shutdown._reset());
+
+// Server with one endpoint that answers after `ms`
+function slowServer(ms) {
+    const slow = express();
+    slow.use(shutdown.trackRequests);
+    slow.get('/slow', (req, res) => setTimeout(() => res.json({ok: true}), ms));
+    return new Promise((resolve) => {
+        const server = slow.listen(0, () => resolve(server));
+    });
+}
+
+function get(server, path) {
+    return new Promise((resolve, reject) => {
+        http.get({port: server.address().port, path}, (res) => {
+            let body = '';
+            res.on('data', (chunk) => {
+                body += chunk;
+            });
+            res.on('end', () => resolve({status: res.statusCode, headers: res.headers, body}));
+        }).on('error', reject);
+    });
+}
+
+describe('Shutdown - Coordinator', () => {
+    test('finishes in-flight requests, then runs wait and close hooks', async () => {
+        const server = await slowServer(200);
+        const order = [];
+        shutdown.onShutdown('wait', 'work', async () => order.push('wait'));
+        shutdown.onShutdown('close', 'pool', async () => order.push('close'));
+
+        const pending = get(server, '/slow');
+        await new Promise((resolve) => setTimeout(resolve, 50));
+        expect(shutdown.inflightRequests()).toBe(1);
+
+        const code = await shutdown.shutdown(server, {signal: 'SIGTERM', timeoutMs: 2000});
+        const res = await pending;
+
+        expect(code).toBe(0);
+        expect(res.status).toBe(200);
+        expect(res.headers.connection).toBe('close');
+        expect(order).toEqual(['wait', 'close']);
+        expect(server.listening).toBe(false);
+    });
+
+    test('gives up at the deadline with exit code 1', async () => {
+        const server = await slowServer(5000);
+        const pending = get(server, '/slow').catch(() => null);
+        await new Promise((resolve) => setTimeout(resolve, 50));
+
+        const code = await shutdown.shutdown(server, {signal: 'SIGTERM', timeoutMs: 300});
+        await pending;
+        expect(code).toBe(1);
+    });
+
+    test('GET /health reports draining with 503', async () => {
+        const server = await slowServer(0);
+        await shutdown.shutdown(server, {signal: 'SIGTERM', timeoutMs: 1000});
+
+        const res = await request(app).get('/health');
+        expect(res.status).toBe(503);
+        expect(res.body.status).toBe('draining');
+    });
+});
@@ -0,0 +1,100 @@
+const {
+    Account,
+    Address,
+    Contract,
+    Keypair,
+    TransactionBuilder,
+    nativeToScVal,
+} = require('@stellar/stellar-sdk');
+const sorobanService = require('../src/services/sorobanService');
+
+const NETWORK_PASSPHRASE = process.env.SOROBAN_NETWORK_PASSPHRASE;
+
+// Build a signed contract call the way the frontend does (minus simulation)
+function signedCall(keypair, fn, args, {contractId = process.env.CONTRACT_ID, sign = true} = {}) {
+    const tx = new TransactionBuilder(new Account(keypair.publicKey(), '1'), {
+        fee: '100',
+        networkPassphrase: NETWORK_PASSPHRASE,
+    })
+        .addOperation(new Contract(contractId).call(fn, ...args))
+        .setTimeout(30)
+        .build();
+    if (sign) tx.sign(keypair);
+    return tx.toXDR();
+}
+
+function contributeArgs(tripId, wallet, stroops) {
+    return [
+        nativeToScVal(tripId, {type: 'u64'}),
+        new Address(wallet).toScVal(),
+        nativeToScVal(stroops, {type: 'i128'}),
+    ];
+}
+
+describe('sorobanService - hashSignedXdr', () => {
+    test('returns the envelope hash', () => {
+        const keypair = Keypair.random();
+        const signedXdr = signedCall(keypair, 'release', [nativeToScVal(1, {type: 'u64'})]);
+        const expected = TransactionBuilder.fromXDR(signedXdr, NETWORK_PASSPHRASE).hash().toString('hex');
+        expect(sorobanService.hashSignedXdr(signedXdr)).toBe(expected);
+    });
+
+    test('returns null for garbage', () => {
+        expect(sorobanService.hashSignedXdr('not-xdr')).toBeNull();
+    });
+});
+
+describe('sorobanService - verifySignedTx', () => {
+    const keypair = Keypair.random();
+    const wallet = keypair.publicKey();
+    const expected = {fn: 'contribute', tripId: '7', wallet, amountStroops: 2500000000};
+
+    test('accepts the expected contribute call', async () => {
+        const signedXdr = signedCall(keypair, 'contribute', contributeArgs(7, wallet, 2500000000n));
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).resolves.toBeUndefined();
+    });
+
+    test('rejects malformed XDR with status 400', async () => {
+        await expect(sorobanService.verifySignedTx('fake-xdr', expected))
+            .rejects.toMatchObject({status: 400});
+    });
+
+    test('rejects unsigned envelopes', async () => {
+        const signedXdr = signedCall(keypair, 'contribute', contributeArgs(7, wallet, 2500000000n), {sign: false});
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).rejects.toThrow('not signed');
+    });
+
+    test('rejects a different function', async () => {
+        const signedXdr = signedCall(keypair, 'withdraw', contributeArgs(7, wallet, 2500000000n).slice(0, 2));
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).rejects.toThrow('contribute');
+    });
+
+    test('rejects another invoice\'s trip_id', async () => {
+        const signedXdr = signedCall(keypair, 'contribute', contributeArgs(8, wallet, 2500000000n));
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).rejects.toThrow('trip_id');
+    });
+
+    test('rejects a mismatched amount', async () => {
+        const signedXdr = signedCall(keypair, 'contribute', contributeArgs(7, wallet, 1n));
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).rejects.toThrow('amount');
+    });
+
+    test('rejects transactions sourced from another wallet', async () => {
+        const other = Keypair.random();
+        const signedXdr = signedCall(other, 'contribute', contributeArgs(7, wallet, 2500000000n));
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).rejects.toThrow('source account');
+    });
+
+    test('rejects calls to another contract', async () => {
+        const otherContract = process.env.NATIVE_TOKEN_ID;
+        const signedXdr = signedCall(keypair, 'contribute', contributeArgs(7, wallet, 2500000000n),
+            {contractId: otherContract});
+        await expect(sorobanService.verifySignedTx(signedXdr, expected)).rejects.toThrow('wrong contract');
+    });
+
+    test('rejects calls on unlinked invoices', async () => {
+        const signedXdr = signedCall(keypair, 'contribute', contributeArgs(7, wallet, 2500000000n));
+        await expect(sorobanService.verifySignedTx(signedXdr, {...expected, tripId: null}))
+            .rejects.toThrow('not linked');
+    });
+});
@@ -0,0 +1,89 @@
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {loginWithNewWallet, createTestInvoice} = require('./helpers');
+const tracing = require('../src/services/tracing');
+
+let spans;
+
+beforeEach(async () => {
+    await beginTransaction();
+    jest.clearAllMocks();
+    spans = [];
+    tracing.setExporter({
+        export: (span) => spans.push(span.toOtlp()),
+        flush: () => {
+        },
+    });
+});
+afterEach(async () => {
+    tracing.setExporter(null);
+    await rollbackTransaction();
+});
+
+function attr(span, key) {
+    const found = span.attributes.find((a) => a.key === key);
+    return found && Object.values(found.value)[0];
+}
+
+// ─── traceparent ─────────────────────────────────────────────────────────────
+
+describe('Tracing - traceparent', () => {
+    test('parses valid headers and rejects malformed ones', () => {
+        const header = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01';
+        expect(tracing.parseTraceparent(header)).toEqual({
+            traceId: '4bf92f3577b34da6a3ce929d0e0e4736',
+            spanId: '00f067aa0ba902b7',
+            sampled: true,
+        });
+        expect(tracing.parseTraceparent('00-00000000000000000000000000000000-00f067aa0ba902b7-01')).toBeNull();
+        expect(tracing.parseTraceparent('garbage')).toBeNull();
+        expect(tracing.parseTraceparent(undefined)).toBeNull();
+    });
+});
+
+// ─── Request spans ───────────────────────────────────────────────────────────
+
+describe('Tracing - Request spans', () => {
+    test('continues the caller trace and nests model spans under the request', async () => {
+        const {token} = await loginWithNewWallet(app);
+        const invoice = await createTestInvoice(app, token);
+        spans = [];
+
+        const traceId = '4bf92f3577b34da6a3ce929d0e0e4736';
+        const res = await request(app)
+            .get(`/api/invoices/${invoice.id}`)
+            .set('Authorization', `Bearer ${token}`)
+            .set('traceparent', `00-${traceId}-00f067aa0ba902b7-01`);
+        expect(res.status).toBe(200);
+        expect(res.headers.traceparent).toMatch(new RegExp(`^00-${traceId}-[0-9a-f]{16}-01$`));
+
+        const server = spans.find((s) => s.kind === tracing.SPAN_KIND.SERVER);
+        expect(server.name).toBe('GET /api/invoices/:id');
+        expect(server.traceId).toBe(traceId);
+        expect(server.parentSpanId).toBe('00f067aa0ba902b7');
+        expect(attr(server, 'http.status_code')).toBe('200');
+        expect(attr(server, 'invoice.id')).toBe(String(invoice.id));
+        expect(attr(server, 'request.id')).toMatch(/^[0-9a-f-]{36}$/);
+
+        const model = spans.find((s) => s.name === 'db invoiceModel.findById');
+        expect(model.traceId).toBe(traceId);
+        expect(model.parentSpanId).toBe(server.spanId);
+        expect(model.endTimeUnixNano >= model.startTimeUnixNano).toBe(true);
+    });
+
+    test('records failing model calls as error spans', async () => {
+        const invoiceModel = require('../src/models/invoiceModel');
+        await expect(tracing.withSpan('job', {}, () => invoiceModel.findById('not-a-number')))
+            .rejects.toThrow();
+        const failed = spans.find((s) => s.name === 'db invoiceModel.findById');
+        expect(failed.status.code).toBe(2);
+    });
+
+    test('does nothing when no exporter is configured', async () => {
+        tracing.setExporter(null);
+        const res = await request(app).get('/');
+        expect(res.headers.traceparent).toBeUndefined();
+        expect(spans).toHaveLength(0);
+    });
+});
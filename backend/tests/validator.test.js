@@ -0,0 +1,58 @@
+const request = require('supertest');
+const app = require('../src/app');
+const {beginTransaction, rollbackTransaction} = require('./dbHelper');
+const {generateToken} = require('../src/middleware/auth');
+const {compileValidator} = require('../src/services/validator');
+const invoiceModel = require('../src/models/invoiceModel');
+const schemas = require('../src/schemas/requests');
+
+beforeEach(() => beginTransaction());
+afterEach(async () => {
+    jest.restoreAllMocks();
+    await rollbackTransaction();
+});
+
+// ─── Compiled validators ─────────────────────────────────────────────────────
+
+describe('Validator - Compile', () => {
+    test('reports the first failing check with the schema message', () => {
+        const check = compileValidator(schemas.createInvoice.body);
+        const future = new Date(Date.now() + 86400000).toISOString();
+        const item = {description: 'Hotel', amount: '100.50'};
+
+        expect(check({name: 'Trip', items: [item], deadline: future})).toBeNull();
+        expect(check({name: 'Trip', items: [], deadline: future}))
+            .toBe('Required: name, items (array with at least one item), deadline');
+        expect(check({name: 'Trip', items: [item], deadline: 'soon'})).toBe('Invalid deadline format');
+        expect(check({name: 'Trip', items: [{description: 'Hotel', amount: -1}], deadline: future}))
+            .toBe('Each item must have a description and valid positive amount');
+        expect(check({name: 'Trip', items: [{...item, recipient_wallet: 'GABC'}], deadline: future}))
+            .toBe('Invalid Stellar wallet address in item: Hotel');
+        expect(check({name: 'Trip', items: [{description: 'Free', amount: 0}], deadline: future}))
+            .toBe('Total amount must be positive');
+    });
+
+    test('unsupported keywords fail when the schema is compiled', () => {
+        expect(() => compileValidator({type: 'date'})).toThrow(/Unsupported request schema type/);
+        expect(() => compileValidator({type: 'string', format: 'email'})).toThrow(/Unsupported request schema format/);
+        expect(() => compileValidator({required: ['a']})).toThrow(/type object/);
+    });
+});
+
+// ─── Middleware ──────────────────────────────────────────────────────────────
+
+describe('Validator - Middleware', () => {
+    test('malformed requests are rejected before the invoice is loaded', async () => {
+        const findById = jest.spyOn(invoiceModel, 'findById');
+        const token = generateToken({id: 905, wallet_address: 'GTEST', role: 'user'});
+
+        const res = await request(app)
+            .post('/api/invoices/1/contribute')
+            .set('Authorization', `Bearer ${token}`)
+            .send({signed_xdr: 'AAAA', amount: 'ten'});
+
+        expect(res.status).toBe(400);
+        expect(res.body.error).toBe('amount must be a number');
+        expect(findById).not.toHaveBeenCalled();
+    });
+});
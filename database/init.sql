@@ -21,6 +21,11 @@ DROP TABLE IF EXISTS services CASCADE;
 DROP TABLE IF EXISTS businesses CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
+DROP TABLE IF EXISTS images CASCADE;
+DROP TABLE IF EXISTS stat_counters CASCADE;
+DROP TABLE IF EXISTS daily_stats CASCADE;
+DROP TABLE IF EXISTS auth_challenges CASCADE;
+DROP TABLE IF EXISTS rate_limit_buckets CASCADE;
 
 -- ============================================================================
 -- USUARIOS
@@ -297,12 +302,222 @@ ON TABLE transactions IS 'Registro off-chain de transacciones blockchain';
 COMMENT
 ON COLUMN transactions.type IS 'create/contribute/withdraw/release/cancel/confirm_release/update_recipients/claim_deadline';
 
+-- ============================================================================
+-- IMÁGENES
+-- ============================================================================
+-- Índice de los objetos del bucket `images` de MinIO. Se mantiene en cada
+-- upload y en el GC; GET /images lo usa con IMAGE_LIST_SOURCE=db para paginar
+-- sin listar el bucket. COLLATE "C" ordena igual que S3 (por bytes) y permite
+-- usar el índice de la PK en filtros por prefijo.
+
+CREATE TABLE images
+(
+    key          VARCHAR(255) COLLATE "C" PRIMARY KEY,
+    size         BIGINT NOT NULL,
+    content_type VARCHAR(100),
+    created_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT
+ON TABLE images IS 'Índice de objetos del bucket images (listado paginado sin MinIO)';
+
+-- ============================================================================
+-- ESTADO COMPARTIDO ENTRE PROCESOS
+-- ============================================================================
+-- Con CLUSTER_WORKERS > 1 (o varias réplicas) cada petición puede caer en un
+-- proceso distinto: el challenge de login y los buckets de rate limit no
+-- pueden vivir en memoria. Ambas tablas son UNLOGGED (no pasan por el WAL);
+-- tras un crash de Postgres se vacían, lo que solo obliga a pedir otro
+-- challenge.
+
+CREATE UNLOGGED TABLE auth_challenges
+(
+    wallet     VARCHAR(56) PRIMARY KEY,
+    message    VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_auth_challenges_created_at ON auth_challenges (created_at);
+
+COMMENT
+ON TABLE auth_challenges IS 'Challenge de login pendiente por wallet (un solo uso, expira a los 5 minutos)';
+
+CREATE UNLOGGED TABLE rate_limit_buckets
+(
+    key        VARCHAR(255) PRIMARY KEY,
+    tokens     DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP        NOT NULL
+);
+
+CREATE INDEX idx_rate_limit_buckets_updated_at ON rate_limit_buckets (updated_at);
+
+COMMENT
+ON TABLE rate_limit_buckets IS 'Token buckets del rate limiter compartidos entre procesos (RATE_LIMIT_STORE=postgres)';
+
+-- Rellena el bucket (capacity tokens por window_ms), y descuenta cost si
+-- alcanza. El FOR UPDATE serializa peticiones simultáneas de la misma clave.
+CREATE OR REPLACE FUNCTION rate_limit_take(p_key VARCHAR, p_capacity FLOAT8, p_cost FLOAT8, p_window_ms FLOAT8,
+                                           OUT granted BOOLEAN, OUT tokens_left FLOAT8) AS $$
+DECLARE
+    level FLOAT8;
+BEGIN
+    INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+    VALUES (p_key, p_capacity, NOW())
+    ON CONFLICT (key) DO NOTHING;
+
+    SELECT LEAST(p_capacity, b.tokens + EXTRACT(EPOCH FROM NOW() - b.updated_at) * 1000 * p_capacity / p_window_ms)
+    INTO level
+    FROM rate_limit_buckets b
+    WHERE b.key = p_key
+    FOR UPDATE;
+
+    granted := level >= p_cost;
+    tokens_left := CASE WHEN granted THEN level - p_cost ELSE level END;
+
+    UPDATE rate_limit_buckets SET tokens = tokens_left, updated_at = NOW() WHERE key = p_key;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- ESTADÍSTICAS
+-- ============================================================================
+-- stat_counters guarda el número de filas de las tablas que muestra el panel
+-- de administración (para businesses, solo las activas). Lo mantienen
+-- triggers por sentencia (un UPDATE por INSERT/DELETE, no por fila), así
+-- /api/admin/stats y los listados paginados no hacen COUNT(*).
+-- daily_stats es un resumen por día que recalcula el job de statsRollup a
+-- partir de users, businesses, invoices y transactions.
+
+CREATE TABLE stat_counters
+(
+    name  VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+COMMENT
+ON TABLE stat_counters IS 'Contadores de filas mantenidos por triggers (users, businesses activas, invoices) y generación del catálogo';
+
+INSERT INTO stat_counters (name, value)
+SELECT 'users', COUNT(*) FROM users
+UNION ALL
+SELECT 'businesses', COUNT(*) FILTER (WHERE active) FROM businesses
+UNION ALL
+SELECT 'invoices', COUNT(*) FROM invoices
+UNION ALL
+SELECT 'catalog', 0;
+
+CREATE OR REPLACE FUNCTION bump_stat_counter() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE stat_counters SET value = value + (SELECT COUNT(*) FROM new_rows) WHERE name = TG_TABLE_NAME;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE stat_counters SET value = value - (SELECT COUNT(*) FROM old_rows) WHERE name = TG_TABLE_NAME;
+    ELSE
+        UPDATE stat_counters SET value = 0 WHERE name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_count_insert AFTER INSERT ON users
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_stat_counter();
+CREATE TRIGGER users_count_delete AFTER DELETE ON users
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_stat_counter();
+CREATE TRIGGER users_count_truncate AFTER TRUNCATE ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_stat_counter();
+
+-- businesses cuenta solo las activas: también cambia al (des)activar
+CREATE OR REPLACE FUNCTION bump_business_counter() RETURNS TRIGGER AS $$
+DECLARE
+    delta BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        delta := delta + (SELECT COUNT(*) FROM new_rows WHERE active);
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        delta := delta - (SELECT COUNT(*) FROM old_rows WHERE active);
+    END IF;
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE stat_counters SET value = 0 WHERE name = 'businesses';
+    ELSIF delta <> 0 THEN
+        UPDATE stat_counters SET value = value + delta WHERE name = 'businesses';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER businesses_count_insert AFTER INSERT ON businesses
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_business_counter();
+CREATE TRIGGER businesses_count_update AFTER UPDATE ON businesses
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_business_counter();
+CREATE TRIGGER businesses_count_delete AFTER DELETE ON businesses
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_business_counter();
+CREATE TRIGGER businesses_count_truncate AFTER TRUNCATE ON businesses
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_business_counter();
+
+CREATE TRIGGER invoices_count_insert AFTER INSERT ON invoices
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_stat_counter();
+CREATE TRIGGER invoices_count_delete AFTER DELETE ON invoices
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_stat_counter();
+CREATE TRIGGER invoices_count_truncate AFTER TRUNCATE ON invoices
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_stat_counter();
+
+-- La generación del catálogo ('catalog') sube con cada sentencia que escribe
+-- services o businesses, y cuando un dueño de negocios cambia su wallet o su
+-- nombre (el catálogo incluye owner_wallet y owner_name). Es la versión del
+-- ETag de /api/services y /api/businesses (serviceModel.catalogVersion): a
+-- diferencia de MAX(updated_at), no depende del orden en que confirman las
+-- transacciones.
+CREATE OR REPLACE FUNCTION bump_catalog_generation() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE stat_counters SET value = value + 1 WHERE name = 'catalog';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER services_catalog_generation AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON services
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_generation();
+CREATE TRIGGER businesses_catalog_generation AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON businesses
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_generation();
+
+CREATE OR REPLACE FUNCTION bump_catalog_for_owner() RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM businesses WHERE owner_id = NEW.id) THEN
+        UPDATE stat_counters SET value = value + 1 WHERE name = 'catalog';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_catalog_generation AFTER UPDATE OF wallet_address, username ON users
+    FOR EACH ROW
+    WHEN (OLD.wallet_address IS DISTINCT FROM NEW.wallet_address OR OLD.username IS DISTINCT FROM NEW.username)
+    EXECUTE FUNCTION bump_catalog_for_owner();
+
+CREATE TABLE daily_stats
+(
+    day                 DATE PRIMARY KEY,
+    new_users           INTEGER        NOT NULL DEFAULT 0,
+    new_businesses      INTEGER        NOT NULL DEFAULT 0,
+    new_invoices        INTEGER        NOT NULL DEFAULT 0,
+    invoices_by_status  JSONB          NOT NULL DEFAULT '{}', -- facturas creadas ese día, por estado actual
+    total_collected     DECIMAL(20, 7) NOT NULL DEFAULT 0,    -- suma de contribute del día
+    released_volume     DECIMAL(20, 7) NOT NULL DEFAULT 0,    -- suma de release del día
+    funded_invoices     INTEGER        NOT NULL DEFAULT 0,    -- facturas que alcanzaron el target ese día
+    avg_funding_seconds INTEGER,                              -- media desde created_at hasta alcanzar el target
+    computed_at         TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT
+ON TABLE daily_stats IS 'Resumen diario para /api/admin/analytics (lo recalcula statsRollup)';
+
 -- ============================================================================
 -- ÍNDICES
 -- ============================================================================
 
 -- Users
 CREATE INDEX idx_users_wallet ON users (wallet_address);
+CREATE INDEX idx_users_created ON users (created_at);
 CREATE INDEX idx_users_email ON users (email);
 
 -- Businesses
@@ -310,6 +525,7 @@ CREATE INDEX idx_businesses_owner ON businesses (owner_id);
 CREATE INDEX idx_businesses_category ON businesses (category);
 CREATE INDEX idx_businesses_wallet ON businesses (wallet_address);
 CREATE INDEX idx_businesses_location ON businesses (location);
+CREATE INDEX idx_businesses_created ON businesses (created_at);
 
 -- Services
 CREATE INDEX idx_services_business ON services (business_id);
@@ -324,6 +540,7 @@ CREATE INDEX idx_invoices_organizer ON invoices (organizer_id);
 CREATE INDEX idx_invoices_status ON invoices (status);
 CREATE INDEX idx_invoices_contract ON invoices (contract_invoice_id);
 CREATE INDEX idx_invoices_invite_code ON invoices (invite_code);
+CREATE INDEX idx_invoices_created ON invoices (created_at);
 
 -- Invoice Items
 CREATE INDEX idx_invoice_items_invoice ON invoice_items (invoice_id);
@@ -338,8 +555,9 @@ CREATE INDEX idx_invoice_modifications_invoice ON invoice_modifications (invoice
 
 -- Transactions
 CREATE INDEX idx_tx_invoice ON transactions (invoice_id);
+CREATE INDEX idx_tx_created ON transactions (created_at);
 CREATE INDEX idx_tx_user ON transactions (user_id);
-CREATE INDEX idx_tx_hash ON transactions (tx_hash);
+-- tx_hash ya tiene índice único (UNIQUE): garantiza idempotencia de submissions
 CREATE INDEX idx_tx_type ON transactions (type);
 
 -- ============================================================================
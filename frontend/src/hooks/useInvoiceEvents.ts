@@ -0,0 +1,36 @@
+import {useEffect} from 'react';
+import {useQueryClient} from '@tanstack/react-query';
+import * as api from '@/services/api';
+import type {Invoice} from '@/types';
+
+/**
+ * Keep the invoice detail queries fresh from the backend's event stream
+ * instead of polling. Counters are patched in place; participants and
+ * the full invoice are refetched only when an event arrives.
+ */
+export function useInvoiceEvents(invoiceId: number, enabled: boolean) {
+    const queryClient = useQueryClient();
+
+    useEffect(() => {
+        if (!enabled || isNaN(invoiceId)) return;
+
+        return api.subscribeInvoiceEvents(invoiceId, (event) => {
+            queryClient.setQueryData<Invoice>(['invoice', invoiceId], (prev) => {
+                if (!prev) return prev;
+                return {
+                    ...prev,
+                    status: event.status ?? prev.status,
+                    total_amount: event.total_amount ?? prev.total_amount,
+                    total_collected: event.total_collected ?? prev.total_collected,
+                    participant_count: event.participant_count ?? prev.participant_count,
+                    confirmation_count: event.confirmation_count ?? prev.confirmation_count,
+                    version: event.version ?? prev.version,
+                };
+            });
+            queryClient.invalidateQueries({queryKey: ['invoiceParticipants', invoiceId]});
+            if (event.type === 'items_updated' || event.type === 'linked') {
+                queryClient.invalidateQueries({queryKey: ['invoice', invoiceId]});
+            }
+        });
+    }, [invoiceId, enabled, queryClient]);
+}
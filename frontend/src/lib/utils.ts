@@ -10,6 +10,13 @@ export function truncateAddress(address: string, chars = 4): string {
     return `${address.slice(0, chars)}...${address.slice(-chars)}`;
 }
 
+// Resized variant of an uploaded image (/images/:filename?w=&fmt=).
+// External URLs are returned unchanged. Widths must match the backend whitelist.
+export function imageVariantUrl(url: string, width: 160 | 320 | 480 | 640 | 960 | 1280, fmt: 'webp' | 'avif' = 'webp'): string {
+    if (!url.startsWith('/images/')) return url;
+    return `${url}?w=${width}&fmt=${fmt}`;
+}
+
 export function formatXLM(amount: number | string): string {
     const num = typeof amount === 'string' ? parseFloat(amount) : amount;
     return new Intl.NumberFormat(i18n.language, {
@@ -8,7 +8,7 @@ import {Badge} from '@/components/ui/badge';
 import {ScheduleDisplay} from '@/components/ui/schedule-display';
 import {ContactInfoDisplay} from '@/components/ui/contact-info-display';
 import {getBusiness, getBusinessServices} from '@/services/api';
-import {formatXLM, truncateAddress} from '@/lib/utils';
+import {formatXLM, imageVariantUrl, truncateAddress} from '@/lib/utils';
 import {useAuth} from '@/hooks/useAuth';
 import {useCart} from '@/hooks/useCart';
 
@@ -147,8 +147,9 @@ export function BusinessProfile() {
                                      className="flex items-center justify-between py-3 border-b last:border-0">
                                     {service.image_url && (
                                         <img
-                                            src={service.image_url}
+                                            src={imageVariantUrl(service.image_url, 160)}
                                             alt={service.name}
+                                            loading="lazy"
                                             className="h-10 w-10 rounded object-cover border mr-3 flex-shrink-0"
                                         />
                                     )}
@@ -53,6 +53,7 @@ import {InvoiceItemsList} from '@/components/invoice/InvoiceItemsList';
 import {ModificationBanner} from '@/components/invoice/ModificationBanner';
 import {useAuth} from '@/hooks/useAuth';
 import {useSign} from '@/hooks/useSign';
+import {useInvoiceEvents} from '@/hooks/useInvoiceEvents';
 import {fadeInUp, staggerContainer} from '@/lib/motion';
 import type {Invoice, InvoiceParticipant} from '@/types';
 
@@ -609,7 +610,8 @@ export function InvoiceDetail() {
         queryKey: ['invoice', invoiceId],
         queryFn: () => getInvoice(invoiceId),
         enabled: !isNaN(invoiceId) && isAuthenticated,
-        refetchInterval: 15_000,
+        // Live updates arrive over SSE; polling is only a slow safety net
+        refetchInterval: 60_000,
         retry: false,
     });
 
@@ -617,9 +619,11 @@ export function InvoiceDetail() {
         queryKey: ['invoiceParticipants', invoiceId],
         queryFn: () => getInvoiceParticipants(invoiceId),
         enabled: !isNaN(invoiceId) && isAuthenticated && !error,
-        refetchInterval: 15_000,
+        refetchInterval: 60_000,
     });
 
+    useInvoiceEvents(invoiceId, isAuthenticated && !error);
+
     const [copied, setCopied] = useState(false);
 
     useEffect(() => {
@@ -13,7 +13,7 @@ import {PageHeader} from '@/components/ui/page-header';
 import {ScheduleDisplay} from '@/components/ui/schedule-display';
 import {ContactInfoDisplay} from '@/components/ui/contact-info-display';
 import {getBusinessCategories, getBusinesses, getBusinessLocations, getServices} from '@/services/api';
-import {formatXLM} from '@/lib/utils';
+import {formatXLM, imageVariantUrl} from '@/lib/utils';
 import {fadeInUp, staggerContainer} from '@/lib/motion';
 import {useAuth} from '@/hooks/useAuth';
 import {useCart} from '@/hooks/useCart';
@@ -280,8 +280,10 @@ export function ServiceCatalog() {
                                     {service.image_url && (
                                         <div className="h-36 w-full overflow-hidden">
                                             <img
-                                                src={service.image_url}
+                                                src={imageVariantUrl(service.image_url, 480)}
+                                                srcSet={`${imageVariantUrl(service.image_url, 480)} 1x, ${imageVariantUrl(service.image_url, 960)} 2x`}
                                                 alt={service.name}
+                                                loading="lazy"
                                                 className="h-full w-full object-cover"
                                             />
                                         </div>
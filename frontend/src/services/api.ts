@@ -8,8 +8,10 @@ import type {
     ContactInfo,
     HealthStatus,
     ImageInfo,
+    ImagePresign,
     ImageUploadResponse,
     Invoice,
+    InvoiceEvent,
     InvoiceItem,
     InvoiceParticipant,
     LocationData,
@@ -51,6 +53,74 @@ async function request<T>(
     return res.json() as Promise<T>;
 }
 
+// ─── Batched GETs ───────────────────────────────────────────────────────────
+// GETs issued in the same tick (the queries a page fires when it mounts) go
+// out as one POST /api/batch: one round trip and one auth check, and the
+// server shares identical lookups between them. Each call still resolves or
+// throws on its own status. A lone GET is sent as a plain request.
+//
+// Only for per-user reads with no validators (me, cart, participants): the
+// catalog and invoice GETs stay plain requests so the browser can revalidate
+// them with If-None-Match and get a 304.
+
+const MAX_BATCH_REQUESTS = 20;
+
+interface BatchResponse {
+    id: string;
+    status: number;
+    body: unknown;
+}
+
+interface PendingGet {
+    path: string;
+    resolve: (body: unknown) => void;
+    reject: (err: Error) => void;
+}
+
+let pendingGets: PendingGet[] = [];
+
+async function sendBatch(pending: PendingGet[]) {
+    if (pending.length === 1) {
+        const [{path, resolve, reject}] = pending;
+        return request<unknown>(path).then(resolve, reject);
+    }
+    try {
+        const {responses} = await request<{ responses: BatchResponse[] }>('/api/batch', {
+            method: 'POST',
+            body: JSON.stringify({requests: pending.map(({path}, i) => ({id: String(i), path}))}),
+        });
+        const byId = new Map(responses.map((res) => [res.id, res]));
+        pending.forEach(({resolve, reject}, i) => {
+            const res = byId.get(String(i));
+            if (!res) {
+                reject(new Error('Missing batch response'));
+            } else if (res.status >= 200 && res.status < 300) {
+                resolve(res.body);
+            } else {
+                const error = (res.body as { error?: string } | null)?.error;
+                reject(new Error(error || `HTTP ${res.status}`));
+            }
+        });
+    } catch (err) {
+        pending.forEach(({reject}) => reject(err as Error));
+    }
+}
+
+function flushGets() {
+    const pending = pendingGets;
+    pendingGets = [];
+    for (let i = 0; i < pending.length; i += MAX_BATCH_REQUESTS) {
+        void sendBatch(pending.slice(i, i + MAX_BATCH_REQUESTS));
+    }
+}
+
+export function batchGet<T>(path: string): Promise<T> {
+    return new Promise<T>((resolve, reject) => {
+        if (!pendingGets.length) setTimeout(flushGets, 0);
+        pendingGets.push({path, resolve: resolve as (body: unknown) => void, reject});
+    });
+}
+
 // ─── Health ─────────────────────────────────────────────────────────────────
 
 export const getHealth = () => request<HealthStatus>('/health');
@@ -78,7 +148,7 @@ export const loginWithAccesly = (email: string, wallet: string) =>
         body: JSON.stringify({provider: 'accesly', email, wallet}),
     });
 
-export const getMe = () => request<User>('/api/auth/me');
+export const getMe = () => batchGet<User>('/api/auth/me');
 
 // ─── Users ──────────────────────────────────────────────────────────────────
 
@@ -93,7 +163,7 @@ export const getUserByWallet = (wallet: string) =>
 
 // ─── Images ─────────────────────────────────────────────────────────────────
 
-export const uploadImage = (file: File) => {
+const uploadImageViaApi = (file: File) => {
     const form = new FormData();
     form.append('image', file);
     return request<ImageUploadResponse>('/images/upload', {
@@ -102,7 +172,42 @@ export const uploadImage = (file: File) => {
     });
 };
 
-export const getImages = () => request<ImageInfo[]>('/images');
+// Upload straight to object storage with a presigned POST policy, then let
+// the API verify it. Falls back to the multipart upload through the API when
+// direct uploads are disabled or the storage request fails.
+export const uploadImage = async (file: File) => {
+    let presign: ImagePresign;
+    try {
+        presign = await request<ImagePresign>('/images/presign', {
+            method: 'POST',
+            body: JSON.stringify({filename: file.name, content_type: file.type, size: file.size}),
+        });
+    } catch {
+        return uploadImageViaApi(file);
+    }
+
+    const form = new FormData();
+    for (const [name, value] of Object.entries(presign.fields)) form.append(name, value);
+    form.append('file', file);
+    const res = await fetch(presign.url, {method: 'POST', body: form}).catch(() => null);
+    if (!res || !res.ok) return uploadImageViaApi(file);
+
+    return request<ImageUploadResponse>('/images/complete', {
+        method: 'POST',
+        body: JSON.stringify({upload_token: presign.upload_token}),
+    });
+};
+
+// One page of images; pass the last filename as `cursor` for the next page.
+// A page shorter than `limit` is the last one.
+export const getImages = (params: {limit?: number; prefix?: string; cursor?: string} = {}) => {
+    const query = new URLSearchParams();
+    if (params.limit) query.set('limit', String(params.limit));
+    if (params.prefix) query.set('prefix', params.prefix);
+    if (params.cursor) query.set('cursor', params.cursor);
+    const qs = query.toString();
+    return request<ImageInfo[]>(`/images${qs ? `?${qs}` : ''}`);
+};
 
 // ─── Businesses ─────────────────────────────────────────────────────────────
 
@@ -218,7 +323,7 @@ export const getBusinessLocations = () =>
 
 // ─── Cart ───────────────────────────────────────────────────────────────────
 
-export const getCart = () => request<Cart>('/api/cart');
+export const getCart = () => batchGet<Cart>('/api/cart');
 
 export const addToCart = (service_id: number, quantity = 1) =>
     request<CartItem>('/api/cart/items', {
@@ -226,6 +331,15 @@ export const addToCart = (service_id: number, quantity = 1) =>
         body: JSON.stringify({service_id, quantity}),
     });
 
+export const addManyToCart = (
+    items: { service_id: number; quantity?: number }[],
+    replace = false,
+) =>
+    request<Cart>('/api/cart/items/bulk', {
+        method: 'POST',
+        body: JSON.stringify({items, replace}),
+    });
+
 export const updateCartItem = (id: number, quantity: number) =>
     request<CartItem>(`/api/cart/items/${id}`, {
         method: 'PUT',
@@ -349,7 +463,7 @@ export const claimDeadline = (id: number, signed_xdr: string) =>
 // ─── Invoice Participants ───────────────────────────────────────────────────
 
 export const getInvoiceParticipants = (invoiceId: number) =>
-    request<InvoiceParticipant[]>(`/api/invoices/${invoiceId}/participants`);
+    batchGet<InvoiceParticipant[]>(`/api/invoices/${invoiceId}/participants`);
 
 export const joinInvoice = (invoiceId: number) =>
     request<InvoiceParticipant>(`/api/invoices/${invoiceId}/join`, {
@@ -387,6 +501,69 @@ export const confirmRelease = (invoiceId: number, signed_xdr?: string) =>
         },
     );
 
+/**
+ * Subscribe to the invoice's Server-Sent Events stream. Uses fetch instead of
+ * EventSource so the JWT travels in the Authorization header; reconnects with
+ * Last-Event-ID so no events are missed. Returns an unsubscribe function.
+ */
+export function subscribeInvoiceEvents(
+    invoiceId: number,
+    onEvent: (event: InvoiceEvent) => void,
+): () => void {
+    const controller = new AbortController();
+    let lastEventId = '';
+    let retryMs = 5000;
+
+    const dispatch = (block: string) => {
+        let id = '';
+        let data = '';
+        for (const line of block.split('\n')) {
+            if (line.startsWith('id: ')) id = line.slice(4);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+            else if (line.startsWith('retry: ')) retryMs = Number(line.slice(7)) || retryMs;
+        }
+        if (id) lastEventId = id;
+        if (data) onEvent({...JSON.parse(data), id: Number(id)});
+    };
+
+    const connect = async () => {
+        while (!controller.signal.aborted) {
+            try {
+                const token = localStorage.getItem('jwt');
+                const headers: Record<string, string> = {Accept: 'text/event-stream'};
+                if (token) headers['Authorization'] = `Bearer ${token}`;
+                if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+
+                const res = await fetch(`${BASE_URL}/api/invoices/${invoiceId}/events`, {
+                    headers,
+                    signal: controller.signal,
+                });
+                if (res.status === 401 || res.status === 403 || res.status === 404) return;
+                if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+                const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                for (; ;) {
+                    const {value, done} = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    let sep;
+                    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                        dispatch(buffer.slice(0, sep));
+                        buffer = buffer.slice(sep + 2);
+                    }
+                }
+            } catch (_) {
+                if (controller.signal.aborted) return;
+            }
+            await new Promise((r) => setTimeout(r, retryMs));
+        }
+    };
+
+    connect();
+    return () => controller.abort();
+}
+
 // ─── Admin ──────────────────────────────────────────────────────────────────
 
 export const getAdminStats = () =>
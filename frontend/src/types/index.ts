@@ -178,6 +178,22 @@ export interface InvoiceModification {
     created_at: string;
 }
 
+export interface InvoiceEvent {
+    id: number;
+    type: 'participant_joined' | 'contribution' | 'withdrawal' | 'release_confirmed'
+        | 'released' | 'cancelled' | 'items_updated' | 'linked';
+    invoice_id: number;
+    status?: Invoice['status'];
+    total_amount?: string;
+    total_collected?: string;
+    participant_count?: number;
+    confirmation_count?: number;
+    version?: number;
+    user_id?: number;
+    tx_hash?: string | null;
+    at: string;
+}
+
 export interface OnchainState {
     status: string;
     total_collected: string;
@@ -202,9 +218,19 @@ export interface CartItem {
     business_wallet: string | null;
 }
 
+export interface CartBusinessSummary {
+    business_id: number;
+    business_name: string;
+    business_wallet: string | null;
+    count: number;
+    subtotal: string;
+}
+
 export interface Cart {
     items: CartItem[];
     count: number;
+    total: string;
+    businesses: CartBusinessSummary[];
 }
 
 // ─── Images ─────────────────────────────────────────────────────────────────
@@ -217,6 +243,13 @@ export interface ImageUploadResponse {
     url: string;
 }
 
+export interface ImagePresign {
+    url: string;
+    fields: Record<string, string>;
+    filename: string;
+    upload_token: string;
+}
+
 export interface ImageInfo {
     filename: string;
     size: number;